@@ -1,33 +1,50 @@
-import json
+import os
 import sys
 
-with open('prod-google-services.json', 'r') as f:
-    data = json.load(f)
+# Shared tracing and cache helpers live with the other tooling in scripts/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scripts'))
+import tracing  # noqa: E402
+import validation_cache  # noqa: E402
 
-project_id = data['project_info']['project_id']
-print(f'✅ Production Project ID: {project_id}')
+# Bump when the checks below change so cached verdicts are not reused
+RULES_VERSION = 1
+CONFIG_PATH = 'prod-google-services.json'
 
-if project_id != 'samaan-ai-production-2025':
-    print(f'❌ Expected production project: samaan-ai-production-2025, got: {project_id}')
-    sys.exit(1)
 
-# Check Android client
-client = data['client'][0]
-oauth_clients = client['oauth_client']
-android_client = next((c for c in oauth_clients if c['client_type'] == 1), None)
+def validate():
+    data = tracing.load_json(CONFIG_PATH)
 
-if not android_client:
-    print('❌ No Android OAuth client found in production config')
-    sys.exit(1)
+    project_id = data['project_info']['project_id']
+    print(f'✅ Production Project ID: {project_id}')
 
-package_name = android_client['android_info']['package_name']
-cert_hash = android_client['android_info']['certificate_hash']
+    if project_id != 'samaan-ai-production-2025':
+        print(f'❌ Expected production project: samaan-ai-production-2025, got: {project_id}')
+        return 1
 
-print(f'✅ Package Name: {package_name}')
-print(f'✅ Certificate Hash: {cert_hash}')
+    # Check Android client
+    client = data['client'][0]
+    oauth_clients = client['oauth_client']
+    android_client = next((c for c in oauth_clients if c['client_type'] == 1), None)
 
-if package_name != 'com.samaanai.productivityhealth.prod':
-    print(f'❌ Unexpected package name: {package_name}')
-    sys.exit(1)
+    if not android_client:
+        print('❌ No Android OAuth client found in production config')
+        return 1
 
-print('✅ Production configuration structure is valid!')
\ No newline at end of file
+    package_name = android_client['android_info']['package_name']
+    cert_hash = android_client['android_info']['certificate_hash']
+
+    print(f'✅ Package Name: {package_name}')
+    print(f'✅ Certificate Hash: {cert_hash}')
+
+    if package_name != 'com.samaanai.productivityhealth.prod':
+        print(f'❌ Unexpected package name: {package_name}')
+        return 1
+
+    print('✅ Production configuration structure is valid!')
+    return 0
+
+
+if __name__ == '__main__':
+    tracing.setup()
+    cache = validation_cache.from_argv()
+    sys.exit(cache.run('validate_production', RULES_VERSION, [CONFIG_PATH], validate))
@@ -1,45 +1,62 @@
-import json
-import sys
 import os
+import sys
+
+# Shared tracing and cache helpers live with the other tooling in scripts/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scripts'))
+import tracing  # noqa: E402
+import validation_cache  # noqa: E402
+
+# Bump when the checks below change so cached verdicts are not reused
+RULES_VERSION = 1
+CONFIG_PATH = 'staging-google-services.json'
+
+
+def validate():
+    data = tracing.load_json(CONFIG_PATH)
+
+    project_id = data['project_info']['project_id']
+    print(f'✅ Staging Project ID: {project_id}')
 
-with open('staging-google-services.json', 'r') as f:
-    data = json.load(f)
+    if project_id != 'samaan-ai-staging-2025':
+        print(f'❌ Expected staging project: samaan-ai-staging-2025, got: {project_id}')
+        return 1
 
-project_id = data['project_info']['project_id']
-print(f'✅ Staging Project ID: {project_id}')
+    # Check Android client
+    client = data['client'][0]
+    oauth_clients = client['oauth_client']
+    android_client = next((c for c in oauth_clients if c['client_type'] == 1), None)
 
-if project_id != 'samaan-ai-staging-2025':
-    print(f'❌ Expected staging project: samaan-ai-staging-2025, got: {project_id}')
-    sys.exit(1)
+    if not android_client:
+        print('❌ No Android OAuth client found in staging config')
+        return 1
 
-# Check Android client
-client = data['client'][0]
-oauth_clients = client['oauth_client']
-android_client = next((c for c in oauth_clients if c['client_type'] == 1), None)
+    package_name = android_client['android_info']['package_name']
+    cert_hash = android_client['android_info']['certificate_hash']
 
-if not android_client:
-    print('❌ No Android OAuth client found in staging config')
-    sys.exit(1)
+    print(f'✅ Package Name: {package_name}')
+    print(f'✅ Certificate Hash: {cert_hash}')
 
-package_name = android_client['android_info']['package_name']
-cert_hash = android_client['android_info']['certificate_hash']
+    if package_name != 'com.samaanai.productivityhealth':
+        print(f'❌ Unexpected package name: {package_name}')
+        return 1
 
-print(f'✅ Package Name: {package_name}')
-print(f'✅ Certificate Hash: {cert_hash}')
+    # Compare against EXPECTED_DEBUG_SHA1 if provided (computed from DEBUG_KEYSTORE in CI)
+    expected_debug_hash = os.environ.get('EXPECTED_DEBUG_SHA1')
+    if expected_debug_hash:
+        if cert_hash.lower() != expected_debug_hash.lower():
+            print(f'❌ Staging should use consistent debug keystore hash: {expected_debug_hash}')
+            print(f'❌ But got: {cert_hash}')
+            print('❌ Make sure GOOGLE_SERVICES_STAGING matches the DEBUG_KEYSTORE SHA-1')
+            return 1
+    else:
+        print('⚠️  EXPECTED_DEBUG_SHA1 not set; skipping SHA-1 match enforcement')
 
-if package_name != 'com.samaanai.productivityhealth':
-    print(f'❌ Unexpected package name: {package_name}')
-    sys.exit(1)
+    print('✅ Staging configuration is valid!')
+    return 0
 
-# Compare against EXPECTED_DEBUG_SHA1 if provided (computed from DEBUG_KEYSTORE in CI)
-expected_debug_hash = os.environ.get('EXPECTED_DEBUG_SHA1')
-if expected_debug_hash:
-    if cert_hash.lower() != expected_debug_hash.lower():
-        print(f'❌ Staging should use consistent debug keystore hash: {expected_debug_hash}')
-        print(f'❌ But got: {cert_hash}')
-        print('❌ Make sure GOOGLE_SERVICES_STAGING matches the DEBUG_KEYSTORE SHA-1')
-        sys.exit(1)
-else:
-    print('⚠️  EXPECTED_DEBUG_SHA1 not set; skipping SHA-1 match enforcement')
 
-print('✅ Staging configuration is valid!')
\ No newline at end of file
+if __name__ == '__main__':
+    tracing.setup()
+    cache = validation_cache.from_argv()
+    sys.exit(cache.run('validate_staging', RULES_VERSION, [CONFIG_PATH], validate,
+                       extra=[os.environ.get('EXPECTED_DEBUG_SHA1', '').lower()]))
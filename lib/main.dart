@@ -5,6 +5,7 @@ import 'package:samaanai_fitness_tracker/config/firebase_config.dart';
 import 'package:samaanai_fitness_tracker/screens/auth_gate.dart';
 import 'package:samaanai_fitness_tracker/services/auth_service.dart';
 import 'package:samaanai_fitness_tracker/services/firebase_service.dart';
+import 'package:samaanai_fitness_tracker/services/operation_recorder.dart';
 import 'package:samaanai_fitness_tracker/theme/app_theme.dart';
 import 'package:firebase_auth/firebase_auth.dart';
 import 'package:cloud_firestore/cloud_firestore.dart';
@@ -86,6 +87,8 @@ class MyApp extends StatelessWidget {
             auth: FirebaseAuth.instance,
             firestore: FirebaseFirestore.instance,
             httpClient: http.Client(),
+            recorder:
+                OperationRecorder.enabled ? OperationRecorder() : null,
           ),
         ),
       ],
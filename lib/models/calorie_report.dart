@@ -1,3 +1,5 @@
+import 'dart:convert';
+
 class CalorieReportData {
   final DateTime date;
   final double netCalorieDeficit;
@@ -51,6 +53,11 @@ class CalorieReportData {
 }
 
 class CalorieReport {
+  static const String columnarFormat = 'columnar-v1';
+  static const String columnarMediaType =
+      'application/vnd.samaan.columnar+json';
+  static const String streamMediaType = 'application/x-ndjson';
+
   final String period;
   final DateTime startDate;
   final DateTime endDate;
@@ -80,14 +87,26 @@ class CalorieReport {
   });
 
   factory CalorieReport.fromJson(Map<String, dynamic> json) {
+    return CalorieReport.fromTotals(
+      json,
+      json['format'] == columnarFormat
+          ? _columnarData(json['columns'] as Map<String, dynamic>)
+          : (json['data'] as List<dynamic>? ?? [])
+              .map((item) =>
+                  CalorieReportData.fromJson(item as Map<String, dynamic>))
+              .toList(),
+    );
+  }
+
+  // Builds a report from its summary fields and rows decoded separately, as
+  // the final record of a streamed report carries totals only.
+  factory CalorieReport.fromTotals(
+      Map<String, dynamic> json, List<CalorieReportData> data) {
     return CalorieReport(
       period: json['period'] as String? ?? '',
       startDate: DateTime.parse(json['startDate'] as String),
       endDate: DateTime.parse(json['endDate'] as String),
-      data: (json['data'] as List<dynamic>? ?? [])
-          .map((item) =>
-              CalorieReportData.fromJson(item as Map<String, dynamic>))
-          .toList(),
+      data: data,
       averageBMR: CalorieReportData._safeToDouble(json['averageBMR']),
       totalCaloriesConsumed:
           CalorieReportData._safeToDouble(json['totalCaloriesConsumed']),
@@ -101,6 +120,41 @@ class CalorieReport {
     );
   }
 
+  // Decodes the columnar wire format: one array per field, dates as day
+  // offsets from baseDate, nullable fields paired with a presence bitmap.
+  static List<CalorieReportData> _columnarData(Map<String, dynamic> columns) {
+    final baseDate = DateTime.parse(columns['baseDate'] as String);
+    final offsets = columns['dayOffsets'] as List<dynamic>;
+    List<dynamic> column(String name) => columns[name] as List<dynamic>;
+    final weightPresent = _presence(columns['weightPresent']);
+    final glassesPresent = _presence(columns['glassesPresent']);
+
+    return List.generate(offsets.length, (i) {
+      return CalorieReportData(
+        date: baseDate.add(Duration(days: _safeToInt(offsets[i]))),
+        netCalorieDeficit:
+            CalorieReportData._safeToDouble(column('netCalorieDeficit')[i]),
+        bmr: CalorieReportData._safeToDouble(column('bmr')[i]),
+        caloriesConsumed:
+            CalorieReportData._safeToDouble(column('caloriesConsumed')[i]),
+        caloriesBurned:
+            CalorieReportData._safeToDouble(column('caloriesBurned')[i]),
+        weight: _isSet(weightPresent, i)
+            ? CalorieReportData._safeToDouble(column('weight')[i])
+            : null,
+        glasses: _isSet(glassesPresent, i)
+            ? CalorieReportData._safeToDouble(column('glasses')[i])
+            : null,
+      );
+    });
+  }
+
+  static List<int> _presence(dynamic encoded) =>
+      encoded is String ? base64Decode(encoded) : const [];
+
+  static bool _isSet(List<int> bits, int i) =>
+      (i >> 3) < bits.length && bits[i >> 3] & (1 << (i & 7)) != 0;
+
   static int _safeToInt(dynamic value) {
     if (value == null) return 0;
     if (value is int) return value;
@@ -126,3 +180,21 @@ class CalorieReport {
     };
   }
 }
+
+// One record of a streamed report: a month of rows, or the final summary.
+class CalorieReportChunk {
+  final DateTime startDate;
+  final DateTime endDate;
+  final List<CalorieReportData> data;
+  // Set on the last chunk only, holding every row received so far
+  final CalorieReport? report;
+
+  CalorieReportChunk({
+    required this.startDate,
+    required this.endDate,
+    required this.data,
+    this.report,
+  });
+
+  bool get isComplete => report != null;
+}
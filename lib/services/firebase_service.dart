@@ -8,24 +8,34 @@ import '../models/user_profile.dart';
 import '../models/daily_entry.dart';
 import '../models/calorie_report.dart';
 import '../models/weight_loss_goal.dart';
+import 'operation_recorder.dart';
 
 class FirebaseService extends ChangeNotifier {
   final FirebaseAuth _auth;
   final FirebaseFirestore _firestore;
   final http.Client _httpClient;
+  final OperationRecorder? _recorder;
 
   FirebaseService({
     required FirebaseAuth auth,
     required FirebaseFirestore firestore,
     required http.Client httpClient,
+    OperationRecorder? recorder,
   })  : _auth = auth,
         _firestore = firestore,
-        _httpClient = httpClient;
+        _httpClient = httpClient,
+        _recorder = recorder;
 
   // Collections
   static const String usersCollection = 'users';
   static const String dailyEntriesCollection = 'dailyEntries';
   static const String weightLossGoalsCollection = 'weightLossGoals';
+  static const String userWatermarksCollection = 'userWatermarks';
+
+  // Last 200 response per request, revalidated with If-None-Match. Kept in
+  // least-recently-used order and capped at maxCachedHttpResponses.
+  static const int maxCachedHttpResponses = 64;
+  final Map<String, _CachedHttpResponse> _httpResponseCache = {};
 
   // Get current user ID
   String? get _currentUserId => _auth.currentUser?.uid;
@@ -33,10 +43,11 @@ class FirebaseService extends ChangeNotifier {
   // User Profile Methods
   Future<void> createUserProfile(UserProfile profile) async {
     try {
-      await _firestore
-          .collection(usersCollection)
-          .doc(profile.uid)
-          .set(profile.toFirestore());
+      final batch = _firestore.batch();
+      batch.set(_firestore.collection(usersCollection).doc(profile.uid),
+          profile.toFirestore());
+      _advanceWriteWatermark(batch, profile.uid);
+      await batch.commit();
     } catch (e) {
       throw Exception('Failed to create user profile: $e');
     }
@@ -56,10 +67,11 @@ class FirebaseService extends ChangeNotifier {
 
   Future<void> updateUserProfile(UserProfile profile) async {
     try {
-      await _firestore
-          .collection(usersCollection)
-          .doc(profile.uid)
-          .update(profile.copyWith(updatedAt: DateTime.now()).toFirestore());
+      final batch = _firestore.batch();
+      batch.update(_firestore.collection(usersCollection).doc(profile.uid),
+          profile.copyWith(updatedAt: DateTime.now()).toFirestore());
+      _advanceWriteWatermark(batch, profile.uid);
+      await batch.commit();
     } catch (e) {
       throw Exception('Failed to update user profile: $e');
     }
@@ -88,7 +100,9 @@ class FirebaseService extends ChangeNotifier {
       final dateString = _formatDateString(entry.date);
       final docId = '${entry.uid}_$dateString';
 
-      await _firestore.collection(dailyEntriesCollection).doc(docId).set(
+      final batch = _firestore.batch();
+      batch.set(
+          _firestore.collection(dailyEntriesCollection).doc(docId),
           entry
               .copyWith(
                 id: docId,
@@ -96,11 +110,23 @@ class FirebaseService extends ChangeNotifier {
               )
               .toFirestore(),
           SetOptions(merge: true));
+      _advanceWriteWatermark(batch, entry.uid);
+      await batch.commit();
     } catch (e) {
       throw Exception('Failed to save daily entry: $e');
     }
   }
 
+  // Bump the user's last-write watermark in the same batch as a data write.
+  // The report endpoints compare cached reports against it.
+  void _advanceWriteWatermark(WriteBatch batch, String uid) {
+    batch.set(
+      _firestore.collection(userWatermarksCollection).doc(uid),
+      {'lastWriteAt': FieldValue.serverTimestamp()},
+      SetOptions(merge: true),
+    );
+  }
+
   Future<DailyEntry?> getDailyEntry(String uid, DateTime date) async {
     try {
       final dateString = _formatDateString(date);
@@ -149,142 +175,119 @@ class FirebaseService extends ChangeNotifier {
     }
   }
 
+  // Runs a daily-entry write, recording it when an OperationRecorder is attached
+  Future<void> _recorded(String op, Map<String, dynamic> payload,
+      Future<void> Function() body) {
+    final recorder = _recorder;
+    if (recorder == null) return body();
+    return recorder.track(op, _currentUserId!,
+        _formatDateString(DateTime.now()), payload, body);
+  }
+
   // Add food entry to today's log
   Future<void> addFoodEntry(FoodEntry foodEntry) async {
     if (_currentUserId == null) throw Exception('User not authenticated');
 
-    try {
-      final today = DateTime.now();
-      final existingEntry = await getDailyEntry(_currentUserId!, today);
-
-      if (existingEntry != null) {
-        final updatedFoodEntries = [...existingEntry.foodEntries, foodEntry];
-        await createOrUpdateDailyEntry(
-          existingEntry.copyWith(foodEntries: updatedFoodEntries),
-        );
-      } else {
-        final newEntry = DailyEntry(
-          id: '',
-          uid: _currentUserId!,
-          date: today,
-          foodEntries: [foodEntry],
-          exerciseEntries: [],
-          createdAt: DateTime.now(),
-          updatedAt: DateTime.now(),
-        );
-        await createOrUpdateDailyEntry(newEntry);
+    await _recorded('addFoodEntry', foodEntry.toMap(), () async {
+      try {
+        final today = DateTime.now();
+        final existingEntry = await getDailyEntry(_currentUserId!, today);
+
+        if (existingEntry != null) {
+          final updatedFoodEntries = [...existingEntry.foodEntries, foodEntry];
+          await createOrUpdateDailyEntry(
+            existingEntry.copyWith(foodEntries: updatedFoodEntries),
+          );
+        } else {
+          final newEntry = DailyEntry(
+            id: '',
+            uid: _currentUserId!,
+            date: today,
+            foodEntries: [foodEntry],
+            exerciseEntries: [],
+            createdAt: DateTime.now(),
+            updatedAt: DateTime.now(),
+          );
+          await createOrUpdateDailyEntry(newEntry);
+        }
+      } catch (e) {
+        throw Exception('Failed to add food entry: $e');
       }
-    } catch (e) {
-      throw Exception('Failed to add food entry: $e');
-    }
+    });
   }
 
   // Add exercise entry to today's log
   Future<void> addExerciseEntry(ExerciseEntry exerciseEntry) async {
     if (_currentUserId == null) throw Exception('User not authenticated');
 
-    try {
-      final today = DateTime.now();
-      final existingEntry = await getDailyEntry(_currentUserId!, today);
-
-      if (existingEntry != null) {
-        final updatedExerciseEntries = [
-          ...existingEntry.exerciseEntries,
-          exerciseEntry
-        ];
-        await createOrUpdateDailyEntry(
-          existingEntry.copyWith(exerciseEntries: updatedExerciseEntries),
-        );
-      } else {
-        final newEntry = DailyEntry(
-          id: '',
-          uid: _currentUserId!,
-          date: today,
-          foodEntries: [],
-          exerciseEntries: [exerciseEntry],
-          createdAt: DateTime.now(),
-          updatedAt: DateTime.now(),
-        );
-        await createOrUpdateDailyEntry(newEntry);
+    await _recorded('addExerciseEntry', exerciseEntry.toMap(), () async {
+      try {
+        final today = DateTime.now();
+        final existingEntry = await getDailyEntry(_currentUserId!, today);
+
+        if (existingEntry != null) {
+          final updatedExerciseEntries = [
+            ...existingEntry.exerciseEntries,
+            exerciseEntry
+          ];
+          await createOrUpdateDailyEntry(
+            existingEntry.copyWith(exerciseEntries: updatedExerciseEntries),
+          );
+        } else {
+          final newEntry = DailyEntry(
+            id: '',
+            uid: _currentUserId!,
+            date: today,
+            foodEntries: [],
+            exerciseEntries: [exerciseEntry],
+            createdAt: DateTime.now(),
+            updatedAt: DateTime.now(),
+          );
+          await createOrUpdateDailyEntry(newEntry);
+        }
+      } catch (e) {
+        throw Exception('Failed to add exercise entry: $e');
       }
-    } catch (e) {
-      throw Exception('Failed to add exercise entry: $e');
-    }
+    });
   }
 
   // Update weight for today
   Future<void> updateWeight(double weight) async {
     if (_currentUserId == null) throw Exception('User not authenticated');
 
-    try {
-      final today = DateTime.now();
-      final existingEntry = await getDailyEntry(_currentUserId!, today);
+    await _recorded('updateWeight', {'weight': weight}, () async {
+      try {
+        final today = DateTime.now();
+        final existingEntry = await getDailyEntry(_currentUserId!, today);
 
-      if (existingEntry != null) {
-        await createOrUpdateDailyEntry(
-          existingEntry.copyWith(weight: weight),
-        );
-      } else {
-        final newEntry = DailyEntry(
-          id: '',
-          uid: _currentUserId!,
-          date: today,
-          weight: weight,
-          foodEntries: [],
-          exerciseEntries: [],
-          createdAt: DateTime.now(),
-          updatedAt: DateTime.now(),
-        );
-        await createOrUpdateDailyEntry(newEntry);
+        if (existingEntry != null) {
+          await createOrUpdateDailyEntry(
+            existingEntry.copyWith(weight: weight),
+          );
+        } else {
+          final newEntry = DailyEntry(
+            id: '',
+            uid: _currentUserId!,
+            date: today,
+            weight: weight,
+            foodEntries: [],
+            exerciseEntries: [],
+            createdAt: DateTime.now(),
+            updatedAt: DateTime.now(),
+          );
+          await createOrUpdateDailyEntry(newEntry);
+        }
+      } catch (e) {
+        throw Exception('Failed to update weight: $e');
       }
-    } catch (e) {
-      throw Exception('Failed to update weight: $e');
-    }
+    });
   }
 
   // Cloud Functions
-  // Debug function to check user profile completeness
-  Future<Map<String, dynamic>> debugUserProfile(String uid) async {
-    try {
-      final userDoc = await _firestore.collection('users').doc(uid).get();
-
-      if (!userDoc.exists) {
-        return {'exists': false, 'error': 'User profile not found'};
-      }
-
-      final userData = userDoc.data()!;
-      final result = {
-        'exists': true,
-        'data': userData,
-        'requiredFields': {
-          'height': userData['height'] != null,
-          'weight': userData['weight'] != null,
-          'gender': userData['gender'] != null,
-          'dateOfBirth': userData['dateOfBirth'] != null,
-        },
-        'fieldValues': {
-          'height': userData['height'],
-          'weight': userData['weight'],
-          'gender': userData['gender'],
-          'dateOfBirth': userData['dateOfBirth']?.toString(),
-        }
-      };
-
-      print('👤 User profile debug: $result');
-      return result;
-    } catch (e) {
-      print('❌ Error debugging user profile: $e');
-      return {'exists': false, 'error': e.toString()};
-    }
-  }
-
   Future<double> calculateBMR(String uid) async {
     try {
       print('🔍 Calculating BMR for user: $uid');
 
-      // Debug user profile first
-      await debugUserProfile(uid);
-
       // Check environment configuration
       const bool useEmulators =
           bool.fromEnvironment('USE_FIREBASE_EMULATORS', defaultValue: false);
@@ -373,8 +376,11 @@ class FirebaseService extends ChangeNotifier {
               'https://us-central1-samaan-ai-staging-2025.cloudfunctions.net/generateCalorieReportHttp';
         }
 
-        final response =
-            await _makeHttpRequest(endpoint, {'uid': uid, 'period': period});
+        final response = await _makeHttpRequest(
+          endpoint,
+          {'uid': uid, 'period': period},
+          accept: CalorieReport.columnarMediaType,
+        );
         return CalorieReport.fromJson(response);
       }
     } catch (e) {
@@ -386,6 +392,79 @@ class FirebaseService extends ChangeNotifier {
     }
   }
 
+  // Streams a custom-range report month by month so charts can render while
+  // the rest of a multi-year history is still arriving.
+  Stream<CalorieReportChunk> streamCalorieReport(
+      String uid, DateTime startDate, DateTime endDate) async* {
+    const bool useEmulators =
+        bool.fromEnvironment('USE_FIREBASE_EMULATORS', defaultValue: false);
+    const String environment =
+        String.fromEnvironment('ENVIRONMENT', defaultValue: 'staging');
+
+    String endpoint;
+    if (useEmulators) {
+      endpoint =
+          'http://127.0.0.1:5001/fitness-tracker-p2025/us-central1/streamCalorieReportHttp';
+    } else if (environment == 'production') {
+      endpoint =
+          'https://us-central1-samaan-ai-production-2025.cloudfunctions.net/streamCalorieReportHttp';
+    } else {
+      // staging, development, or default
+      endpoint =
+          'https://us-central1-samaan-ai-staging-2025.cloudfunctions.net/streamCalorieReportHttp';
+    }
+
+    final request = http.Request('POST', Uri.parse(endpoint))
+      ..headers['Content-Type'] = 'application/json'
+      ..headers['Accept'] = CalorieReport.streamMediaType
+      ..body = jsonEncode({
+        'uid': uid,
+        'startDate': _formatDateString(startDate),
+        'endDate': _formatDateString(endDate),
+      });
+
+    final resp = await _httpClient.send(request);
+    if (resp.statusCode != 200) {
+      final body = await resp.stream.bytesToString();
+      throw Exception('HTTP ${resp.statusCode}: $body');
+    }
+
+    // Decode line by line as bytes arrive instead of buffering the body
+    final rows = <CalorieReportData>[];
+    final lines =
+        resp.stream.transform(utf8.decoder).transform(const LineSplitter());
+    await for (final line in lines) {
+      if (line.trim().isEmpty) continue;
+      final record = jsonDecode(line) as Map<String, dynamic>;
+      switch (record['type']) {
+        case 'month':
+          final data = (record['data'] as List<dynamic>)
+              .map((item) =>
+                  CalorieReportData.fromJson(item as Map<String, dynamic>))
+              .toList();
+          rows.addAll(data);
+          yield CalorieReportChunk(
+            startDate: DateTime.parse(record['startDate'] as String),
+            endDate: DateTime.parse(record['endDate'] as String),
+            data: data,
+          );
+          break;
+        case 'totals':
+          final report = CalorieReport.fromTotals(record, rows);
+          yield CalorieReportChunk(
+            startDate: report.startDate,
+            endDate: report.endDate,
+            data: const [],
+            report: report,
+          );
+          return;
+        case 'error':
+          throw Exception('Report stream failed: ${record['error']}');
+      }
+    }
+    throw Exception('Report stream ended before its totals record');
+  }
+
   // Helper method for HTTP endpoint calls (emulator only)
   Future<Map<String, dynamic>> _generateCalorieReportHttp(
       String uid, String period) async {
@@ -393,6 +472,7 @@ class FirebaseService extends ChangeNotifier {
       final response = await _makeHttpRequest(
         'http://127.0.0.1:5001/fitness-tracker-p2025/us-central1/generateCalorieReportHttp',
         {'uid': uid, 'period': period},
+        accept: CalorieReport.columnarMediaType,
       );
       return response;
     } catch (e) {
@@ -400,19 +480,42 @@ class FirebaseService extends ChangeNotifier {
     }
   }
 
+  // Endpoints that don't know the requested Accept type reply with plain JSON,
+  // which CalorieReport.fromJson still understands.
   Future<Map<String, dynamic>> _makeHttpRequest(
-      String url, Map<String, dynamic> data) async {
+      String url, Map<String, dynamic> data,
+      {String? accept}) async {
     try {
       final uri = Uri.parse(url);
+      final body = jsonEncode(data);
+      final cacheKey = '$url $body';
+      final cached = _httpResponseCache[cacheKey];
+      final headers = {'Content-Type': 'application/json'};
+      if (accept != null) {
+        headers['Accept'] = accept;
+      }
+      if (cached != null) {
+        headers['If-None-Match'] = cached.etag;
+      }
+
       // Use the injected _httpClient for testability
       final resp = await _httpClient.post(
         uri,
-        headers: {'Content-Type': 'application/json'},
-        body: jsonEncode(data),
+        headers: headers,
+        body: body,
       );
 
+      if (resp.statusCode == 304 && cached != null) {
+        _rememberHttpResponse(cacheKey, cached);
+        return cached.data;
+      }
       if (resp.statusCode == 200) {
-        return jsonDecode(resp.body) as Map<String, dynamic>;
+        final decoded = jsonDecode(resp.body) as Map<String, dynamic>;
+        final etag = resp.headers['etag'];
+        if (etag != null) {
+          _rememberHttpResponse(cacheKey, _CachedHttpResponse(etag, decoded));
+        }
+        return decoded;
       }
       throw Exception('HTTP ${resp.statusCode}: ${resp.body}');
     } catch (e) {
@@ -420,6 +523,16 @@ class FirebaseService extends ChangeNotifier {
     }
   }
 
+  // Map keeps insertion order, so re-inserting marks an entry most recently
+  // used and the first key is the one to evict.
+  void _rememberHttpResponse(String key, _CachedHttpResponse response) {
+    _httpResponseCache.remove(key);
+    _httpResponseCache[key] = response;
+    while (_httpResponseCache.length > maxCachedHttpResponses) {
+      _httpResponseCache.remove(_httpResponseCache.keys.first);
+    }
+  }
+
   // Helper method to format date string (normalize to UTC date only)
   String _formatDateString(DateTime date) {
     // Normalize to UTC date only to prevent timezone issues
@@ -534,6 +647,13 @@ class FirebaseService extends ChangeNotifier {
           .doc(_currentUserId!)
           .delete();
 
+      // Advance the watermark last so the report endpoints drop every report
+      // and BMR cached before (or during) the deletes
+      final batch = _firestore.batch();
+      _advanceWriteWatermark(batch, _currentUserId!);
+      await batch.commit();
+      _httpResponseCache.clear();
+
       print('All user data deleted successfully');
     } catch (e) {
       throw Exception('Failed to delete user data: $e');
@@ -664,3 +784,10 @@ class FirebaseService extends ChangeNotifier {
     }
   }
 }
+
+class _CachedHttpResponse {
+  final String etag;
+  final Map<String, dynamic> data;
+
+  _CachedHttpResponse(this.etag, this.data);
+}
@@ -0,0 +1,71 @@
+import 'dart:convert';
+import 'dart:math';
+import 'package:flutter/foundation.dart';
+
+/// Records the daily-entry write operations FirebaseService performs, with
+/// start time, payload and latency, so scripts/op_trace_replay.py can replay
+/// them against the emulator. Enabled with --dart-define=RECORD_CLIENT_OPS=true;
+/// each record is also printed as an `OPTRACE {json}` log line, so a trace
+/// can be collected with `flutter run ... | grep OPTRACE > trace.ndjson`.
+class OperationRecorder {
+  static const bool enabled =
+      bool.fromEnvironment('RECORD_CLIENT_OPS', defaultValue: false);
+  static const String logPrefix = 'OPTRACE ';
+
+  final String deviceId;
+  final int capacity;
+  final bool echo;
+  final List<Map<String, dynamic>> _records = [];
+
+  OperationRecorder({String? deviceId, this.capacity = 10000, bool? echo})
+      : deviceId = deviceId ?? _randomDeviceId(),
+        echo = echo ?? kDebugMode;
+
+  static String _randomDeviceId() {
+    final random = Random();
+    return List.generate(8, (_) => random.nextInt(16).toRadixString(16)).join();
+  }
+
+  /// Runs [body] and records it as [op] on the `{uid}_{date}` document.
+  Future<T> track<T>(
+    String op,
+    String uid,
+    String date,
+    Map<String, dynamic> payload,
+    Future<T> Function() body,
+  ) async {
+    final startedAt = DateTime.now().toUtc();
+    final stopwatch = Stopwatch()..start();
+    var outcome = 'ok';
+    try {
+      return await body();
+    } catch (_) {
+      outcome = 'error';
+      rethrow;
+    } finally {
+      _add({
+        't': startedAt.toIso8601String(),
+        'device': deviceId,
+        'op': op,
+        'uid': uid,
+        'date': date,
+        'payload': payload,
+        'latencyMs': stopwatch.elapsedMicroseconds / 1000,
+        'outcome': outcome,
+      });
+    }
+  }
+
+  void _add(Map<String, dynamic> record) {
+    if (_records.length >= capacity) _records.removeAt(0);
+    _records.add(record);
+    if (echo) debugPrint('$logPrefix${jsonEncode(record)}');
+  }
+
+  List<Map<String, dynamic>> get records => List.unmodifiable(_records);
+
+  /// The recorded operations as newline-delimited JSON, oldest first.
+  String toNdjson() => _records.map(jsonEncode).join('\n');
+
+  void clear() => _records.clear();
+}
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Size breakdown of an APK or AAB, and a build-to-build diff with budgets.
+Reads only the zip central directory through mmap (no extraction, no
+reading of entry data), so a 100MB artifact is analyzed in milliseconds.
+Compressed (download) and uncompressed (install) bytes are attributed to
+the Dart AOT snapshot (libapp.so), the Flutter engine (libflutter.so),
+other native code, Flutter assets, other assets, Android resources and
+dex. The diff pairs entries by name, then by content (crc32 + size) for
+renames, then by name shape for renamed-and-changed files, and fails when
+growth exceeds the budget.
+
+  python3 scripts/apk_size.py analyze build/app/outputs/flutter-apk/app-release.apk
+  python3 scripts/apk_size.py diff old.apk new.apk --budget apk-size-budget.json
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+import time
+import zipfile
+
+EOCD_SIGNATURE = b'PK\x05\x06'
+EOCD64_LOCATOR_SIGNATURE = b'PK\x06\x07'
+CENTRAL_SIGNATURE = b'PK\x01\x02'
+CENTRAL_HEADER = struct.Struct('<4s4H2H3I5H2I')
+EOCD = struct.Struct('<4s4H2IH')
+EOCD64_LOCATOR = struct.Struct('<4sIQI')
+EOCD64 = struct.Struct('<4sQ2H2I4Q')
+ZIP64_EXTRA = 0x0001
+MAX_COMMENT = 0xFFFF
+
+CATEGORIES = ('dart-aot', 'flutter-engine', 'native-other', 'flutter-assets', 'assets',
+              'resources', 'dex', 'meta', 'other')
+# Compressed-byte growth allowed per category (or 'total') before diff fails.
+# Values are bytes, a size like "500KB", or a percentage like "5%".
+DEFAULT_BUDGET = {'total': '2%', 'dart-aot': '300KB', 'flutter-assets': '500KB'}
+UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+
+class ZipFormatError(Exception):
+    """The file is not a readable zip archive."""
+
+
+class Entry:
+    __slots__ = ('name', 'compressed', 'size', 'crc', 'method', 'category')
+
+    def __init__(self, name, compressed, size, crc, method):
+        self.name = name
+        self.compressed = compressed
+        self.size = size
+        self.crc = crc
+        self.method = method
+        self.category = None
+
+
+def _find_eocd(data):
+    start = max(0, len(data) - EOCD.size - MAX_COMMENT)
+    position = data.rfind(EOCD_SIGNATURE, start)
+    if position < 0:
+        raise ZipFormatError('End of central directory not found')
+    return position
+
+
+def _zip64_sizes(extra, compressed, size, offset):
+    """Apply a zip64 extended-information extra field to the 32-bit placeholders."""
+    position = 0
+    while position + 4 <= len(extra):
+        header_id, length = struct.unpack_from('<HH', extra, position)
+        if header_id == ZIP64_EXTRA:
+            values = iter(struct.unpack_from(f"<{length // 8}Q", extra, position + 4))
+            if size == 0xFFFFFFFF:
+                size = next(values)
+            if compressed == 0xFFFFFFFF:
+                compressed = next(values)
+            if offset == 0xFFFFFFFF:
+                offset = next(values)
+            break
+        position += 4 + length
+    return compressed, size, offset
+
+
+def read_entries(path):
+    """(entries, archive bytes) from the central directory of a zip file."""
+    with open(path, 'rb') as handle:
+        archive_size = os.fstat(handle.fileno()).st_size
+        if archive_size < EOCD.size:
+            raise ZipFormatError(f"{path} is too small to be a zip archive")
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            eocd = _find_eocd(data)
+            _, _, _, _, count, directory_size, directory_offset, _ = EOCD.unpack_from(data, eocd)
+            locator = eocd - EOCD64_LOCATOR.size
+            if locator >= 0 and data[locator:locator + 4] == EOCD64_LOCATOR_SIGNATURE:
+                _, _, eocd64, _ = EOCD64_LOCATOR.unpack_from(data, locator)
+                fields = EOCD64.unpack_from(data, eocd64)
+                count, directory_size, directory_offset = fields[7], fields[8], fields[9]
+
+            entries = []
+            position = directory_offset
+            end = directory_offset + directory_size
+            while position < end:
+                (signature, _, _, flags, method, _, _, crc, compressed, size,
+                 name_length, extra_length, comment_length, _, _, _, offset) = \
+                    CENTRAL_HEADER.unpack_from(data, position)
+                if signature != CENTRAL_SIGNATURE:
+                    raise ZipFormatError(f"Bad central directory entry at offset {position}")
+                name_start = position + CENTRAL_HEADER.size
+                raw_name = data[name_start:name_start + name_length]
+                name = raw_name.decode('utf-8' if flags & 0x800 else 'cp437')
+                if 0xFFFFFFFF in (compressed, size, offset):
+                    extra = data[name_start + name_length:name_start + name_length + extra_length]
+                    compressed, size, offset = _zip64_sizes(extra, compressed, size, offset)
+                entries.append(Entry(name, compressed, size, crc, method))
+                position = name_start + name_length + extra_length + comment_length
+            if len(entries) != count:
+                raise ZipFormatError(f"Central directory lists {count} entries but holds {len(entries)}")
+    return entries, archive_size
+
+
+def categorize(entries):
+    """Set each entry's category; AAB module prefixes (base/, feature/) are ignored."""
+    bundle = any(entry.name == 'BundleConfig.pb' for entry in entries)
+    for entry in entries:
+        name = entry.name.split('/', 1)[1] if bundle and '/' in entry.name else entry.name
+        base = name.rsplit('/', 1)[-1]
+        if name.startswith('lib/') and base == 'libapp.so':
+            entry.category = 'dart-aot'
+        elif name.startswith('lib/') and base == 'libflutter.so':
+            entry.category = 'flutter-engine'
+        elif name.startswith('lib/'):
+            entry.category = 'native-other'
+        elif name.startswith('assets/flutter_assets/'):
+            entry.category = 'flutter-assets'
+        elif name.startswith(('assets/', 'root/')):
+            entry.category = 'assets'
+        elif name.startswith('res/') or base in ('resources.arsc', 'resources.pb'):
+            entry.category = 'resources'
+        elif base.endswith('.dex'):
+            entry.category = 'dex'
+        elif name.startswith('META-INF/') or base in ('AndroidManifest.xml', 'BundleConfig.pb') \
+                or entry.name.startswith('BUNDLE-METADATA/'):
+            entry.category = 'meta'
+        else:
+            entry.category = 'other'
+    return entries
+
+
+def load(path):
+    entries, archive_size = read_entries(path)
+    return categorize(entries), archive_size
+
+
+def totals(entries):
+    """{category: [count, compressed, uncompressed]} including 'total'."""
+    result = {category: [0, 0, 0] for category in CATEGORIES + ('total',)}
+    for entry in entries:
+        for key in (entry.category, 'total'):
+            row = result[key]
+            row[0] += 1
+            row[1] += entry.compressed
+            row[2] += entry.size
+    return result
+
+
+def human(size):
+    sign = '-' if size < 0 else ''
+    size = abs(size)
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024 or unit == 'MB':
+            return f"{sign}{size:.0f}{unit}" if unit == 'B' else f"{sign}{size:.1f}{unit}"
+        size /= 1024
+
+
+def analyze(path, top):
+    entries, archive_size = load(path)
+    table = totals(entries)
+    print(f"📊 {os.path.basename(path)}: {human(archive_size)} on disk, {len(entries)} entries")
+    print("=" * 60)
+    print(f"{'category':<16} {'files':>6} {'download':>10} {'install':>10} {'share':>6}")
+    for category in CATEGORIES + ('total',):
+        count, compressed, size = table[category]
+        if not count:
+            continue
+        share = compressed / max(table['total'][1], 1)
+        print(f"{category:<16} {count:>6} {human(compressed):>10} {human(size):>10} {share:>6.1%}")
+    overhead = archive_size - table['total'][1]
+    print(f"{'zip + signing':<16} {'':>6} {human(overhead):>10}")
+    if top:
+        print(f"\nLargest {top} entries (download bytes):")
+        for entry in sorted(entries, key=lambda e: e.compressed, reverse=True)[:top]:
+            stored = ' (stored)' if entry.method == zipfile.ZIP_STORED else ''
+            print(f"  {human(entry.compressed):>9}  {entry.name}{stored}")
+    return 0
+
+
+def name_shape(name):
+    """A name with hash-like and numeric runs masked, for matching renamed-and-changed files."""
+    return re.sub(r'[0-9a-f]{6,}|\d+', '#', name.lower())
+
+
+def match_entries(old, new):
+    """Pair old and new entries: (pairs of (old, new, how), removed, added).
+
+    how is 'same' (same name), 'renamed' (identical content under a new
+    name) or 'reshaped' (same category and name shape, content changed).
+    """
+    by_name = {entry.name: entry for entry in old}
+    pairs = []
+    added = []
+    for entry in new:
+        previous = by_name.pop(entry.name, None)
+        if previous is not None:
+            pairs.append((previous, entry, 'same'))
+        else:
+            added.append(entry)
+
+    by_content = {}
+    for entry in by_name.values():
+        by_content.setdefault((entry.crc, entry.size), []).append(entry)
+    still_added = []
+    for entry in added:
+        candidates = by_content.get((entry.crc, entry.size))
+        if candidates:
+            previous = candidates.pop()
+            del by_name[previous.name]
+            pairs.append((previous, entry, 'renamed'))
+        else:
+            still_added.append(entry)
+
+    by_shape = {}
+    for entry in by_name.values():
+        by_shape.setdefault((entry.category, name_shape(entry.name)), []).append(entry)
+    added = []
+    for entry in still_added:
+        candidates = by_shape.get((entry.category, name_shape(entry.name)))
+        if candidates and len(candidates) == 1:
+            previous = candidates.pop()
+            del by_name[previous.name]
+            pairs.append((previous, entry, 'reshaped'))
+        else:
+            added.append(entry)
+    return pairs, list(by_name.values()), added
+
+
+def parse_budget(value, base):
+    """Allowed growth in bytes for a budget value relative to a base size."""
+    if isinstance(value, (int, float)):
+        return value
+    text = str(value).strip().upper()
+    if text.endswith('%'):
+        return base * float(text[:-1]) / 100
+    match = re.fullmatch(r'([\d.]+)\s*([KMG]?B)?', text)
+    if not match:
+        raise ValueError(f"Invalid budget value: {value}")
+    return float(match.group(1)) * UNITS[match.group(2) or 'B']
+
+
+def load_budget(path):
+    if not path:
+        return dict(DEFAULT_BUDGET)
+    with open(path) as handle:
+        budget = json.load(handle)
+    unknown = set(budget) - set(CATEGORIES) - {'total'}
+    if unknown:
+        raise ValueError(f"Unknown budget categories: {', '.join(sorted(unknown))}")
+    return budget
+
+
+def diff(old_path, new_path, budget, top):
+    old, _ = load(old_path)
+    new, _ = load(new_path)
+    pairs, removed, added = match_entries(old, new)
+    before, after = totals(old), totals(new)
+
+    print(f"📊 {os.path.basename(old_path)} → {os.path.basename(new_path)}")
+    print("=" * 72)
+    print(f"{'category':<16} {'before':>10} {'after':>10} {'change':>10} {'budget':>10}")
+    failures = []
+    for category in CATEGORIES + ('total',):
+        old_bytes, new_bytes = before[category][1], after[category][1]
+        if not old_bytes and not new_bytes:
+            continue
+        growth = new_bytes - old_bytes
+        allowed = parse_budget(budget[category], old_bytes) if category in budget else None
+        over = allowed is not None and growth > allowed
+        if over:
+            failures.append(category)
+        print(f"{category:<16} {human(old_bytes):>10} {human(new_bytes):>10} {human(growth):>10} "
+              f"{human(allowed) if allowed is not None else '-':>10}  {'❌' if over else ''}")
+
+    renamed = sum(1 for _, _, how in pairs if how != 'same')
+    print(f"\nEntries: {len(pairs)} matched ({renamed} renamed), {len(added)} added, {len(removed)} removed")
+    changes = [(new_entry.compressed - old_entry.compressed, f"{old_entry.name} → {new_entry.name}"
+                if how != 'same' else new_entry.name) for old_entry, new_entry, how in pairs]
+    changes += [(entry.compressed, f"+ {entry.name}") for entry in added]
+    changes += [(-entry.compressed, f"- {entry.name}") for entry in removed]
+    changes = [change for change in changes if change[0]]
+    if changes and top:
+        print("Largest changes (download bytes):")
+        for delta, label in sorted(changes, key=lambda change: abs(change[0]), reverse=True)[:top]:
+            print(f"  {human(delta):>9}  {label}")
+    if failures:
+        print(f"\n❌ Size budget exceeded for: {', '.join(failures)}")
+        return 1
+    print("\n✅ Within size budget")
+    return 0
+
+
+def run_benchmark(megabytes):
+    """Analyze a synthetic APK-shaped archive of the given size."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'synthetic.apk')
+        chunk = os.urandom(1 << 20)
+        with zipfile.ZipFile(path, 'w') as archive:
+            for abi in ('arm64-v8a', 'armeabi-v7a', 'x86_64'):
+                archive.writestr(f"lib/{abi}/libflutter.so", chunk * max(1, megabytes // 8))
+                archive.writestr(f"lib/{abi}/libapp.so", chunk * max(1, megabytes // 16))
+            for i in range(4000):
+                archive.writestr(f"res/drawable-xxhdpi/image_{i}.png", chunk[:8192 + i])
+            for i in range(200):
+                archive.writestr(f"assets/flutter_assets/assets/images/{i}.png", chunk[:40000])
+            archive.writestr('classes.dex', chunk * 4, compress_type=zipfile.ZIP_DEFLATED)
+        size = os.path.getsize(path)
+        began = time.perf_counter()
+        entries, _ = load(path)
+        table = totals(entries)
+        elapsed = time.perf_counter() - began
+        old = list(entries)
+        began = time.perf_counter()
+        match_entries(old, entries)
+        matched = time.perf_counter() - began
+    print(f"📊 Synthetic {human(size)} archive, {len(entries)} entries")
+    print("=" * 60)
+    print(f"Central directory + categories  {elapsed * 1000:>8.1f}ms")
+    print(f"Entry matching (self-diff)      {matched * 1000:>8.1f}ms")
+    print(f"dart-aot {human(table['dart-aot'][1])}, flutter-engine {human(table['flutter-engine'][1])}, "
+          f"resources {human(table['resources'][1])}")
+    ok = elapsed < 1.0
+    print(f"{'✅' if ok else '❌'} Analysis took {elapsed * 1000:.0f}ms (target: well under 1s)")
+    return 0 if ok else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    show = sub.add_parser('analyze', help='Size breakdown of one APK/AAB')
+    show.add_argument('artifact')
+    show.add_argument('--top', type=int, default=15, help='Largest entries to list')
+    compare = sub.add_parser('diff', help='Compare two builds and enforce the size budget')
+    compare.add_argument('old')
+    compare.add_argument('new')
+    compare.add_argument('--budget', help='JSON {category|"total": growth} (default: built-in budget)')
+    compare.add_argument('--top', type=int, default=20)
+    bench = sub.add_parser('benchmark', help='Time the analysis of a synthetic archive')
+    bench.add_argument('--mb', type=int, default=100)
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'analyze':
+            return analyze(args.artifact, args.top)
+        if args.command == 'diff':
+            return diff(args.old, args.new, load_budget(args.budget), args.top)
+        return run_benchmark(args.mb)
+    except (OSError, ValueError, ZipFormatError) as e:
+        print(f"❌ {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Generate every launcher icon and favicon from assets/images/logo.png.
+Renders the Android mipmaps, the iOS AppIcon set, the web icons (plain and
+maskable) and the favicon in a process pool, losslessly optimizes each PNG
+(drops an unused alpha channel, uses a palette when the image has few
+enough colours, and keeps the smallest encoding), and rewrites the iOS
+Contents.json and the icon entries of web/manifest.json to match.
+
+Rendered icons are cached in .icon-cache by a hash of the source and the
+target's spec, so rerunning with an unchanged logo only checks the files.
+
+  python3 scripts/app_icons.py generate
+  python3 scripts/app_icons.py check     # exit 1 if any icon is stale
+"""
+
+import argparse
+import concurrent.futures
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+SOURCE = os.path.join('assets', 'images', 'logo.png')
+CACHE_DIR = os.environ.get('SAMAAN_ICON_CACHE', '.icon-cache')
+ANDROID_RES = os.path.join('android', 'app', 'src', 'main', 'res')
+IOS_ICONSET = os.path.join('ios', 'Runner', 'Assets.xcassets', 'AppIcon.appiconset')
+WEB_DIR = 'web'
+WEB_MANIFEST = os.path.join(WEB_DIR, 'manifest.json')
+# Bump when rendering or optimization changes, to invalidate cached icons
+PIPELINE_VERSION = 1
+# Maskable icons keep the logo inside the spec's 80% safe zone
+MASKABLE_SAFE_ZONE = 0.8
+
+ANDROID_DENSITIES = (('mdpi', 48), ('hdpi', 72), ('xhdpi', 96), ('xxhdpi', 144), ('xxxhdpi', 192))
+# (size in points, scale, idioms): Flutter's default AppIcon set
+IOS_ICONS = (
+    ('20', 1, ('ipad',)), ('20', 2, ('iphone', 'ipad')), ('20', 3, ('iphone',)),
+    ('29', 1, ('iphone', 'ipad')), ('29', 2, ('iphone', 'ipad')), ('29', 3, ('iphone',)),
+    ('40', 1, ('ipad',)), ('40', 2, ('iphone', 'ipad')), ('40', 3, ('iphone',)),
+    ('60', 2, ('iphone',)), ('60', 3, ('iphone',)),
+    ('76', 1, ('ipad',)), ('76', 2, ('ipad',)), ('83.5', 2, ('ipad',)),
+    ('1024', 1, ('ios-marketing',)),
+)
+WEB_ICONS = ((192, False), (512, False), (192, True), (512, True))
+FAVICON_SIZE = 32
+
+
+def targets(background):
+    """Every icon to render: dicts with platform, path, pixel size and options."""
+    result = []
+    for density, pixels in ANDROID_DENSITIES:
+        result.append({'platform': 'android', 'size': pixels,
+                       'path': os.path.join(ANDROID_RES, f"mipmap-{density}", 'ic_launcher.png')})
+    for points, scale, _ in IOS_ICONS:
+        result.append({'platform': 'ios', 'size': round(float(points) * scale),
+                       'path': os.path.join(IOS_ICONSET, ios_filename(points, scale)),
+                       # App Store icons must not have an alpha channel
+                       'opaque': background})
+    for pixels, maskable in WEB_ICONS:
+        target = {'platform': 'web', 'size': pixels,
+                  'path': os.path.join(WEB_DIR, 'icons', web_filename(pixels, maskable))}
+        if maskable:
+            target.update(opaque=background, padding=MASKABLE_SAFE_ZONE)
+        result.append(target)
+    result.append({'platform': 'web', 'size': FAVICON_SIZE, 'path': os.path.join(WEB_DIR, 'favicon.png')})
+    return result
+
+
+def ios_filename(points, scale):
+    return f"Icon-App-{points}x{points}@{scale}x.png"
+
+
+def web_filename(pixels, maskable):
+    return f"Icon-{'maskable-' if maskable else ''}{pixels}.png"
+
+
+def cache_key(source_digest, target):
+    spec = {k: v for k, v in target.items() if k not in ('platform', 'path')}
+    spec['version'] = PIPELINE_VERSION
+    return hashlib.sha256(f"{source_digest}:{json.dumps(spec, sort_keys=True)}".encode()).hexdigest()
+
+
+def encode_smallest(image):
+    """Smallest lossless PNG encoding of an RGBA image."""
+    opaque = image.getchannel('A').getextrema() == (255, 255)
+    base = image.convert('RGB') if opaque else image
+    candidates = [base]
+    if image.getcolors(256) is not None:
+        method = Image.Quantize.MEDIANCUT if opaque else Image.Quantize.FASTOCTREE
+        palette = base.quantize(colors=256, method=method, dither=Image.Dither.NONE)
+        # Only lossless when every pixel keeps its exact colour
+        if palette.convert(base.mode).tobytes() == base.tobytes():
+            candidates.append(palette)
+    best = None
+    for candidate in candidates:
+        buffer = io.BytesIO()
+        candidate.save(buffer, format='PNG', optimize=True)
+        if best is None or buffer.tell() < len(best):
+            best = buffer.getvalue()
+    return best
+
+
+_source = None
+
+
+def _init_worker(source_path):
+    global _source
+    _source = Image.open(source_path).convert('RGBA')
+    _source.load()
+
+
+def render(target):
+    """PNG bytes for one target from the worker's source image."""
+    size = target['size']
+    inner = round(size * target.get('padding', 1.0))
+    image = _source.resize((inner, inner), Image.Resampling.LANCZOS)
+    if target.get('opaque') or inner != size:
+        canvas = Image.new('RGBA', (size, size), target.get('opaque') or (0, 0, 0, 0))
+        offset = (size - inner) // 2
+        canvas.alpha_composite(image, (offset, offset))
+        image = canvas
+    return encode_smallest(image)
+
+
+def _render_job(target):
+    return target['path'], render(target)
+
+
+def file_digest(path):
+    try:
+        with open(path, 'rb') as handle:
+            return hashlib.sha256(handle.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def plan(source, cache_dir):
+    """(targets with cache keys, keys needing a render) for the current source."""
+    background = manifest_background()
+    source_digest = file_digest(source)
+    planned = []
+    missing = []
+    for target in targets(background):
+        key = cache_key(source_digest, target)
+        planned.append((target, key))
+        if not os.path.exists(os.path.join(cache_dir, key + '.png')):
+            missing.append((target, key))
+    return planned, missing
+
+
+def manifest_background():
+    with open(WEB_MANIFEST) as handle:
+        return json.load(handle).get('background_color', '#FFFFFF')
+
+
+def write_contents_json():
+    images = []
+    for idiom in ('iphone', 'ipad', 'ios-marketing'):
+        for points, scale, idioms in IOS_ICONS:
+            if idiom in idioms:
+                images.append({'size': f"{points}x{points}", 'idiom': idiom,
+                               'filename': ios_filename(points, scale), 'scale': f"{scale}x"})
+    contents = {'images': images, 'info': {'version': 1, 'author': 'xcode'}}
+    # Xcode's own formatting, so regenerating is a no-op diff
+    text = json.dumps(contents, indent=2, separators=(',', ' : ')) + '\n'
+    return _write_if_changed(os.path.join(IOS_ICONSET, 'Contents.json'), text)
+
+
+def write_web_manifest():
+    with open(WEB_MANIFEST) as handle:
+        manifest = json.load(handle)
+    icons = []
+    for pixels, maskable in WEB_ICONS:
+        icon = {'src': f"icons/{web_filename(pixels, maskable)}", 'sizes': f"{pixels}x{pixels}",
+                'type': 'image/png'}
+        if maskable:
+            icon['purpose'] = 'maskable'
+        icons.append(icon)
+    manifest['icons'] = icons
+    return _write_if_changed(WEB_MANIFEST, json.dumps(manifest, indent=4) + '\n')
+
+
+def _write_if_changed(path, text):
+    try:
+        with open(path) as handle:
+            if handle.read().strip() == text.strip():
+                return False
+    except OSError:
+        pass
+    with open(path, 'w') as handle:
+        handle.write(text)
+    return True
+
+
+def generate(source, cache_dir, jobs, check_only=False):
+    if Image is None:
+        print("❌ Pillow is required (pip install Pillow)")
+        return 1
+    if not os.path.isfile(source):
+        print(f"❌ Source logo not found: {source}")
+        return 1
+    began = time.perf_counter()
+    planned, missing = plan(source, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    if missing:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                                    initargs=(source,)) as pool:
+            jobs_by_path = {target['path']: key for target, key in missing}
+            for path, data in pool.map(_render_job, [target for target, _ in missing]):
+                with open(os.path.join(cache_dir, jobs_by_path[path] + '.png'), 'wb') as handle:
+                    handle.write(data)
+
+    totals = {}
+    stale = []
+    for target, key in planned:
+        with open(os.path.join(cache_dir, key + '.png'), 'rb') as handle:
+            data = handle.read()
+        path = target['path']
+        before = os.path.getsize(path) if os.path.exists(path) else 0
+        row = totals.setdefault(target['platform'], [0, 0, 0])
+        row[0] += 1
+        row[1] += before
+        row[2] += len(data)
+        if file_digest(path) != hashlib.sha256(data).hexdigest():
+            stale.append(path)
+            if not check_only:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'wb') as handle:
+                    handle.write(data)
+
+    if check_only:
+        if stale:
+            print(f"❌ {len(stale)} icon(s) out of date with {source}:")
+            for path in stale:
+                print(f"   {path}")
+            print("   Run: python3 scripts/app_icons.py generate")
+            return 1
+        print(f"✅ All {len(planned)} icons match {source}")
+        return 0
+
+    updated = [name for name, changed in (('Contents.json', write_contents_json()),
+                                          ('manifest.json', write_web_manifest())) if changed]
+    print(f"📊 App icons from {source} ({time.perf_counter() - began:.1f}s, {jobs} workers)")
+    print("=" * 60)
+    print(f"Rendered {len(missing)}, reused {len(planned) - len(missing)} cached; "
+          f"wrote {len(stale)} changed file(s)" + (f", updated {', '.join(updated)}" if updated else ''))
+    print(f"{'platform':<10} {'icons':>6} {'before':>10} {'after':>10} {'saved':>10}")
+    for platform, (count, before, after) in totals.items():
+        print(f"{platform:<10} {count:>6} {before / 1024:>8.1f}KB {after / 1024:>8.1f}KB "
+              f"{(before - after) / 1024:>8.1f}KB")
+    before = sum(row[1] for row in totals.values())
+    after = sum(row[2] for row in totals.values())
+    print(f"{'total':<10} {len(planned):>6} {before / 1024:>8.1f}KB {after / 1024:>8.1f}KB "
+          f"{(before - after) / 1024:>8.1f}KB")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('command', nargs='?', choices=('generate', 'check'), default='generate')
+    parser.add_argument('--source', default=SOURCE)
+    parser.add_argument('--cache', default=CACHE_DIR, help='Rendered icon cache')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    return generate(args.source, args.cache, args.jobs, check_only=args.command == 'check')
+
+
+if __name__ == "__main__":
+    sys.exit(main())
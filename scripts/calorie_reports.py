@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Calorie report and BMR computation for Python tooling.
+Produces payloads in the shape CalorieReport.fromJson expects, from user
+profiles and dailyEntries documents already loaded into memory, and encodes
+them in either the row JSON format or the compact columnar format. Long
+custom ranges can be streamed as NDJSON, one record per calendar month.
+"""
+
+import argparse
+import base64
+import collections
+import datetime
+import gzip
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PERIODS = ('weekly', 'monthly', 'yearly')
+STREAM_MEDIA_TYPE = 'application/x-ndjson'
+COLUMNAR_FORMAT = 'columnar-v1'
+COLUMNAR_MEDIA_TYPE = 'application/vnd.samaan.columnar+json'
+NUMERIC_COLUMNS = ('netCalorieDeficit', 'bmr', 'caloriesConsumed', 'caloriesBurned')
+NULLABLE_COLUMNS = ('weight', 'glasses')
+REQUIRED_PROFILE_FIELDS = ('height', 'weight', 'gender', 'dateOfBirth')
+
+
+def _safe_to_double(value):
+    """Lenient float coercion matching CalorieReportData._safeToDouble."""
+    if value is None or isinstance(value, bool):
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return 0.0
+    return 0.0
+
+
+def _as_date(value):
+    """Calendar date of a datetime/date/ISO string (UTC components, as stored)."""
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc)
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.date.fromisoformat(value[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def iso_date(day):
+    """Serialize a date the way the report endpoint does (UTC midnight)."""
+    return f"{day.isoformat()}T00:00:00.000Z"
+
+
+def calculate_age(date_of_birth, as_of):
+    age = as_of.year - date_of_birth.year
+    if (as_of.month, as_of.day) < (date_of_birth.month, date_of_birth.day):
+        age -= 1
+    return age
+
+
+def calculate_bmr(profile, as_of=None):
+    """Mifflin-St Jeor BMR from a users document, or None if it is incomplete."""
+    if not profile or any(not profile.get(field) for field in REQUIRED_PROFILE_FIELDS):
+        return None
+    date_of_birth = _as_date(profile['dateOfBirth'])
+    if date_of_birth is None:
+        return None
+    as_of = as_of or datetime.date.today()
+    weight_kg = _safe_to_double(profile['weight']) * 0.453592
+    height_cm = _safe_to_double(profile['height'])
+    age = calculate_age(date_of_birth, as_of)
+    bmr = 10 * weight_kg + 6.25 * height_cm - 5 * age
+    bmr += 5 if profile['gender'] == 'male' else -161
+    if bmr != bmr or bmr <= 0:
+        return None
+    return bmr
+
+
+def period_bounds(period, as_of):
+    """Inclusive (start, end) dates for a report period ending at as_of."""
+    if period == 'weekly':
+        return as_of - datetime.timedelta(days=6), as_of
+    if period == 'monthly':
+        start = as_of.replace(day=1)
+        next_month = (start + datetime.timedelta(days=32)).replace(day=1)
+        return start, next_month - datetime.timedelta(days=1)
+    if period == 'yearly':
+        return datetime.date(as_of.year, 1, 1), datetime.date(as_of.year, 12, 31)
+    raise ValueError(f"Unknown report period: {period}")
+
+
+def _entry_items(value):
+    """Map items of a foodEntries/exerciseEntries field; anything else is skipped."""
+    if not isinstance(value, list):
+        return []
+    return [item for item in value if isinstance(item, dict)]
+
+
+def summarize_entry(entry, bmr):
+    """One CalorieReportData row from a dailyEntries document."""
+    consumed = sum(_safe_to_double(f.get('calories')) for f in _entry_items(entry.get('foodEntries')))
+    burned = sum(_safe_to_double(e.get('caloriesBurned')) for e in _entry_items(entry.get('exerciseEntries')))
+    weight = entry.get('weight')
+    glasses = entry.get('glasses')
+    return {
+        'date': iso_date(_as_date(entry.get('date'))),
+        'netCalorieDeficit': bmr + burned - consumed,
+        'bmr': bmr,
+        'caloriesConsumed': consumed,
+        'caloriesBurned': burned,
+        'weight': _safe_to_double(weight) if weight is not None else None,
+        'glasses': _safe_to_double(glasses) if glasses is not None else None,
+    }
+
+
+def build_report(period, start, end, entries, bmr):
+    """CalorieReport payload for the entries that fall within [start, end]."""
+    bmr = bmr or 0.0
+    by_day = {}
+    for entry in entries:
+        day = _as_date(entry.get('date'))
+        if day is not None and start <= day <= end:
+            by_day[day] = entry
+    data = [summarize_entry(by_day[day], bmr) for day in sorted(by_day)]
+    total_glasses = sum(row['glasses'] or 0.0 for row in data)
+    return {
+        'period': period,
+        'startDate': iso_date(start),
+        'endDate': iso_date(end),
+        'data': data,
+        'averageBMR': bmr,
+        'totalCaloriesConsumed': sum(row['caloriesConsumed'] for row in data),
+        'totalCaloriesBurned': sum(row['caloriesBurned'] for row in data),
+        'totalNetDeficit': sum(row['netCalorieDeficit'] for row in data),
+        'totalGlasses': total_glasses,
+        'averageGlasses': total_glasses / len(data) if data else 0.0,
+        'daysWithData': len(data),
+        'totalDays': (end - start).days + 1,
+    }
+
+
+def _month_end(day):
+    return (day.replace(day=1) + datetime.timedelta(days=32)).replace(day=1) - datetime.timedelta(days=1)
+
+
+def stream_report(start, end, entries, bmr):
+    """Yield one 'month' record per calendar month of [start, end], then 'totals'.
+
+    entries must be ordered by date (as a dailyEntries query ordered on date
+    returns them) and are consumed lazily, so only one month of rows is held
+    at a time. Concatenating the month rows gives build_report's data list.
+    """
+    bmr = bmr or 0.0
+    totals = collections.Counter()
+    days_with_data = 0
+    entries = iter(entries)
+    pending = None
+    month_start = start
+    while month_start <= end:
+        month_end = min(_month_end(month_start), end)
+        by_day = {}
+        if pending is not None and pending[0] <= month_end:
+            by_day[pending[0]] = pending[1]
+            pending = None
+        if pending is None:
+            for entry in entries:
+                day = _as_date(entry.get('date'))
+                if day is None or day < start:
+                    continue
+                if day > month_end:
+                    pending = (day, entry)
+                    break
+                # Later duplicates of a day win, as in build_report
+                by_day[day] = entry
+        data = [summarize_entry(by_day[day], bmr) for day in sorted(by_day)]
+        for row in data:
+            totals['caloriesConsumed'] += row['caloriesConsumed']
+            totals['caloriesBurned'] += row['caloriesBurned']
+            totals['netDeficit'] += row['netCalorieDeficit']
+            totals['glasses'] += row['glasses'] or 0.0
+        days_with_data += len(data)
+        yield {
+            'type': 'month',
+            'month': month_start.strftime('%Y-%m'),
+            'startDate': iso_date(month_start),
+            'endDate': iso_date(month_end),
+            'data': data,
+        }
+        month_start = month_end + datetime.timedelta(days=1)
+    yield {
+        'type': 'totals',
+        'period': 'custom',
+        'startDate': iso_date(start),
+        'endDate': iso_date(end),
+        'averageBMR': bmr,
+        'totalCaloriesConsumed': totals['caloriesConsumed'],
+        'totalCaloriesBurned': totals['caloriesBurned'],
+        'totalNetDeficit': totals['netDeficit'],
+        'totalGlasses': totals['glasses'],
+        'averageGlasses': totals['glasses'] / days_with_data if days_with_data else 0.0,
+        'daysWithData': days_with_data,
+        'totalDays': (end - start).days + 1,
+    }
+
+
+def build_reports(profile, entries, as_of=None, periods=PERIODS):
+    """BMR plus every requested period report for one user."""
+    as_of = as_of or datetime.date.today()
+    bmr = calculate_bmr(profile, as_of)
+    reports = {}
+    for period in periods:
+        start, end = period_bounds(period, as_of)
+        reports[period] = build_report(period, start, end, entries, bmr)
+    return bmr, reports
+
+
+def earliest_start(as_of, periods=PERIODS):
+    """First date any of the periods needs, for a single range query."""
+    return min(period_bounds(period, as_of)[0] for period in periods)
+
+
+def _pack_presence(values):
+    """Bitmap (LSB first, base64) with bit i set when values[i] is not None."""
+    bits = bytearray((len(values) + 7) // 8)
+    for i, value in enumerate(values):
+        if value is not None:
+            bits[i >> 3] |= 1 << (i & 7)
+    return base64.b64encode(bytes(bits)).decode('ascii')
+
+
+def _unpack_presence(encoded, count):
+    bits = base64.b64decode(encoded or '')
+    return [(i >> 3) < len(bits) and bool(bits[i >> 3] & (1 << (i & 7))) for i in range(count)]
+
+
+def encode_columnar(report):
+    """Columnar form of a row report: base date + day offsets, one array per field.
+
+    Nullable fields store 0 in their array and a presence bitmap alongside.
+    Every non-data key of the report is carried over unchanged.
+    """
+    columnar = {key: value for key, value in report.items() if key != 'data'}
+    columnar['format'] = COLUMNAR_FORMAT
+    rows = report['data']
+    base = _as_date(rows[0]['date']) if rows else _as_date(report['startDate'])
+    columns = {
+        'baseDate': iso_date(base),
+        'dayOffsets': [(_as_date(row['date']) - base).days for row in rows],
+    }
+    for field in NUMERIC_COLUMNS:
+        columns[field] = [row[field] for row in rows]
+    for field in NULLABLE_COLUMNS:
+        values = [row[field] for row in rows]
+        columns[field] = [value if value is not None else 0 for value in values]
+        columns[f"{field}Present"] = _pack_presence(values)
+    columnar['columns'] = columns
+    return columnar
+
+
+def decode_columnar(columnar):
+    """Inverse of encode_columnar, back to the row report shape."""
+    report = {key: value for key, value in columnar.items() if key not in ('format', 'columns')}
+    columns = columnar['columns']
+    base = _as_date(columns['baseDate'])
+    offsets = columns['dayOffsets']
+    presence = {field: _unpack_presence(columns.get(f"{field}Present"), len(offsets))
+                for field in NULLABLE_COLUMNS}
+    data = []
+    for i, offset in enumerate(offsets):
+        row = {'date': iso_date(base + datetime.timedelta(days=offset))}
+        for field in NUMERIC_COLUMNS:
+            row[field] = columns[field][i]
+        for field in NULLABLE_COLUMNS:
+            row[field] = columns[field][i] if presence[field][i] else None
+        data.append(row)
+    report['data'] = data
+    return report
+
+
+def negotiate_encoding(accept_encoding):
+    """Pick 'br', 'gzip' or None from an Accept-Encoding header."""
+    offered = {part.split(';')[0].strip().lower() for part in (accept_encoding or '').split(',')}
+    if 'br' in offered and brotli is not None:
+        return 'br'
+    if 'gzip' in offered:
+        return 'gzip'
+    return None
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=6)
+    return body
+
+
+def dumps(payload):
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+def _synthetic_entries(first_day, days, seed=1):
+    """Lazily generated dailyEntries documents in date order (~85% of days logged)."""
+    rng = random.Random(seed)
+    for offset in range(days):
+        if rng.random() < 0.15:
+            continue
+        day = first_day + datetime.timedelta(days=offset)
+        entry = {
+            'date': datetime.datetime.combine(day, datetime.time()),
+            'foodEntries': [{'calories': rng.randint(200, 900)} for _ in range(rng.randint(1, 5))],
+            'exerciseEntries': [{'caloriesBurned': rng.randint(100, 600)} for _ in range(rng.randint(0, 2))],
+        }
+        if rng.random() < 0.6:
+            entry['weight'] = round(200 - offset * 0.05 + rng.uniform(-1.5, 1.5), 1)
+        if rng.random() < 0.7:
+            entry['glasses'] = rng.randint(2, 10)
+        yield entry
+
+
+SYNTHETIC_PROFILE = {'height': 175, 'weight': 200, 'gender': 'male', 'dateOfBirth': '1990-01-01'}
+
+
+def _synthetic_year(seed=1):
+    as_of = datetime.date(2025, 12, 31)
+    start, end = period_bounds('yearly', as_of)
+    entries = _synthetic_entries(start, 365, seed)
+    return build_report('yearly', start, end, entries, calculate_bmr(SYNTHETIC_PROFILE, as_of))
+
+
+def _measure(produce):
+    """(seconds to first bytes, total seconds, peak traced bytes) for a body producer."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    size = 0
+    for chunk in produce():
+        if first is None:
+            first = time.perf_counter() - start
+        size += len(chunk)
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first, total, peak, size
+
+
+def run_stream_benchmark(years):
+    """Compare the monolithic report body with the NDJSON stream over a long range."""
+    end = datetime.date(2025, 12, 31)
+    start = datetime.date(end.year - years + 1, 1, 1)
+    days = (end - start).days + 1
+    bmr = calculate_bmr(SYNTHETIC_PROFILE, end)
+
+    def monolithic():
+        yield dumps(build_report('custom', start, end, _synthetic_entries(start, days), bmr))
+
+    def streamed():
+        for record in stream_report(start, end, _synthetic_entries(start, days), bmr):
+            yield dumps(record) + b'\n'
+
+    print(f"📊 {years}-year custom report ({days} days)")
+    print("=" * 60)
+    print(f"{'mode':<12} {'first bytes':>12} {'total':>10} {'peak mem':>12} {'bytes':>12}")
+    for name, produce in (('monolithic', monolithic), ('ndjson', streamed)):
+        first, total, peak, size = _measure(produce)
+        print(f"{name:<12} {first * 1000:>10.1f}ms {total * 1000:>8.1f}ms "
+              f"{peak / 1024:>10,.0f}KB {size:>12,}")
+
+
+def run_benchmark(iterations):
+    report = _synthetic_year()
+    row_body = dumps(report)
+    columnar_body = dumps(encode_columnar(report))
+    assert decode_columnar(json.loads(columnar_body)) == json.loads(row_body)
+
+    print(f"📊 Yearly CalorieReport wire size ({report['daysWithData']} days with data)")
+    print("=" * 60)
+    print(f"{'encoding':<12} {'row JSON':>12} {'columnar':>12} {'saving':>8}")
+    encodings = [None, 'gzip'] + (['br'] if brotli is not None else [])
+    for encoding in encodings:
+        row_size = len(compress(row_body, encoding))
+        columnar_size = len(compress(columnar_body, encoding))
+        print(f"{encoding or 'identity':<12} {row_size:>12,} {columnar_size:>12,} "
+              f"{1 - columnar_size / row_size:>7.0%}")
+    if brotli is None:
+        print("ℹ️  brotli not installed; skipping br (pip install brotli)")
+
+    def timed(fn):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        return (time.perf_counter() - start) / iterations * 1e6
+
+    row_decode = timed(lambda: json.loads(row_body))
+    columnar_parse = timed(lambda: json.loads(columnar_body))
+    columnar_rows = timed(lambda: decode_columnar(json.loads(columnar_body)))
+    print(f"\n⏱️  Decode: row JSON {row_decode:.0f}µs, columnar parse {columnar_parse:.0f}µs, "
+          f"columnar → rows {columnar_rows:.0f}µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    bench = sub.add_parser('benchmark', help='Compare row JSON and columnar payloads')
+    bench.add_argument('--iterations', type=int, default=200)
+    stream_bench = sub.add_parser('stream-benchmark',
+                                  help='Time-to-first-chunk and peak memory of NDJSON streaming')
+    stream_bench.add_argument('--years', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == 'benchmark':
+        run_benchmark(args.iterations)
+    elif args.command == 'stream-benchmark':
+        run_stream_benchmark(args.years)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
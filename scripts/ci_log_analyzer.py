@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Scan GitHub Actions logs for known failure signatures.
+Streams downloaded log archives (the run's logs .zip, or plain/gzipped
+.txt/.log files) line by line without extracting them, and finds every
+catalogued signature in a single pass per line with an Aho-Corasick
+automaton over the signatures' literal keywords. A compiled alternation of
+the same keywords screens lines first, so the pure-Python automaton only
+walks the few lines that contain any keyword (it then reports every,
+possibly overlapping, keyword on them). Only lines with a keyword hit go on
+to the signature's targeted regex, which confirms the match and
+extracts details such as the SHA-1 or project_id. Each finding is
+classified with a remediation hint. Several archives are scanned in
+parallel.
+
+Lines inside `##[group]Run` blocks are the step's script as Actions
+echoes it before running it, so they are skipped: otherwise every
+`echo "❌ ..."` in a workflow would match whether or not it ran.
+
+  gh api repos/{owner}/{repo}/actions/runs/RUN_ID/logs > run.zip
+  python3 scripts/ci_log_analyzer.py scan run.zip
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import functools
+import gzip
+import io
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+
+# Actions prefixes every log line with an RFC 3339 timestamp
+TIMESTAMP = re.compile(r'^\ufeff?\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d+)?Z ')
+RUN_GROUP_START = '##[group]Run '
+GROUP_END = '##[endgroup]'
+MAX_LOCATIONS = 3
+
+# Signing certificates the CI workflows and SHA1_CONFLICT_RESOLUTION.md expect
+KNOWN_CERTIFICATES = {
+    '7e221caa4a68c4c47179faea691934f1435e016c': 'staging DEBUG_KEYSTORE',
+    '53315440bd500648d1034bdf6fa462fce03775fa': 'staging debug keystore (before the conflict fix)',
+    'c95a9f9e768a8d15c96e5dbf181c1406c9b70b99': 'production release keystore',
+}
+KNOWN_PROJECTS = ('samaan-ai-staging-2025', 'samaan-ai-production-2025')
+
+
+def _unknown_certificate(match):
+    fingerprint = match.group(1).replace(':', '').lower()
+    if fingerprint in KNOWN_CERTIFICATES:
+        return None
+    return fingerprint
+
+
+def _unknown_project(match):
+    project = match.group(1)
+    return None if project in KNOWN_PROJECTS else project
+
+
+# Keywords are matched case-insensitively. A signature with a regex only
+# matches when the regex also matches the line; its first group (or the
+# classifier's result) is the finding's detail, and a classifier returning
+# None drops the line. Lines matching `exclude` never count.
+SIGNATURES = (
+    {'id': 'certificate-hash-mismatch', 'severity': 'error',
+     'keywords': ('certificate_hash mismatch', 'certificate_hash does not match',
+                  'signingreport sha-1 does not match'),
+     'title': 'Signing certificate SHA-1 does not match google-services.json',
+     'hint': 'The APK is signed with a keystore whose SHA-1 is not the certificate_hash in '
+             'google-services.json. Compare them with scripts/get-production-sha1.sh and '
+             'scripts/debug-apk-signing.py; register the SHA-1 in Firebase or fix the keystore secret.'},
+    {'id': 'unknown-certificate', 'severity': 'warning',
+     'keywords': ('sha1:', 'sha-1:', 'sha1 (clean):', 'sha-1 (clean):'),
+     'regex': r'sha-?1[^:]*:\s*((?:[0-9a-f]{2}:){19}[0-9a-f]{2}|[0-9a-f]{40})\b',
+     'classify': _unknown_certificate,
+     'title': 'Build signed with an unrecognized certificate',
+     'hint': 'The SHA-1 is neither the staging nor the production keystore. Check that the keystore '
+             'secret (DEBUG_KEYSTORE / ANDROID_RELEASE_KEYSTORE) was not regenerated.'},
+    {'id': 'sha1-package-conflict', 'severity': 'error',
+     'keywords': ("sha-1 fingerprint and package name combination", 'production sha-1 matches staging sha-1'),
+     'title': 'The same SHA-1 is registered for two package names',
+     'hint': 'Staging and production must be signed with different keystores; '
+             'see SHA1_CONFLICT_RESOLUTION.md.'},
+    {'id': 'wrong-project-id', 'severity': 'error',
+     'keywords': ('appears to be production (project_id)', 'appears to be production (package_name)'),
+     'title': 'Production google-services.json used in a staging build',
+     'hint': 'android/app/google-services.json must be the staging config in CI '
+             '(GOOGLE_SERVICES_STAGING); production config is only decoded in release.yml.'},
+    {'id': 'unknown-project-id', 'severity': 'warning',
+     'keywords': ('project_id', 'project id:', 'firebase use '),
+     'regex': r'(?:project_?id"?\s*[:=]\s*"?|project id:\s*|firebase use\s+)([a-z][a-z0-9-]{4,})',
+     'classify': _unknown_project,
+     'exclude': r'^\s*(?:if |grep )',
+     'title': 'Unexpected Firebase project',
+     'hint': f"Only {' and '.join(KNOWN_PROJECTS)} are deployed from CI (.firebaserc). A different "
+             'project_id means a secret holds another project\'s google-services.json or config.'},
+    {'id': 'client-id-placeholder', 'severity': 'error',
+     'keywords': ('{{google_client_id}}', '{{firebase_'),
+     'regex': r'\{\{([A-Z_]+)\}\}',
+     'exclude': r'sed -i|grep -q|must contain \{\{|echo "',
+     'title': 'Template placeholder left in web/index.html',
+     'hint': 'The "Replace Firebase configuration" step did not substitute this placeholder; the '
+             'matching secret is probably empty. See GOOGLE_CLIENT_ID_SETUP.md.'},
+    {'id': 'client-id-committed', 'severity': 'error',
+     'keywords': ('must contain {{google_client_id}} placeholder',),
+     'title': 'A real client ID was committed to web/index.html',
+     'hint': 'Restore the {{GOOGLE_CLIENT_ID}} placeholder; CI injects the ID (PROJECT_RULES.md).'},
+    {'id': 'google-sign-in-developer-error', 'severity': 'error',
+     'keywords': ('apiexception: 10', 'developer_error'),
+     'title': 'Google Sign-In DEVELOPER_ERROR (ApiException: 10)',
+     'hint': 'Package name, SHA-1 or OAuth client do not match; run scripts/validate_google_services.py.'},
+    {'id': 'missing-secret', 'severity': 'error',
+     'keywords': ('secret is missing',),
+     'regex': r'([A-Z][A-Z0-9_]+) secret is missing',
+     'title': 'Required GitHub secret is not set',
+     'hint': 'Add the secret under Settings → Secrets and variables → Actions.'},
+    {'id': 'invalid-json-secret', 'severity': 'error',
+     'keywords': ('is not valid json', 'google-services.json is invalid json'),
+     'title': 'A base64 secret did not decode to valid JSON',
+     'hint': 'Re-encode the file with `base64 -w0` and update the secret; '
+             'scripts/secret_digest.py compares it with your local copy.'},
+    {'id': 'base64-invalid', 'severity': 'error',
+     'keywords': ('base64: invalid input',),
+     'title': 'A secret is not valid base64',
+     'hint': 'The secret has line breaks or was pasted truncated; re-encode with `base64 -w0`.'},
+    {'id': 'keystore-invalid', 'severity': 'error',
+     'keywords': ('keystore was tampered with', 'password was incorrect', 'is invalid or corrupted',
+                  'failed to create debug keystore', 'failed to read key'),
+     'title': 'Keystore cannot be opened',
+     'hint': 'Keystore secret or its passwords are wrong; see scripts/create-production-keystore.sh.'},
+    {'id': 'no-matching-client', 'severity': 'error',
+     'keywords': ('no matching client found for package name',),
+     'regex': r"package name '([\w.]+)'",
+     'title': 'google-services.json has no client for the applicationId',
+     'hint': 'The flavor\'s applicationId is not in google-services.json; use the config for this environment.'},
+    {'id': 'google-services-missing', 'severity': 'error',
+     'keywords': ('file google-services.json is missing',),
+     'title': 'google-services.json was not written before the Gradle build',
+     'hint': 'The decode step for GOOGLE_SERVICES_STAGING / GOOGLE_SERVICES_PROD did not run or failed.'},
+    {'id': 'firebase-auth', 'severity': 'error',
+     'keywords': ('http error: 401', 'http error: 403', 'failed to authenticate, have you run firebase login',
+                  'caller does not have permission'),
+     'title': 'Firebase CLI is not authorized',
+     'hint': 'FIREBASE_TOKEN or the service account secret is expired or lacks Hosting/Firebase Admin roles.'},
+    {'id': 'gradle-out-of-memory', 'severity': 'warning',
+     'keywords': ('java.lang.outofmemoryerror', 'gradle build daemon disappeared'),
+     'title': 'Gradle ran out of memory',
+     'hint': 'Raise org.gradle.jvmargs in android/gradle.properties.'},
+    {'id': 'flutter-tests-failed', 'severity': 'error',
+     'keywords': ('some tests failed',),
+     'title': 'flutter test failed',
+     'hint': 'Run `flutter test` locally; the failing test names are just above this line.'},
+)
+
+
+class AhoCorasick:
+    """Every occurrence of any of a set of keywords, in one pass over the text."""
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        goto = [{}]
+        output = [[]]
+        for index, keyword in enumerate(self.keywords):
+            node = 0
+            for char in keyword:
+                following = goto[node].get(char)
+                if following is None:
+                    following = len(goto)
+                    goto[node][char] = following
+                    goto.append({})
+                    output.append([])
+                node = following
+            output[node].append(index)
+
+        fail = [0] * len(goto)
+        queue = collections.deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, following in goto[node].items():
+                queue.append(following)
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                fallback = goto[state].get(char, 0)
+                fail[following] = fallback if fallback != following else 0
+                output[following] = output[following] + output[fail[following]]
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+
+    def search(self, text):
+        """Yield (end offset, keyword index) for every keyword occurrence in text."""
+        goto, fail, output = self._goto, self._fail, self._output
+        root = goto[0]
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0) if node else root.get(char, 0)
+            if output[node]:
+                for index in output[node]:
+                    yield position, index
+
+
+class Catalog:
+    """SIGNATURES compiled into one automaton plus per-signature regexes."""
+
+    def __init__(self, signatures=SIGNATURES):
+        self.signatures = signatures
+        keywords = []
+        self._owners = []
+        for number, signature in enumerate(signatures):
+            for keyword in signature['keywords']:
+                keywords.append(keyword.lower())
+                self._owners.append(number)
+        self.matcher = AhoCorasick(keywords)
+        # Leftmost-first, so it can't list every keyword, but it says in C whether there is one
+        self._screen = re.compile('|'.join(map(re.escape, sorted(set(keywords), key=len, reverse=True))))
+        self._regex = [re.compile(s['regex'], re.I) if 'regex' in s else None for s in signatures]
+        self._exclude = [re.compile(s['exclude'], re.I) if 'exclude' in s else None for s in signatures]
+
+    def match_line(self, line):
+        """[(signature, detail)] for one log line."""
+        lowered = line.lower()
+        if not self._screen.search(lowered):
+            return []
+        hits = {self._owners[index] for _, index in self.matcher.search(lowered)}
+        found = []
+        for number in sorted(hits):
+            signature = self.signatures[number]
+            if self._exclude[number] and self._exclude[number].search(line):
+                continue
+            detail = None
+            if self._regex[number]:
+                match = self._regex[number].search(line)
+                if not match:
+                    continue
+                detail = signature['classify'](match) if 'classify' in signature else match.group(1)
+                if detail is None:
+                    continue
+            found.append((signature, detail))
+        return found
+
+
+@functools.lru_cache(maxsize=None)
+def catalog():
+    return Catalog()
+
+
+def scan_lines(lines, source):
+    """Findings (dicts) and bytes read for one log's lines."""
+    matcher = catalog()
+    findings = []
+    scanned = 0
+    in_script = False
+    for number, line in enumerate(lines, 1):
+        scanned += len(line)
+        line = TIMESTAMP.sub('', line.rstrip('\r\n'), count=1)
+        if line.startswith(RUN_GROUP_START):
+            in_script = True
+            continue
+        if in_script:
+            in_script = not line.startswith(GROUP_END)
+            continue
+        for signature, detail in matcher.match_line(line):
+            findings.append({'signature': signature['id'], 'source': source, 'line': number,
+                             'detail': detail, 'text': line.strip()[:200]})
+    return findings, scanned
+
+
+def iter_logs(path):
+    """(source name, line iterator) for each log in a zip, .gz or text file."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for member in archive.infolist():
+                if member.is_dir():
+                    continue
+                with archive.open(member) as raw:
+                    yield f"{path}:{member.filename}", io.TextIOWrapper(raw, encoding='utf-8', errors='replace')
+    elif path.endswith('.gz'):
+        with gzip.open(path, 'rt', encoding='utf-8', errors='replace') as handle:
+            yield path, handle
+    else:
+        with open(path, encoding='utf-8', errors='replace') as handle:
+            yield path, handle
+
+
+def scan_path(path):
+    """All findings in one archive or log file, and characters scanned."""
+    findings = []
+    scanned = 0
+    for source, lines in iter_logs(path):
+        found, count = scan_lines(lines, source)
+        findings.extend(found)
+        scanned += count
+    return findings, scanned
+
+
+def expand(paths):
+    result = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                result.extend(os.path.join(root, name) for name in sorted(files)
+                              if name.endswith(('.zip', '.txt', '.log', '.gz')))
+        else:
+            result.append(path)
+    return result
+
+
+def scan(paths, jobs):
+    """(findings, characters scanned) over many paths, one worker process per archive."""
+    findings = []
+    scanned = 0
+    if jobs <= 1 or len(paths) <= 1:
+        results = list(map(scan_path, paths))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+            results = list(pool.map(scan_path, paths))
+    for found, count in results:
+        findings.extend(found)
+        scanned += count
+    return findings, scanned
+
+
+def report(findings):
+    by_id = {signature['id']: signature for signature in SIGNATURES}
+    grouped = collections.OrderedDict()
+    for finding in findings:
+        grouped.setdefault(finding['signature'], []).append(finding)
+    ordered = sorted(grouped.items(), key=lambda item: (by_id[item[0]]['severity'] != 'error', item[0]))
+    for signature_id, matches in ordered:
+        signature = by_id[signature_id]
+        icon = '❌' if signature['severity'] == 'error' else '⚠️ '
+        details = sorted({m['detail'] for m in matches if m['detail']})
+        print(f"{icon} {signature['title']} [{signature_id}] × {len(matches)}")
+        if details:
+            print(f"   Detail: {', '.join(details[:5])}{' …' if len(details) > 5 else ''}")
+        for match in matches[:MAX_LOCATIONS]:
+            print(f"   {match['source']}:{match['line']}: {match['text']}")
+        if len(matches) > MAX_LOCATIONS:
+            print(f"   … and {len(matches) - MAX_LOCATIONS} more")
+        print(f"   💡 {signature['hint']}")
+
+
+def run_benchmark(megabytes):
+    """Compare the screened Aho-Corasick scan with searching every keyword per line."""
+    filler = ('2025-06-01T12:00:00.0000000Z Compiling lib/main.dart for the Web...                 \n',
+              '2025-06-01T12:00:00.0000000Z > Task :app:mergeReleaseResources UP-TO-DATE          \n',
+              '2025-06-01T12:00:00.0000000Z 00:42 +118: All tests passed!                          \n')
+    lines = [filler[i % len(filler)] for i in range(megabytes * (1 << 20) // len(filler[0]))]
+    for i in range(0, len(lines), 5000):
+        lines[i] = '2025-06-01T12:00:00.0000000Z ❌ certificate_hash mismatch\n'
+    began = time.perf_counter()
+    findings, scanned = scan_lines(lines, 'synthetic')
+    automaton = time.perf_counter() - began
+
+    keywords = [(k.lower(), s['id']) for s in SIGNATURES for k in s['keywords']]
+    began = time.perf_counter()
+    naive = sum(1 for line in lines for keyword, _ in keywords if keyword in line.lower())
+    per_keyword = time.perf_counter() - began
+    mb = scanned / (1 << 20)
+    print(f"📊 {mb:.0f}MB synthetic log, {len(lines):,} lines, {len(keywords)} keywords")
+    print("=" * 60)
+    print(f"Screened automaton    {automaton * 1000:>8.0f}ms  {mb / automaton:>6.1f} MB/s  "
+          f"({len(findings)} findings)")
+    print(f"Per-keyword `in`      {per_keyword * 1000:>8.0f}ms  {mb / per_keyword:>6.1f} MB/s  "
+          f"({naive} keyword hits)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    run = sub.add_parser('scan', help='Scan log archives, log files or directories of them')
+    run.add_argument('paths', nargs='+')
+    run.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='Archives scanned in parallel')
+    run.add_argument('--json', action='store_true', help='Print findings as JSON lines')
+    sub.add_parser('signatures', help='List the failure signatures')
+    bench = sub.add_parser('benchmark', help='Time the scan on a synthetic log')
+    bench.add_argument('--mb', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.command == 'signatures':
+        for signature in SIGNATURES:
+            print(f"{signature['id']:<32} {signature['severity']:<8} {signature['title']}")
+        return 0
+    if args.command == 'benchmark':
+        return run_benchmark(args.mb)
+
+    paths = expand(args.paths)
+    began = time.perf_counter()
+    try:
+        findings, scanned = scan(paths, args.jobs)
+    except (OSError, zipfile.BadZipFile) as e:
+        print(f"❌ {e}")
+        return 1
+    elapsed = time.perf_counter() - began
+    if args.json:
+        for finding in findings:
+            print(json.dumps(finding))
+    else:
+        print(f"📊 Scanned {len(paths)} file(s), {scanned / (1 << 20):.1f}MB in {elapsed:.1f}s")
+        print("=" * 60)
+        if findings:
+            report(findings)
+        else:
+            print("✅ No known failure signatures found")
+    severities = {signature['id']: signature['severity'] for signature in SIGNATURES}
+    return 1 if any(severities[f['signature']] == 'error' for f in findings) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Timezone-aware, vectorized day/week/month/year bucketing of timestamps.
+The app keys dailyEntries by the user's local calendar date
+(`{uid}_{YYYY-MM-DD}`, see FirebaseService._formatDateString) and reports
+group those days into ISO weeks, months and years. This converts millions of
+UTC timestamps at once: each IANA zone's UTC offset history is precomputed
+into a transition table (from zoneinfo, once per zone and process), all the
+zones in a batch are merged into one sorted key array, and a single NumPy
+searchsorted finds every row's offset. Calendar fields then come from
+integer day arithmetic and datetime64 casts, with no per-row Python.
+
+Report engines and migration tools should use these results rather than
+converting dates themselves, so every tool agrees on the day a timestamp
+belongs to.
+
+  python3 scripts/date_buckets.py bucket --zone Asia/Kolkata 1735669800 1735756200
+  python3 scripts/date_buckets.py benchmark --rows 2000000
+"""
+
+import argparse
+import calendar
+import datetime
+import functools
+import sys
+import time
+import zoneinfo
+
+import numpy as np
+
+SECONDS_PER_DAY = 86400
+# Offset tables cover these years; outside them the nearest known offset applies
+TABLE_START_YEAR = 1970
+TABLE_END_YEAR = 2100
+# Merged lookup keys are zone_index * ZONE_SPAN + (seconds + ZONE_SPAN // 2)
+ZONE_SPAN = 1 << 42
+_BEFORE_ALL = -(ZONE_SPAN // 2)
+
+
+def _utc_offset(zone, seconds):
+    return int(datetime.datetime.fromtimestamp(seconds, zone).utcoffset().total_seconds())
+
+
+@functools.lru_cache(maxsize=None)
+def zone_table(name, start_year=TABLE_START_YEAR, end_year=TABLE_END_YEAR):
+    """(transition seconds, offset seconds) arrays for an IANA zone.
+
+    offsets[i] applies from transitions[i] until the next transition; the
+    first entry starts before any representable timestamp. Transitions are
+    found by probing zoneinfo once per day and bisecting to the second.
+    """
+    zone = zoneinfo.ZoneInfo(name)
+    start = calendar.timegm((start_year, 1, 1, 0, 0, 0))
+    end = calendar.timegm((end_year, 1, 1, 0, 0, 0))
+    transitions = [_BEFORE_ALL]
+    offsets = [_utc_offset(zone, start)]
+    previous = offsets[0]
+    for probe in range(start, end, SECONDS_PER_DAY):
+        offset = _utc_offset(zone, probe + SECONDS_PER_DAY)
+        if offset == previous:
+            continue
+        low, high = probe, probe + SECONDS_PER_DAY
+        while high - low > 1:
+            middle = (low + high) // 2
+            if _utc_offset(zone, middle) == previous:
+                low = middle
+            else:
+                high = middle
+        transitions.append(high)
+        offsets.append(offset)
+        previous = offset
+    return np.array(transitions, dtype=np.int64), np.array(offsets, dtype=np.int64)
+
+
+class ZoneSet:
+    """Offset lookup for several zones through one merged, sorted key array."""
+
+    def __init__(self, names):
+        self.names = list(names)
+        if len(self.names) >= (1 << 20):
+            raise ValueError('Too many zones in one batch')
+        keys, offsets = [], []
+        for index, name in enumerate(self.names):
+            transitions, zone_offsets = zone_table(name)
+            keys.append(index * ZONE_SPAN + (transitions - _BEFORE_ALL))
+            offsets.append(zone_offsets)
+        self.keys = np.concatenate(keys) if keys else np.zeros(0, dtype=np.int64)
+        self.offsets = np.concatenate(offsets) if offsets else np.zeros(0, dtype=np.int64)
+
+    def offsets_at(self, zone_indexes, seconds):
+        """UTC offset in seconds of each (zone index, UTC seconds) row."""
+        keys = zone_indexes.astype(np.int64) * ZONE_SPAN + (seconds - _BEFORE_ALL)
+        return self.offsets[np.searchsorted(self.keys, keys, side='right') - 1]
+
+    def to_utc(self, zone_indexes, wall):
+        """UTC seconds of local wall-clock seconds (since 1970-01-01 local time).
+
+        A wall time inside a DST gap is read with the offset from before the
+        gap, so 02:30 on a day that skips 02:00-03:00 becomes 03:30; an
+        ambiguous one maps to either of its two instants.
+        """
+        guess_offsets = self.offsets_at(zone_indexes, wall)
+        offsets = self.offsets_at(zone_indexes, wall - guess_offsets)
+        # Re-evaluate the offset at the guess in case a transition lies in between
+        corrected = wall - offsets
+        exists = corrected + self.offsets_at(zone_indexes, corrected) == wall
+        return np.where(exists, corrected, wall - np.minimum(guess_offsets, offsets))
+
+
+def _as_seconds(timestamps, unit):
+    seconds = np.asarray(timestamps, dtype=np.int64)
+    if unit == 'ms':
+        return np.floor_divide(seconds, 1000)
+    if unit != 's':
+        raise ValueError(f"Unknown timestamp unit: {unit}")
+    return seconds
+
+
+def _zone_indexes(zones, rows):
+    """(zone names, per-row index into them) from any accepted zones argument."""
+    if isinstance(zones, str):
+        return [zones], np.zeros(rows, dtype=np.int64)
+    if isinstance(zones, tuple):
+        names, indexes = zones
+        names, indexes = list(names), np.asarray(indexes, dtype=np.int64)
+    else:
+        # Sorting millions of strings dominates here; pass (names, indexes) when possible
+        names, indexes = np.unique(np.asarray(zones), return_inverse=True)
+    if len(indexes) != rows:
+        raise ValueError(f"Got {len(indexes)} zones for {rows} timestamps")
+    return [str(name) for name in names], indexes.reshape(-1)
+
+
+def local_days(timestamps, zones, unit='s'):
+    """Local calendar day (days since 1970-01-01) of each UTC timestamp."""
+    seconds = _as_seconds(timestamps, unit)
+    names, indexes = _zone_indexes(zones, len(seconds))
+    local = seconds + ZoneSet(names).offsets_at(indexes, seconds)
+    return np.floor_divide(local, SECONDS_PER_DAY)
+
+
+def buckets_for_days(days):
+    """ISO week, month and year buckets of epoch days.
+
+    week_start is the epoch day of the ISO week's Monday; iso_year/iso_week
+    follow ISO 8601 (the week belongs to the year of its Thursday); month
+    counts months since 1970-01.
+    """
+    days = np.asarray(days, dtype=np.int64)
+    # 1970-01-01 was a Thursday: Monday-based weekday is (day + 3) % 7
+    weekday = np.remainder(days + 3, 7)
+    week_start = days - weekday
+    thursday = (week_start + 3).astype('datetime64[D]')
+    iso_year_start = thursday.astype('datetime64[Y]')
+    iso_week = (thursday - iso_year_start.astype('datetime64[D]')).astype(np.int64) // 7 + 1
+    month = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    return {
+        'day': days,
+        'weekday': weekday,
+        'week_start': week_start,
+        'iso_year': iso_year_start.astype(np.int64) + 1970,
+        'iso_week': iso_week,
+        'month': month,
+        'year': month // 12 + 1970,
+    }
+
+
+def bucket(timestamps, zones, unit='s'):
+    """Local day, ISO week, month and year buckets for UTC timestamps.
+
+    zones is one IANA zone name for every row, a per-row array of names,
+    or (names, indexes) with a per-row index into names, which is the fast
+    form for large batches (e.g. one zone index per user). Returns a dict of
+    int64 arrays, see buckets_for_days.
+    """
+    return buckets_for_days(local_days(timestamps, zones, unit))
+
+
+def local_to_utc(wall, zones):
+    """UTC seconds of local wall-clock seconds, see ZoneSet.to_utc."""
+    wall = np.asarray(wall, dtype=np.int64)
+    names, indexes = _zone_indexes(zones, len(wall))
+    return ZoneSet(names).to_utc(indexes, wall)
+
+
+def day_start_utc(days, zones):
+    """UTC seconds of local midnight starting each epoch day (for range queries).
+
+    When midnight is skipped by a DST change, the first existing local time
+    of that day is used.
+    """
+    return local_to_utc(np.asarray(days, dtype=np.int64) * SECONDS_PER_DAY, zones)
+
+
+def format_days(days):
+    """'YYYY-MM-DD' strings for epoch days, as used in dailyEntries document IDs."""
+    return np.datetime_as_string(np.asarray(days, dtype=np.int64).astype('datetime64[D]'), unit='D')
+
+
+def format_months(months):
+    return np.datetime_as_string(np.asarray(months, dtype=np.int64).astype('datetime64[M]'), unit='M')
+
+
+def format_iso_weeks(iso_years, iso_weeks):
+    return np.char.add(np.char.add(np.asarray(iso_years).astype(str), '-W'),
+                       np.char.zfill(np.asarray(iso_weeks).astype(str), 2))
+
+
+def daily_entry_ids(uids, timestamps, zones, unit='s'):
+    """`{uid}_{YYYY-MM-DD}` document IDs for writes made at the given instants."""
+    return np.char.add(np.char.add(np.asarray(uids).astype(str), '_'),
+                       format_days(local_days(timestamps, zones, unit)))
+
+
+def _per_row(seconds, zone_names):
+    """Reference conversion with zoneinfo, one row at a time."""
+    zones = {}
+    out = []
+    for stamp, name in zip(seconds.tolist(), zone_names.tolist()):
+        zone = zones.get(name) or zones.setdefault(name, zoneinfo.ZoneInfo(name))
+        local = datetime.datetime.fromtimestamp(stamp, zone).date()
+        iso = local.isocalendar()
+        out.append(((local - datetime.date(1970, 1, 1)).days, iso[0], iso[1],
+                    (local.year - 1970) * 12 + local.month - 1))
+    return out
+
+
+BENCHMARK_ZONES = ('America/Los_Angeles', 'America/New_York', 'America/Sao_Paulo', 'Europe/London',
+                   'Europe/Berlin', 'Africa/Johannesburg', 'Asia/Kolkata', 'Asia/Tokyo',
+                   'Australia/Sydney', 'Pacific/Auckland', 'Asia/Kathmandu', 'America/St_Johns')
+
+
+def run_benchmark(rows, sample):
+    rng = np.random.default_rng(1)
+    low = calendar.timegm((2015, 1, 1, 0, 0, 0))
+    high = calendar.timegm((2030, 1, 1, 0, 0, 0))
+    seconds = rng.integers(low, high, rows, dtype=np.int64)
+    zone_indexes = rng.integers(0, len(BENCHMARK_ZONES), rows)
+    zone_names = np.array(BENCHMARK_ZONES)[zone_indexes]
+
+    start = time.perf_counter()
+    for name in BENCHMARK_ZONES:
+        zone_table(name)
+    tables = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = bucket(seconds, (BENCHMARK_ZONES, zone_indexes))
+    vectorized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bucket(seconds, zone_names)
+    by_name = time.perf_counter() - start
+
+    sample = min(sample, rows)
+    start = time.perf_counter()
+    reference = _per_row(seconds[:sample], zone_names[:sample])
+    per_row = (time.perf_counter() - start) / sample
+
+    expected = np.array(reference, dtype=np.int64)
+    got = np.stack([result['day'][:sample], result['iso_year'][:sample],
+                    result['iso_week'][:sample], result['month'][:sample]], axis=1)
+    mismatches = int(np.count_nonzero(np.any(expected != got, axis=1)))
+
+    print(f"📊 Bucketing {rows:,} timestamps across {len(BENCHMARK_ZONES)} zones")
+    print("=" * 60)
+    print(f"{'offset tables (once)':<26} {tables * 1000:>9.0f}ms")
+    print(f"{'vectorized':<26} {vectorized * 1000:>9.0f}ms {rows / vectorized:>14,.0f} rows/s")
+    print(f"{'vectorized, zone names':<26} {by_name * 1000:>9.0f}ms {rows / by_name:>14,.0f} rows/s")
+    print(f"{'per-row zoneinfo (est.)':<26} {per_row * rows * 1000:>9.0f}ms {1 / per_row:>14,.0f} rows/s")
+    print(f"Speed-up: {per_row * rows / vectorized:.0f}×")
+    if mismatches:
+        print(f"❌ {mismatches} of {sample:,} sampled rows differ from zoneinfo")
+        return 1
+    print(f"✅ Day, ISO week and month match zoneinfo on {sample:,} sampled rows")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    show = sub.add_parser('bucket', help='Print the buckets of some timestamps')
+    show.add_argument('timestamps', nargs='+', type=int, help='UTC epoch seconds')
+    show.add_argument('--zone', required=True, help='IANA time zone, e.g. America/Los_Angeles')
+    bench = sub.add_parser('benchmark', help='Compare with per-row zoneinfo conversion')
+    bench.add_argument('--rows', type=int, default=2_000_000)
+    bench.add_argument('--sample', type=int, default=200_000, help='Rows converted per-row for timing and checking')
+    args = parser.parse_args()
+
+    if args.command == 'benchmark':
+        return run_benchmark(args.rows, args.sample)
+    try:
+        result = bucket(args.timestamps, args.zone)
+    except zoneinfo.ZoneInfoNotFoundError:
+        print(f"❌ Unknown time zone: {args.zone}")
+        return 1
+    days = format_days(result['day'])
+    weeks = format_iso_weeks(result['iso_year'], result['iso_week'])
+    months = format_months(result['month'])
+    for i, stamp in enumerate(args.timestamps):
+        print(f"{stamp}  day {days[i]}  week {weeks[i]}  month {months[i]}  year {result['year'][i]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,17 +4,17 @@ Debug APK signing and Google Sign-In configuration.
 This script analyzes an APK to understand why Google Sign-In is failing.
 """
 
-import subprocess
 import sys
 import os
 import zipfile
-import json
 import tempfile
 
+import tracing
+
 def run_command(cmd, description=""):
     """Run a command and return output."""
     try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        result = tracing.run(cmd, shell=True, capture_output=True, text=True)
         if result.returncode != 0:
             print(f"❌ Error running {description}: {result.stderr}")
             return None
@@ -23,6 +23,7 @@ def run_command(cmd, description=""):
         print(f"❌ Exception running {description}: {e}")
         return None
 
+@tracing.traced()
 def get_apk_signature_info(apk_path):
     """Get signature information from APK."""
     print(f"🔍 Analyzing APK signature: {apk_path}")
@@ -47,6 +48,7 @@ def get_apk_signature_info(apk_path):
     
     return output
 
+@tracing.traced()
 def get_apk_signing_certificate(apk_path):
     """Get signing certificate info from APK."""
     print(f"🔐 Getting signing certificate from APK...")
@@ -85,6 +87,7 @@ def get_apk_signing_certificate(apk_path):
     
     return None
 
+@tracing.traced()
 def extract_google_services_from_apk(apk_path):
     """Extract google-services.json equivalent from APK."""
     print(f"🔍 Extracting Google services configuration from APK...")
@@ -94,9 +97,12 @@ def extract_google_services_from_apk(apk_path):
         with zipfile.ZipFile(apk_path, 'r') as zip_file:
             # Look for google-services related files
             relevant_files = []
-            for file_name in zip_file.namelist():
-                if any(keyword in file_name.lower() for keyword in ['google', 'firebase', 'oauth', 'client']):
-                    relevant_files.append(file_name)
+            with tracing.span('scan APK entries', 'zip') as scan:
+                names = zip_file.namelist()
+                for file_name in names:
+                    if any(keyword in file_name.lower() for keyword in ['google', 'firebase', 'oauth', 'client']):
+                        relevant_files.append(file_name)
+                scan.annotate(entries=len(names), matches=len(relevant_files))
             
             if relevant_files:
                 print("📋 Found Google/Firebase related files in APK:")
@@ -142,6 +148,7 @@ def compare_with_expected_config():
     print(f"🌐 Expected Web Client: 763348902456-l7kcl7qerssghmid1bmc5n53oq2v62ic.apps.googleusercontent.com")
     print(f"📱 Expected Android Client: 763348902456-b2ga4vrkv25ecap115hmr8qdh3jk1q73.apps.googleusercontent.com")
 
+@tracing.traced()
 def check_local_debug_keystore():
     """Check local debug keystore for comparison."""
     print("\n🔑 Local Debug Keystore Info:")
@@ -203,4 +210,5 @@ def main():
     print("5. If package name is wrong, rebuild with correct configuration")
 
 if __name__ == "__main__":
+    tracing.setup()
     main()
\ No newline at end of file
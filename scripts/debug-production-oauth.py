@@ -8,6 +8,9 @@ import base64
 import os
 import sys
 
+import secret_digest
+import tracing
+
 def check_production_secrets():
     """Check if production secrets are configured correctly."""
     print("🔍 Production OAuth Configuration Debugger")
@@ -34,9 +37,18 @@ def check_production_secrets():
         # Try to decode and check GOOGLE_SERVICES_PROD
         google_services = os.getenv('GOOGLE_SERVICES_PROD', '')
         if google_services:
+            # Compare by digest first; when the secret is the committed file, read that instead
+            local_path = secret_digest.KNOWN_SECRETS['GOOGLE_SERVICES_PROD']
+            result = secret_digest.verify(('GOOGLE_SERVICES_PROD', 'env', 'GOOGLE_SERVICES_PROD', local_path))
+            secret_digest.report(result)
             try:
-                decoded = base64.b64decode(google_services).decode('utf-8')
-                config = json.loads(decoded)
+                if result['status'] == 'match':
+                    config = tracing.load_json(os.path.join(secret_digest.REPO_ROOT, local_path))
+                else:
+                    with tracing.span('decode GOOGLE_SERVICES_PROD', 'encode'):
+                        decoded = base64.b64decode(google_services).decode('utf-8')
+                    with tracing.span('parse GOOGLE_SERVICES_PROD', 'parse'):
+                        config = json.loads(decoded)
                 
                 project_id = config.get('project_info', {}).get('project_id', 'Unknown')
                 project_number = config.get('project_info', {}).get('project_number', 'Unknown')
@@ -106,4 +118,5 @@ def check_production_secrets():
     print("4. Verify production project has Android app with correct SHA-1")
 
 if __name__ == "__main__":
+    tracing.setup()
     check_production_secrets()
\ No newline at end of file
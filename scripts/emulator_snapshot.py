@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Snapshot and restore Firestore emulator datasets for perf and integration runs.
+A snapshot is a gzip stream of one line per document,
+`<collection>/<quoted id>\\t<REST fields JSON>`, after a JSON header line.
+Fields are kept in the REST wire encoding, so a restore passes each line
+straight into documents:batchWrite requests (500 writes each, several in
+flight) without decoding or re-encoding a single value.
+
+An incremental snapshot names a base snapshot and stores only documents
+whose content changed since it, plus tombstones (`<path>\\t-`) for deleted
+ones. Restoring it restores the base chain first, then applies the deltas.
+
+  FIRESTORE_EMULATOR_HOST=localhost:8080 python3 scripts/emulator_snapshot.py capture seed.snap
+  FIRESTORE_EMULATOR_HOST=localhost:8080 python3 scripts/emulator_snapshot.py capture --base seed.snap run1.snap
+  FIRESTORE_EMULATOR_HOST=localhost:8080 python3 scripts/emulator_snapshot.py restore run1.snap
+"""
+
+import argparse
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+import urllib.parse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from firestore_rest import FirestoreClient, FirestoreError, encode_value, with_retries
+
+SNAPSHOT_FORMAT = 'emulator-snapshot-v1'
+COLLECTIONS = ('users', 'dailyEntries', 'weightLossGoals')
+BATCH_SIZE = 500  # documents:batchWrite limit
+DEFAULT_WORKERS = 8
+TOMBSTONE = '-'
+
+
+def canonical_fields(document):
+    """Stable JSON text of a REST document's fields (the stored and hashed form)."""
+    return json.dumps(document.get('fields', {}), sort_keys=True, separators=(',', ':'))
+
+
+def content_hash(fields_text):
+    return hashlib.blake2b(fields_text.encode('utf-8'), digest_size=8).digest()
+
+
+def snapshot_path(collection, doc_id):
+    return f"{collection}/{urllib.parse.quote(doc_id, safe='')}"
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_header(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+    if header.get('format') != SNAPSHOT_FORMAT:
+        raise ValueError(f"{path} is not a {SNAPSHOT_FORMAT} snapshot")
+    return header
+
+
+def iter_lines(path):
+    """Yield (path, fields text or TOMBSTONE) for each document line of a snapshot."""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        f.readline()
+        for line in f:
+            doc_path, _, fields = line.rstrip('\n').partition('\t')
+            yield doc_path, fields
+
+
+def chain(path):
+    """Snapshot files to apply in order: the full base first, path last."""
+    files = [os.path.abspath(path)]
+    seen = set(files)
+    while True:
+        header = read_header(files[0])
+        base = header.get('base')
+        if not base:
+            return files
+        base_path = os.path.normpath(os.path.join(os.path.dirname(files[0]), base['path']))
+        if base_path in seen:
+            raise ValueError(f"Snapshot chain loops back to {base_path}")
+        if not os.path.exists(base_path):
+            raise ValueError(f"Base snapshot {base_path} (of {files[0]}) not found")
+        if file_sha256(base_path) != base['sha256']:
+            raise ValueError(f"Base snapshot {base_path} changed since {files[0]} was taken")
+        seen.add(base_path)
+        files.insert(0, base_path)
+
+
+def chain_hashes(path):
+    """{path: content hash} of the dataset a snapshot chain restores to."""
+    hashes = {}
+    for snapshot in chain(path):
+        for doc_path, fields in iter_lines(snapshot):
+            if fields == TOMBSTONE:
+                hashes.pop(doc_path, None)
+            else:
+                hashes[doc_path] = content_hash(fields)
+    return hashes
+
+
+def write_snapshot(out_path, header, lines, level=6):
+    """Write header and (path, fields) lines atomically; returns counts by kind."""
+    counts = {'documents': 0, 'deleted': 0}
+    tmp_path = f"{out_path}.tmp"
+    with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=level) as f:
+        f.write(json.dumps(header) + '\n')
+        for doc_path, fields in lines:
+            f.write(f"{doc_path}\t{fields}\n")
+            counts['deleted' if fields == TOMBSTONE else 'documents'] += 1
+    os.replace(tmp_path, out_path)
+    return counts
+
+
+def capture(client, out_path, collections=COLLECTIONS, base=None, page_size=1000):
+    """Snapshot the emulator's collections, only changes since base when given."""
+    header = {
+        'format': SNAPSHOT_FORMAT,
+        'project': client.project,
+        'collections': list(collections),
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'base': None,
+    }
+    base_hashes = None
+    if base:
+        base_hashes = chain_hashes(base)
+        header['base'] = {
+            'path': os.path.relpath(os.path.abspath(base), os.path.dirname(os.path.abspath(out_path))),
+            'sha256': file_sha256(base),
+        }
+
+    def lines():
+        for collection in collections:
+            prefix = f"{collection}/"
+            for document in client.list_documents(collection, page_size=page_size):
+                doc_path = snapshot_path(collection, document['name'].rsplit('/', 1)[-1])
+                fields = canonical_fields(document)
+                if base_hashes is not None and base_hashes.pop(doc_path, None) == content_hash(fields):
+                    continue
+                yield doc_path, fields
+            if base_hashes is not None:
+                # Whatever the base had in this collection and the emulator no longer does
+                for doc_path in [p for p in base_hashes if p.startswith(prefix)]:
+                    del base_hashes[doc_path]
+                    yield doc_path, TOMBSTONE
+
+    return write_snapshot(out_path, header, lines())
+
+
+def _write_for(documents_root, doc_path, fields):
+    collection, _, quoted_id = doc_path.partition('/')
+    name = json.dumps(f"{documents_root}/{collection}/{urllib.parse.unquote(quoted_id)}")
+    if fields == TOMBSTONE:
+        return f'{{"delete":{name}}}'
+    return f'{{"update":{{"name":{name},"fields":{fields}}}}}'
+
+
+def apply_snapshot(client, path, workers=DEFAULT_WORKERS, batch_size=BATCH_SIZE):
+    """Stream one snapshot file into batchWrite requests; returns writes applied."""
+    def send(batch):
+        with_retries(lambda: client.batch_write(batch))
+        return len(batch)
+
+    applied = 0
+    pending = set()
+    batch = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for doc_path, fields in iter_lines(path):
+            batch.append(_write_for(client.documents_root, doc_path, fields))
+            if len(batch) < batch_size:
+                continue
+            pending.add(pool.submit(send, batch))
+            batch = []
+            # Bound the batches held in memory to a couple per worker
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                applied += sum(future.result() for future in done)
+        if batch:
+            pending.add(pool.submit(send, batch))
+        applied += sum(future.result() for future in pending)
+    return applied
+
+
+def restore(client, path, workers=DEFAULT_WORKERS, clear=True):
+    """Restore a snapshot chain into the emulator; returns [(file, writes)]."""
+    if not client.using_emulator:
+        raise ValueError('Restore only runs against the emulator (set FIRESTORE_EMULATOR_HOST)')
+    files = chain(path)
+    if clear:
+        client.clear_emulator()
+    # Files apply in order so a delta never races the base write it overrides
+    return [(snapshot, apply_snapshot(client, snapshot, workers)) for snapshot in files]
+
+
+def synthetic_lines(documents, users=1000):
+    """(path, fields) lines for a seeded dataset of roughly `documents` docs."""
+    start = datetime.datetime(2024, 1, 1, 12, tzinfo=datetime.timezone.utc)
+    days = max(1, documents // users - 2)
+    for u in range(users):
+        uid = f"perf-user-{u:05d}"
+        weight = 150 + u % 60
+        user = {'uid': uid, 'name': f"Perf User {u}", 'email': f"{uid}@test.com",
+                'height': 160 + u % 30, 'weight': weight, 'gender': 'female' if u % 2 else 'male',
+                'dateOfBirth': datetime.datetime(1980 + u % 25, 1, 1, tzinfo=datetime.timezone.utc)}
+        yield snapshot_path('users', uid), _fields_text(user)
+        goal = {'uid': uid, 'currentWeight': weight, 'targetWeight': weight - 10,
+                'weightLossPerWeek': 1.0, 'isActive': True, 'startDate': start}
+        yield snapshot_path('weightLossGoals', uid), _fields_text(goal)
+        for d in range(days):
+            date = start + datetime.timedelta(days=d)
+            entry = {'uid': uid, 'date': date, 'weight': weight - d * 0.02, 'glasses': 6 + d % 4,
+                     'foodEntries': [{'name': 'Lunch', 'calories': 450 + (u + d) % 200, 'time': '12:00'}],
+                     'exerciseEntries': [{'name': 'Running', 'caloriesBurned': 200 + d % 150,
+                                          'duration': 30, 'time': '07:00'}]}
+            yield snapshot_path('dailyEntries', f"{uid}_{date.date().isoformat()}"), _fields_text(entry)
+
+
+def _fields_text(values):
+    return canonical_fields({'fields': {k: encode_value(v) for k, v in values.items()}})
+
+
+def run_benchmark(client, documents, workers, sample):
+    """Time a full restore against per-document writes (how seeding works today)."""
+    header = {'format': SNAPSHOT_FORMAT, 'project': client.project,
+              'collections': list(COLLECTIONS), 'created': None, 'base': None}
+    path = os.path.join(os.environ.get('TMPDIR', '/tmp'), f"emulator-benchmark-{os.getpid()}.snap")
+    try:
+        start = time.perf_counter()
+        counts = write_snapshot(path, header, synthetic_lines(documents), level=1)
+        print(f"📦 Generated {counts['documents']} documents in {time.perf_counter() - start:.1f}s "
+              f"({os.path.getsize(path) / 1024 / 1024:.1f}MB compressed)")
+
+        client.clear_emulator()
+        start = time.perf_counter()
+        for i, (doc_path, fields) in enumerate(iter_lines(path)):
+            if i == sample:
+                break
+            client.batch_write([_write_for(client.documents_root, doc_path, fields)])
+        one_by_one = (time.perf_counter() - start) / sample
+
+        start = time.perf_counter()
+        written = sum(count for _, count in restore(client, path, workers))
+        elapsed = time.perf_counter() - start
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+    print(f"📊 Restoring {written} documents ({workers} workers)")
+    print("=" * 60)
+    print(f"{'per-document writes':<24} {one_by_one * written:>8.1f}s (est. from {sample} docs)")
+    print(f"{'snapshot restore':<24} {elapsed:>8.1f}s {written / elapsed:>10.0f} docs/s")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--project', help='Firestore project (default: $GCLOUD_PROJECT)')
+    sub = parser.add_subparsers(dest='command', required=True)
+    cap = sub.add_parser('capture', help='Snapshot the emulator collections')
+    cap.add_argument('output')
+    cap.add_argument('--base', help='Store only changes since this snapshot')
+    cap.add_argument('--collection', action='append', dest='collections',
+                     help=f"Collection to include (default: {', '.join(COLLECTIONS)})")
+    res = sub.add_parser('restore', help='Replace the emulator contents with a snapshot')
+    res.add_argument('snapshot')
+    res.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='batchWrite requests in flight')
+    res.add_argument('--keep', action='store_true', help='Write over existing data instead of clearing first')
+    info = sub.add_parser('info', help='Show a snapshot chain and its document counts')
+    info.add_argument('snapshot')
+    bench = sub.add_parser('benchmark', help='Time restoring a synthetic dataset')
+    bench.add_argument('--docs', type=int, default=100000)
+    bench.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    bench.add_argument('--sample', type=int, default=200, help='Per-document writes timed for comparison')
+    args = parser.parse_args()
+
+    if args.command == 'info':
+        for snapshot in chain(args.snapshot):
+            header = read_header(snapshot)
+            counts = {'documents': 0, 'deleted': 0}
+            for _, fields in iter_lines(snapshot):
+                counts['deleted' if fields == TOMBSTONE else 'documents'] += 1
+            kind = 'incremental' if header['base'] else 'full'
+            print(f"📦 {snapshot} ({kind}, {header['created']}): {counts['documents']} documents, "
+                  f"{counts['deleted']} deletions, {os.path.getsize(snapshot) / 1024:.0f}KB")
+        return 0
+
+    client = FirestoreClient(project=args.project)
+    if not client.using_emulator:
+        print('❌ Set FIRESTORE_EMULATOR_HOST (e.g. localhost:8080); snapshots only touch the emulator')
+        return 1
+    try:
+        if args.command == 'capture':
+            start = time.perf_counter()
+            counts = capture(client, args.output, args.collections or COLLECTIONS, args.base)
+            kind = f"changes since {args.base}" if args.base else 'documents'
+            print(f"✅ Captured {counts['documents']} {kind}, {counts['deleted']} deletions "
+                  f"to {args.output} in {time.perf_counter() - start:.1f}s "
+                  f"({os.path.getsize(args.output) / 1024:.0f}KB)")
+        elif args.command == 'restore':
+            start = time.perf_counter()
+            applied = restore(client, args.snapshot, args.workers, clear=not args.keep)
+            elapsed = time.perf_counter() - start
+            for snapshot, writes in applied:
+                print(f"   {os.path.basename(snapshot)}: {writes} writes")
+            total = sum(writes for _, writes in applied)
+            print(f"✅ Restored {args.snapshot} in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} writes/s)")
+        else:
+            return run_benchmark(client, args.docs, args.workers, args.sample)
+    except (FirestoreError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
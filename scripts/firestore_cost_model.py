@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Offline Firestore cost and latency model of the app's flows.
+Each FirebaseService method is described by the steps it awaits in order
+(document reads, queries, commits, HTTP calls into the report/BMR endpoints,
+and calls to other methods). Methods compose into user sessions such as
+a dashboard week swipe or logging a meal. For each session the model
+counts billed reads and writes, index entries written and round trips,
+then samples latency with log-normal round-trip times to give p50/p95.
+A daily session mix turns that into cost per DAU.
+
+Proposed data-model changes are variants that override some methods'
+steps. They are compared side by side without building anything:
+
+  python3 scripts/firestore_cost_model.py --variant array-union-writes --variant parallel-summary
+  python3 scripts/firestore_cost_model.py --variants-file proposal.json --rtt 150 --methods
+
+A variants file maps a variant name to {method: [step, ...]} using the step
+syntax of METHODS below.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INDEXES_FILE = os.path.join(REPO_ROOT, 'firestore.indexes.json')
+
+# USD, Firestore and Cloud Functions list prices
+PRICE_PER_READ = 0.06 / 100000
+PRICE_PER_WRITE = 0.18 / 100000
+PRICE_PER_DELETE = 0.02 / 100000
+PRICE_PER_INVOCATION = 0.40 / 1000000
+
+# Fields of each collection; arrays get one array-contains entry per new element,
+# every other field an ascending and a descending single-field entry
+SCHEMA = {
+    'users': ['uid', 'name', 'email', 'height', 'weight', 'gender', 'dateOfBirth',
+              'photoURL', 'createdAt', 'updatedAt'],
+    'dailyEntries': ['id', 'uid', 'date', 'weight', 'glasses', 'foodEntries',
+                     'exerciseEntries', 'createdAt', 'updatedAt'],
+    'weightLossGoals': ['uid', 'currentWeight', 'targetWeight', 'weightLossPerWeek',
+                        'isActive', 'startDate', 'createdAt', 'updatedAt'],
+    'userWatermarks': ['lastWriteAt'],
+    'reportCache': ['payload', 'generatedAt'],
+}
+ARRAY_FIELDS = {'foodEntries', 'exerciseEntries'}
+
+# Steps, awaited in order:
+#   ['read', collection]                   one document get
+#   ['query', collection, days]            range query over `days` daily documents
+#   ['commit', [write, ...]]               one batch; write is ['write', collection, fields]
+#                                          (fields changed, or '*' for a new document)
+#                                          or ['delete', collection]
+#   ['http', endpoint]                     POST to an endpoint in ENDPOINTS
+#   ['call', method]                       everything `method` does
+#   ['parallel', step, ...]                Future.wait over the steps
+_WATERMARK = ['write', 'userWatermarks', ['lastWriteAt']]
+METHODS = {
+    'getUserProfile': [['read', 'users']],
+    'getDailyEntry': [['read', 'dailyEntries']],
+    'getActiveWeightLossGoal': [['read', 'weightLossGoals']],
+    'calculateBMR': [['http', 'calculateBMRHttp']],
+    'getSummaryForDate': [['call', 'getDailyEntry'], ['call', 'getActiveWeightLossGoal'],
+                          ['call', 'calculateBMR']],
+    'createOrUpdateDailyEntry': [['commit', [['write', 'dailyEntries', '*'], _WATERMARK]]],
+    # Read the whole day, then merge-write every field back; only changed values
+    # (the appended array element and updatedAt) touch the indexes
+    'addFoodEntry': [['call', 'getDailyEntry'],
+                     ['commit', [['write', 'dailyEntries', ['foodEntries', 'updatedAt']], _WATERMARK]]],
+    'addExerciseEntry': [['call', 'getDailyEntry'],
+                         ['commit', [['write', 'dailyEntries', ['exerciseEntries', 'updatedAt']], _WATERMARK]]],
+    'updateWeight': [['call', 'getDailyEntry'],
+                     ['commit', [['write', 'dailyEntries', ['weight', 'updatedAt']], _WATERMARK]]],
+    'updateUserProfile': [['commit', [['write', 'users', ['weight', 'updatedAt']], _WATERMARK]]],
+    'saveWeightLossGoal': [['commit', [['write', 'weightLossGoals', '*']]]],
+    'getDailyEntriesInRange:week': [['query', 'dailyEntries', 7]],
+    'generateCalorieReport:weekly': [['http', 'generateCalorieReportHttp:weekly']],
+    'generateCalorieReport:monthly': [['http', 'generateCalorieReportHttp:monthly']],
+    'generateCalorieReport:yearly': [['http', 'generateCalorieReportHttp:yearly']],
+}
+
+# Server-side round trips of each endpoint when its in-memory cache hits or misses
+# (scripts/report_cache.py: watermark check first, then precomputed report or recompute)
+ENDPOINTS = {
+    'calculateBMRHttp': {
+        'hit': [['read', 'userWatermarks']],
+        'miss': [['read', 'userWatermarks'], ['read', 'users']],
+    },
+    'generateCalorieReportHttp:weekly': {
+        'hit': [['read', 'userWatermarks']],
+        'miss': [['read', 'userWatermarks'], ['read', 'reportCache'], ['read', 'users'],
+                 ['query', 'dailyEntries', 7]],
+    },
+    'generateCalorieReportHttp:monthly': {
+        'hit': [['read', 'userWatermarks']],
+        'miss': [['read', 'userWatermarks'], ['read', 'reportCache'], ['read', 'users'],
+                 ['query', 'dailyEntries', 31]],
+    },
+    'generateCalorieReportHttp:yearly': {
+        'hit': [['read', 'userWatermarks']],
+        'miss': [['read', 'userWatermarks'], ['read', 'reportCache'], ['read', 'users'],
+                 ['query', 'dailyEntries', 365]],
+    },
+}
+
+SESSIONS = {
+    'dashboard_week_swipe': [['getSummaryForDate', 7]],
+    'log_meal': [['addFoodEntry', 1], ['getSummaryForDate', 1]],
+    'log_weight': [['updateWeight', 1], ['getSummaryForDate', 1]],
+    'open_weekly_report': [['generateCalorieReport:weekly', 1], ['calculateBMR', 1]],
+    'open_yearly_report': [['generateCalorieReport:yearly', 1], ['calculateBMR', 1]],
+}
+DEFAULT_MIX = {'dashboard_week_swipe': 1, 'log_meal': 3, 'log_weight': 0.5,
+               'open_weekly_report': 0.3, 'open_yearly_report': 0.1}
+
+_NO_READ_APPEND = {
+    'addFoodEntry': [['commit', [['write', 'dailyEntries', ['foodEntries', 'updatedAt']], _WATERMARK]]],
+    'addExerciseEntry': [['commit', [['write', 'dailyEntries', ['exerciseEntries', 'updatedAt']],
+                                     _WATERMARK]]],
+    'updateWeight': [['commit', [['write', 'dailyEntries', ['weight', 'updatedAt']], _WATERMARK]]],
+}
+VARIANTS = {
+    'baseline': {},
+    # FieldValue.arrayUnion / update() with no read-before-write
+    'array-union-writes': _NO_READ_APPEND,
+    # Future.wait over the three independent dashboard lookups
+    'parallel-summary': {'getSummaryForDate': [['parallel', ['call', 'getDailyEntry'],
+                                                ['call', 'getActiveWeightLossGoal'],
+                                                ['call', 'calculateBMR']]]},
+}
+
+
+def load_composite_indexes(path=INDEXES_FILE):
+    """{collection: [set of field paths]} from firestore.indexes.json."""
+    try:
+        with open(path, 'r') as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    indexes = {}
+    for index in config.get('indexes', []):
+        fields = {field['fieldPath'] for field in index.get('fields', [])}
+        indexes.setdefault(index['collectionGroup'], []).append(fields)
+    return indexes
+
+
+class Params:
+    """Environment knobs shared by every evaluation."""
+
+    def __init__(self, rtt_ms=80.0, jitter=0.5, server_rtt_ms=8.0, function_ms=30.0,
+                 cache_hit=0.5, fill=0.7, per_doc_ms=0.05, samples=5000, seed=1):
+        self.rtt_ms = rtt_ms
+        self.jitter = jitter
+        self.server_rtt_ms = server_rtt_ms
+        self.function_ms = function_ms
+        self.cache_hit = cache_hit
+        self.fill = fill
+        self.per_doc_ms = per_doc_ms
+        self.samples = samples
+        self.seed = seed
+
+
+class Model:
+    """Counts and latency samples for methods and sessions under one variant."""
+
+    def __init__(self, methods, params, composite_indexes):
+        self.methods = methods
+        self.params = params
+        self.composite_indexes = composite_indexes
+
+    def index_entries(self, collection, fields):
+        if fields == '*':
+            fields = SCHEMA.get(collection, [])
+        entries = sum(1 if field in ARRAY_FIELDS else 2 for field in fields)
+        entries += sum(1 for index in self.composite_indexes.get(collection, [])
+                       if index & set(fields))
+        return entries
+
+    def _query_reads(self, days):
+        return max(1, round(days * self.params.fill))
+
+    def counts(self, step, depth=0):
+        """Expected {reads, writes, deletes, index_entries, round_trips, invocations} of a step."""
+        if depth > 20:
+            raise ValueError('Method calls nest too deeply (recursive call?)')
+        totals = dict.fromkeys(('reads', 'writes', 'deletes', 'index_entries',
+                                'round_trips', 'invocations'), 0.0)
+
+        def add(other, weight=1.0):
+            for key, value in other.items():
+                totals[key] += value * weight
+
+        kind = step[0]
+        if kind == 'read':
+            add({'reads': 1, 'round_trips': 1})
+        elif kind == 'query':
+            add({'reads': self._query_reads(step[2]), 'round_trips': 1})
+        elif kind == 'commit':
+            add({'round_trips': 1})
+            for write in step[1]:
+                if write[0] == 'delete':
+                    add({'deletes': 1})
+                else:
+                    add({'writes': 1, 'index_entries': self.index_entries(write[1], write[2])})
+        elif kind == 'http':
+            add({'round_trips': 1, 'invocations': 1})
+            endpoint = ENDPOINTS[step[1]]
+            for branch, weight in (('hit', self.params.cache_hit), ('miss', 1 - self.params.cache_hit)):
+                for server_step in endpoint[branch]:
+                    server = self.counts(server_step)
+                    # Server round trips stay inside the data center; only count billing
+                    server['round_trips'] = 0
+                    add(server, weight)
+        elif kind == 'call':
+            for inner in self._method(step[1]):
+                add(self.counts(inner, depth + 1))
+        elif kind == 'parallel':
+            for inner in step[1:]:
+                add(self.counts(inner, depth + 1))
+        else:
+            raise ValueError(f"Unknown step kind: {kind}")
+        return totals
+
+    def _method(self, name):
+        if name not in self.methods:
+            raise ValueError(f"Unknown method: {name}")
+        return self.methods[name]
+
+    def latency(self, step, rng, depth=0):
+        """One sampled latency (ms) of a step."""
+        if depth > 20:
+            raise ValueError('Method calls nest too deeply (recursive call?)')
+        p = self.params
+        kind = step[0]
+        if kind in ('read', 'commit'):
+            return self._rtt(rng, p.rtt_ms)
+        if kind == 'query':
+            return self._rtt(rng, p.rtt_ms) + self._query_reads(step[2]) * p.per_doc_ms
+        if kind == 'http':
+            branch = 'hit' if rng.random() < p.cache_hit else 'miss'
+            server = sum(self._rtt(rng, p.server_rtt_ms) for _ in ENDPOINTS[step[1]][branch])
+            server += sum(self._query_reads(s[2]) * p.per_doc_ms
+                          for s in ENDPOINTS[step[1]][branch] if s[0] == 'query')
+            return self._rtt(rng, p.rtt_ms) + self._rtt(rng, p.function_ms) + server
+        if kind == 'call':
+            return sum(self.latency(inner, rng, depth + 1) for inner in self._method(step[1]))
+        if kind == 'parallel':
+            return max(self.latency(inner, rng, depth + 1) for inner in step[1:])
+        raise ValueError(f"Unknown step kind: {kind}")
+
+    def _rtt(self, rng, median):
+        return median * math.exp(rng.gauss(0, self.params.jitter)) if self.params.jitter else median
+
+    def session(self, name):
+        """(expected counts, sorted latency samples) of one session."""
+        steps = [['call', method] for method, repeat in SESSIONS[name] for _ in range(int(repeat))]
+        totals = {}
+        for step in steps:
+            for key, value in self.counts(step).items():
+                totals[key] = totals.get(key, 0.0) + value
+        rng = random.Random(self.params.seed)
+        samples = sorted(sum(self.latency(step, rng) for step in steps)
+                         for _ in range(self.params.samples))
+        return totals, samples
+
+
+def cost(counts):
+    return (counts['reads'] * PRICE_PER_READ + counts['writes'] * PRICE_PER_WRITE
+            + counts['deletes'] * PRICE_PER_DELETE + counts['invocations'] * PRICE_PER_INVOCATION)
+
+
+def percentile(sorted_values, fraction):
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def parse_mix(text):
+    mix = {}
+    for part in filter(None, (text or '').split(',')):
+        name, _, count = part.partition('=')
+        if name not in SESSIONS:
+            raise argparse.ArgumentTypeError(f"Unknown session {name!r} (known: {', '.join(SESSIONS)})")
+        mix[name] = float(count or 1)
+    return mix
+
+
+def evaluate(methods, params, composite_indexes, mix):
+    """{session: (counts, samples)} plus per-DAU daily counts for a variant."""
+    model = Model(methods, params, composite_indexes)
+    sessions = {name: model.session(name) for name in SESSIONS}
+    daily = {}
+    for name, per_day in mix.items():
+        for key, value in sessions[name][0].items():
+            daily[key] = daily.get(key, 0.0) + value * per_day
+    return model, sessions, daily
+
+
+def print_methods(model, names):
+    print(f"{'method':<32} {'reads':>6} {'writes':>6} {'idx':>5} {'trips':>6} {'fn':>4}")
+    for name in sorted(names):
+        counts = model.counts(['call', name])
+        print(f"{name:<32} {counts['reads']:>6.1f} {counts['writes']:>6.0f} "
+              f"{counts['index_entries']:>5.0f} {counts['round_trips']:>6.0f} {counts['invocations']:>4.0f}")
+    print()
+
+
+def print_sessions(sessions):
+    print(f"{'session':<22} {'reads':>6} {'writes':>6} {'idx':>5} {'trips':>6} "
+          f"{'p50':>8} {'p95':>8} {'$/1k':>8}")
+    for name, (counts, samples) in sessions.items():
+        print(f"{name:<22} {counts['reads']:>6.1f} {counts['writes']:>6.0f} "
+              f"{counts['index_entries']:>5.0f} {counts['round_trips']:>6.0f} "
+              f"{percentile(samples, 0.5):>6.0f}ms {percentile(samples, 0.95):>6.0f}ms "
+              f"{cost(counts) * 1000:>8.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--variant', action='append', default=[],
+                        help=f"Variant to compare with baseline ({', '.join(v for v in VARIANTS if v != 'baseline')})")
+    parser.add_argument('--variants-file', help='JSON {variant: {method: [steps]}} of proposed changes')
+    parser.add_argument('--rtt', type=float, default=80.0, help='Median client round trip (ms)')
+    parser.add_argument('--jitter', type=float, default=0.5, help='Log-normal sigma of round trips')
+    parser.add_argument('--server-rtt', type=float, default=8.0, help='Median function→Firestore round trip (ms)')
+    parser.add_argument('--function-ms', type=float, default=30.0, help='Median function overhead (ms)')
+    parser.add_argument('--cache-hit', type=float, default=0.5, help='Endpoint in-memory cache hit rate')
+    parser.add_argument('--fill', type=float, default=0.7, help='Fraction of days that have an entry')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help='Sessions per DAU per day, e.g. log_meal=3,dashboard_week_swipe=1')
+    parser.add_argument('--dau', type=int, default=1000, help='Daily active users for the monthly total')
+    parser.add_argument('--methods', action='store_true', help='Also print per-method counts')
+    parser.add_argument('--samples', type=int, default=5000, help='Latency samples per session')
+    args = parser.parse_args()
+
+    variants = {'baseline': {}}
+    for name in args.variant:
+        if name not in VARIANTS:
+            parser.error(f"Unknown variant {name!r} (known: {', '.join(VARIANTS)})")
+        variants[name] = VARIANTS[name]
+    if args.variants_file:
+        with open(args.variants_file, 'r') as f:
+            variants.update(json.load(f))
+
+    params = Params(args.rtt, args.jitter, args.server_rtt, args.function_ms,
+                    args.cache_hit, args.fill, samples=args.samples)
+    composite_indexes = load_composite_indexes()
+    print(f"📊 Firestore cost model (client RTT {args.rtt:.0f}ms, server RTT {args.server_rtt:.0f}ms, "
+          f"cache hit {args.cache_hit:.0%}, {len(composite_indexes.get('dailyEntries', []))} "
+          f"composite dailyEntries indexes)")
+    summary = []
+    for name, overrides in variants.items():
+        try:
+            model, sessions, daily = evaluate({**METHODS, **overrides}, params, composite_indexes, args.mix)
+        except (ValueError, KeyError) as e:
+            print(f"❌ Variant {name}: {e}")
+            return 1
+        print(f"\n=== {name} ===")
+        if args.methods:
+            # Variants only list the methods they change
+            print_methods(model, overrides or model.methods)
+        print_sessions(sessions)
+        summary.append((name, daily, sessions))
+
+    mix_text = ', '.join(f"{session}×{count:g}" for session, count in args.mix.items())
+    print(f"\n💰 Per DAU per day ({mix_text})")
+    print(f"{'variant':<26} {'reads':>7} {'writes':>7} {'idx':>6} {'trips':>6} "
+          f"{'$/DAU/mo':>10} {f'$/mo @{args.dau}':>12}")
+    for name, daily, _ in summary:
+        monthly = cost(daily) * 30
+        print(f"{name:<26} {daily['reads']:>7.1f} {daily['writes']:>7.1f} {daily['index_entries']:>6.0f} "
+              f"{daily['round_trips']:>6.0f} {monthly:>10.5f} {monthly * args.dau:>12.2f}")
+    if len(summary) > 1:
+        print("\n⏱️  p95 by session (ms)")
+        print(f"{'session':<22} " + ' '.join(f"{name[:14]:>14}" for name, _, _ in summary))
+        for session in SESSIONS:
+            print(f"{session:<22} " + ' '.join(
+                f"{percentile(sessions[session][1], 0.95):>14.0f}" for _, _, sessions in summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
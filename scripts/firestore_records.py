@@ -0,0 +1,994 @@
+#!/usr/bin/env python3
+"""
+Compact record types for the app's Firestore models.
+Python counterparts of DailyEntry, FoodEntry, ExerciseEntry, UserProfile,
+WeightLossGoal and CalorieReportData as __slots__ classes, decoded with the
+same lenient coercion as the Dart fromFirestore/fromMap factories: numbers
+stored as strings are parsed, wrong types fall back to the model default,
+unreadable timestamps become "now", a malformed foodEntries or
+exerciseEntries list decodes as empty, and a non-string uid or name makes the
+document unreadable (RecordError), as it throws in Dart.
+
+from_fields() reads a Firestore REST Value map directly, without building the
+intermediate dict of decode_fields(); from_dict() takes plain values such as
+an NDJSON export. DailyEntryColumns decodes a stream of REST documents into
+struct-of-arrays form (array.array columns, usable with numpy.frombuffer).
+
+  for doc_id, entry in client.run_query('dailyEntries', decode=DailyEntry.from_fields): ...
+  entries = decode_documents(client.list_documents('dailyEntries'))
+  columns = DailyEntryColumns().extend(client.list_documents('dailyEntries'))
+
+  python3 scripts/firestore_records.py verify      # decoders agree with each other and with Dart
+  python3 scripts/firestore_records.py benchmark   # decode time and memory vs plain dicts
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import math
+import random
+import re
+import sys
+import time
+import tracemalloc
+import urllib.parse
+from array import array
+
+from firestore_rest import decode_fields, document_id, encode_value, parse_timestamp
+
+UTC = datetime.timezone.utc
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+# double.tryParse / int.tryParse accept surrounding whitespace but not Python's
+# 'inf', 'nan' or digit separators
+_DART_DOUBLE = re.compile(r'[+-]?(?:NaN|Infinity|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)\Z')
+_DART_INT = re.compile(r'([+-]?)(?:0[xX]([0-9a-fA-F]+)|(\d+))\Z')
+
+
+class RecordError(ValueError):
+    """A document field has a type the Dart model rejects (its factory throws)."""
+
+
+def parse_double(text, default=None):
+    """Dart double.tryParse: the float in text, or default."""
+    text = text.strip()
+    if not _DART_DOUBLE.match(text):
+        return default
+    return float(text)
+
+
+def parse_int(text, default=None):
+    """Dart int.tryParse: a decimal or 0x-prefixed 64-bit integer, or default."""
+    match = _DART_INT.match(text.strip())
+    if not match:
+        return default
+    sign, hex_digits, digits = match.groups()
+    value = int(hex_digits, 16) if hex_digits else int(digits)
+    value = -value if sign == '-' else value
+    return value if INT64_MIN <= value <= INT64_MAX else default
+
+
+def parse_datetime(text):
+    """Dart DateTime.tryParse as an aware UTC datetime (no offset means UTC), or None."""
+    try:
+        value = datetime.datetime.fromisoformat(text.strip())
+    except ValueError:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
+
+
+def safe_to_double(value, default=None):
+    """Dart _safeToDouble: ints, doubles and numeric strings as float, else default."""
+    if isinstance(value, float):
+        return value
+    if isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        return parse_double(value, default)
+    return default
+
+
+def safe_to_int(value, default=0):
+    """Dart _safeToInt: ints, truncated doubles and integer strings, else default."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float):
+        return int(value) if math.isfinite(value) else default
+    if isinstance(value, str):
+        return parse_int(value, default)
+    return default
+
+
+def _utc_date(moment):
+    return moment.astimezone(UTC).date()
+
+
+class _PlainValues:
+    """Coercion of plain Python values (decoded documents, JSON exports)."""
+
+    double = staticmethod(safe_to_double)
+    integer = staticmethod(safe_to_int)
+
+    @staticmethod
+    def present(value):
+        return value is not None
+
+    @staticmethod
+    def string(value, default, field):
+        if value is None:
+            return default
+        if isinstance(value, str):
+            return value
+        raise RecordError(f"{field} is {type(value).__name__}, not a string")
+
+    @staticmethod
+    def boolean(value, default, field):
+        if value is None:
+            return default
+        if isinstance(value, bool):
+            return value
+        raise RecordError(f"{field} is {type(value).__name__}, not a bool")
+
+    @staticmethod
+    def timestamp(value, now):
+        """_safeToTimestamp: a Timestamp or date string, else now."""
+        if isinstance(value, datetime.datetime):
+            return value.replace(tzinfo=UTC) if value.tzinfo is None else value
+        if isinstance(value, dict):
+            # Timestamp as serialized by the Admin SDK in JSON exports
+            seconds = value.get('_seconds', value.get('seconds'))
+            if isinstance(seconds, (int, float)):
+                nanos = value.get('_nanoseconds', value.get('nanoseconds')) or 0
+                return datetime.datetime.fromtimestamp(seconds, UTC) + datetime.timedelta(
+                    microseconds=nanos // 1000)
+            return now
+        if isinstance(value, str):
+            return parse_datetime(value) or now
+        return now
+
+    @staticmethod
+    def date(value, now):
+        """DailyEntry's _safeTimestampToDate: the UTC calendar date of a timestamp."""
+        if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+            return value
+        return _utc_date(_PlainValues.timestamp(value, now))
+
+    @staticmethod
+    def maps(value):
+        """Items of a list of maps; [] when it is not a list or any item is not a map."""
+        if not isinstance(value, list) or not all(isinstance(item, dict) for item in value):
+            return []
+        return value
+
+
+_DAY_CACHE = {}
+_NO_FIELDS = {}
+
+
+class _RestValues:
+    """Coercion read straight from Firestore REST Value objects ({'doubleValue': 1.5})."""
+
+    @staticmethod
+    def present(value):
+        return value is not None and 'nullValue' not in value
+
+    @staticmethod
+    def double(value, default=None):
+        if value is None:
+            return default
+        if 'doubleValue' in value:
+            # NaN and the infinities arrive as strings in the JSON mapping
+            return float(value['doubleValue'])
+        if 'integerValue' in value:
+            return float(int(value['integerValue']))
+        if 'stringValue' in value:
+            return parse_double(value['stringValue'], default)
+        return default
+
+    @staticmethod
+    def integer(value, default=0):
+        if value is None:
+            return default
+        if 'integerValue' in value:
+            return int(value['integerValue'])
+        if 'doubleValue' in value:
+            number = float(value['doubleValue'])
+            return int(number) if math.isfinite(number) else default
+        if 'stringValue' in value:
+            return parse_int(value['stringValue'], default)
+        return default
+
+    @staticmethod
+    def string(value, default, field):
+        if value is None:
+            return default
+        if 'stringValue' in value:
+            return value['stringValue']
+        if 'nullValue' in value:
+            return default
+        raise RecordError(f"{field} is {next(iter(value), 'empty')}, not a string")
+
+    @staticmethod
+    def boolean(value, default, field):
+        if value is None or 'nullValue' in value:
+            return default
+        if 'booleanValue' in value:
+            return value['booleanValue']
+        raise RecordError(f"{field} is {next(iter(value), 'empty')}, not a bool")
+
+    @staticmethod
+    def timestamp(value, now):
+        if value is None:
+            return now
+        if 'timestampValue' in value:
+            return parse_timestamp(value['timestampValue'])
+        if 'stringValue' in value:
+            return parse_datetime(value['stringValue']) or now
+        return now
+
+    @staticmethod
+    def date(value, now):
+        if value is not None and 'timestampValue' in value:
+            text = value['timestampValue']
+            # The REST API always answers in UTC ('Z'), so the first ten
+            # characters are the calendar date; days repeat, share the object
+            day = _DAY_CACHE.get(text[:10]) if text[-1] == 'Z' else None
+            if day is None:
+                day = _utc_date(parse_timestamp(text))
+                if text[-1] == 'Z' and len(_DAY_CACHE) < 100_000:
+                    _DAY_CACHE[text[:10]] = day
+            return day
+        return _utc_date(_RestValues.timestamp(value, now))
+
+    @staticmethod
+    def maps(value):
+        if value is None or 'arrayValue' not in value:
+            return []
+        maps = []
+        for item in value['arrayValue'].get('values', ()):
+            if 'mapValue' not in item:
+                return []
+            maps.append(item['mapValue'].get('fields', _NO_FIELDS))
+        return maps
+
+
+def _now(now):
+    return now if now is not None else datetime.datetime.now(UTC)
+
+
+def _plain(value):
+    if isinstance(value, _Record):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
+
+
+class _Record:
+    """Shared equality, repr and dict export driven by __slots__ and FIELDS."""
+
+    __slots__ = ()
+    FIELDS = ()  # Firestore field name of each slot, in __slots__ order
+
+    def __eq__(self, other):
+        return type(other) is type(self) and all(
+            getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        values = ', '.join(f"{slot}={getattr(self, slot)!r}" for slot in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+    def to_dict(self):
+        """The document as Firestore field names with plain values (what calorie_reports expects)."""
+        return {field: _plain(getattr(self, slot)) for slot, field in zip(self.__slots__, self.FIELDS)}
+
+    @classmethod
+    def from_fields(cls, fields, doc_id='', now=None):
+        """Decode a REST document's fields map."""
+        return cls._decode(fields.get, _RestValues, doc_id, now)
+
+    @classmethod
+    def from_dict(cls, data, doc_id='', now=None):
+        """Decode already-plain values, e.g. a decode_fields() dict or a JSON export."""
+        return cls._decode(data.get, _PlainValues, doc_id, now)
+
+
+class FoodEntry(_Record):
+    __slots__ = ('name', 'calories', 'description', 'meal_type')
+    FIELDS = ('name', 'calories', 'description', 'mealType')
+
+    def __init__(self, name, calories, description=None, meal_type=None):
+        self.name = name
+        self.calories = calories
+        self.description = description
+        self.meal_type = meal_type
+
+    @classmethod
+    def _decode(cls, get, values, doc_id=None, now=None):
+        return cls(values.string(get('name'), '', 'name'),
+                   values.double(get('calories'), 0.0),
+                   values.string(get('description'), None, 'description'),
+                   values.string(get('mealType'), None, 'mealType'))
+
+
+class ExerciseEntry(_Record):
+    __slots__ = ('name', 'calories_burned', 'duration_minutes', 'description')
+    FIELDS = ('name', 'caloriesBurned', 'durationMinutes', 'description')
+
+    def __init__(self, name, calories_burned, duration_minutes, description=None):
+        self.name = name
+        self.calories_burned = calories_burned
+        self.duration_minutes = duration_minutes
+        self.description = description
+
+    @classmethod
+    def _decode(cls, get, values, doc_id=None, now=None):
+        return cls(values.string(get('name'), '', 'name'),
+                   values.double(get('caloriesBurned'), 0.0),
+                   values.integer(get('durationMinutes'), 0),
+                   values.string(get('description'), None, 'description'))
+
+
+def _entries(record, value, values):
+    """_safeFoodEntries/_safeExerciseEntries: any unreadable item empties the list."""
+    try:
+        return [record._decode(item.get, values) for item in values.maps(value)]
+    except RecordError:
+        return []
+
+
+class DailyEntry(_Record):
+    """A dailyEntries document. As in the Dart model, every timestamp decodes to its UTC date."""
+
+    __slots__ = ('id', 'uid', 'date', 'weight', 'glasses', 'food_entries', 'exercise_entries',
+                 'created_at', 'updated_at')
+    FIELDS = ('id', 'uid', 'date', 'weight', 'glasses', 'foodEntries', 'exerciseEntries',
+              'createdAt', 'updatedAt')
+
+    def __init__(self, id, uid, date, weight, glasses, food_entries, exercise_entries,
+                 created_at, updated_at):
+        self.id = id
+        self.uid = uid
+        self.date = date
+        self.weight = weight
+        self.glasses = glasses
+        self.food_entries = food_entries
+        self.exercise_entries = exercise_entries
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @property
+    def total_calories_consumed(self):
+        return sum(food.calories for food in self.food_entries)
+
+    @property
+    def total_calories_burned(self):
+        return sum(exercise.calories_burned for exercise in self.exercise_entries)
+
+    @classmethod
+    def from_document(cls, document, now=None):
+        """Decode a REST document resource (name, fields)."""
+        return cls.from_fields(document.get('fields', {}),
+                               urllib.parse.unquote(document_id(document['name'])), now)
+
+    @classmethod
+    def _decode(cls, get, values, doc_id, now):
+        now = _now(now)
+        return cls(doc_id,
+                   values.string(get('uid'), '', 'uid'),
+                   values.date(get('date'), now),
+                   values.double(get('weight')),
+                   values.double(get('glasses')),
+                   _entries(FoodEntry, get('foodEntries'), values),
+                   _entries(ExerciseEntry, get('exerciseEntries'), values),
+                   values.date(get('createdAt'), now),
+                   values.date(get('updatedAt'), now))
+
+
+class UserProfile(_Record):
+    __slots__ = ('uid', 'email', 'display_name', 'photo_url', 'date_of_birth', 'height', 'weight',
+                 'gender', 'created_at', 'updated_at')
+    FIELDS = ('uid', 'email', 'displayName', 'photoURL', 'dateOfBirth', 'height', 'weight',
+              'gender', 'createdAt', 'updatedAt')
+
+    def __init__(self, uid, email, display_name, photo_url, date_of_birth, height, weight, gender,
+                 created_at, updated_at):
+        self.uid = uid
+        self.email = email
+        self.display_name = display_name
+        self.photo_url = photo_url
+        self.date_of_birth = date_of_birth
+        self.height = height
+        self.weight = weight
+        self.gender = gender
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    def age(self, as_of=None):
+        as_of = as_of or datetime.date.today()
+        born = self.date_of_birth
+        return as_of.year - born.year - ((as_of.month, as_of.day) < (born.month, born.day))
+
+    @classmethod
+    def _decode(cls, get, values, doc_id, now):
+        now = _now(now)
+        return cls(values.string(get('uid'), '', 'uid'),
+                   values.string(get('email'), '', 'email'),
+                   values.string(get('displayName'), None, 'displayName'),
+                   values.string(get('photoURL'), None, 'photoURL'),
+                   values.timestamp(get('dateOfBirth'), now),
+                   values.double(get('height'), 0.0),
+                   values.double(get('weight'), 70.0),
+                   values.string(get('gender'), 'male', 'gender'),
+                   values.timestamp(get('createdAt'), now),
+                   values.timestamp(get('updatedAt'), now))
+
+
+class WeightLossGoal(_Record):
+    __slots__ = ('uid', 'weight_loss_per_week', 'target_weight', 'current_weight', 'start_date',
+                 'target_date', 'is_active', 'created_at', 'updated_at')
+    FIELDS = ('uid', 'weightLossPerWeek', 'targetWeight', 'currentWeight', 'startDate',
+              'targetDate', 'isActive', 'createdAt', 'updatedAt')
+
+    def __init__(self, uid, weight_loss_per_week, target_weight, current_weight, start_date,
+                 target_date, is_active, created_at, updated_at):
+        self.uid = uid
+        self.weight_loss_per_week = weight_loss_per_week
+        self.target_weight = target_weight
+        self.current_weight = current_weight
+        self.start_date = start_date
+        self.target_date = target_date
+        self.is_active = is_active
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @property
+    def daily_calorie_deficit(self):
+        return self.weight_loss_per_week * 3500 / 7
+
+    def target_daily_calories(self, bmr):
+        return bmr - self.daily_calorie_deficit
+
+    @classmethod
+    def _decode(cls, get, values, doc_id, now):
+        now = _now(now)
+        target_date = get('targetDate')
+        return cls(values.string(get('uid'), '', 'uid'),
+                   values.double(get('weightLossPerWeek'), 1.0),
+                   values.double(get('targetWeight'), 150.0),
+                   values.double(get('currentWeight'), 170.0),
+                   values.timestamp(get('startDate'), now),
+                   values.timestamp(target_date, now) if values.present(target_date) else None,
+                   values.boolean(get('isActive'), True, 'isActive'),
+                   values.timestamp(get('createdAt'), now),
+                   values.timestamp(get('updatedAt'), now))
+
+
+class CalorieReportData(_Record):
+    """One report row. Its date is required (DateTime.parse throws), the numbers default to 0."""
+
+    __slots__ = ('date', 'net_calorie_deficit', 'bmr', 'calories_consumed', 'calories_burned',
+                 'weight', 'glasses')
+    FIELDS = ('date', 'netCalorieDeficit', 'bmr', 'caloriesConsumed', 'caloriesBurned',
+              'weight', 'glasses')
+
+    def __init__(self, date, net_calorie_deficit, bmr, calories_consumed, calories_burned,
+                 weight=None, glasses=None):
+        self.date = date
+        self.net_calorie_deficit = net_calorie_deficit
+        self.bmr = bmr
+        self.calories_consumed = calories_consumed
+        self.calories_burned = calories_burned
+        self.weight = weight
+        self.glasses = glasses
+
+    def to_dict(self):
+        row = super().to_dict()
+        row['date'] = f"{self.date.isoformat()}T00:00:00.000Z"
+        return row
+
+    @classmethod
+    def _decode(cls, get, values, doc_id, now):
+        date = values.string(get('date'), None, 'date')
+        moment = parse_datetime(date) if date is not None else None
+        if moment is None:
+            raise RecordError(f"date {date!r} is not a date")
+        weight, glasses = get('weight'), get('glasses')
+        return cls(moment.date(),
+                   values.double(get('netCalorieDeficit'), 0.0),
+                   values.double(get('bmr'), 0.0),
+                   values.double(get('caloriesConsumed'), 0.0),
+                   values.double(get('caloriesBurned'), 0.0),
+                   values.double(weight, 0.0) if values.present(weight) else None,
+                   values.double(glasses, 0.0) if values.present(glasses) else None)
+
+
+def decode_documents(documents, record=DailyEntry, now=None):
+    """Records for many REST document resources (RecordError propagates).
+
+    Records never form reference cycles, so cyclic GC is paused meanwhile:
+    CPython untracks dicts holding only atoms but not __slots__ objects, and
+    the collections triggered by millions of new records would otherwise
+    cost more than decoding them.
+    """
+    now = _now(now)
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        if record is DailyEntry:
+            return [DailyEntry.from_document(document, now) for document in documents]
+        return [record.from_fields(document.get('fields', _NO_FIELDS), '', now) for document in documents]
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class DailyEntryColumns:
+    """Struct-of-arrays DailyEntry batch decoded straight from REST documents.
+
+    One row per document: uid_index into uids, dates as epoch days, weight and
+    glasses with has_weight/has_glasses flags (NaN is a storable value). Food and exercise items are flattened, with
+    row i owning items food_start[i]:food_start[i + 1]. Names, meal types and
+    uids are interned. Documents a DailyEntry factory would reject are
+    counted in rejected instead of raising.
+    """
+
+    def __init__(self, now=None):
+        self.now = _now(now)
+        self.ids = []
+        self.uids = []
+        self.strings = []
+        self._interned = {None: -1}
+        self._uid_rows = {}
+        self._days = {}
+        self.uid_index = array('i')
+        self.day = array('i')
+        self.created_day = array('i')
+        self.updated_day = array('i')
+        self.weight = array('d')
+        self.glasses = array('d')
+        self.has_weight = array('b')
+        self.has_glasses = array('b')
+        self.food_start = array('q', [0])
+        self.food_name = array('i')
+        self.food_meal = array('i')  # -1 when absent
+        self.food_calories = array('d')
+        self.exercise_start = array('q', [0])
+        self.exercise_name = array('i')
+        self.exercise_calories = array('d')
+        self.exercise_minutes = array('q')
+        self.descriptions = {}  # ('food' | 'exercise', item) -> description; rarely set
+        self.rejected = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _intern(self, text):
+        index = self._interned.get(text)
+        if index is None:
+            index = self._interned[text] = len(self.strings)
+            self.strings.append(text)
+        return index
+
+    def _epoch_day(self, value):
+        if value is not None and 'timestampValue' in value:
+            text = value['timestampValue']
+            day = self._days.get(text[:10]) if text[-1] == 'Z' else None
+            if day is None:
+                day = _RestValues.date(value, self.now).toordinal() - EPOCH_ORDINAL
+                if text[-1] == 'Z':
+                    self._days[text[:10]] = day
+            return day
+        return _RestValues.date(value, self.now).toordinal() - EPOCH_ORDINAL
+
+    def _items(self, value, number_field, extra_field, extra):
+        """Column lists (names, numbers, extras, descriptions) of one food or exercise list.
+
+        All empty when any item is unreadable, like _safeFoodEntries.
+        """
+        names, numbers, extras, descriptions = [], [], [], []
+        string, double, intern = _RestValues.string, _RestValues.double, self._intern
+        try:
+            for fields in _RestValues.maps(value):
+                get = fields.get
+                names.append(intern(string(get('name'), '', 'name')))
+                numbers.append(double(get(number_field), 0.0))
+                extras.append(extra(get(extra_field)))
+                descriptions.append(string(get('description'), None, 'description'))
+        except RecordError:
+            return [], [], [], []
+        return names, numbers, extras, descriptions
+
+    def _meal(self, value):
+        return self._intern(_RestValues.string(value, None, 'mealType'))
+
+    def add_document(self, document):
+        """Append one REST document resource; returns False if it was rejected."""
+        get = document.get('fields', _NO_FIELDS).get
+        try:
+            uid = _RestValues.string(get('uid'), '', 'uid')
+        except RecordError:
+            self.rejected.append(document.get('name'))
+            return False
+        foods = self._items(get('foodEntries'), 'calories', 'mealType', self._meal)
+        exercises = self._items(get('exerciseEntries'), 'caloriesBurned', 'durationMinutes',
+                                _RestValues.integer)
+
+        row = self._uid_rows.get(uid)
+        if row is None:
+            row = self._uid_rows[uid] = len(self.uids)
+            self.uids.append(uid)
+        self.ids.append(urllib.parse.unquote(document_id(document['name'])))
+        self.uid_index.append(row)
+        self.day.append(self._epoch_day(get('date')))
+        self.created_day.append(self._epoch_day(get('createdAt')))
+        self.updated_day.append(self._epoch_day(get('updatedAt')))
+        weight, glasses = _RestValues.double(get('weight')), _RestValues.double(get('glasses'))
+        self.has_weight.append(weight is not None)
+        self.weight.append(math.nan if weight is None else weight)
+        self.has_glasses.append(glasses is not None)
+        self.glasses.append(math.nan if glasses is None else glasses)
+        for (names, numbers, extras, descriptions), kind, name_column, number_column, extra_column, starts in (
+                (foods, 'food', self.food_name, self.food_calories, self.food_meal, self.food_start),
+                (exercises, 'exercise', self.exercise_name, self.exercise_calories,
+                 self.exercise_minutes, self.exercise_start)):
+            if names:
+                offset = len(name_column)
+                for i, description in enumerate(descriptions):
+                    if description is not None:
+                        self.descriptions[kind, offset + i] = description
+                name_column.extend(names)
+                number_column.extend(numbers)
+                extra_column.extend(extras)
+            starts.append(len(name_column))
+        return True
+
+    def extend(self, documents):
+        for document in documents:
+            self.add_document(document)
+        return self
+
+    def totals(self):
+        """(calories consumed, calories burned) per row as float arrays."""
+        consumed, burned = array('d'), array('d')
+        for values, starts, out in ((self.food_calories, self.food_start, consumed),
+                                    (self.exercise_calories, self.exercise_start, burned)):
+            for i in range(len(self.ids)):
+                out.append(sum(values[starts[i]:starts[i + 1]]))
+        return consumed, burned
+
+    def row(self, i):
+        """Row i as a DailyEntry record."""
+        def day(epoch_day):
+            return datetime.date.fromordinal(epoch_day + EPOCH_ORDINAL)
+
+        strings, descriptions = self.strings, self.descriptions
+        foods = [FoodEntry(strings[self.food_name[j]], self.food_calories[j],
+                           descriptions.get(('food', j)),
+                           None if self.food_meal[j] < 0 else strings[self.food_meal[j]])
+                 for j in range(self.food_start[i], self.food_start[i + 1])]
+        exercises = [ExerciseEntry(strings[self.exercise_name[j]], self.exercise_calories[j],
+                                   self.exercise_minutes[j], descriptions.get(('exercise', j)))
+                     for j in range(self.exercise_start[i], self.exercise_start[i + 1])]
+        return DailyEntry(self.ids[i], self.uids[self.uid_index[i]], day(self.day[i]),
+                          self.weight[i] if self.has_weight[i] else None,
+                          self.glasses[i] if self.has_glasses[i] else None, foods, exercises,
+                          day(self.created_day[i]), day(self.updated_day[i]))
+
+    def nbytes(self):
+        """Approximate bytes held by the column buffers (strings excluded)."""
+        return sum(column.itemsize * len(column) for column in vars(self).values()
+                   if isinstance(column, array))
+
+
+# --- verification and benchmark -------------------------------------------------
+
+# (value, Dart _safeToDouble result with a null default, _safeToInt result with a 0 default)
+COERCION_CASES = [
+    (None, None, 0), (True, None, 0), (3, 3.0, 3), (2.9, 2.9, 2), (-2.9, -2.9, -2),
+    ('12.5', 12.5, 0), (' 7 ', 7.0, 7), ('0x1F', None, 31), ('1e3', 1000.0, 0), ('.5', 0.5, 0),
+    ('Infinity', math.inf, 0), ('inf', None, 0), ('1_000', None, 0), ('abc', None, 0),
+    ('', None, 0), ('-4', -4.0, -4), ('9223372036854775808', 9.223372036854776e18, 0),
+    ([1], None, 0), ({'a': 1}, None, 0),
+]
+
+
+def _messy_value(rng, kind):
+    """A random field value as the app, old app versions or hand edits may have stored it."""
+    roll = rng.random()
+    if roll < 0.55:
+        return round(rng.uniform(50, 900), 1) if kind == 'double' else rng.randint(5, 90)
+    if roll < 0.7:
+        return rng.randint(50, 900)
+    if roll < 0.8:
+        return rng.choice(['250', ' 12.5 ', '1e2', 'abc', '', '0x10', 'NaN', '3.9'])
+    if roll < 0.9:
+        return None
+    return rng.choice([True, [1, 2], {'x': 1}, 2.5])
+
+
+def _messy_timestamp(rng, base):
+    roll = rng.random()
+    moment = base + datetime.timedelta(days=rng.randint(0, 400), seconds=rng.randint(0, 86399))
+    if roll < 0.75:
+        return moment
+    if roll < 0.85:
+        return moment.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+    if roll < 0.9:
+        return moment.strftime('%Y-%m-%d')
+    return rng.choice([None, 'not a date', 12345])
+
+
+def _messy_items(rng, number_field, extra_field):
+    roll = rng.random()
+    if roll < 0.05:
+        return rng.choice([None, 'x', {'name': 'a'}, [1, {'name': 'a'}]])
+    items = []
+    for _ in range(rng.randint(0, 5)):
+        item = {'name': rng.choice(['oats', 'apple', 'run', 'tea', None]),
+                number_field: _messy_value(rng, 'double')}
+        if extra_field == 'durationMinutes':
+            item[extra_field] = _messy_value(rng, 'int')
+        elif rng.random() < 0.8:
+            item[extra_field] = rng.choice(['breakfast', 'lunch', 'dinner', 'snacks', None])
+        if rng.random() < 0.1:
+            item['description'] = rng.choice(['homemade', None, 5])
+        if rng.random() < 0.02:
+            item['name'] = 42
+        items.append(item)
+    return items
+
+
+def _messy_daily_entry(rng, index, base):
+    data = {
+        'uid': f"user{rng.randint(0, 200)}" if rng.random() > 0.01 else 7,
+        'date': _messy_timestamp(rng, base),
+        'weight': _messy_value(rng, 'double'),
+        'glasses': _messy_value(rng, 'double'),
+        'foodEntries': _messy_items(rng, 'calories', 'mealType'),
+        'exerciseEntries': _messy_items(rng, 'caloriesBurned', 'durationMinutes'),
+        'createdAt': _messy_timestamp(rng, base),
+        'updatedAt': _messy_timestamp(rng, base),
+    }
+    if rng.random() < 0.1:
+        del data[rng.choice(list(data))]
+    return f"entry{index}", data
+
+
+def _messy_other(rng, base):
+    """A messy users, weightLossGoals or report row document, with its record type."""
+    def text(*choices):
+        return rng.choice(choices + (None, 3))
+
+    kind = rng.randrange(3)
+    if kind == 0:
+        data = {'uid': text('u1', 'u2'), 'email': text('a@b.c'), 'displayName': text('Ann'),
+                'photoURL': text('https://x/p.png'), 'dateOfBirth': _messy_timestamp(rng, base),
+                'height': _messy_value(rng, 'double'), 'weight': _messy_value(rng, 'double'),
+                'gender': text('male', 'female'), 'createdAt': _messy_timestamp(rng, base),
+                'updatedAt': _messy_timestamp(rng, base)}
+        record = UserProfile
+    elif kind == 1:
+        data = {'uid': text('u1'), 'weightLossPerWeek': _messy_value(rng, 'double'),
+                'targetWeight': _messy_value(rng, 'double'), 'currentWeight': _messy_value(rng, 'double'),
+                'startDate': _messy_timestamp(rng, base), 'targetDate': _messy_timestamp(rng, base),
+                'isActive': rng.choice([True, False, None, 'yes']),
+                'createdAt': _messy_timestamp(rng, base), 'updatedAt': _messy_timestamp(rng, base)}
+        record = WeightLossGoal
+    else:
+        data = {'date': text('2025-03-01T00:00:00.000Z', '2025-03-02', 'soon'),
+                **{field: _messy_value(rng, 'double') for field in CalorieReportData.FIELDS[1:]}}
+        record = CalorieReportData
+    if rng.random() < 0.2:
+        del data[rng.choice(list(data))]
+    return record, data
+
+
+def _decode_all(record, data, fields, now):
+    """from_dict, from_fields and from_dict(decode_fields) results, None where they raise."""
+    results = []
+    for decode, source in ((record.from_dict, data), (record.from_fields, fields),
+                           (record.from_dict, decode_fields(fields))):
+        try:
+            results.append(decode(source, '', now))
+        except RecordError:
+            results.append(None)
+    return results
+
+
+def _rest_document(doc_id, data):
+    fields = {}
+    for key, value in data.items():
+        if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+            value = value.isoformat()
+        fields[key] = encode_value(value)
+    return {'name': f"projects/p/databases/(default)/documents/dailyEntries/{doc_id}", 'fields': fields}
+
+
+def _same(a, b):
+    """Record equality where NaN equals NaN."""
+    if isinstance(a, float) and isinstance(b, float):
+        return a == b or (math.isnan(a) and math.isnan(b))
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, _Record) and type(a) is type(b):
+        return all(_same(getattr(a, slot), getattr(b, slot)) for slot in a.__slots__)
+    return a == b
+
+
+def run_verify(count, seed):
+    print(f"📊 Verifying record decoders on {count:,} messy documents")
+    print("=" * 60)
+    failures = 0
+    for value, as_double, as_int in COERCION_CASES:
+        got_double, got_int = safe_to_double(value), safe_to_int(value)
+        rest = encode_value(value) if not isinstance(value, (list, dict)) else {'arrayValue': {}}
+        checks = [(got_double, as_double), (got_int, as_int),
+                  (_RestValues.double(rest), as_double), (_RestValues.integer(rest), as_int)]
+        if not all(_same(got, want) for got, want in checks):
+            failures += 1
+            print(f"❌ coercion of {value!r}: {[got for got, _ in checks]} != {as_double!r}, {as_int!r}")
+
+    rng = random.Random(seed)
+    now = datetime.datetime(2025, 6, 1, 12, tzinfo=UTC)
+    base = datetime.datetime(2024, 1, 1, tzinfo=UTC)
+    columns = DailyEntryColumns(now=now)
+    rejected = 0
+    for index in range(count):
+        doc_id, data = _messy_daily_entry(rng, index, base)
+        document = _rest_document(doc_id, data)
+        try:
+            plain = DailyEntry.from_dict(data, doc_id, now)
+        except RecordError:
+            plain = None
+        try:
+            rest = DailyEntry.from_document(document, now)
+        except RecordError:
+            rest = None
+        from_decoded = None
+        try:
+            from_decoded = DailyEntry.from_dict(decode_fields(document['fields']), doc_id, now)
+        except RecordError:
+            pass
+        accepted = columns.add_document(document)
+        if plain is None:
+            rejected += 1
+        mismatch = not (_same(plain, rest) and _same(plain, from_decoded) and accepted == (plain is not None))
+        if not mismatch and accepted:
+            mismatch = not _same(plain, columns.row(len(columns) - 1))
+        if mismatch:
+            failures += 1
+            if failures <= 5:
+                print(f"❌ {doc_id}: {data}\n   plain {plain}\n   rest  {rest}")
+
+    for _ in range(count // 4):
+        record, data = _messy_other(rng, base)
+        results = _decode_all(record, data, _rest_document('x', data)['fields'], now)
+        if not all(_same(results[0], other) for other in results[1:]):
+            failures += 1
+            if failures <= 5:
+                print(f"❌ {record.__name__} {data}\n   {results}")
+
+    consumed, burned = columns.totals()
+    for i in range(len(columns)):
+        row = columns.row(i)
+        for total, expected in ((consumed[i], row.total_calories_consumed),
+                                (burned[i], row.total_calories_burned)):
+            if not (_same(total, expected) or math.isclose(total, expected)):
+                failures += 1
+                print(f"❌ row {i} totals {total} != {expected}")
+
+    print(f"ℹ️  {len(COERCION_CASES)} coercion cases, {count:,} daily entries ({rejected:,} rejected "
+          f"like Dart), {count // 4:,} profiles, goals and report rows")
+    if failures:
+        print(f"❌ {failures} mismatches")
+        return 1
+    print("✅ REST, plain and columnar decoders agree")
+    return 0
+
+
+def _benchmark_texts(distinct, seed):
+    """Distinct REST document JSON texts shaped like production dailyEntries."""
+    rng = random.Random(seed)
+    base = datetime.datetime(2024, 1, 1, tzinfo=UTC)
+    foods = ['oatmeal', 'banana', 'chicken salad', 'rice', 'coffee', 'yogurt', 'apple', 'pasta']
+    texts = []
+    for index in range(distinct):
+        day = base + datetime.timedelta(days=rng.randint(0, 365))
+        data = {
+            'uid': f"user{rng.randint(0, distinct // 5)}",
+            'date': day,
+            'weight': round(rng.uniform(120, 260), 1) if rng.random() < 0.4 else None,
+            'glasses': float(rng.randint(0, 10)),
+            'foodEntries': [{'name': rng.choice(foods), 'calories': rng.randint(50, 800),
+                             'description': None, 'mealType': rng.choice(['breakfast', 'lunch', 'dinner', 'snacks'])}
+                            for _ in range(rng.randint(1, 6))],
+            'exerciseEntries': [{'name': 'walking', 'caloriesBurned': float(rng.randint(50, 500)),
+                                 'durationMinutes': rng.randint(10, 90), 'description': None}
+                                for _ in range(rng.randint(0, 2))],
+            'createdAt': day + datetime.timedelta(hours=20),
+            'updatedAt': day + datetime.timedelta(hours=21),
+        }
+        texts.append(json.dumps(_rest_document(f"entry{index}", data)))
+    return texts
+
+
+def _decode_dicts(documents):
+    return [(urllib.parse.unquote(document_id(d['name'])), decode_fields(d.get('fields', {})))
+            for d in documents]
+
+
+def _decode_dicts_coerced(documents):
+    now = _now(None)
+    return [DailyEntry.from_dict(decode_fields(d.get('fields', {})), document_id(d['name']), now)
+            for d in documents]
+
+
+def _decode_records(documents):
+    return decode_documents(documents)
+
+
+def _decode_columns(documents):
+    return DailyEntryColumns().extend(documents)
+
+
+def run_benchmark(count, sample):
+    print(f"📊 Decoding {count:,} dailyEntries REST documents (memory from a {sample:,} sample, per 1M)")
+    print("=" * 60)
+    texts = _benchmark_texts(min(count, 20_000), seed=11)
+    documents = [json.loads(texts[i % len(texts)]) for i in range(count)]
+    rows = []
+    for label, decode in (('plain dicts (decode_fields)', _decode_dicts),
+                          ('decode_fields + from_dict', _decode_dicts_coerced),
+                          ('__slots__ records', _decode_records),
+                          ('struct-of-arrays columns', _decode_columns)):
+        gc.collect()
+        start = time.perf_counter()
+        result = decode(documents)
+        elapsed = time.perf_counter() - start
+        del result
+        gc.collect()
+        # Fresh parses so the decoded values do not share strings with the source documents
+        source = [json.loads(texts[i % len(texts)]) for i in range(sample)]
+        tracemalloc.start()
+        result = decode(source)
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del result, source
+        rows.append((label, elapsed, retained * 1_000_000 / sample))
+    baseline_time, baseline_memory = rows[0][1], rows[0][2]
+    for label, elapsed, memory in rows:
+        print(f"{label:30} {elapsed:7.2f}s  {count / elapsed:>9,.0f} docs/s  "
+              f"{memory / 1024 ** 2:8,.0f} MB per 1M  "
+              f"({baseline_time / elapsed:.1f}× speed, {baseline_memory / memory:.1f}× smaller)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    verify = sub.add_parser('verify', help='Check the decoders against each other and Dart coercion')
+    verify.add_argument('--docs', type=int, default=20_000)
+    verify.add_argument('--seed', type=int, default=1)
+
+    bench = sub.add_parser('benchmark', help='Measure decode time and memory against plain dicts')
+    bench.add_argument('--docs', type=int, default=200_000)
+    bench.add_argument('--sample', type=int, default=50_000,
+                       help='Documents traced for memory, scaled to 1M')
+
+    args = parser.parse_args()
+
+    if args.command == 'verify':
+        return run_verify(args.docs, args.seed)
+    return run_benchmark(args.docs, min(args.sample, args.docs))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
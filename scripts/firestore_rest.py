@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Minimal Firestore REST client for Python tooling.
+Uses only the standard library. When FIRESTORE_EMULATOR_HOST is set all calls
+go to the local emulator with owner credentials; otherwise an OAuth access
+token is read from FIRESTORE_ACCESS_TOKEN.
+"""
+
+import base64
+import datetime
+import json
+import os
+import random
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+DEFAULT_PROJECT = 'fitness-tracker-p2025'
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+# google.rpc.Code of a failed batchWrite entry -> the HTTP status it corresponds to
+GRPC_STATUSES = {4: 504, 8: 429, 10: 409, 13: 500, 14: 503}
+
+
+class FirestoreError(Exception):
+    """A failed Firestore REST call."""
+
+    def __init__(self, status, message):
+        super().__init__(f"Firestore HTTP {status}: {message}")
+        self.status = status
+
+    @property
+    def retryable(self):
+        return self.status in RETRYABLE_STATUSES or self.status == 0
+
+
+class Reference(str):
+    """A full document name to encode as a referenceValue, e.g. for __name__ filters."""
+
+
+def encode_value(value):
+    """Convert a Python value into a Firestore REST Value."""
+    if value is None:
+        return {'nullValue': None}
+    if isinstance(value, Reference):
+        return {'referenceValue': str(value)}
+    if isinstance(value, bool):
+        return {'booleanValue': value}
+    if isinstance(value, int):
+        return {'integerValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    if isinstance(value, str):
+        return {'stringValue': value}
+    if isinstance(value, bytes):
+        return {'bytesValue': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        stamp = value.astimezone(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+        return {'timestampValue': stamp}
+    if isinstance(value, dict):
+        return {'mapValue': {'fields': {k: encode_value(v) for k, v in value.items()}}}
+    if isinstance(value, (list, tuple)):
+        return {'arrayValue': {'values': [encode_value(v) for v in value]}}
+    raise TypeError(f"Cannot encode {type(value).__name__} for Firestore")
+
+
+def parse_timestamp(text):
+    """Parse an RFC 3339 Firestore timestamp (nanosecond precision allowed)."""
+    text = text.rstrip('Z')
+    if '.' in text:
+        head, fraction = text.split('.', 1)
+        text = f"{head}.{fraction[:6]}"
+    return datetime.datetime.fromisoformat(text).replace(tzinfo=datetime.timezone.utc)
+
+
+def decode_value(value):
+    """Convert a Firestore REST Value into a plain Python value."""
+    if 'stringValue' in value:
+        return value['stringValue']
+    if 'integerValue' in value:
+        return int(value['integerValue'])
+    if 'doubleValue' in value:
+        return float(value['doubleValue'])
+    if 'booleanValue' in value:
+        return value['booleanValue']
+    if 'timestampValue' in value:
+        return parse_timestamp(value['timestampValue'])
+    if 'mapValue' in value:
+        return decode_fields(value['mapValue'].get('fields', {}))
+    if 'arrayValue' in value:
+        return [decode_value(v) for v in value['arrayValue'].get('values', [])]
+    if 'bytesValue' in value:
+        return base64.b64decode(value['bytesValue'])
+    if 'referenceValue' in value:
+        return value['referenceValue']
+    if 'geoPointValue' in value:
+        return value['geoPointValue']
+    return None
+
+
+def decode_fields(fields):
+    return {name: decode_value(value) for name, value in fields.items()}
+
+
+def document_id(name):
+    """Last path segment of a full document resource name."""
+    return name.rsplit('/', 1)[-1]
+
+
+def structured_query(collection, filters=(), order_by=(), select=None, page_size=500):
+    """(structuredQuery, ordered field paths) for run_query-style cursor paging.
+
+    filters are (field, op, value) tuples using REST operator names such as
+    'EQUAL' or 'GREATER_THAN_OR_EQUAL'. order_by is a list of field names
+    (ascending); the document name is always appended as a tiebreaker.
+    """
+    query = {'from': [{'collectionId': collection}], 'limit': page_size}
+    if filters:
+        clauses = [{'fieldFilter': {'field': {'fieldPath': field}, 'op': op,
+                                    'value': encode_value(value)}}
+                   for field, op, value in filters]
+        if len(clauses) == 1:
+            query['where'] = clauses[0]
+        else:
+            query['where'] = {'compositeFilter': {'op': 'AND', 'filters': clauses}}
+    orders = list(order_by) + ['__name__']
+    query['orderBy'] = [{'field': {'fieldPath': f}, 'direction': 'ASCENDING'} for f in orders]
+    if select is not None:
+        # Ordered fields must come back too, or the next page's cursor is empty
+        masked = list(select) + [f for f in order_by if f not in select]
+        query['select'] = {'fields': [{'fieldPath': f} for f in masked]}
+    return query, orders
+
+
+def page_cursor(orders, last):
+    """startAt cursor for the page after the raw REST document `last`."""
+    cursor = [last.get('fields', {}).get(field, {'nullValue': None}) for field in orders[:-1]]
+    cursor.append({'referenceValue': last['name']})
+    return {'values': cursor, 'before': False}
+
+
+class FirestoreClient:
+    """Synchronous client for the handful of REST calls the tooling needs."""
+
+    def __init__(self, project=None, timeout=30):
+        self.project = project or os.environ.get('GCLOUD_PROJECT', DEFAULT_PROJECT)
+        self.timeout = timeout
+        emulator = os.environ.get('FIRESTORE_EMULATOR_HOST')
+        self.emulator_host = emulator
+        if emulator:
+            self.base_url = f"http://{emulator}/v1"
+            self._token = 'owner'
+        else:
+            self.base_url = 'https://firestore.googleapis.com/v1'
+            self._token = os.environ.get('FIRESTORE_ACCESS_TOKEN')
+        self.database = f"projects/{self.project}/databases/(default)"
+        self.documents_root = f"{self.database}/documents"
+        self.request_count = 0
+
+    @property
+    def using_emulator(self):
+        return self._token == 'owner'
+
+    def _request(self, method, path, body=None):
+        url = f"{self.base_url}/{path}"
+        if body is None or isinstance(body, bytes):
+            data = body
+        else:
+            data = json.dumps(body).encode('utf-8')
+        request = urllib.request.Request(url, data=data, method=method)
+        request.add_header('Content-Type', 'application/json')
+        if self._token:
+            request.add_header('Authorization', f"Bearer {self._token}")
+        self.request_count += 1
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                payload = response.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 404 and method == 'GET':
+                return None
+            raise FirestoreError(e.code, e.read().decode('utf-8', 'replace')[:500])
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+            raise FirestoreError(0, str(e))
+        return json.loads(payload) if payload else {}
+
+    def get(self, collection, doc_id):
+        """Fetch one document as a dict, or None when it does not exist."""
+        path = f"{self.documents_root}/{collection}/{urllib.parse.quote(doc_id)}"
+        document = self._request('GET', path)
+        if document is None:
+            return None
+        return decode_fields(document.get('fields', {}))
+
+    def get_document(self, collection, doc_id):
+        """Fetch one raw REST document (name, fields, updateTime), or None."""
+        path = f"{self.documents_root}/{collection}/{urllib.parse.quote(doc_id)}"
+        return self._request('GET', path)
+
+    def batch_get(self, collection, doc_ids, fields=None):
+        """Yield (doc_id, fields or None when missing) for many documents in one call.
+
+        fields limits the returned fields, e.g. ['uid'] for a cheap existence check.
+        """
+        body = {'documents': [f"{self.documents_root}/{collection}/{urllib.parse.quote(doc_id)}"
+                              for doc_id in doc_ids]}
+        if not body['documents']:
+            return
+        if fields is not None:
+            body['mask'] = {'fieldPaths': list(fields)}
+        for item in self._request('POST', f"{self.documents_root}:batchGet", body) or []:
+            if 'found' in item:
+                document = item['found']
+                yield (urllib.parse.unquote(document_id(document['name'])),
+                       decode_fields(document.get('fields', {})))
+            elif 'missing' in item:
+                yield urllib.parse.unquote(document_id(item['missing'])), None
+
+    def run_query(self, collection, filters=(), order_by=(), select=None, page_size=500,
+                  decode=decode_fields):
+        """Yield (doc_id, fields) for a structured query, paging with cursors.
+
+        See structured_query for the filters and order_by formats. decode turns
+        each REST fields map into the yielded value, e.g. a firestore_records
+        from_fields.
+        """
+        query, orders = structured_query(collection, filters, order_by, select, page_size)
+        while True:
+            results = self._request('POST', f"{self.documents_root}:runQuery",
+                                    {'structuredQuery': query}) or []
+            last = None
+            returned = 0
+            for item in results:
+                document = item.get('document')
+                if not document:
+                    continue
+                last = document
+                returned += 1
+                yield document_id(document['name']), decode(document.get('fields', {}))
+            if returned < page_size:
+                return
+            query['startAt'] = page_cursor(orders, last)
+
+    def list_documents(self, collection, page_size=1000):
+        """Yield raw REST documents (name, fields, updateTime) of a collection, in name order."""
+        path = f"{self.documents_root}/{collection}"
+        params = {'pageSize': page_size}
+        while True:
+            page = self._request('GET', f"{path}?{urllib.parse.urlencode(params)}") or {}
+            yield from page.get('documents', [])
+            token = page.get('nextPageToken')
+            if not token:
+                return
+            params['pageToken'] = token
+
+    def batch_write(self, writes):
+        """Apply REST Write objects non-atomically with documents:batchWrite.
+
+        writes may be dicts or already-serialized JSON text, so callers holding
+        stored documents can pass them through without re-encoding. Raises
+        FirestoreError for the first write that failed.
+        """
+        body = '{"writes":[' + ','.join(
+            write if isinstance(write, str) else json.dumps(write) for write in writes) + ']}'
+        response = self._request('POST', f"{self.documents_root}:batchWrite", body.encode('utf-8'))
+        for status in response.get('status', []):
+            code = status.get('code', 0)
+            if code:
+                raise FirestoreError(GRPC_STATUSES.get(code, 400), status.get('message', ''))
+        return response
+
+    def clear_emulator(self):
+        """Delete every document in the emulator database."""
+        if not self.using_emulator:
+            raise ValueError('clear_emulator only runs against FIRESTORE_EMULATOR_HOST')
+        url = f"http://{self.emulator_host}/emulator/v1/{self.documents_root}"
+        request = urllib.request.Request(url, method='DELETE')
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout):
+                pass
+        except urllib.error.HTTPError as e:
+            raise FirestoreError(e.code, e.read().decode('utf-8', 'replace')[:500])
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+            raise FirestoreError(0, str(e))
+
+    def commit(self, writes):
+        """Apply (collection, doc_id, fields) upserts atomically in one commit."""
+        return self.commit_writes([
+            {'update': {'name': f"{self.documents_root}/{collection}/{doc_id}",
+                        'fields': {k: encode_value(v) for k, v in fields.items()}}}
+            for collection, doc_id, fields in writes
+        ])
+
+    def commit_writes(self, writes):
+        """Commit REST Write objects (with masks, preconditions, transforms) atomically."""
+        return self._request('POST', f"{self.documents_root}:commit", {'writes': writes})
+
+
+def with_retries(fn, retries=5, base_delay=0.2, max_delay=10.0, on_retry=None):
+    """Call fn, retrying retryable FirestoreErrors with exponential backoff and jitter."""
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except FirestoreError as e:
+            attempt += 1
+            if not e.retryable or attempt > retries:
+                raise
+            delay = min(max_delay, base_delay * (2 ** (attempt - 1)))
+            if on_retry:
+                on_retry(attempt, e)
+            time.sleep(delay * (0.5 + random.random() / 2))
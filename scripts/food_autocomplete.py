@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+"""
+Food and exercise autocomplete index built from logged history.
+Names are kept in a sorted array and looked up by prefix with bisect. Busy
+prefixes keep a precomputed top-k list so lookups stay sub-millisecond even
+with millions of distinct names.
+"""
+
+import argparse
+import bisect
+import heapq
+import json
+import os
+import random
+import statistics
+import string
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+FOOD = 'food'
+EXERCISE = 'exercise'
+
+# Number of recent values kept per name for the median calories/duration
+SAMPLE_SIZE = 15
+# Prefix ranges larger than this get a precomputed top-k list
+HOT_THRESHOLD = 256
+# Length of the precomputed top-k lists
+TOP_K = 16
+
+_MAGIC = b'SAC1'
+_KIND_CODES = {FOOD: 0, EXERCISE: 1}
+_HIGH = '\U0010ffff'
+
+
+def normalize_name(name):
+    """Normalize a logged name into its index key."""
+    return ' '.join(str(name or '').lower().split())
+
+
+def _safe_to_double(value):
+    """Lenient float coercion matching the Dart _safeToDouble helpers."""
+    if isinstance(value, bool) or value is None:
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return 0.0
+    return 0.0
+
+
+class NameStats:
+    """Frequency and recent values for one distinct name."""
+
+    __slots__ = ('display', 'count', 'values', 'durations')
+
+    def __init__(self, display, count=0):
+        self.display = display
+        self.count = count
+        self.values = []
+        self.durations = []
+
+    def add(self, value, duration=None):
+        self.count += 1
+        self.values.append(value)
+        if len(self.values) > SAMPLE_SIZE:
+            del self.values[0]
+        if duration is not None:
+            self.durations.append(duration)
+            if len(self.durations) > SAMPLE_SIZE:
+                del self.durations[0]
+
+    @property
+    def median_value(self):
+        return statistics.median(self.values) if self.values else 0.0
+
+    @property
+    def median_duration(self):
+        return statistics.median(self.durations) if self.durations else 0.0
+
+
+class PrefixIndex:
+    """Sorted-array prefix index over the names of one kind (food or exercise)."""
+
+    def __init__(self, kind=FOOD):
+        if kind not in _KIND_CODES:
+            raise ValueError(f"Unknown index kind: {kind}")
+        self.kind = kind
+        self._keys = []
+        self._stats = {}
+        self._hot = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, name):
+        return normalize_name(name) in self._stats
+
+    def add(self, name, value, duration=None):
+        """Record one logged entry. New names are inserted in sorted position."""
+        key = normalize_name(name)
+        if not key:
+            return
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = NameStats(str(name).strip())
+            self._stats[key] = stats
+            bisect.insort(self._keys, key)
+        else:
+            stats.display = str(name).strip()
+        stats.add(_safe_to_double(value), duration)
+        self._update_hot(key, stats.count)
+
+    def add_many(self, rows):
+        """Bulk-load (name, value, duration) rows and rebuild the hot prefixes."""
+        for name, value, duration in rows:
+            key = normalize_name(name)
+            if not key:
+                continue
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = NameStats(str(name).strip())
+                self._stats[key] = stats
+            stats.add(_safe_to_double(value), duration)
+        self._keys = sorted(self._stats)
+        self.rebuild_hot()
+
+    def rebuild_hot(self):
+        """Precompute top-k lists for every prefix whose range exceeds HOT_THRESHOLD."""
+        keys = self._keys
+        self._hot = {}
+        pending = [('', 0, len(keys))] if len(keys) > HOT_THRESHOLD else []
+        while pending:
+            next_pending = []
+            for prefix, lo, hi in pending:
+                self._hot[prefix] = self._top_in_range(lo, hi, TOP_K)
+                depth = len(prefix)
+                i = lo
+                while i < hi:
+                    if len(keys[i]) <= depth:
+                        i += 1
+                        continue
+                    child = keys[i][:depth + 1]
+                    j = bisect.bisect_left(keys, child + _HIGH, i, hi)
+                    if j - i > HOT_THRESHOLD:
+                        next_pending.append((child, i, j))
+                    i = j
+            pending = next_pending
+
+    def _top_in_range(self, lo, hi, limit):
+        stats = self._stats
+        return heapq.nlargest(limit, self._keys[lo:hi], key=lambda k: stats[k].count)
+
+    def _update_hot(self, key, count):
+        stats = self._stats
+        for depth in range(len(key) + 1):
+            top = self._hot.get(key[:depth])
+            if top is None:
+                continue
+            if key not in top:
+                if len(top) >= TOP_K and stats[top[-1]].count >= count:
+                    continue
+                top.append(key)
+            top.sort(key=lambda k: stats[k].count, reverse=True)
+            del top[TOP_K:]
+
+    def lookup(self, prefix, limit=8):
+        """Return up to `limit` suggestions for a prefix, most frequent first."""
+        prefix = normalize_name(prefix)
+        top = self._hot.get(prefix)
+        if top is None:
+            lo = bisect.bisect_left(self._keys, prefix)
+            hi = bisect.bisect_left(self._keys, prefix + _HIGH, lo)
+            if hi - lo > HOT_THRESHOLD:
+                top = self._hot[prefix] = self._top_in_range(lo, hi, TOP_K)
+            else:
+                top = self._top_in_range(lo, hi, limit)
+        return [self.suggestion(key) for key in top[:limit]]
+
+    def suggestion(self, key):
+        stats = self._stats[key]
+        if self.kind == EXERCISE:
+            return {
+                'name': stats.display,
+                'count': stats.count,
+                'medianCaloriesBurned': stats.median_value,
+                'medianDurationMinutes': stats.median_duration,
+            }
+        return {
+            'name': stats.display,
+            'count': stats.count,
+            'medianCalories': stats.median_value,
+        }
+
+    def to_bytes(self):
+        """Serialize to a compact form: front-coded keys plus packed numeric columns."""
+        body = bytearray()
+        counts = array('I')
+        medians = array('f')
+        durations = array('f')
+        previous = b''
+        for key in self._keys:
+            stats = self._stats[key]
+            encoded = key.encode('utf-8')
+            shared = 0
+            limit = min(len(previous), len(encoded))
+            while shared < limit and previous[shared] == encoded[shared]:
+                shared += 1
+            display = stats.display.encode('utf-8')
+            if stats.display == key:
+                display = b''
+            _write_varint(body, shared)
+            _write_varint(body, len(encoded) - shared)
+            body += encoded[shared:]
+            _write_varint(body, len(display))
+            body += display
+            counts.append(min(stats.count, 0xFFFFFFFF))
+            medians.append(stats.median_value)
+            durations.append(stats.median_duration)
+            previous = encoded
+        header = struct.pack('<BII', _KIND_CODES[self.kind], len(self._keys), len(body))
+        payload = header + bytes(body) + counts.tobytes() + medians.tobytes()
+        if self.kind == EXERCISE:
+            payload += durations.tobytes()
+        return _MAGIC + zlib.compress(payload, 6)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Load an index written by to_bytes. Medians seed the per-name samples."""
+        if data[:4] != _MAGIC:
+            raise ValueError('Not an autocomplete index')
+        payload = zlib.decompress(data[4:])
+        kind_code, n, body_len = struct.unpack_from('<BII', payload)
+        kind = next(k for k, code in _KIND_CODES.items() if code == kind_code)
+        offset = struct.calcsize('<BII')
+        body = payload[offset:offset + body_len]
+        offset += body_len
+        counts = array('I')
+        counts.frombytes(payload[offset:offset + 4 * n])
+        offset += 4 * n
+        medians = array('f')
+        medians.frombytes(payload[offset:offset + 4 * n])
+        offset += 4 * n
+        durations = None
+        if kind == EXERCISE:
+            durations = array('f')
+            durations.frombytes(payload[offset:offset + 4 * n])
+
+        index = cls(kind)
+        keys = []
+        previous = b''
+        pos = 0
+        for i in range(n):
+            shared, pos = _read_varint(body, pos)
+            suffix_len, pos = _read_varint(body, pos)
+            encoded = previous[:shared] + body[pos:pos + suffix_len]
+            pos += suffix_len
+            display_len, pos = _read_varint(body, pos)
+            key = encoded.decode('utf-8')
+            display = body[pos:pos + display_len].decode('utf-8') if display_len else key
+            pos += display_len
+            stats = NameStats(display, counts[i])
+            stats.values.append(medians[i])
+            if durations is not None:
+                stats.durations.append(durations[i])
+            index._stats[key] = stats
+            keys.append(key)
+            previous = encoded
+        index._keys = keys
+        index.rebuild_hot()
+        return index
+
+
+def _write_varint(buf, value):
+    while value >= 0x80:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _read_varint(buf, pos):
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+class AutocompleteService:
+    """Global and per-user food/exercise indexes fed from dailyEntries documents."""
+
+    def __init__(self):
+        self.global_indexes = {FOOD: PrefixIndex(FOOD), EXERCISE: PrefixIndex(EXERCISE)}
+        self.user_indexes = {}
+
+    def _user(self, uid):
+        indexes = self.user_indexes.get(uid)
+        if indexes is None:
+            indexes = {FOOD: PrefixIndex(FOOD), EXERCISE: PrefixIndex(EXERCISE)}
+            self.user_indexes[uid] = indexes
+        return indexes
+
+    def record_food(self, uid, food_entry):
+        """Incrementally add one FoodEntry map as it is written."""
+        name = food_entry.get('name')
+        calories = food_entry.get('calories')
+        self.global_indexes[FOOD].add(name, calories)
+        if uid:
+            self._user(uid)[FOOD].add(name, calories)
+
+    def record_exercise(self, uid, exercise_entry):
+        """Incrementally add one ExerciseEntry map as it is written."""
+        name = exercise_entry.get('name')
+        burned = exercise_entry.get('caloriesBurned')
+        duration = _safe_to_double(exercise_entry.get('durationMinutes'))
+        self.global_indexes[EXERCISE].add(name, burned, duration)
+        if uid:
+            self._user(uid)[EXERCISE].add(name, burned, duration)
+
+    def build(self, daily_entries):
+        """Bulk-build every index from an iterable of dailyEntries documents."""
+        global_rows = {FOOD: [], EXERCISE: []}
+        user_rows = {}
+        for entry in daily_entries:
+            uid = entry.get('uid') or ''
+            rows = user_rows.setdefault(uid, {FOOD: [], EXERCISE: []})
+            for food in entry.get('foodEntries') or []:
+                row = (food.get('name'), food.get('calories'), None)
+                global_rows[FOOD].append(row)
+                rows[FOOD].append(row)
+            for exercise in entry.get('exerciseEntries') or []:
+                row = (exercise.get('name'), exercise.get('caloriesBurned'),
+                       _safe_to_double(exercise.get('durationMinutes')))
+                global_rows[EXERCISE].append(row)
+                rows[EXERCISE].append(row)
+        for kind, rows in global_rows.items():
+            self.global_indexes[kind].add_many(rows)
+        for uid, rows in user_rows.items():
+            if not uid:
+                continue
+            indexes = self._user(uid)
+            for kind, kind_rows in rows.items():
+                indexes[kind].add_many(kind_rows)
+
+    def suggest(self, kind, prefix, uid=None, limit=8):
+        """User's own history first, then global suggestions not already listed."""
+        results = []
+        seen = set()
+        if uid and uid in self.user_indexes:
+            for suggestion in self.user_indexes[uid][kind].lookup(prefix, limit):
+                seen.add(normalize_name(suggestion['name']))
+                results.append(dict(suggestion, scope='user'))
+        if len(results) < limit:
+            for suggestion in self.global_indexes[kind].lookup(prefix, limit):
+                if normalize_name(suggestion['name']) in seen:
+                    continue
+                results.append(dict(suggestion, scope='global'))
+                if len(results) >= limit:
+                    break
+        return results
+
+    def save(self, directory):
+        os.makedirs(os.path.join(directory, 'users'), exist_ok=True)
+        for kind, index in self.global_indexes.items():
+            with open(os.path.join(directory, f'global-{kind}.idx'), 'wb') as f:
+                f.write(index.to_bytes())
+        for uid, indexes in self.user_indexes.items():
+            for kind, index in indexes.items():
+                with open(os.path.join(directory, 'users', f'{uid}-{kind}.idx'), 'wb') as f:
+                    f.write(index.to_bytes())
+
+    @classmethod
+    def load(cls, directory):
+        service = cls()
+        for kind in (FOOD, EXERCISE):
+            path = os.path.join(directory, f'global-{kind}.idx')
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    service.global_indexes[kind] = PrefixIndex.from_bytes(f.read())
+        users_dir = os.path.join(directory, 'users')
+        if os.path.isdir(users_dir):
+            for file_name in os.listdir(users_dir):
+                uid, _, kind = file_name[:-len('.idx')].rpartition('-')
+                if kind not in _KIND_CODES:
+                    continue
+                with open(os.path.join(users_dir, file_name), 'rb') as f:
+                    service._user(uid)[kind] = PrefixIndex.from_bytes(f.read())
+        return service
+
+
+def load_daily_entries(path):
+    """Read dailyEntries documents from a JSON array or newline-delimited JSON file."""
+    with open(path, 'r') as f:
+        text = f.read()
+    stripped = text.lstrip()
+    if stripped.startswith('['):
+        return json.loads(stripped)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def _random_names(count, seed=42):
+    rng = random.Random(seed)
+    words = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+             for _ in range(max(2000, count // 50))]
+    names = set()
+    while len(names) < count:
+        names.add(' '.join(rng.choices(words, k=rng.randint(1, 3))))
+    return list(names)
+
+
+def run_benchmark(name_count, query_count):
+    print(f"📊 Autocomplete benchmark: {name_count:,} distinct names, {query_count:,} lookups")
+    print("=" * 60)
+    names = _random_names(name_count)
+    rng = random.Random(7)
+    rows = [(name, rng.randint(50, 900), None) for name in names]
+    rows += [(rng.choice(names), rng.randint(50, 900), None) for _ in range(name_count)]
+
+    index = PrefixIndex(FOOD)
+    start = time.perf_counter()
+    index.add_many(rows)
+    print(f"✅ Built index in {time.perf_counter() - start:.2f}s ({len(index._hot):,} hot prefixes)")
+
+    start = time.perf_counter()
+    blob = index.to_bytes()
+    print(f"✅ Serialized to {len(blob) / 1e6:.1f} MB in {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    PrefixIndex.from_bytes(blob)
+    print(f"✅ Loaded in {time.perf_counter() - start:.2f}s")
+
+    prefixes = []
+    for _ in range(query_count):
+        name = rng.choice(names)
+        prefixes.append(name[:rng.randint(1, min(len(name), 8))])
+    latencies = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        index.lookup(prefix)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1e6
+
+    print(f"⏱️  Lookup p50 {pct(50):.1f}µs  p99 {pct(99):.1f}µs  max {latencies[-1] * 1e6:.1f}µs")
+
+    start = time.perf_counter()
+    for i in range(1000):
+        index.add(f"benchmark food {i}", 250)
+    print(f"⏱️  Incremental insert {(time.perf_counter() - start) / 1000 * 1e6:.1f}µs per new name")
+    if pct(99) < 1000:
+        print("✅ p99 lookup latency is sub-millisecond")
+    else:
+        print("❌ p99 lookup latency exceeds 1ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build = sub.add_parser('build', help='Build indexes from exported dailyEntries')
+    build.add_argument('--input', required=True, help='JSON or NDJSON file of dailyEntries documents')
+    build.add_argument('--output', required=True, help='Directory to write the indexes to')
+
+    suggest = sub.add_parser('suggest', help='Query a built index')
+    suggest.add_argument('--index', required=True, help='Directory written by build')
+    suggest.add_argument('--kind', choices=[FOOD, EXERCISE], default=FOOD)
+    suggest.add_argument('--uid', help='Include this user\'s own history first')
+    suggest.add_argument('--limit', type=int, default=8)
+    suggest.add_argument('prefix')
+
+    bench = sub.add_parser('benchmark', help='Measure lookup latency on synthetic names')
+    bench.add_argument('--names', type=int, default=1_000_000)
+    bench.add_argument('--queries', type=int, default=100_000)
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        entries = load_daily_entries(args.input)
+        service = AutocompleteService()
+        service.build(entries)
+        service.save(args.output)
+        print(f"✅ Indexed {len(entries)} daily entries for {len(service.user_indexes)} users")
+        print(f"🍽️  Foods: {len(service.global_indexes[FOOD]):,}  🏃 Exercises: {len(service.global_indexes[EXERCISE]):,}")
+    elif args.command == 'suggest':
+        service = AutocompleteService.load(args.index)
+        for suggestion in service.suggest(args.kind, args.prefix, args.uid, args.limit):
+            print(json.dumps(suggestion))
+    elif args.command == 'benchmark':
+        run_benchmark(args.names, args.queries)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
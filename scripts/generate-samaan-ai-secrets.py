@@ -6,25 +6,27 @@ This script helps ensure your GitHub secrets match your local setup.
 
 import json
 import base64
-import subprocess
 import os
 import sys
 
+import tracing
+
 def encode_file_to_base64(file_path):
     """Encode a file to base64."""
     try:
-        with open(file_path, 'rb') as f:
-            content = f.read()
-        return base64.b64encode(content).decode('utf-8')
+        content = tracing.read_bytes(file_path)
+        with tracing.span(f"base64 {os.path.basename(file_path)}", 'encode'):
+            return base64.b64encode(content).decode('utf-8')
     except Exception as e:
         print(f"❌ Error encoding {file_path}: {e}")
         return None
 
+@tracing.traced()
 def get_debug_keystore_sha1():
     """Get SHA-1 fingerprint from debug keystore."""
     try:
         debug_keystore = os.path.expanduser('~/.android/debug.keystore')
-        result = subprocess.run([
+        result = tracing.run([
             'keytool', '-list', '-v', 
             '-keystore', debug_keystore,
             '-alias', 'androiddebugkey',
@@ -44,6 +46,7 @@ def get_debug_keystore_sha1():
         print(f"❌ Error getting debug keystore SHA-1: {e}")
         return None
 
+@tracing.traced()
 def create_staging_google_services():
     """Create staging google-services.json with correct debug SHA-1."""
     debug_sha1 = get_debug_keystore_sha1()
@@ -239,4 +242,5 @@ def main():
     print("✅ Done! Your staging builds should now work correctly.")
 
 if __name__ == "__main__":
+    tracing.setup()
     main()
\ No newline at end of file
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Replay recorded client operations against the Firestore emulator to measure
+write contention on dailyEntries.
+addFoodEntry, addExerciseEntry and updateWeight each read the whole
+`{uid}_{date}` document, modify it and write it back without a transaction.
+This replays a trace of those operations (recorded by OperationRecorder in
+the app, `--dart-define=RECORD_CLIENT_OPS=true`) the same way, at N× speed
+with a pool of concurrent clients, optionally fanning every operation out to
+several simulated devices of the same user. It then reports overlapping
+read-modify-writes, lost updates (entries appended but missing from the final
+document), bytes written per logical operation and latency percentiles.
+--mode transaction replays the same trace with updateTime preconditions and
+retries for comparison.
+
+  flutter run --dart-define=RECORD_CLIENT_OPS=true | grep OPTRACE > trace.ndjson
+  FIRESTORE_EMULATOR_HOST=localhost:8080 python3 scripts/op_trace_replay.py replay trace.ndjson --speed 20 --devices 3
+  python3 scripts/op_trace_replay.py synthesize --users 5 --ops 600 > trace.ndjson
+"""
+
+import argparse
+import datetime
+import json
+import math
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from firestore_rest import FirestoreClient, FirestoreError, decode_fields, encode_value, parse_timestamp
+
+DAILY_ENTRIES = 'dailyEntries'
+USER_WATERMARKS = 'userWatermarks'
+TRACE_PREFIX = 'OPTRACE '
+APPEND_FIELDS = {'addFoodEntry': 'foodEntries', 'addExerciseEntry': 'exerciseEntries'}
+OPERATIONS = ('addFoodEntry', 'addExerciseEntry', 'updateWeight')
+MAX_TRANSACTION_ATTEMPTS = 5
+
+
+def load_trace(path):
+    """Operation records from an NDJSON trace or a raw `flutter run` log, oldest first."""
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if TRACE_PREFIX in line:
+                line = line.split(TRACE_PREFIX, 1)[1]
+            line = line.strip()
+            if not line.startswith('{'):
+                continue
+            record = json.loads(line)
+            if record.get('op') in OPERATIONS:
+                record['started'] = parse_timestamp(record['t'])
+                records.append(record)
+    records.sort(key=lambda record: record['started'])
+    return records
+
+
+def schedule(records, devices=1):
+    """(offset seconds, device, record) for every op, fanned out to `devices` copies."""
+    if not records:
+        return []
+    origin = records[0]['started']
+    plan = []
+    for record in records:
+        offset = (record['started'] - origin).total_seconds()
+        for copy in range(devices):
+            device = record.get('device', 'device') if devices == 1 else f"{record.get('device', 'device')}-{copy}"
+            plan.append((offset, device, record))
+    return plan
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _new_entry(uid, date):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    day = datetime.date.fromisoformat(date)
+    return {
+        'uid': uid,
+        'date': datetime.datetime(day.year, day.month, day.day, tzinfo=datetime.timezone.utc),
+        'weight': None,
+        'glasses': 0,
+        'foodEntries': [],
+        'exerciseEntries': [],
+        'createdAt': now,
+    }
+
+
+class Replayer:
+    """Performs operations the way FirebaseService does and collects per-op results."""
+
+    def __init__(self, client, mode='client'):
+        self.client = client
+        self.mode = mode
+        self.results = []
+        self._lock = threading.Lock()
+
+    def perform(self, op, uid, date, payload, device):
+        doc_id = f"{uid}_{date}"
+        result = {'op': op, 'doc': doc_id, 'device': device, 'bytes': 0, 'retries': 0,
+                  'payload_bytes': len(json.dumps(payload)), 'ok': False}
+        result['read_start'] = time.perf_counter()
+        try:
+            for _ in range(MAX_TRANSACTION_ATTEMPTS if self.mode == 'transaction' else 1):
+                try:
+                    self._read_modify_write(op, uid, date, payload, doc_id, result)
+                    result['ok'] = True
+                    break
+                except FirestoreError as e:
+                    # Failed precondition (someone wrote in between) or aborted: retry
+                    if self.mode != 'transaction' or e.status not in (400, 409):
+                        raise
+                    result['retries'] += 1
+        except FirestoreError as e:
+            result['error'] = str(e)
+        result['end'] = time.perf_counter()
+        with self._lock:
+            self.results.append(result)
+        return result
+
+    def _read_modify_write(self, op, uid, date, payload, doc_id, result):
+        document = self.client.get_document(DAILY_ENTRIES, doc_id)
+        entry = decode_fields(document.get('fields', {})) if document else _new_entry(uid, date)
+        if op in APPEND_FIELDS:
+            entry[APPEND_FIELDS[op]] = list(entry.get(APPEND_FIELDS[op]) or []) + [payload]
+        else:
+            entry['weight'] = payload.get('weight')
+        entry['id'] = doc_id
+        entry['updatedAt'] = datetime.datetime.now(datetime.timezone.utc)
+
+        # set(..., SetOptions(merge: true)) of every field, plus the watermark bump
+        write = {
+            'update': {'name': f"{self.client.documents_root}/{DAILY_ENTRIES}/{doc_id}",
+                       'fields': {k: encode_value(v) for k, v in entry.items()}},
+            'updateMask': {'fieldPaths': sorted(entry)},
+        }
+        if self.mode == 'transaction':
+            write['currentDocument'] = ({'updateTime': document['updateTime']} if document
+                                        else {'exists': False})
+        writes = [write, {
+            'update': {'name': f"{self.client.documents_root}/{USER_WATERMARKS}/{uid}", 'fields': {}},
+            'updateMask': {'fieldPaths': []},
+            'updateTransforms': [{'fieldPath': 'lastWriteAt', 'setToServerValue': 'REQUEST_TIME'}],
+        }]
+        result['bytes'] += len(json.dumps({'writes': writes}))
+        self.client.commit_writes(writes)
+
+
+def reset_documents(client, plan):
+    """Delete the dailyEntries and watermarks the plan touches, so expected counts hold."""
+    names = set()
+    for _, _, record in plan:
+        names.add(f"{client.documents_root}/{DAILY_ENTRIES}/{record['uid']}_{record['date']}")
+        names.add(f"{client.documents_root}/{USER_WATERMARKS}/{record['uid']}")
+    names = sorted(names)
+    for start in range(0, len(names), 500):
+        client.batch_write([{'delete': name} for name in names[start:start + 500]])
+
+
+def replay(client, plan, speed=1.0, concurrency=8, mode='client'):
+    """Run the plan at `speed`× its recorded pace; returns (replayer, max scheduling lag)."""
+    replayer = Replayer(client, mode)
+    max_lag = 0.0
+    futures = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for offset, device, record in plan:
+            delay = offset / speed - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                max_lag = max(max_lag, -delay)
+            futures.append(pool.submit(replayer.perform, record['op'], record['uid'], record['date'],
+                                       record.get('payload') or {}, device))
+    for future in futures:
+        future.result()
+    return replayer, max_lag
+
+
+def overlapping(results):
+    """Ops whose read-modify-write window overlapped another op on the same document."""
+    by_doc = {}
+    for result in results:
+        by_doc.setdefault(result['doc'], []).append(result)
+    count = 0
+    for ops in by_doc.values():
+        ops.sort(key=lambda r: r['read_start'])
+        latest_end, latest = float('-inf'), None
+        flagged = set()
+        for i, result in enumerate(ops):
+            if result['read_start'] < latest_end:
+                flagged.update((i, latest))
+            if result['end'] > latest_end:
+                latest_end, latest = result['end'], i
+        count += len(flagged)
+    return count
+
+
+def lost_updates(client, results):
+    """(appended entries expected, entries missing from the final documents)."""
+    expected = {}
+    for result in results:
+        if result['ok'] and result['op'] in APPEND_FIELDS:
+            key = (result['doc'], APPEND_FIELDS[result['op']])
+            expected[key] = expected.get(key, 0) + 1
+    missing = 0
+    for (doc_id, field), count in expected.items():
+        document = client.get_document(DAILY_ENTRIES, doc_id) or {}
+        stored = document.get('fields', {}).get(field, {}).get('arrayValue', {}).get('values', [])
+        missing += max(0, count - len(stored))
+    return sum(expected.values()), missing
+
+
+def report(client, replayer, plan, args, max_lag, elapsed):
+    results = replayer.results
+    print(f"📊 Replayed {len(results)} operations ({args.devices} device(s) per recorded op) "
+          f"at {args.speed:g}× speed, {args.concurrency} workers, {args.mode} mode, {elapsed:.1f}s")
+    print("=" * 84)
+    print(f"{'operation':<18} {'count':>6} {'p50':>8} {'p90':>8} {'p99':>8} "
+          f"{'bytes/op':>9} {'amplif.':>8} {'errors':>7}")
+    for op in OPERATIONS + ('all',):
+        rows = [r for r in results if op in ('all', r['op'])]
+        if not rows:
+            continue
+        latencies = sorted((r['end'] - r['read_start']) * 1000 for r in rows)
+        written = sum(r['bytes'] for r in rows)
+        logical = sum(r['payload_bytes'] for r in rows) or 1
+        errors = sum(1 for r in rows if not r['ok'])
+        print(f"{op:<18} {len(rows):>6} {percentile(latencies, 0.5):>6.1f}ms "
+              f"{percentile(latencies, 0.9):>6.1f}ms {percentile(latencies, 0.99):>6.1f}ms "
+              f"{written / len(rows):>9.0f} {written / logical:>7.1f}× {errors:>7}")
+    appended, missing = lost_updates(client, results)
+    concurrent = overlapping(results)
+    retries = sum(r['retries'] for r in results)
+    print(f"🔀 Overlapping read-modify-writes: {concurrent} ({concurrent / max(len(results), 1):.1%})")
+    if args.mode == 'transaction':
+        print(f"🔁 Precondition conflicts retried: {retries}")
+    print(f"{'❌' if missing else '✅'} Lost updates: {missing} of {appended} appended entries "
+          f"({missing / max(appended, 1):.1%})")
+    if max_lag > 0.05:
+        print(f"⚠️  Replay fell up to {max_lag * 1000:.0f}ms behind schedule; lower --speed or raise --concurrency")
+
+
+def synthesize(users, ops, minutes, devices, seed):
+    """A plausible trace: bursts of logging per user across their devices, one day."""
+    rng = random.Random(seed)
+    start = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+    date = start.date().isoformat()
+    records = []
+    for _ in range(ops):
+        user = rng.randrange(users)
+        op = rng.choices(OPERATIONS, weights=(6, 3, 1))[0]
+        if op == 'addFoodEntry':
+            payload = {'name': rng.choice(['Oats', 'Salad', 'Rice bowl', 'Apple']),
+                       'calories': rng.randrange(80, 700), 'description': None, 'mealType': None}
+        elif op == 'addExerciseEntry':
+            payload = {'name': rng.choice(['Running', 'Cycling', 'Walking']),
+                       'caloriesBurned': rng.randrange(100, 500),
+                       'durationMinutes': rng.randrange(15, 60), 'description': None}
+        else:
+            payload = {'weight': round(rng.uniform(140, 200), 1)}
+        at = start + datetime.timedelta(seconds=rng.uniform(0, minutes * 60))
+        records.append({'t': at.isoformat().replace('+00:00', 'Z'), 'device': f"u{user}-d{rng.randrange(devices)}",
+                        'op': op, 'uid': f"trace-user-{user}", 'date': date, 'payload': payload,
+                        'latencyMs': None, 'outcome': 'ok'})
+    records.sort(key=lambda record: record['t'])
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    run = sub.add_parser('replay', help='Replay a trace against the emulator')
+    run.add_argument('trace', help='NDJSON trace or flutter log containing OPTRACE lines')
+    run.add_argument('--speed', type=float, default=10.0, help='Speed-up over the recorded pace')
+    run.add_argument('--concurrency', type=int, default=16, help='Operations in flight at once')
+    run.add_argument('--devices', type=int, default=1, help='Simulated devices per recorded operation')
+    run.add_argument('--mode', choices=('client', 'transaction'), default='client',
+                     help='client: blind read-modify-write like the app; transaction: preconditions and retries')
+    syn = sub.add_parser('synthesize', help='Write a synthetic trace to stdout')
+    syn.add_argument('--users', type=int, default=5)
+    syn.add_argument('--ops', type=int, default=500)
+    syn.add_argument('--minutes', type=float, default=10.0)
+    syn.add_argument('--devices', type=int, default=2, help='Devices per user')
+    syn.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.command == 'synthesize':
+        for record in synthesize(args.users, args.ops, args.minutes, args.devices, args.seed):
+            print(json.dumps(record))
+        return 0
+
+    client = FirestoreClient()
+    if not client.using_emulator:
+        print('❌ Set FIRESTORE_EMULATOR_HOST (e.g. localhost:8080); replays only run against the emulator')
+        return 1
+    plan = schedule(load_trace(args.trace), args.devices)
+    if not plan:
+        print(f"❌ No operations found in {args.trace}")
+        return 1
+    try:
+        reset_documents(client, plan)
+        start = time.perf_counter()
+        replayer, max_lag = replay(client, plan, args.speed, args.concurrency, args.mode)
+        report(client, replayer, plan, args, max_lag, time.perf_counter() - start)
+    except FirestoreError as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
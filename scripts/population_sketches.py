@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+Population analytics over dailyEntries from mergeable per-day, per-shard sketches.
+`build` reads a dailyEntries export once and writes one small sketch file
+per (day, shard). Each file holds:
+  - a HyperLogLog of the uids that logged that day;
+  - KLL quantile sketches of calories consumed, weekly weight change
+    (between consecutive weigh-ins at most two weeks apart) and glasses;
+  - a count-min sketch of food names with the most frequent candidates.
+`query` merges the files for any date range across shards, so questions
+like daily active loggers, p90 calories or the median weekly weight change
+are answered without rescanning raw documents.
+
+  python3 scripts/population_sketches.py build --entries daily.ndjson --out sketches/
+  python3 scripts/population_sketches.py query --dir sketches/ --from 2025-01-01 --to 2025-03-31
+  python3 scripts/population_sketches.py benchmark   # accuracy and speed against exact computation
+"""
+
+import argparse
+import base64
+import collections
+import concurrent.futures
+import datetime
+import functools
+import gzip
+import hashlib
+import json
+import math
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from food_autocomplete import load_daily_entries, normalize_name
+from precompute_reports import shard_for
+from weight_trend import from_epoch_day, to_epoch_day
+
+# 2^14 registers: ~0.8% standard error on distinct counts, 16KB per sketch
+HLL_PRECISION = 14
+# KLL accuracy parameter: rank error around 1.7/k
+KLL_K = 200
+CMS_DEPTH = 4
+CMS_WIDTH = 2048
+# Food name candidates kept per sketch for top-k queries
+CMS_CANDIDATES = 200
+# Weigh-ins further apart than this don't give a weekly change
+MAX_WEIGHT_GAP_DAYS = 14
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+DISTRIBUTIONS = ('calories', 'weightChange', 'glasses')
+
+
+def _safe_to_double(value):
+    """Lenient float coercion (None stays None)."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _pack(array):
+    return base64.b64encode(np.ascontiguousarray(array).tobytes()).decode('ascii')
+
+
+def _unpack(text, dtype):
+    return np.frombuffer(base64.b64decode(text), dtype=dtype).copy()
+
+
+@functools.lru_cache(maxsize=1 << 20)
+def _hll_position(item, precision=HLL_PRECISION):
+    """(register, rank) of an item: first bits pick the register, the rest give the rank."""
+    value = int.from_bytes(hashlib.blake2b(item.encode('utf-8'), digest_size=8).digest(), 'big')
+    remaining = 64 - precision
+    rest = value & ((1 << remaining) - 1)
+    return value >> remaining, remaining - rest.bit_length() + 1
+
+
+class HyperLogLog:
+    """Distinct-count sketch; merging is an element-wise max of the registers."""
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_many(self, items):
+        positions = np.array([_hll_position(item, self.precision) for item in items], dtype=np.int64)
+        if len(positions):
+            np.maximum.at(self.registers, positions[:, 0], positions[:, 1].astype(np.uint8))
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.exp2(-self.registers.astype(np.float64)).sum()
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # Linear counting is more accurate while many registers are still empty
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)
+        return raw
+
+    def to_dict(self):
+        return {'precision': self.precision, 'registers': _pack(self.registers)}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['precision'])
+        sketch.registers = _unpack(data['registers'], np.uint8)
+        return sketch
+
+
+class KLL:
+    """KLL quantile sketch: levels of compactors, an item at level h standing for 2^h values."""
+
+    def __init__(self, k=KLL_K, seed=None):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = random.Random(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+
+    def _compress(self):
+        while True:
+            level = next((h for h, items in enumerate(self.levels) if len(items) > self._capacity(h)), None)
+            if level is None:
+                return
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(self.levels[level])
+            # An odd item out stays behind so the promoted half keeps exact weight
+            keep = items[:len(items) % 2]
+            paired = items[len(keep):]
+            promoted = paired[self._rng.random() < 0.5::2]
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate((self.levels[level + 1], promoted))
+
+    def add_many(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.levels[0] = np.concatenate((self.levels[0], values))
+            self.count += len(values)
+            self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate((self.levels[level], items))
+        self.count += other.count
+        self._compress()
+        return self
+
+    def quantiles(self, fractions):
+        """Approximate values at each fraction in [0, 1]; NaN when empty."""
+        if not self.count:
+            return [math.nan for _ in fractions]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_items), 1 << level, dtype=np.int64)
+                                  for level, level_items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        ranks = np.clip(np.ceil(np.asarray(fractions) * cumulative[-1]), 1, cumulative[-1])
+        return items[np.searchsorted(cumulative, ranks)].tolist()
+
+    def to_dict(self):
+        return {'k': self.k, 'count': self.count, 'levels': [_pack(items) for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['k'])
+        sketch.count = data['count']
+        sketch.levels = [_unpack(items, np.float64) for items in data['levels']]
+        return sketch
+
+
+@functools.lru_cache(maxsize=1 << 18)
+def _cms_columns(name, width=CMS_WIDTH):
+    value = int.from_bytes(hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest(), 'big')
+    return tuple((value >> (16 * row)) % width for row in range(CMS_DEPTH))
+
+
+class HeavyHitters:
+    """Count-min sketch plus the names with the largest estimates seen so far."""
+
+    def __init__(self, width=CMS_WIDTH, candidates=CMS_CANDIDATES):
+        self.width = width
+        self.capacity = candidates
+        self.counts = np.zeros((CMS_DEPTH, width), dtype=np.int64)
+        self.candidates = {}
+
+    def _estimates(self, names):
+        columns = np.array([_cms_columns(name, self.width) for name in names], dtype=np.int64)
+        return self.counts[np.arange(CMS_DEPTH), columns].min(axis=1)
+
+    def _keep_top(self, names):
+        names = list(names)
+        if not names:
+            return
+        estimates = self._estimates(names)
+        ranked = sorted(zip(estimates.tolist(), names), reverse=True)[:self.capacity]
+        self.candidates = {name: estimate for estimate, name in ranked}
+
+    def add_counts(self, counts):
+        """Add a {name: occurrences} mapping."""
+        if not counts:
+            return
+        names = list(counts)
+        columns = np.array([_cms_columns(name, self.width) for name in names], dtype=np.int64)
+        for row in range(CMS_DEPTH):
+            np.add.at(self.counts[row], columns[:, row], np.fromiter(counts.values(), np.int64, len(names)))
+        self._keep_top(set(names) | set(self.candidates))
+
+    def merge(self, other):
+        self.counts += other.counts
+        self._keep_top(set(self.candidates) | set(other.candidates))
+        return self
+
+    def top(self, count):
+        return sorted(self.candidates.items(), key=lambda item: (-item[1], item[0]))[:count]
+
+    def to_dict(self):
+        return {'width': self.width, 'counts': _pack(self.counts), 'candidates': self.candidates}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['width'])
+        sketch.counts = _unpack(data['counts'], np.int64).reshape(CMS_DEPTH, data['width'])
+        sketch.candidates = data['candidates']
+        return sketch
+
+
+class DaySketch:
+    """Every sketch for one day (or a merged range) of dailyEntries."""
+
+    def __init__(self):
+        self.entries = 0
+        self.active = HyperLogLog()
+        self.distributions = {name: KLL() for name in DISTRIBUTIONS}
+        self.foods = HeavyHitters()
+
+    def add(self, uids, calories, weight_changes, glasses, foods):
+        self.entries += len(uids)
+        self.active.add_many(uids)
+        self.distributions['calories'].add_many(calories)
+        self.distributions['weightChange'].add_many(weight_changes)
+        self.distributions['glasses'].add_many(glasses)
+        self.foods.add_counts(foods)
+
+    def merge(self, other):
+        self.entries += other.entries
+        self.active.merge(other.active)
+        for name, sketch in self.distributions.items():
+            sketch.merge(other.distributions[name])
+        self.foods.merge(other.foods)
+        return self
+
+    def to_dict(self):
+        return {'entries': self.entries, 'active': self.active.to_dict(),
+                'distributions': {name: sketch.to_dict() for name, sketch in self.distributions.items()},
+                'foods': self.foods.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls()
+        sketch.entries = data['entries']
+        sketch.active = HyperLogLog.from_dict(data['active'])
+        sketch.distributions = {name: KLL.from_dict(value) for name, value in data['distributions'].items()}
+        sketch.foods = HeavyHitters.from_dict(data['foods'])
+        return sketch
+
+
+def entry_rows(entries):
+    """Per-entry (day, uid, calories, weekly weight change, glasses, food names), sorted by uid and day.
+
+    Weight change compares each weigh-in with the same user's previous one.
+    """
+    rows = []
+    for entry in entries:
+        day = to_epoch_day(entry.get('date'))
+        if day is not None:
+            rows.append((entry.get('uid') or '', day, entry))
+    rows.sort(key=lambda row: (row[0], row[1]))
+    previous = {}
+    for uid, day, entry in rows:
+        foods = entry.get('foodEntries') or []
+        calories = sum(_safe_to_double(food.get('calories')) or 0.0 for food in foods)
+        weight = _safe_to_double(entry.get('weight'))
+        change = math.nan
+        if weight and weight > 0:
+            last = previous.get(uid)
+            if last and 0 < day - last[0] <= MAX_WEIGHT_GAP_DAYS:
+                change = (weight - last[1]) / (day - last[0]) * 7
+            previous[uid] = (day, weight)
+        glasses = _safe_to_double(entry.get('glasses'))
+        names = [normalize_name(food.get('name')) for food in foods]
+        yield day, uid, calories if foods else math.nan, change, \
+            math.nan if glasses is None else glasses, [name for name in names if name]
+
+
+def sketch_entries(entries):
+    """{epoch day: DaySketch} for one shard's dailyEntries."""
+    by_day = collections.defaultdict(lambda: ([], [], [], [], collections.Counter()))
+    for day, uid, calories, change, glasses, names in entry_rows(entries):
+        uids, calorie_values, changes, glass_values, foods = by_day[day]
+        uids.append(uid)
+        calorie_values.append(calories)
+        changes.append(change)
+        glass_values.append(glasses)
+        foods.update(names)
+    sketches = {}
+    for day, columns in by_day.items():
+        sketches[day] = DaySketch()
+        sketches[day].add(*columns)
+    return sketches
+
+
+def sketch_path(directory, day, shard):
+    return os.path.join(directory, from_epoch_day(day).isoformat(), f"shard-{shard:03d}.json.gz")
+
+
+def _build_shard(job):
+    directory, shard, entries = job
+    written = 0
+    for day, sketch in sketch_entries(entries).items():
+        path = sketch_path(directory, day, shard)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path, 'wt') as handle:
+            json.dump(sketch.to_dict(), handle, separators=(',', ':'))
+        written += 1
+    return written
+
+
+def build(entries, directory, shards, jobs):
+    """Write day/shard sketch files; returns the number written."""
+    by_shard = collections.defaultdict(list)
+    for entry in entries:
+        by_shard[shard_for(entry.get('uid') or '', shards)].append(entry)
+    jobs_list = [(directory, shard, shard_entries) for shard, shard_entries in sorted(by_shard.items())]
+    if jobs <= 1 or len(jobs_list) <= 1:
+        return sum(map(_build_shard, jobs_list))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        return sum(pool.map(_build_shard, jobs_list))
+
+
+def load_range(directory, first_day, last_day):
+    """{epoch day: DaySketch merged across shards} for days in [first_day, last_day] with data."""
+    merged = {}
+    for day in range(first_day, last_day + 1):
+        folder = os.path.join(directory, from_epoch_day(day).isoformat())
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            with gzip.open(os.path.join(folder, name), 'rt') as handle:
+                sketch = DaySketch.from_dict(json.load(handle))
+            merged[day] = merged[day].merge(sketch) if day in merged else sketch
+    return merged
+
+
+def summarize(days, fractions=DEFAULT_QUANTILES, top=10):
+    """Query answers for a {day: DaySketch} range."""
+    total = DaySketch()
+    daily_active = {}
+    for day in sorted(days):
+        daily_active[from_epoch_day(day).isoformat()] = round(days[day].active.estimate())
+        total.merge(days[day])
+    return {
+        'entries': total.entries,
+        'distinctActive': round(total.active.estimate()),
+        'dailyActive': daily_active,
+        'quantiles': {name: dict(zip((f"p{round(q * 100):g}" for q in fractions), sketch.quantiles(fractions)))
+                      for name, sketch in total.distributions.items()},
+        'topFoods': total.foods.top(top),
+    }
+
+
+def print_summary(summary):
+    daily = list(summary['dailyActive'].values())
+    print(f"Entries: {summary['entries']:,}   distinct active loggers: ~{summary['distinctActive']:,}")
+    if daily:
+        print(f"Daily active loggers: mean ~{sum(daily) / len(daily):,.0f}, min ~{min(daily):,}, max ~{max(daily):,}")
+    for name, values in summary['quantiles'].items():
+        print(f"{name:<14} " + '  '.join(f"{label} {value:,.1f}" for label, value in values.items()))
+    print("Top foods: " + ', '.join(f"{name} (~{count:,})" for name, count in summary['topFoods']))
+
+
+def _synthetic_population(users, days, seed=7):
+    """dailyEntries documents for a synthetic population with Zipf-distributed food names."""
+    rng = np.random.default_rng(seed)
+    names = [f"food {i}" for i in range(5000)]
+    popularity = 1 / np.arange(1, len(names) + 1) ** 1.1
+    popularity /= popularity.sum()
+    start_weight = rng.uniform(140, 260, users)
+    activity = rng.uniform(0.2, 0.95, users)
+    first_day = datetime.date(2025, 1, 1)
+    entries = []
+    for offset in range(days):
+        date = (first_day + datetime.timedelta(days=offset)).isoformat()
+        active = np.flatnonzero(rng.random(users) < activity)
+        food_counts = rng.integers(1, 6, len(active))
+        picked = iter(rng.choice(len(names), int(food_counts.sum()), p=popularity).tolist())
+        calories = iter(rng.integers(80, 900, int(food_counts.sum())).tolist())
+        weighed = rng.random(len(active)) < 0.4
+        noise = rng.normal(0, 1.2, len(active))
+        glasses = np.where(rng.random(len(active)) < 0.6, rng.integers(0, 12, len(active)), -1)
+        for i, uid in enumerate(active.tolist()):
+            entry = {'uid': f"user{uid}", 'date': date,
+                     'foodEntries': [{'name': names[next(picked)], 'calories': float(next(calories))}
+                                     for _ in range(food_counts[i])]}
+            if weighed[i]:
+                entry['weight'] = round(start_weight[uid] - offset * 0.07 + noise[i], 1)
+            if glasses[i] >= 0:
+                entry['glasses'] = int(glasses[i])
+            entries.append(entry)
+    return entries
+
+
+def run_benchmark(users, days, window):
+    print(f"📊 Population sketches: {users:,} users × {days} days, query over the last {window} days")
+    print("=" * 60)
+    began = time.perf_counter()
+    entries = _synthetic_population(users, days)
+    print(f"📥 {len(entries):,} synthetic dailyEntries ({time.perf_counter() - began:.1f}s to generate)")
+
+    began = time.perf_counter()
+    sketches = sketch_entries(entries)
+    build_seconds = time.perf_counter() - began
+    stored = sum(len(gzip.compress(json.dumps(s.to_dict()).encode())) for s in sketches.values())
+    print(f"🧱 Built {len(sketches)} day sketches in {build_seconds:.1f}s "
+          f"({len(entries) / build_seconds:,.0f} entries/s, {stored / 1024 / len(sketches):.0f}KB per day gzipped)")
+
+    last_day = max(sketches)
+    first_day = last_day - window + 1
+    began = time.perf_counter()
+    summary = summarize({day: DaySketch.from_dict(sketches[day].to_dict())
+                         for day in range(first_day, last_day + 1) if day in sketches})
+    sketch_seconds = time.perf_counter() - began
+
+    began = time.perf_counter()
+    rows = [row for row in entry_rows(entries) if first_day <= row[0] <= last_day]
+    exact_active = len({row[1] for row in rows})
+    exact_values = {name: np.array([row[2 + i] for row in rows], dtype=np.float64)
+                    for i, name in enumerate(DISTRIBUTIONS)}
+    exact_foods = collections.Counter(name for row in rows for name in row[5])
+    exact_seconds = time.perf_counter() - began
+
+    print(f"⏱️  Range query: sketches {sketch_seconds * 1000:.0f}ms (incl. decoding) vs exact scan "
+          f"{exact_seconds * 1000:.0f}ms over {len(rows):,} entries")
+    error = abs(summary['distinctActive'] - exact_active) / exact_active
+    print(f"Distinct active: ~{summary['distinctActive']:,} vs {exact_active:,} exact ({error:.2%} error)")
+    for name, values in exact_values.items():
+        values = np.sort(values[~np.isnan(values)])
+        parts = []
+        for label, estimate in summary['quantiles'][name].items():
+            fraction = float(label[1:]) / 100
+            # Ties give a value a range of ranks; any rank in it answers the quantile exactly
+            low = np.searchsorted(values, estimate, side='left') / len(values)
+            high = np.searchsorted(values, estimate, side='right') / len(values)
+            parts.append(f"{label} {estimate:,.1f} vs {np.quantile(values, fraction, method='inverted_cdf'):,.1f} "
+                         f"(rank error {max(0.0, low - fraction, fraction - high):.2%})")
+        print(f"{name:<14} " + '; '.join(parts))
+    exact_top = [name for name, _ in exact_foods.most_common(10)]
+    found = len(set(exact_top) & {name for name, _ in summary['topFoods']})
+    worst = max(abs(count - exact_foods[name]) / exact_foods[name] for name, count in summary['topFoods'])
+    print(f"Top 10 foods: {found}/10 match the exact top 10, counts within {worst:.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build_cmd = sub.add_parser('build', help='Write per-day, per-shard sketches from an export')
+    build_cmd.add_argument('--entries', required=True, help='JSON/NDJSON dailyEntries export')
+    build_cmd.add_argument('--out', required=True, help='Sketch directory')
+    build_cmd.add_argument('--shards', type=int, default=8)
+    build_cmd.add_argument('--jobs', type=int, default=os.cpu_count() or 1)
+
+    query = sub.add_parser('query', help='Answer population questions for a date range')
+    query.add_argument('--dir', required=True, help='Sketch directory')
+    query.add_argument('--from', dest='first', required=True, help='First date (YYYY-MM-DD)')
+    query.add_argument('--to', dest='last', required=True, help='Last date (YYYY-MM-DD)')
+    query.add_argument('--quantiles', default=','.join(map(str, DEFAULT_QUANTILES)))
+    query.add_argument('--top', type=int, default=10, help='Number of top foods')
+    query.add_argument('--json', action='store_true')
+
+    bench = sub.add_parser('benchmark', help='Compare sketch answers with exact computation')
+    bench.add_argument('--users', type=int, default=5000)
+    bench.add_argument('--days', type=int, default=90)
+    bench.add_argument('--window', type=int, default=30, help='Days covered by the range query')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        began = time.perf_counter()
+        written = build(load_daily_entries(args.entries), args.out, args.shards, args.jobs)
+        print(f"✅ Wrote {written} sketch files to {args.out} in {time.perf_counter() - began:.1f}s")
+    elif args.command == 'query':
+        fractions = [float(value) for value in args.quantiles.split(',')]
+        days = load_range(args.dir, to_epoch_day(args.first), to_epoch_day(args.last))
+        if not days:
+            print(f"❌ No sketches between {args.first} and {args.last} in {args.dir}")
+            return 1
+        summary = summarize(days, fractions, args.top)
+        if args.json:
+            print(json.dumps(summary))
+        else:
+            print(f"📊 {args.first} → {args.last} ({len(days)} days with data)")
+            print("=" * 60)
+            print_summary(summary)
+    elif args.command == 'benchmark':
+        run_benchmark(args.users, args.days, args.window)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
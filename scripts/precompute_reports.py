@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Nightly batch scheduler that precomputes every active user's reports.
+Users are sharded by a stable uid hash across a process pool. Each shard
+writes weekly, monthly and yearly CalorieReport payloads plus BMR to the
+reportCache collection, checkpointing progress so a rerun resumes where it
+stopped.
+
+Run against the emulator:
+  FIRESTORE_EMULATOR_HOST=localhost:8080 python3 scripts/precompute_reports.py
+"""
+
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import sys
+import time
+import zlib
+
+from calorie_reports import PERIODS, build_reports, earliest_start, iso_date, period_bounds
+from firestore_rest import FirestoreClient, FirestoreError, with_retries
+
+REPORT_CACHE_COLLECTION = 'reportCache'
+CHECKPOINT_EVERY = 25
+
+# Per-process state installed by _init_worker
+_slots = None
+_progress = None
+_config = None
+
+
+def shard_for(uid, shards):
+    """Stable shard number for a uid (crc32, identical across processes and runs)."""
+    return zlib.crc32(uid.encode('utf-8')) % shards
+
+
+def report_cache_id(uid, period, period_start):
+    return f"{uid}_{period}_{period_start.isoformat()}"
+
+
+def list_active_users(client, since):
+    """uids with at least one dailyEntries document dated on or after `since`."""
+    cutoff = datetime.datetime.combine(since, datetime.time(), datetime.timezone.utc)
+    uids = set()
+    for _, fields in client.run_query('dailyEntries',
+                                      filters=[('date', 'GREATER_THAN_OR_EQUAL', cutoff)],
+                                      order_by=['date'], select=['uid']):
+        if fields.get('uid'):
+            uids.add(fields['uid'])
+    return sorted(uids)
+
+
+class Checkpoint:
+    """Completed uids for one shard of one run, persisted as JSON."""
+
+    def __init__(self, directory, run_id, shard):
+        self.path = os.path.join(directory, run_id, f"shard-{shard:03d}.json")
+        self.done = set()
+        self.complete = False
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+            self.done = set(state.get('done', []))
+            self.complete = state.get('complete', False)
+
+    def save(self, complete=False):
+        self.complete = complete
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'done': sorted(self.done), 'complete': complete}, f)
+        os.replace(tmp_path, self.path)
+
+
+def _init_worker(slots, progress, config):
+    global _slots, _progress, _config
+    _slots = slots
+    _progress = progress
+    _config = config
+
+
+def _datastore_call(fn, stats):
+    """Run one datastore call inside the shared concurrency limit, with retries."""
+    def attempt():
+        with _slots:
+            return fn()
+
+    def on_retry(attempt_number, error):
+        stats['retries'] += 1
+
+    return with_retries(attempt, retries=_config['retries'],
+                        base_delay=_config['base_delay'], on_retry=on_retry)
+
+
+def _precompute_user(client, uid, as_of, stats):
+    profile = _datastore_call(lambda: client.get('users', uid), stats)
+    since = datetime.datetime.combine(earliest_start(as_of), datetime.time(), datetime.timezone.utc)
+    entries = _datastore_call(lambda: [fields for _, fields in client.run_query(
+        'dailyEntries',
+        filters=[('uid', 'EQUAL', uid), ('date', 'GREATER_THAN_OR_EQUAL', since)],
+        order_by=['date'])], stats)
+
+    bmr, reports = build_reports(profile, entries, as_of)
+    generated_at = datetime.datetime.now(datetime.timezone.utc)
+    writes = []
+    for period in PERIODS:
+        start, _ = period_bounds(period, as_of)
+        writes.append((REPORT_CACHE_COLLECTION, report_cache_id(uid, period, start), {
+            'uid': uid,
+            'period': period,
+            'periodStart': iso_date(start),
+            'bmr': bmr,
+            'payload': json.dumps(reports[period], separators=(',', ':')),
+            'generatedAt': generated_at,
+        }))
+    _datastore_call(lambda: client.commit(writes), stats)
+
+
+def _run_shard(job):
+    """Process one shard; returns its stats. Runs inside a pool worker."""
+    shard, uids = job
+    as_of = datetime.date.fromisoformat(_config['as_of'])
+    checkpoint = Checkpoint(_config['checkpoint_dir'], _config['run_id'], shard)
+    stats = {'shard': shard, 'users': 0, 'skipped': 0, 'failed': 0, 'retries': 0,
+             'requests': 0, 'seconds': 0.0, 'errors': []}
+    if checkpoint.complete:
+        stats['skipped'] = len(uids)
+        with _progress.get_lock():
+            _progress.value += len(uids)
+        return stats
+
+    client = FirestoreClient(_config['project'])
+    start = time.perf_counter()
+    since_save = 0
+    for uid in uids:
+        if uid in checkpoint.done:
+            stats['skipped'] += 1
+        else:
+            try:
+                _precompute_user(client, uid, as_of, stats)
+                checkpoint.done.add(uid)
+                stats['users'] += 1
+                since_save += 1
+            except FirestoreError as e:
+                stats['failed'] += 1
+                stats['errors'].append(f"{uid}: {e}")
+            except Exception as e:
+                # A malformed document must not abort the shard (and with it the pool)
+                stats['failed'] += 1
+                stats['errors'].append(f"{uid}: {type(e).__name__}: {e}")
+        with _progress.get_lock():
+            _progress.value += 1
+        if since_save >= CHECKPOINT_EVERY:
+            checkpoint.save()
+            since_save = 0
+    checkpoint.save(complete=stats['failed'] == 0)
+    stats['seconds'] = time.perf_counter() - start
+    stats['requests'] = client.request_count
+    return stats
+
+
+def run(config, workers, shards):
+    """Shard active users, fan out to the pool and print progress until done."""
+    client = FirestoreClient(config['project'])
+    as_of = datetime.date.fromisoformat(config['as_of'])
+    since = as_of - datetime.timedelta(days=config['active_days'])
+    print(f"🔍 Listing users active since {since.isoformat()}...")
+    uids = with_retries(lambda: list_active_users(client, since), retries=config['retries'])
+    print(f"👥 {len(uids)} active users → {shards} shards on {workers} workers "
+          f"(max {config['max_inflight']} concurrent datastore calls)")
+
+    buckets = {}
+    for uid in uids:
+        buckets.setdefault(shard_for(uid, shards), []).append(uid)
+    jobs = sorted(buckets.items())
+
+    slots = multiprocessing.BoundedSemaphore(config['max_inflight'])
+    progress = multiprocessing.Value('i', 0)
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers, initializer=_init_worker,
+                              initargs=(slots, progress, config)) as pool:
+        pending = pool.map_async(_run_shard, jobs)
+        while not pending.ready():
+            pending.wait(2.0)
+            elapsed = time.perf_counter() - start
+            done = progress.value
+            rate = done / elapsed if elapsed else 0.0
+            print(f"⏳ {done}/{len(uids)} users ({rate:.1f} users/s)", flush=True)
+        results = pending.get()
+    elapsed = time.perf_counter() - start
+
+    print("\n📊 Shard summary")
+    print("-" * 72)
+    print(f"{'shard':>5} {'users':>7} {'skipped':>8} {'failed':>7} {'retries':>8} {'requests':>9} {'users/s':>8}")
+    for stats in sorted(results, key=lambda s: s['shard']):
+        rate = stats['users'] / stats['seconds'] if stats['seconds'] else 0.0
+        print(f"{stats['shard']:>5} {stats['users']:>7} {stats['skipped']:>8} {stats['failed']:>7} "
+              f"{stats['retries']:>8} {stats['requests']:>9} {rate:>8.1f}")
+    computed = sum(s['users'] for s in results)
+    failed = sum(s['failed'] for s in results)
+    print("-" * 72)
+    print(f"✅ Precomputed {computed} users ({computed * len(PERIODS)} reports) in {elapsed:.1f}s "
+          f"→ {computed / elapsed if elapsed else 0.0:.1f} users/s")
+    if failed:
+        print(f"❌ {failed} users failed; rerun with the same --run-id to retry them")
+        for stats in results:
+            for error in stats['errors'][:5]:
+                print(f"   - {error}")
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--project', help='Firebase project id (default: GCLOUD_PROJECT or emulator project)')
+    parser.add_argument('--as-of', default=datetime.date.today().isoformat(), help='Report date (YYYY-MM-DD)')
+    parser.add_argument('--active-days', type=int, default=30, help='Days of inactivity before a user is skipped')
+    parser.add_argument('--shards', type=int, default=64)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--max-inflight', type=int, default=16, help='Concurrent datastore calls across all workers')
+    parser.add_argument('--retries', type=int, default=5)
+    parser.add_argument('--base-delay', type=float, default=0.2, help='First retry delay in seconds')
+    parser.add_argument('--checkpoint-dir', default='.report-checkpoints')
+    parser.add_argument('--run-id', help='Checkpoint namespace (default: the --as-of date)')
+    args = parser.parse_args()
+
+    if not os.environ.get('FIRESTORE_EMULATOR_HOST') and not os.environ.get('FIRESTORE_ACCESS_TOKEN'):
+        print("⚠️  Neither FIRESTORE_EMULATOR_HOST nor FIRESTORE_ACCESS_TOKEN is set")
+        print("👉 For local runs: export FIRESTORE_EMULATOR_HOST=localhost:8080")
+        return 1
+
+    config = {
+        'project': args.project,
+        'as_of': args.as_of,
+        'active_days': args.active_days,
+        'max_inflight': args.max_inflight,
+        'retries': args.retries,
+        'base_delay': args.base_delay,
+        'checkpoint_dir': args.checkpoint_dir,
+        'run_id': args.run_id or args.as_of,
+    }
+    return run(config, args.workers, args.shards)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Fleet-wide audit of user profile completeness and BMR readiness.
+Scans the whole users collection with field-masked, cursor-paginated queries
+over document-name ranges streamed concurrently through the pooled async
+client, and classifies every profile:
+  complete        height, weight, gender and dateOfBirth present and plausible
+  missing-fields  a field calculateBMRHttp requires is absent, null, empty or 0
+  invalid         present but unreadable (height "abc", gender "M", bad date)
+  out-of-range    readable but outside what the profile screens accept
+BMR is computed offline for complete profiles with the same Mifflin-St Jeor
+code the endpoint uses. Profiles for which the endpoint would still return
+a number despite a bad value are flagged server-computes-bmr.
+
+  FIRESTORE_EMULATOR_HOST=localhost:8080 python3 scripts/profile_audit.py scan --out audit/
+  python3 scripts/profile_audit.py scan --export users.ndjson --out audit/
+  python3 scripts/profile_audit.py verify      # partition coverage and classification
+  python3 scripts/profile_audit.py benchmark   # one stream vs parallel partitions
+
+audit/summary.json holds the counts and BMR distribution; audit/findings.ndjson
+has one {uid, status, findings, bmr} line per profile, ready for targeted
+data fixes.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import math
+import os
+import random
+import sys
+import time
+
+from calorie_reports import REQUIRED_PROFILE_FIELDS, calculate_age, calculate_bmr
+from firestore_async import AsyncFirestoreClient, StandInServer
+from firestore_records import safe_to_double
+from firestore_rest import DEFAULT_PROJECT, FirestoreError, Reference
+
+USERS_COLLECTION = 'users'
+PROFILE_MASK = ['uid'] + list(REQUIRED_PROFILE_FIELDS)
+# Accepted by profile_setup_screen.dart / profile_screen.dart
+LIMITS = {'height': (50.0, 300.0), 'weight': (45.0, 1100.0), 'age': (13, 100)}
+GENDERS = ('male', 'female')
+STATUSES = ('complete', 'missing-fields', 'invalid', 'out-of-range')
+# Firebase Auth uids are 28 characters from this alphabet (in byte order)
+UID_ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+
+
+def _birth_date(value):
+    """Calendar date of a stored dateOfBirth, read the way calculateBMRHttp reads it."""
+    if isinstance(value, datetime.datetime):
+        return value.astimezone(datetime.timezone.utc).date() if value.tzinfo else value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.date.fromisoformat(value[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def audit_profile(profile, as_of):
+    """(status, findings, bmr) for one users document's plain field values.
+
+    bmr is set for complete profiles only; findings are 'kind:field' codes.
+    """
+    findings = [f"missing:{field}" for field in REQUIRED_PROFILE_FIELDS if not profile.get(field)]
+    invalid = out_of_range = False
+    for field in ('height', 'weight'):
+        value = profile.get(field)
+        if not value:
+            continue
+        number = safe_to_double(value)
+        if number is None or not math.isfinite(number):
+            findings.append(f"invalid:{field}")
+            invalid = True
+            continue
+        if isinstance(value, str):
+            findings.append(f"stored-as-string:{field}")
+        low, high = LIMITS[field]
+        if not low <= number <= high:
+            findings.append(f"out-of-range:{field}")
+            out_of_range = True
+    gender = profile.get('gender')
+    if gender and gender not in GENDERS:
+        # calculate_bmr applies the female formula to anything but 'male'
+        findings.append('invalid:gender')
+        invalid = True
+    if profile.get('dateOfBirth'):
+        born = _birth_date(profile['dateOfBirth'])
+        if born is None:
+            findings.append('invalid:dateOfBirth')
+            invalid = True
+        else:
+            low, high = LIMITS['age']
+            if not low <= calculate_age(born, as_of) <= high:
+                findings.append('out-of-range:age')
+                out_of_range = True
+
+    if findings and findings[0].startswith('missing:'):
+        return 'missing-fields', findings, None
+    server_bmr = calculate_bmr(profile, as_of)
+    if invalid or out_of_range:
+        if server_bmr is not None:
+            findings.append('server-computes-bmr')
+        return ('invalid' if invalid else 'out-of-range'), findings, None
+    if server_bmr is None:
+        # Plausible one by one, but e.g. 50cm, 45lbs and 100 years give BMR <= 0
+        findings.append('out-of-range:bmr')
+        return 'out-of-range', findings, None
+    return 'complete', findings, server_bmr
+
+
+def name_partitions(count):
+    """count - 1 document-id boundaries splitting the uid space into ranges of equal width.
+
+    The first and last ranges are open, so ids outside the alphabet are still covered.
+    """
+    width = 1 if count <= len(UID_ALPHABET) else 2
+    space = len(UID_ALPHABET) ** width
+    boundaries = []
+    for i in range(1, count):
+        position = i * space // count
+        digits = ''
+        for _ in range(width):
+            position, digit = divmod(position, len(UID_ALPHABET))
+            digits = UID_ALPHABET[digit] + digits
+        if not boundaries or digits > boundaries[-1]:
+            boundaries.append(digits)
+    return boundaries
+
+
+class AuditReport:
+    """Accumulates per-profile results into the summary."""
+
+    def __init__(self, as_of):
+        self.as_of = as_of
+        self.rows = []
+        self.statuses = dict.fromkeys(STATUSES, 0)
+        self.findings = {}
+        self.bmrs = []
+
+    def add(self, uid, profile):
+        status, findings, bmr = audit_profile(profile, self.as_of)
+        stored_uid = profile.get('uid')
+        if stored_uid and stored_uid != uid:
+            findings.append('uid-mismatch')
+        self.statuses[status] += 1
+        for finding in findings:
+            self.findings[finding] = self.findings.get(finding, 0) + 1
+        if bmr is not None:
+            self.bmrs.append(bmr)
+        self.rows.append({'uid': uid, 'status': status, 'findings': findings,
+                          'bmr': round(bmr, 1) if bmr is not None else None})
+
+    def summary(self):
+        bmrs = sorted(self.bmrs)
+
+        def at(fraction):
+            return round(bmrs[min(len(bmrs) - 1, int(fraction * len(bmrs)))], 1)
+
+        return {
+            'asOf': self.as_of.isoformat(),
+            'profiles': len(self.rows),
+            'statuses': self.statuses,
+            'bmrReady': len(bmrs),
+            'findings': dict(sorted(self.findings.items(), key=lambda item: -item[1])),
+            'bmr': {'min': at(0), 'p10': at(0.1), 'p50': at(0.5), 'p90': at(0.9), 'max': at(1),
+                    'mean': round(sum(bmrs) / len(bmrs), 1)} if bmrs else None,
+        }
+
+    def write(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, 'summary.json'), 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+            f.write('\n')
+        with open(os.path.join(directory, 'findings.ndjson'), 'w') as f:
+            for row in sorted(self.rows, key=lambda row: row['uid']):
+                f.write(json.dumps(row, separators=(',', ':')) + '\n')
+
+
+async def scan_users(client, report, partitions=16, page_size=300):
+    """Stream every users document into report; returns the number of documents read."""
+    root = f"{client.documents_root}/{USERS_COLLECTION}/"
+    bounds = [None] + name_partitions(partitions) + [None]
+
+    async def scan(low, high):
+        filters = []
+        if low is not None:
+            filters.append(('__name__', 'GREATER_THAN_OR_EQUAL', Reference(root + low)))
+        if high is not None:
+            filters.append(('__name__', 'LESS_THAN', Reference(root + high)))
+        read = 0
+        async for uid, fields in client.run_query(USERS_COLLECTION, filters, select=PROFILE_MASK,
+                                                  page_size=page_size):
+            report.add(uid, fields)
+            read += 1
+        return read
+
+    counts = await asyncio.gather(*(scan(low, high) for low, high in zip(bounds, bounds[1:])))
+    return sum(counts)
+
+
+def _export_profiles(path):
+    """(uid, fields) from a JSON/NDJSON users export; Admin SDK {_seconds} timestamps become datetimes."""
+    with open(path, 'r') as f:
+        text = f.read()
+    stripped = text.lstrip()
+    documents = json.loads(stripped) if stripped.startswith('[') else [
+        json.loads(line) for line in text.splitlines() if line.strip()]
+    for document in documents:
+        born = document.get('dateOfBirth')
+        if isinstance(born, dict) and '_seconds' in born:
+            document['dateOfBirth'] = datetime.datetime.fromtimestamp(born['_seconds'], datetime.timezone.utc)
+        yield str(document.get('id') or document.get('uid') or ''), document
+
+
+def print_summary(summary, seconds=None, requests=None):
+    print(f"📊 Profile audit as of {summary['asOf']}: {summary['profiles']:,} profiles")
+    print("=" * 60)
+    total = max(1, summary['profiles'])
+    for status, count in summary['statuses'].items():
+        icon = '✅' if status == 'complete' else '⚠️ '
+        print(f"{icon} {status:<16} {count:>9,}  {100 * count / total:5.1f}%")
+    if summary['findings']:
+        print("\nFindings:")
+        for finding, count in summary['findings'].items():
+            print(f"   {finding:<30} {count:>9,}")
+    if summary['bmr']:
+        bmr = summary['bmr']
+        print(f"\nℹ️  BMR of complete profiles: p10 {bmr['p10']:,.0f}  p50 {bmr['p50']:,.0f}  "
+              f"p90 {bmr['p90']:,.0f}  (min {bmr['min']:,.0f}, max {bmr['max']:,.0f})")
+    if seconds is not None:
+        print(f"⏱️  {seconds:.2f}s" + (f", {requests:,} requests" if requests else ''))
+
+
+def run_scan(args):
+    as_of = datetime.date.fromisoformat(args.as_of) if args.as_of else datetime.date.today()
+    report = AuditReport(as_of)
+    began = time.perf_counter()
+    requests = 0
+    if args.export:
+        for uid, profile in _export_profiles(args.export):
+            report.add(uid, profile)
+    else:
+        async def scan():
+            async with AsyncFirestoreClient(args.project, max_concurrency=args.partitions,
+                                            initial_concurrency=args.partitions) as client:
+                await scan_users(client, report, args.partitions, args.page_size)
+                return client.request_count
+
+        try:
+            requests = asyncio.run(scan())
+        except FirestoreError as e:
+            print(f"❌ {e}")
+            return 1
+    summary = report.summary()
+    print_summary(summary, time.perf_counter() - began, requests)
+    if args.out:
+        report.write(args.out)
+        print(f"✅ Wrote {os.path.join(args.out, 'summary.json')} and findings.ndjson")
+    return 0
+
+
+# --- verification and benchmark -------------------------------------------------
+
+def synthetic_profile(rng, uid, as_of):
+    """(users fields, expected status) covering the ways real profiles go wrong."""
+    born = as_of - datetime.timedelta(days=rng.randint(18 * 365, 70 * 365))
+    profile = {
+        'uid': uid, 'email': f"{uid.lower()}@example.com",
+        'height': round(rng.uniform(150, 200), 1), 'weight': round(rng.uniform(110, 300), 1),
+        'gender': rng.choice(GENDERS),
+        'dateOfBirth': datetime.datetime.combine(born, datetime.time(), datetime.timezone.utc),
+    }
+    status = rng.choices(STATUSES, weights=(70, 15, 8, 7))[0]
+    if status == 'missing-fields':
+        for field in rng.sample(REQUIRED_PROFILE_FIELDS, rng.randint(1, 2)):
+            if rng.random() < 0.5:
+                del profile[field]
+            else:
+                profile[field] = {'height': 0, 'weight': 0.0, 'gender': '', 'dateOfBirth': None}[field]
+    elif status == 'invalid':
+        field = rng.choice(('height', 'gender', 'dateOfBirth'))
+        profile[field] = {'height': rng.choice(['abc', '5\'11"']), 'gender': rng.choice(['M', 'Female']),
+                          'dateOfBirth': 'sometime in 1990'}[field]
+    elif status == 'out-of-range':
+        field = rng.choice(('height', 'weight', 'dateOfBirth'))
+        if field == 'dateOfBirth':
+            years = rng.choice([5, 120, -1])
+            profile[field] = profile[field].replace(year=as_of.year - years)
+        else:
+            profile[field] = {'height': rng.choice([5.9, 511.0]), 'weight': rng.choice([20.0, 4000.0])}[field]
+    elif rng.random() < 0.1:
+        profile['weight'] = str(profile['weight'])
+    return profile, status
+
+
+def _population(count, seed, as_of):
+    rng = random.Random(seed)
+    uids = set()
+    while len(uids) < count:
+        if rng.random() < 0.02:
+            # Emulator and test accounts do not follow the Auth uid format
+            uids.add(rng.choice(['test-', 'john', '_seed', 'ü']) + str(rng.randint(0, 10 ** 6)))
+        else:
+            uids.add(''.join(rng.choices(UID_ALPHABET, k=28)))
+    return {uid: synthetic_profile(rng, uid, as_of) for uid in sorted(uids)}
+
+
+async def _seed(population, latency):
+    os.environ['FIRESTORE_EMULATOR_HOST'] = StandInServer(latency).start()
+    async with AsyncFirestoreClient() as client:
+        await asyncio.gather(*(client.set(USERS_COLLECTION, uid, profile)
+                               for uid, (profile, _) in population.items()))
+
+
+async def _timed_scan(partitions, page_size, as_of):
+    report = AuditReport(as_of)
+    async with AsyncFirestoreClient(max_concurrency=partitions, initial_concurrency=partitions) as client:
+        began = time.perf_counter()
+        read = await scan_users(client, report, partitions, page_size)
+        return report, read, time.perf_counter() - began, client.request_count, client.connections_opened
+
+
+def run_verify(count, seed):
+    as_of = datetime.date(2025, 6, 1)
+    population = _population(count, seed, as_of)
+    print(f"📊 Verifying the profile audit on {count:,} synthetic profiles")
+    print("=" * 60)
+    asyncio.run(_seed(population, 0.0))
+    failures = 0
+    for partitions in (1, 7, 62, 200):
+        report, read, _, _, _ = asyncio.run(_timed_scan(partitions, 97, as_of))
+        uids = [row['uid'] for row in report.rows]
+        if read != count or sorted(uids) != sorted(population):
+            failures += 1
+            print(f"❌ {partitions} partitions read {read:,} documents, {len(set(uids)):,} distinct")
+    for row in report.rows:
+        profile, expected = population[row['uid']]
+        bmr = calculate_bmr(profile, as_of) if expected == 'complete' else None
+        if row['status'] != expected or (bmr is not None and abs(row['bmr'] - bmr) > 0.05):
+            failures += 1
+            if failures <= 5:
+                print(f"❌ {row} expected {expected}: {profile}")
+    summary = report.summary()
+    print(f"ℹ️  statuses {summary['statuses']}")
+    if failures:
+        print(f"❌ {failures} failures")
+        return 1
+    print("✅ Every profile read exactly once for 1/7/62/200 partitions and classified as expected")
+    return 0
+
+
+def run_benchmark(count, latency_ms, page_size):
+    as_of = datetime.date(2025, 6, 1)
+    print(f"📊 Scanning {count:,} users through a stand-in server ({latency_ms:g}ms per request)")
+    print("=" * 60)
+    asyncio.run(_seed(_population(count, 3, as_of), latency_ms / 1000))
+    baseline = None
+    for partitions in (1, 4, 16, 64):
+        _, read, seconds, requests, connections = asyncio.run(_timed_scan(partitions, page_size, as_of))
+        baseline = baseline or seconds
+        print(f"{partitions:>3} partition(s)  {seconds:7.2f}s  {read / seconds:>9,.0f} profiles/s  "
+              f"{requests:>5,} requests  {connections:>3} connections  {baseline / seconds:5.1f}×")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    scan = sub.add_parser('scan', help='Audit every profile in Firestore or an export')
+    scan.add_argument('--project', default=DEFAULT_PROJECT)
+    scan.add_argument('--export', help='Audit a JSON/NDJSON users export instead of Firestore')
+    scan.add_argument('--partitions', type=int, default=16, help='Concurrent document-name ranges')
+    scan.add_argument('--page-size', type=int, default=300)
+    scan.add_argument('--as-of', help='Date ages are computed at (YYYY-MM-DD), default today')
+    scan.add_argument('--out', help='Directory for summary.json and findings.ndjson')
+
+    verify = sub.add_parser('verify', help='Check partition coverage and classification')
+    verify.add_argument('--users', type=int, default=5000)
+    verify.add_argument('--seed', type=int, default=1)
+
+    bench = sub.add_parser('benchmark', help='Compare one query stream with parallel partitions')
+    bench.add_argument('--users', type=int, default=20_000)
+    bench.add_argument('--latency-ms', type=float, default=100.0,
+                       help='Per-page latency of the stand-in server')
+    bench.add_argument('--page-size', type=int, default=300)
+
+    args = parser.parse_args()
+
+    if args.command == 'scan':
+        return run_scan(args)
+    if args.command == 'verify':
+        return run_verify(args.users, args.seed)
+    return run_benchmark(args.users, args.latency_ms, args.page_size)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,531 @@
+#!/usr/bin/env python3
+"""
+Server-side daily logging reminders on a hierarchical timing wheel.
+NotificationService.scheduleDailyMorning fires a fixed 08:00 local
+notification on each device whether or not the user already logged. This
+holds every user's (uid, zone, local time) reminder in memory instead: the
+wheel advances one minute per tick, and the reminders due in that minute
+are checked against dailyEntries in batches ("is there a {uid}_{today}
+document?"). Users who have not logged get a send event through a
+pluggable sink; every fired reminder is rescheduled for the next local day.
+
+Insert and cancel are O(1), and a tick costs O(1) plus the reminders it
+fires or cascades. Slots store packed (id, version) int64s in arrays, so
+cancelling just bumps the version and stale entries are dropped when their
+slot is drained.
+
+  python3 scripts/reminder_wheel.py run reminders.ndjson --simulate 1440
+  python3 scripts/reminder_wheel.py benchmark --reminders 5000000
+"""
+
+import argparse
+import datetime
+import json
+import resource
+import sys
+import time
+import zlib
+import zoneinfo
+from array import array
+
+import numpy as np
+
+from date_buckets import BENCHMARK_ZONES, SECONDS_PER_DAY, ZoneSet, format_days
+from firestore_rest import FirestoreClient, FirestoreError, with_retries
+
+DAILY_ENTRIES = 'dailyEntries'
+TICK_SECONDS = 60
+DEFAULT_TIME = '08:00'
+CHECK_BATCH = 300
+REMINDER_TITLE = "Don't forget to log today"
+# Same body as NotificationService.scheduleDailyMorning
+REMINDER_BODY = "Log today's meals, exercise and weight"
+
+VERSION_BITS = 24
+VERSION_MASK = (1 << VERSION_BITS) - 1
+UNSCHEDULED = -1
+
+
+def _grown(values, size, fill):
+    """values, or a copy at least `size` long (doubling) padded with fill."""
+    if size <= len(values):
+        return values
+    grown = np.full(max(size, 2 * len(values), 1024), fill, dtype=values.dtype)
+    grown[:len(values)] = values
+    return grown
+
+
+class TimingWheel:
+    """Hierarchical timing wheel of integer ids keyed by integer tick deadlines.
+
+    Level L has 2**bits slots of 2**(bits*L) ticks each, so the defaults
+    (4 levels of 64 one-minute slots) reach about 31 years ahead. An entry
+    sits on the lowest level whose slot range still contains `now`'s
+    higher bits, and moves down a level when its slot comes round.
+    """
+
+    def __init__(self, now=0, levels=4, bits=6):
+        self.now = now
+        self.levels = levels
+        self.bits = bits
+        self._size = 1 << bits
+        self._mask = self._size - 1
+        self._slots = [[array('q') for _ in range(self._size)] for _ in range(levels)]
+        self._deadline = np.full(0, UNSCHEDULED, dtype=np.int64)
+        self._version = np.zeros(0, dtype=np.int64)
+        self.scheduled = 0
+
+    def __len__(self):
+        return self.scheduled
+
+    def _grow(self, size):
+        self._deadline = _grown(self._deadline, size, UNSCHEDULED)
+        self._version = _grown(self._version, size, 0)
+
+    def _level(self, tick):
+        differing = (tick ^ self.now) >> self.bits
+        level = 0
+        while differing:
+            level += 1
+            differing >>= self.bits
+        if level >= self.levels:
+            raise ValueError(f"Tick {tick} is beyond the wheel's horizon")
+        return level
+
+    def _levels(self, ticks):
+        differing = ticks ^ self.now
+        levels = np.zeros(len(ticks), dtype=np.int64)
+        for level in range(1, self.levels + 1):
+            levels += (differing >> (self.bits * level)) > 0
+        if len(levels) and levels.max() >= self.levels:
+            raise ValueError("Some ticks are beyond the wheel's horizon")
+        return levels
+
+    def deadline(self, entry_id):
+        """Scheduled tick of an id, or None."""
+        if entry_id >= len(self._deadline) or self._deadline[entry_id] == UNSCHEDULED:
+            return None
+        return int(self._deadline[entry_id])
+
+    def schedule(self, entry_id, tick):
+        """Fire entry_id at tick (at the next tick if that has passed), replacing any earlier schedule."""
+        tick = max(int(tick), self.now + 1)
+        level = self._level(tick)
+        self._grow(entry_id + 1)
+        if self._deadline[entry_id] == UNSCHEDULED:
+            self.scheduled += 1
+        version = (int(self._version[entry_id]) + 1) & VERSION_MASK
+        self._version[entry_id] = version
+        self._deadline[entry_id] = tick
+        slot = (tick >> (self.bits * level)) & self._mask
+        self._slots[level][slot].append(entry_id << VERSION_BITS | version)
+
+    def schedule_many(self, entry_ids, ticks):
+        """schedule() for arrays of distinct ids, vectorized."""
+        entry_ids = np.asarray(entry_ids, dtype=np.int64)
+        if not len(entry_ids):
+            return
+        ticks = np.maximum(np.asarray(ticks, dtype=np.int64), self.now + 1)
+        levels = self._levels(ticks)
+        self._grow(int(entry_ids.max()) + 1)
+        self.scheduled += int(np.count_nonzero(self._deadline[entry_ids] == UNSCHEDULED))
+        versions = (self._version[entry_ids] + 1) & VERSION_MASK
+        self._version[entry_ids] = versions
+        self._deadline[entry_ids] = ticks
+        self._place(entry_ids << VERSION_BITS | versions, levels, ticks)
+
+    def _place(self, packed, levels, ticks):
+        keys = levels * self._size + ((ticks >> (self.bits * levels)) & self._mask)
+        order = np.argsort(keys, kind='stable')
+        keys, packed = keys[order], packed[order]
+        starts = np.flatnonzero(np.diff(keys, prepend=-1))
+        ends = np.append(starts[1:], len(keys))
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            level, slot = divmod(int(keys[start]), self._size)
+            self._slots[level][slot].frombytes(packed[start:end].tobytes())
+
+    def cancel(self, entry_id):
+        """Unschedule entry_id; False if it was not scheduled."""
+        if self.deadline(entry_id) is None:
+            return False
+        self._version[entry_id] = (int(self._version[entry_id]) + 1) & VERSION_MASK
+        self._deadline[entry_id] = UNSCHEDULED
+        self.scheduled -= 1
+        return True
+
+    def _drain(self, level, slot):
+        entries = self._slots[level][slot]
+        if not entries:
+            return np.zeros(0, dtype=np.int64)
+        self._slots[level][slot] = array('q')
+        packed = np.frombuffer(entries, dtype=np.int64)
+        entry_ids = packed >> VERSION_BITS
+        return entry_ids[self._version[entry_ids] == (packed & VERSION_MASK)]
+
+    def advance(self):
+        """Move to the next tick and return the ids due at it (now unscheduled)."""
+        self.now += 1
+        for level in range(self.levels - 1, 0, -1):
+            if self.now & ((1 << (self.bits * level)) - 1):
+                continue
+            entry_ids = self._drain(level, (self.now >> (self.bits * level)) & self._mask)
+            if len(entry_ids):
+                ticks = self._deadline[entry_ids]
+                self._place(entry_ids << VERSION_BITS | self._version[entry_ids],
+                            self._levels(ticks), ticks)
+        due = self._drain(0, self.now & self._mask)
+        self._deadline[due] = UNSCHEDULED
+        self.scheduled -= len(due)
+        return due
+
+
+class FirestoreEntryStore:
+    """Checks for existing dailyEntries documents, one documents:batchGet per batch."""
+
+    def __init__(self, client=None):
+        self.client = client or FirestoreClient()
+
+    def logged(self, entry_ids):
+        found = with_retries(lambda: list(self.client.batch_get(DAILY_ENTRIES, entry_ids, fields=['uid'])))
+        return {doc_id for doc_id, fields in found if fields is not None}
+
+
+class MemoryEntryStore:
+    """Local stand-in for dailyEntries: a set of existing `{uid}_{date}` IDs."""
+
+    def __init__(self, entry_ids=()):
+        self.entry_ids = set(entry_ids)
+
+    def logged(self, entry_ids):
+        return self.entry_ids.intersection(entry_ids)
+
+
+class SampledEntryStore:
+    """Benchmark store: a stable `fraction` of entry IDs count as logged."""
+
+    def __init__(self, fraction):
+        self.threshold = int(fraction * 0xFFFFFFFF)
+
+    def logged(self, entry_ids):
+        return {entry_id for entry_id in entry_ids
+                if zlib.crc32(entry_id.encode('utf-8')) < self.threshold}
+
+
+class PrintSink:
+    """Local stub: writes each send event as one JSON line."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, events):
+        for event in events:
+            self.stream.write(json.dumps(event) + '\n')
+        self.stream.flush()
+
+
+class CountingSink:
+    """Counts events and keeps the first `keep` of them."""
+
+    def __init__(self, keep=0):
+        self.keep = keep
+        self.count = 0
+        self.events = []
+
+    def send(self, events):
+        self.count += len(events)
+        if len(self.events) < self.keep:
+            self.events.extend(events[:self.keep - len(self.events)])
+
+
+def parse_time(text):
+    """'HH:MM' -> minute of the day."""
+    hour, minute = (int(part) for part in text.split(':'))
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"Invalid reminder time: {text}")
+    return hour * 60 + minute
+
+
+class ReminderScheduler:
+    """Daily (uid, zone, local time) reminders on a one-minute TimingWheel."""
+
+    def __init__(self, store, sink, now=None, batch_size=CHECK_BATCH):
+        start = int(time.time()) if now is None else int(now)
+        self.wheel = TimingWheel(start // TICK_SECONDS)
+        self.store = store
+        self.sink = sink
+        self.batch_size = batch_size
+        self.uids = []
+        self._ids = {}
+        self.zones = []
+        self._zone_ids = {}
+        self._zone_set = None
+        self._zone = np.zeros(0, dtype=np.int64)
+        self._minute = np.zeros(0, dtype=np.int64)
+        self.stats = {'due': 0, 'logged': 0, 'sent': 0, 'checks': 0}
+
+    def __len__(self):
+        return len(self.wheel)
+
+    def _zone_index(self, name):
+        index = self._zone_ids.get(name)
+        if index is None:
+            ZoneSet([name])  # raises for unknown zones before anything is registered
+            index = self._zone_ids[name] = len(self.zones)
+            self.zones.append(name)
+            self._zone_set = None
+        return index
+
+    @property
+    def zone_set(self):
+        if self._zone_set is None:
+            self._zone_set = ZoneSet(self.zones)
+        return self._zone_set
+
+    def _entry_id(self, uid):
+        entry_id = self._ids.get(uid)
+        if entry_id is None:
+            entry_id = self._ids[uid] = len(self.uids)
+            self.uids.append(uid)
+        return entry_id
+
+    def _register(self, uids, zones, minutes):
+        entry_ids = np.fromiter((self._entry_id(uid) for uid in uids), dtype=np.int64, count=len(uids))
+        zone_indexes = np.fromiter((self._zone_index(zone) for zone in zones), dtype=np.int64,
+                                   count=len(zones))
+        size = len(self.uids)
+        self._zone = _grown(self._zone, size, 0)
+        self._minute = _grown(self._minute, size, 0)
+        self._zone[entry_ids] = zone_indexes
+        self._minute[entry_ids] = minutes
+        return entry_ids
+
+    def _fire_ticks(self, entry_ids, local_days):
+        """Ticks at which each reminder's local time falls on the given local days."""
+        wall = local_days * SECONDS_PER_DAY + self._minute[entry_ids] * 60
+        utc = self.zone_set.to_utc(self._zone[entry_ids], wall)
+        return -(-utc // TICK_SECONDS)
+
+    def _local_days(self, entry_ids, seconds):
+        offsets = self.zone_set.offsets_at(self._zone[entry_ids], seconds)
+        return np.floor_divide(seconds + offsets, SECONDS_PER_DAY)
+
+    def add_many(self, uids, zones, minutes):
+        """Add or replace reminders; minutes are minutes of the local day."""
+        if len(uids) != len(zones) or len(uids) != len(minutes):
+            raise ValueError('uids, zones and minutes must have the same length')
+        entry_ids = self._register(uids, zones, np.asarray(minutes, dtype=np.int64))
+        if not len(entry_ids):
+            return
+        now = self.wheel.now * TICK_SECONDS
+        days = self._local_days(entry_ids, np.full(len(entry_ids), now, dtype=np.int64))
+        ticks = self._fire_ticks(entry_ids, days)
+        passed = ticks <= self.wheel.now
+        if passed.any():
+            ticks[passed] = self._fire_ticks(entry_ids[passed], days[passed] + 1)
+        self.wheel.schedule_many(entry_ids, ticks)
+
+    def add(self, uid, zone, minute=parse_time(DEFAULT_TIME)):
+        self.add_many([uid], [zone], [minute])
+
+    def cancel(self, uid):
+        entry_id = self._ids.get(uid)
+        return entry_id is not None and self.wheel.cancel(entry_id)
+
+    def next_fire(self, uid):
+        """UTC datetime of a uid's next reminder, or None."""
+        entry_id = self._ids.get(uid)
+        tick = None if entry_id is None else self.wheel.deadline(entry_id)
+        if tick is None:
+            return None
+        return datetime.datetime.fromtimestamp(tick * TICK_SECONDS, datetime.timezone.utc)
+
+    def tick(self):
+        """Advance one minute, check and notify the due reminders; returns events sent."""
+        due = self.wheel.advance()
+        if not len(due):
+            return 0
+        fired_at = self.wheel.now * TICK_SECONDS
+        days = self._local_days(due, np.full(len(due), fired_at, dtype=np.int64))
+        dates = format_days(days).tolist()
+        uids = [self.uids[entry_id] for entry_id in due.tolist()]
+        entry_ids = [f"{uid}_{date}" for uid, date in zip(uids, dates)]
+
+        logged = set()
+        for start in range(0, len(entry_ids), self.batch_size):
+            logged |= self.store.logged(entry_ids[start:start + self.batch_size])
+            self.stats['checks'] += 1
+        stamp = datetime.datetime.fromtimestamp(fired_at, datetime.timezone.utc).isoformat()
+        events = [{'uid': uid, 'date': date, 'zone': self.zones[zone], 'sentAt': stamp,
+                   'title': REMINDER_TITLE, 'body': REMINDER_BODY}
+                  for uid, date, entry_id, zone in zip(uids, dates, entry_ids, self._zone[due].tolist())
+                  if entry_id not in logged]
+        if events:
+            self.sink.send(events)
+
+        self.wheel.schedule_many(due, self._fire_ticks(due, days + 1))
+        self.stats['due'] += len(due)
+        self.stats['logged'] += len(logged)
+        self.stats['sent'] += len(events)
+        return len(events)
+
+    def serve(self, clock=time.time, sleep=time.sleep):
+        """Tick in real time forever, catching up if a tick ran long."""
+        while True:
+            delay = (self.wheel.now + 1) * TICK_SECONDS - clock()
+            if delay > 0:
+                sleep(delay)
+            self.tick()
+
+
+def load_reminders(path):
+    """(uids, zones, minutes) from NDJSON lines {"uid", "zone", "time": "HH:MM"}."""
+    uids, zones, minutes = [], [], []
+    with open(path) as handle:
+        for number, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                uids.append(record['uid'])
+                zones.append(record['zone'])
+                minutes.append(parse_time(record.get('time', DEFAULT_TIME)))
+            except (ValueError, KeyError) as e:
+                raise ValueError(f"{path}:{number}: {e}") from e
+    return uids, zones, minutes
+
+
+def run_benchmark(reminders, ticks, logged_fraction, seed):
+    rng = np.random.default_rng(seed)
+    start = int(time.time()) // SECONDS_PER_DAY * SECONDS_PER_DAY
+    sink = CountingSink(keep=2000)
+    scheduler = ReminderScheduler(SampledEntryStore(logged_fraction), sink, now=start)
+    print(f"📊 Timing-wheel reminders: {reminders:,} users in {len(BENCHMARK_ZONES)} zones, "
+          f"{ticks:,} one-minute ticks")
+    print("=" * 60)
+
+    uids = [f"user{i:08d}" for i in range(reminders)]
+    zones = [BENCHMARK_ZONES[i] for i in rng.integers(0, len(BENCHMARK_ZONES), reminders).tolist()]
+    # Half keep the app's 08:00 default, the rest pick any minute of the day
+    minutes = np.where(rng.random(reminders) < 0.5, parse_time(DEFAULT_TIME),
+                       rng.integers(0, 24 * 60, reminders))
+    began = time.perf_counter()
+    scheduler.add_many(uids, zones, minutes)
+    elapsed = time.perf_counter() - began
+    print(f"Bulk insert       {elapsed * 1000:>9.0f}ms  {reminders / elapsed:>12,.0f} reminders/s")
+
+    singles = min(100_000, reminders)
+    picks = rng.integers(0, reminders, singles).tolist()
+    began = time.perf_counter()
+    for i in picks:
+        scheduler.wheel.schedule(i, scheduler.wheel.deadline(i))
+    elapsed = time.perf_counter() - began
+    print(f"Single insert     {elapsed / singles * 1e6:>9.2f}µs/op")
+    cancelled = set(picks[:singles // 10])
+    began = time.perf_counter()
+    for i in cancelled:
+        scheduler.cancel(uids[i])
+    elapsed = time.perf_counter() - began
+    print(f"Cancel            {elapsed / len(cancelled) * 1e6:>9.2f}µs/op")
+
+    scheduled = len(scheduler)
+    slowest = 0.0
+    began = time.perf_counter()
+    for _ in range(ticks):
+        tick_began = time.perf_counter()
+        scheduler.tick()
+        slowest = max(slowest, time.perf_counter() - tick_began)
+    elapsed = time.perf_counter() - began
+    stats = scheduler.stats
+    print(f"Ticks             {elapsed * 1000:>9.0f}ms  {ticks / elapsed:>12,.1f} ticks/s "
+          f"(slowest {slowest * 1000:.0f}ms)")
+    print(f"Reminders fired   {stats['due']:>11,}  {stats['due'] / elapsed:>12,.0f} /s "
+          f"({stats['checks']:,} batched checks)")
+    print(f"Sent              {stats['sent']:>11,}  (already logged: {stats['logged']:,})")
+
+    idle = TimingWheel(scheduler.wheel.now)
+    began = time.perf_counter()
+    for _ in range(100_000):
+        idle.advance()
+    print(f"Empty ticks       {100_000 / (time.perf_counter() - began):>22,.0f} ticks/s")
+    print(f"Peak RSS          {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:>9.0f}MB")
+
+    ok = True
+    if ticks >= 24 * 60 and stats['due'] < scheduled:
+        print(f"❌ Only {stats['due']:,} of {scheduled:,} reminders fired within a day")
+        ok = False
+    sent_at = {}
+    for event in sink.events:
+        sent_at[event['uid']] = (event['sentAt'], event['zone'])
+    mismatched = 0
+    for uid, (stamp, zone) in sent_at.items():
+        local = datetime.datetime.fromisoformat(stamp).astimezone(zoneinfo.ZoneInfo(zone))
+        minute = int(minutes[int(uid[4:])])
+        if (local.hour * 60 + local.minute != minute
+                and not _in_gap(local, minute)):
+            mismatched += 1
+    if mismatched:
+        print(f"❌ {mismatched} of {len(sent_at):,} sampled reminders fired at the wrong local time")
+        ok = False
+    else:
+        print(f"✅ {len(sent_at):,} sampled reminders fired at their local time (checked with zoneinfo)")
+    return 0 if ok else 1
+
+
+def _in_gap(local, minute):
+    """True when the wanted local minute did not exist that day (skipped by DST)."""
+    wall = local.replace(hour=minute // 60, minute=minute % 60, tzinfo=None)
+    aware = wall.replace(tzinfo=local.tzinfo)
+    return aware.astimezone(datetime.timezone.utc).astimezone(local.tzinfo).replace(tzinfo=None) != wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    run = sub.add_parser('run', help='Schedule reminders from a file and send them')
+    run.add_argument('reminders', help='NDJSON lines {"uid", "zone", "time": "HH:MM"}')
+    run.add_argument('--store', choices=('firestore', 'memory'), default='firestore',
+                     help='memory treats nobody as logged (local testing)')
+    run.add_argument('--simulate', type=int, metavar='MINUTES',
+                     help='Run this many ticks immediately instead of in real time')
+    run.add_argument('--start', help='Simulation start, ISO 8601 UTC (default: now)')
+    run.add_argument('--batch-size', type=int, default=CHECK_BATCH, help='Entry IDs per batchGet')
+    bench = sub.add_parser('benchmark', help='Measure inserts, cancels and ticks/sec')
+    bench.add_argument('--reminders', type=int, default=5_000_000)
+    bench.add_argument('--ticks', type=int, default=24 * 60)
+    bench.add_argument('--logged-fraction', type=float, default=0.5,
+                       help='Share of reminders whose user already logged')
+    bench.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.command == 'benchmark':
+        return run_benchmark(args.reminders, args.ticks, args.logged_fraction, args.seed)
+
+    start = None
+    if args.start:
+        start = datetime.datetime.fromisoformat(args.start.replace('Z', '+00:00')).timestamp()
+    store = FirestoreEntryStore() if args.store == 'firestore' else MemoryEntryStore()
+    scheduler = ReminderScheduler(store, PrintSink(), now=start, batch_size=args.batch_size)
+    try:
+        scheduler.add_many(*load_reminders(args.reminders))
+    except (OSError, ValueError, zoneinfo.ZoneInfoNotFoundError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    print(f"✅ Scheduled {len(scheduler):,} reminders in {len(scheduler.zones)} zone(s)", file=sys.stderr)
+    try:
+        if args.simulate is None:
+            scheduler.serve()
+        for _ in range(args.simulate):
+            scheduler.tick()
+    except FirestoreError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    stats = scheduler.stats
+    print(f"📊 {stats['due']:,} due, {stats['logged']:,} already logged, {stats['sent']:,} sent",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Report endpoints with a server-side cache, watermark invalidation and ETags.
+Serves generateCalorieReportHttp and calculateBMRHttp-compatible endpoints.
+Cached entries are keyed by (uid, period, period start) and are only reused
+while the user's userWatermarks/{uid}.lastWriteAt is unchanged. Responses
+carry a strong ETag so clients revalidate with If-None-Match and get a 304.
+Clients that send Accept: application/vnd.samaan.columnar+json receive the
+columnar report encoding; gzip/brotli follow Accept-Encoding.
+streamCalorieReportHttp serves arbitrary startDate/endDate ranges as chunked
+NDJSON (one record per month, then totals) and bypasses the cache.
+
+  FIRESTORE_EMULATOR_HOST=localhost:8080 python3 scripts/report_cache.py --port 5002
+  python3 scripts/report_cache.py --verify
+"""
+
+import argparse
+import collections
+import datetime
+import hashlib
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from calorie_reports import (COLUMNAR_MEDIA_TYPE, PERIODS, STREAM_MEDIA_TYPE, build_report,
+                             calculate_bmr, compress, dumps, encode_columnar,
+                             negotiate_encoding, period_bounds, stream_report)
+from firestore_rest import FirestoreClient, FirestoreError, with_retries
+
+WATERMARKS_COLLECTION = 'userWatermarks'
+REPORT_CACHE_COLLECTION = 'reportCache'
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+# Longest range streamCalorieReportHttp accepts
+MAX_STREAM_DAYS = 20 * 366
+
+
+def strong_etag(body):
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match, etag):
+    """True when an If-None-Match header value lists this ETag (or '*')."""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates
+
+
+class CacheEntry:
+    __slots__ = ('watermark', 'body', 'etag', 'stored_at', 'variants')
+
+    def __init__(self, watermark, body, etag, stored_at):
+        self.watermark = watermark
+        self.body = body
+        self.etag = etag
+        self.stored_at = stored_at
+        self.variants = {}
+
+    def representation(self, columnar, encoding):
+        """(etag, body) for one encoding of the cached row JSON, built once per entry."""
+        key = (columnar, encoding)
+        variant = self.variants.get(key)
+        if variant is None:
+            body = dumps(encode_columnar(json.loads(self.body))) if columnar else self.body
+            body = compress(body, encoding)
+            # Strong ETags must differ between representations of the same resource
+            suffix = ('-c' if columnar else '') + (f"-{encoding}" if encoding else '')
+            variant = (self.etag[:-1] + suffix + '"', body)
+            self.variants[key] = variant
+        return variant
+
+
+class ReportCache:
+    """Thread-safe LRU cache with a TTL and per-entry watermark validation."""
+
+    def __init__(self, max_entries=10000, ttl_seconds=3600, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = collections.Counter()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, watermark):
+        """Return the entry for key if it is fresh and built at this watermark."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.counters['misses'] += 1
+                return None
+            if self._clock() - entry.stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.counters['expirations'] += 1
+                self.counters['misses'] += 1
+                return None
+            if entry.watermark != watermark:
+                del self._entries[key]
+                self.counters['invalidations'] += 1
+                self.counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters['hits'] += 1
+            return entry
+
+    def put(self, key, watermark, body):
+        entry = CacheEntry(watermark, body, strong_etag(body), self._clock())
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters['evictions'] += 1
+        return entry
+
+    def invalidate_user(self, uid):
+        """Drop every entry for a uid (used when a write is observed in-process)."""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == uid]
+            for key in stale:
+                del self._entries[key]
+            self.counters['invalidations'] += len(stale)
+
+
+class ReportService:
+    """Computes, caches and revalidates report and BMR responses."""
+
+    def __init__(self, client, cache):
+        self.client = client
+        self.cache = cache
+
+    def _watermark(self, uid):
+        doc = with_retries(lambda: self.client.get(WATERMARKS_COLLECTION, uid))
+        stamp = (doc or {}).get('lastWriteAt')
+        return stamp if isinstance(stamp, datetime.datetime) else None
+
+    def _profile(self, uid):
+        return with_retries(lambda: self.client.get('users', uid))
+
+    def _entries(self, uid, start, end):
+        since = datetime.datetime.combine(start, datetime.time(), datetime.timezone.utc)
+        until = datetime.datetime.combine(end, datetime.time(), datetime.timezone.utc)
+        return with_retries(lambda: [fields for _, fields in self.client.run_query(
+            'dailyEntries',
+            filters=[('uid', 'EQUAL', uid),
+                     ('date', 'GREATER_THAN_OR_EQUAL', since),
+                     ('date', 'LESS_THAN_OR_EQUAL', until)],
+            order_by=['date'])])
+
+    def _precomputed(self, uid, period, start, watermark):
+        """Payload written by precompute_reports.py, if built after the last write."""
+        doc = with_retries(lambda: self.client.get(
+            REPORT_CACHE_COLLECTION, f"{uid}_{period}_{start.isoformat()}"))
+        if not doc or 'payload' not in doc:
+            return None
+        generated_at = doc.get('generatedAt')
+        if watermark and (not isinstance(generated_at, datetime.datetime)
+                          or generated_at < watermark):
+            return None
+        self.cache.counters['precomputed_hits'] += 1
+        return doc['payload'].encode('utf-8')
+
+    def report(self, uid, period, if_none_match=None, as_of=None, accept=None,
+               accept_encoding=None):
+        """Return (status, etag, body, headers) for a calorie report request."""
+        if period not in PERIODS:
+            raise ValueError(f"Unknown report period: {period}")
+        as_of = as_of or datetime.date.today()
+        start, end = period_bounds(period, as_of)
+        watermark = self._watermark(uid)
+        key = (uid, period, start.isoformat())
+        entry = self.cache.get(key, watermark)
+        if entry is None:
+            body = self._precomputed(uid, period, start, watermark)
+            if body is None:
+                bmr = calculate_bmr(self._profile(uid), as_of)
+                payload = build_report(period, start, end, self._entries(uid, start, end), bmr)
+                body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+            entry = self.cache.put(key, watermark, body)
+        columnar = COLUMNAR_MEDIA_TYPE in (accept or '')
+        return self._respond(entry, if_none_match, columnar, accept_encoding)
+
+    def stream(self, uid, start_date, end_date):
+        """Validate a custom range and return an iterator of NDJSON lines for it.
+
+        BMR and the profile are read up front so request errors still map to
+        a status code; entries are paged lazily while the body is written.
+        """
+        try:
+            start = datetime.date.fromisoformat(str(start_date)[:10])
+            end = datetime.date.fromisoformat(str(end_date)[:10])
+        except ValueError:
+            raise ValueError('startDate and endDate must be YYYY-MM-DD dates')
+        if end < start:
+            raise ValueError('endDate is before startDate')
+        if (end - start).days >= MAX_STREAM_DAYS:
+            raise ValueError(f"Range exceeds {MAX_STREAM_DAYS} days")
+        bmr = calculate_bmr(self._profile(uid), end)
+        since = datetime.datetime.combine(start, datetime.time(), datetime.timezone.utc)
+        until = datetime.datetime.combine(end, datetime.time(), datetime.timezone.utc)
+        entries = (fields for _, fields in self.client.run_query(
+            'dailyEntries',
+            filters=[('uid', 'EQUAL', uid),
+                     ('date', 'GREATER_THAN_OR_EQUAL', since),
+                     ('date', 'LESS_THAN_OR_EQUAL', until)],
+            order_by=['date']))
+
+        def lines():
+            try:
+                for record in stream_report(start, end, entries, bmr):
+                    yield dumps(record) + b'\n'
+            except FirestoreError as e:
+                # Headers are already sent; tell the client the stream is incomplete
+                yield dumps({'type': 'error', 'error': str(e)}) + b'\n'
+        return lines()
+
+    def bmr(self, uid, if_none_match=None, as_of=None, accept_encoding=None):
+        """Return (status, etag, body, headers) for a BMR request."""
+        as_of = as_of or datetime.date.today()
+        watermark = self._watermark(uid)
+        key = (uid, 'bmr', as_of.isoformat())
+        entry = self.cache.get(key, watermark)
+        if entry is None:
+            profile = self._profile(uid)
+            if profile is None:
+                raise LookupError('User profile not found')
+            bmr = calculate_bmr(profile, as_of)
+            if bmr is None:
+                raise ValueError('Missing or invalid profile data for BMR')
+            body = json.dumps({'bmr': bmr}, separators=(',', ':')).encode('utf-8')
+            entry = self.cache.put(key, watermark, body)
+        return self._respond(entry, if_none_match, accept_encoding=accept_encoding)
+
+    def _respond(self, entry, if_none_match, columnar=False, accept_encoding=None):
+        encoding = negotiate_encoding(accept_encoding)
+        if len(entry.body) < MIN_COMPRESS_BYTES:
+            encoding = None
+        etag, body = entry.representation(columnar, encoding)
+        headers = {'Vary': 'Accept, Accept-Encoding'}
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        if columnar:
+            headers['Content-Type'] = COLUMNAR_MEDIA_TYPE
+        if etag_matches(if_none_match, etag):
+            self.cache.counters['not_modified'] += 1
+            return 304, etag, b'', headers
+        return 200, etag, body, headers
+
+    def metrics_text(self):
+        """Counters in Prometheus text exposition format."""
+        lines = []
+        for name in ('hits', 'misses', 'invalidations', 'expirations', 'evictions',
+                     'not_modified', 'precomputed_hits'):
+            metric = f"report_cache_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {self.cache.counters[name]}")
+        lines.append("# TYPE report_cache_entries gauge")
+        lines.append(f"report_cache_entries {len(self.cache)}")
+        return '\n'.join(lines) + '\n'
+
+
+def make_handler(service):
+    class ReportHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _cors(self):
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type, If-None-Match, Accept')
+            self.send_header('Access-Control-Expose-Headers', 'ETag')
+
+        def _send(self, status, body=b'', etag=None, content_type='application/json', headers=None):
+            headers = dict(headers or {})
+            content_type = headers.pop('Content-Type', content_type)
+            self.send_response(status)
+            self._cors()
+            if etag:
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', 'private, no-cache')
+            for name, value in headers.items():
+                if status != 304 or name == 'Vary':
+                    self.send_header(name, value)
+            if status != 304:
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if status != 304:
+                self.wfile.write(body)
+
+        def _send_chunked(self, lines, content_type):
+            self.send_response(200)
+            self._cors()
+            self.send_header('Content-Type', content_type)
+            self.send_header('Cache-Control', 'no-store')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for line in lines:
+                self.wfile.write(f"{len(line):x}\r\n".encode('ascii') + line + b'\r\n')
+                self.wfile.flush()
+            self.wfile.write(b'0\r\n\r\n')
+
+        def _error(self, status, message):
+            self._send(status, json.dumps({'error': message}).encode('utf-8'))
+
+        def do_OPTIONS(self):
+            self._send(204, b'')
+
+        def do_GET(self):
+            if self.path.rstrip('/').endswith('/metrics'):
+                self._send(200, service.metrics_text().encode('utf-8'),
+                           content_type='text/plain; version=0.0.4')
+            else:
+                self._error(404, 'Not found')
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            try:
+                data = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError:
+                return self._error(400, 'Invalid JSON body')
+            uid = data.get('uid')
+            if not uid:
+                return self._error(400, 'uid is required')
+            if_none_match = self.headers.get('If-None-Match')
+            accept_encoding = self.headers.get('Accept-Encoding')
+            path = self.path.rstrip('/')
+            try:
+                if path.endswith('generateCalorieReportHttp'):
+                    status, etag, body, headers = service.report(
+                        uid, data.get('period', 'weekly'), if_none_match,
+                        accept=self.headers.get('Accept'), accept_encoding=accept_encoding)
+                elif path.endswith('streamCalorieReportHttp'):
+                    lines = service.stream(uid, data.get('startDate'), data.get('endDate'))
+                    return self._send_chunked(lines, STREAM_MEDIA_TYPE)
+                elif path.endswith('calculateBMRHttp'):
+                    status, etag, body, headers = service.bmr(
+                        uid, if_none_match, accept_encoding=accept_encoding)
+                else:
+                    return self._error(404, 'Not found')
+            except LookupError as e:
+                return self._error(404, str(e))
+            except ValueError as e:
+                return self._error(400, str(e))
+            except FirestoreError as e:
+                return self._error(503, str(e))
+            self._send(status, body, etag, headers=headers)
+
+    return ReportHandler
+
+
+class _StandInClient:
+    """In-memory users/dailyEntries/userWatermarks for --verify."""
+
+    def __init__(self, as_of):
+        self.documents = {
+            ('users', 'verify-user'): {'height': 170, 'weight': 160, 'gender': 'female',
+                                       'dateOfBirth': '1990-04-12'},
+            (WATERMARKS_COLLECTION, 'verify-user'): {
+                'lastWriteAt': datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)},
+        }
+        self.entries = []
+        for offset in range(7):
+            day = as_of - datetime.timedelta(days=offset)
+            self.entries.append({
+                'uid': 'verify-user',
+                'date': datetime.datetime.combine(day, datetime.time(), datetime.timezone.utc),
+                'foodEntries': [{'name': f"meal {n}", 'calories': 300 + n} for n in range(12)],
+                'exerciseEntries': [{'name': 'walk', 'caloriesBurned': 150}],
+            })
+
+    def get(self, collection, doc_id):
+        return self.documents.get((collection, doc_id))
+
+    def run_query(self, collection, filters=(), order_by=()):
+        for entry in self.entries:
+            yield entry['uid'], entry
+
+
+def run_verify():
+    """POST to each route of an in-process server and check status, encoding and 304s."""
+    import gzip
+    import urllib.error
+    import urllib.request
+
+    service = ReportService(_StandInClient(datetime.date.today()), ReportCache())
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(service))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def post(route, payload, **headers):
+        request = urllib.request.Request(f"{base}/{route}", data=json.dumps(payload).encode('utf-8'),
+                                         headers={'Content-Type': 'application/json', **headers},
+                                         method='POST')
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                return response.status, response.headers, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers, e.read()
+        except (urllib.error.URLError, ConnectionError) as e:
+            # The handler raised and the server dropped the connection
+            return 0, {}, str(e).encode('utf-8')
+
+    print("📊 Verifying report endpoints against an in-process server")
+    print("=" * 60)
+    failures = []
+    checks = [('generateCalorieReportHttp', {'uid': 'verify-user', 'period': 'weekly'}, 'data'),
+              ('calculateBMRHttp', {'uid': 'verify-user'}, 'bmr')]
+    for route, payload, key in checks:
+        for accept_encoding in (None, 'gzip'):
+            headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+            status, response_headers, body = post(route, payload, **headers)
+            label = f"{route} (Accept-Encoding: {accept_encoding or '-'})"
+            failed = len(failures)
+            if status != 200:
+                failures.append(f"{label}: HTTP {status} {body[:200]!r}")
+                continue
+            if response_headers.get('Content-Encoding') == 'gzip':
+                body = gzip.decompress(body)
+            elif accept_encoding and len(body) >= MIN_COMPRESS_BYTES:
+                failures.append(f"{label}: {len(body)} byte body sent uncompressed")
+            if key not in json.loads(body):
+                failures.append(f"{label}: unexpected body {body[:200]!r}")
+            status, _, _ = post(route, payload, **{'If-None-Match': response_headers['ETag'], **headers})
+            if status != 304:
+                failures.append(f"{label}: revalidation returned HTTP {status}, expected 304")
+            if len(failures) == failed:
+                print(f"✅ {label}")
+    server.shutdown()
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        return 1
+    print("✅ Every route answered, honoured Accept-Encoding and revalidated with 304")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5002)
+    parser.add_argument('--project', help='Firebase project id')
+    parser.add_argument('--max-entries', type=int, default=10000)
+    parser.add_argument('--ttl', type=int, default=3600, help='Entry lifetime in seconds')
+    parser.add_argument('--verify', action='store_true',
+                        help='Exercise every route on an in-process server with stand-in data and exit')
+    args = parser.parse_args()
+
+    if args.verify:
+        return run_verify()
+
+    service = ReportService(FirestoreClient(args.project),
+                            ReportCache(args.max_entries, args.ttl))
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"🚀 Report endpoints on http://{args.host}:{args.port} (metrics at /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+Incremental rolling-window analytics: logging streaks, 7/30-day averages and adherence.
+Keeps per-user state in struct-of-arrays form: a ring buffer of the last 30
+days, running 7- and 30-day sums of net deficit, logged days and days on
+target, and a bitmask of logged days with the length of the run that
+continues past the window (so the streak is a trailing-ones count). A new or
+edited day updates all of it in O(1). The cold-start path computes the same
+state from full history for every user at once with array operations, and
+`verify` checks the two paths against each other on random histories.
+
+A day counts as logged when it has food entries, and as on target when
+calories consumed stay within targetDailyCalories plus exercise, where the
+target is BMR minus the active goal's daily deficit (BMR alone without a
+goal), as on the dashboard. Averages and adherence are over logged days in
+the window ending at the user's latest day.
+
+  python3 scripts/rolling_metrics.py compute --entries daily.ndjson --profiles users.ndjson --goals goals.ndjson
+  python3 scripts/rolling_metrics.py verify --users 2000
+"""
+
+import argparse
+import datetime
+import json
+import sys
+import time
+
+import numpy as np
+
+from calorie_reports import calculate_bmr, summarize_entry
+from weight_trend import from_epoch_day, to_epoch_day
+
+WINDOW = 30
+SHORT_WINDOW = 7
+FULL_MASK = (1 << WINDOW) - 1
+SHORT, LONG = 0, 1  # columns of the running sums
+LOGGED, ON_TARGET = 1, 2  # ring_flags bits
+# What the dashboard falls back to when BMR can't be computed
+DEFAULT_BMR = 1500.0
+CALORIES_PER_POUND = 3500
+
+
+def trailing_ones(mask):
+    return (~mask & (mask + 1)).bit_length() - 1
+
+
+def daily_target(bmr, goal):
+    """targetDailyCalories before exercise, as WeightLossGoal.targetDailyCalories computes it."""
+    if not goal:
+        return bmr
+    per_week = goal.get('weightLossPerWeek')
+    per_week = float(per_week) if isinstance(per_week, (int, float)) else 1.0
+    return bmr - per_week * CALORIES_PER_POUND / 7
+
+
+def day_values(entry, bmr, target):
+    """(logged, net deficit, on target) for one dailyEntries document."""
+    row = summarize_entry(entry, bmr)
+    on_target = row['caloriesConsumed'] <= target + row['caloriesBurned']
+    return bool(entry.get('foodEntries')), row['netCalorieDeficit'], on_target
+
+
+class RollingMetrics:
+    """Struct-of-arrays rolling-window state for a population of users."""
+
+    def __init__(self, uids=()):
+        self.uids = []
+        self.index = {}
+        n = 0
+        self.head = np.full(n, -1, dtype=np.int64)  # latest day seen
+        self.ring_day = np.full((n, WINDOW), -1, dtype=np.int64)
+        self.ring_net = np.zeros((n, WINDOW))
+        self.ring_flags = np.zeros((n, WINDOW), dtype=np.uint8)
+        self.net_sum = np.zeros((n, 2))
+        self.logged = np.zeros((n, 2), dtype=np.int64)
+        self.on_target = np.zeros((n, 2), dtype=np.int64)
+        self.mask = np.zeros(n, dtype=np.uint64)  # bit i: head - i was logged
+        self.carry = np.zeros(n, dtype=np.int64)  # logged run ending at head - WINDOW
+        self.stale = np.zeros(n, dtype=bool)
+        for uid in uids:
+            self.user_index(uid)
+
+    def __len__(self):
+        return len(self.uids)
+
+    def user_index(self, uid):
+        """Return the row for a uid, growing the arrays when a new user appears."""
+        row = self.index.get(uid)
+        if row is not None:
+            return row
+        row = len(self.uids)
+        self.uids.append(uid)
+        self.index[uid] = row
+        if row >= len(self.head):
+            self._grow(max(16, 2 * len(self.head)))
+        return row
+
+    def _grow(self, capacity):
+        def extend(array, fill):
+            grown = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+            grown[:len(array)] = array
+            return grown
+
+        self.head = extend(self.head, -1)
+        self.ring_day = extend(self.ring_day, -1)
+        self.ring_net = extend(self.ring_net, 0.0)
+        self.ring_flags = extend(self.ring_flags, 0)
+        self.net_sum = extend(self.net_sum, 0.0)
+        self.logged = extend(self.logged, 0)
+        self.on_target = extend(self.on_target, 0)
+        self.mask = extend(self.mask, 0)
+        self.carry = extend(self.carry, 0)
+        self.stale = extend(self.stale, False)
+
+    def _count(self, row, columns, net, flags, sign):
+        if flags & LOGGED:
+            for column in columns:
+                self.logged[row, column] += sign
+                # An emptied window restarts at exactly zero instead of keeping rounding residue
+                self.net_sum[row, column] = self.net_sum[row, column] + sign * net if self.logged[row, column] else 0.0
+                if flags & ON_TARGET:
+                    self.on_target[row, column] += sign
+
+    def _advance(self, row, head, new_head):
+        """Move a user's windows forward so they end at new_head."""
+        ring_day, ring_net, ring_flags = self.ring_day[row], self.ring_net[row], self.ring_flags[row]
+        for day in range(head - SHORT_WINDOW + 1, min(head, new_head - SHORT_WINDOW) + 1):
+            slot = day % WINDOW
+            if ring_day[slot] == day:
+                self._count(row, (SHORT,), ring_net[slot], ring_flags[slot], -1)
+        for day in range(head - WINDOW + 1, min(head, new_head - WINDOW) + 1):
+            slot = day % WINDOW
+            if ring_day[slot] == day:
+                self._count(row, (LONG,), ring_net[slot], ring_flags[slot], -1)
+                ring_day[slot] = -1
+
+        mask = int(self.mask[row])
+        # Bit of the old mask for the day just before the new window; its run becomes the carry
+        boundary = head - (new_head - WINDOW)
+        if boundary < 0:
+            self.carry[row] = 0
+        else:
+            run = trailing_ones(mask >> boundary)
+            self.carry[row] = run + self.carry[row] if run == WINDOW - boundary else run
+        shift = new_head - head
+        self.mask[row] = (mask << shift) & FULL_MASK if shift < WINDOW else 0
+        self.head[row] = new_head
+
+    def update(self, uid, day, logged, net, on_target):
+        """O(1) update for one new or edited day.
+
+        Days older than the 30-day window can't move any average, but could
+        join two streak runs; those mark the user stale for the next rebuild.
+        """
+        row = self.user_index(uid)
+        head = int(self.head[row])
+        if head < 0:
+            self.head[row] = head = day
+        elif day > head:
+            self._advance(row, head, day)
+            head = day
+        offset = head - day
+        if offset >= WINDOW:
+            self.stale[row] = True
+            return
+        columns = (SHORT, LONG) if offset < SHORT_WINDOW else (LONG,)
+        slot = day % WINDOW
+        if self.ring_day[row, slot] == day:
+            self._count(row, columns, self.ring_net[row, slot], self.ring_flags[row, slot], -1)
+        flags = (LOGGED | (ON_TARGET if on_target else 0)) if logged else 0
+        self.ring_day[row, slot] = day
+        self.ring_net[row, slot] = net
+        self.ring_flags[row, slot] = flags
+        self._count(row, columns, net, flags, 1)
+        mask = int(self.mask[row])
+        self.mask[row] = mask | (1 << offset) if logged else mask & ~(1 << offset)
+
+    def rebuild(self, user_rows, days, logged, net, on_target):
+        """Cold start: replace the state of every user in user_rows from their full history.
+
+        Repeated (user, day) pairs keep the last one given, like a sequence of edits.
+        """
+        user_rows = np.asarray(user_rows, dtype=np.int64)
+        days = np.asarray(days, dtype=np.int64)
+        logged = np.asarray(logged, dtype=bool)
+        net = np.asarray(net, dtype=np.float64)
+        on_target = np.asarray(on_target, dtype=bool) & logged
+        if len(user_rows) == 0:
+            return
+
+        order = np.lexsort((days, user_rows))
+        user_rows, days, logged, net, on_target = (a[order] for a in (user_rows, days, logged, net, on_target))
+        last = np.r_[(user_rows[1:] != user_rows[:-1]) | (days[1:] != days[:-1]), True]
+        user_rows, days, logged, net, on_target = (a[last] for a in (user_rows, days, logged, net, on_target))
+
+        touched = np.unique(user_rows)
+        self.ring_day[touched] = -1
+        self.ring_net[touched] = 0.0
+        self.ring_flags[touched] = 0
+        self.stale[touched] = False
+        user_end = np.flatnonzero(np.r_[user_rows[1:] != user_rows[:-1], True])
+        self.head[user_rows[user_end]] = days[user_end]
+
+        n = len(self.head)
+        offset = self.head[user_rows] - days
+        for column, width in ((SHORT, SHORT_WINDOW), (LONG, WINDOW)):
+            picked = logged & (offset < width)
+            self.net_sum[touched, column] = np.bincount(user_rows[picked], net[picked], n)[touched]
+            self.logged[touched, column] = np.bincount(user_rows[picked], minlength=n)[touched]
+            self.on_target[touched, column] = np.bincount(user_rows[picked & on_target], minlength=n)[touched]
+
+        recent = offset < WINDOW
+        slots = days[recent] % WINDOW
+        self.ring_day[user_rows[recent], slots] = days[recent]
+        self.ring_net[user_rows[recent], slots] = net[recent]
+        self.ring_flags[user_rows[recent], slots] = logged[recent] * LOGGED | on_target[recent] * ON_TARGET
+
+        self.mask[touched] = 0
+        bits = recent & logged
+        np.bitwise_or.at(self.mask, user_rows[bits], np.left_shift(np.uint64(1), offset[bits].astype(np.uint64)))
+
+        # Runs of consecutive logged days; the one covering head - WINDOW is the carry
+        self.carry[touched] = 0
+        run_rows, run_days = user_rows[logged], days[logged]
+        starts = np.r_[True, (run_rows[1:] != run_rows[:-1]) | (run_days[1:] != run_days[:-1] + 1)]
+        run_start = run_days[starts][np.cumsum(starts) - 1]
+        boundary = run_days == self.head[run_rows] - WINDOW
+        self.carry[run_rows[boundary]] = run_days[boundary] - run_start[boundary] + 1
+
+    def metrics(self, as_of_day=None):
+        """Per-user arrays: streak, 7/30-day mean net deficit, adherence and logged days.
+
+        With as_of_day, a streak whose latest day is before yesterday counts as broken.
+        Means and adherence are NaN when the window has no logged day.
+        """
+        n = len(self.uids)
+        mask = self.mask[:n]
+        lowest_zero = ~mask & (mask + np.uint64(1))
+        run = np.log2(lowest_zero.astype(np.float64)).astype(np.int64)
+        streak = np.where(run == WINDOW, WINDOW + self.carry[:n], run)
+        if as_of_day is not None:
+            streak = np.where(self.head[:n] >= as_of_day - 1, streak, 0)
+        logged = self.logged[:n]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = self.net_sum[:n] / logged
+            adherence = self.on_target[:n] / logged
+        return {
+            'streak': streak,
+            'meanDeficit7': mean[:, SHORT],
+            'meanDeficit30': mean[:, LONG],
+            'adherence7': adherence[:, SHORT],
+            'adherence30': adherence[:, LONG],
+            'loggedDays7': logged[:, SHORT],
+            'loggedDays30': logged[:, LONG],
+        }
+
+    def report_rows(self, as_of_day=None):
+        """Per-user dicts suitable for NDJSON output."""
+        metrics = self.metrics(as_of_day)
+
+        def rounded(value, digits):
+            return None if np.isnan(value) else round(float(value), digits)
+
+        for row, uid in enumerate(self.uids):
+            if self.head[row] < 0:
+                continue
+            yield {
+                'uid': uid,
+                'lastDay': from_epoch_day(self.head[row]).isoformat(),
+                'streak': int(metrics['streak'][row]),
+                'meanDeficit7': rounded(metrics['meanDeficit7'][row], 1),
+                'meanDeficit30': rounded(metrics['meanDeficit30'][row], 1),
+                'adherence7': rounded(metrics['adherence7'][row], 3),
+                'adherence30': rounded(metrics['adherence30'][row], 3),
+                'loggedDays7': int(metrics['loggedDays7'][row]),
+                'loggedDays30': int(metrics['loggedDays30'][row]),
+            }
+
+
+def _read_documents(path):
+    with open(path, 'r') as f:
+        text = f.read()
+    stripped = text.lstrip()
+    if stripped.startswith('['):
+        return json.loads(stripped)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def build_metrics(entries, profiles=(), goals=(), as_of=None):
+    """RollingMetrics cold-started from dailyEntries, users and weightLossGoals documents."""
+    as_of = as_of or datetime.date.today()
+    bmr_by_uid = {}
+    for profile in profiles:
+        bmr_by_uid[profile.get('uid') or profile.get('id') or ''] = calculate_bmr(profile, as_of)
+    goal_by_uid = {goal.get('uid') or '': goal for goal in goals if goal.get('isActive') is not False}
+
+    engine = RollingMetrics()
+    rows, days, logged, net, on_target = [], [], [], [], []
+    for entry in entries:
+        day = to_epoch_day(entry.get('date'))
+        if day is None:
+            continue
+        uid = entry.get('uid') or ''
+        bmr = bmr_by_uid.get(uid) or DEFAULT_BMR
+        values = day_values(entry, bmr, daily_target(bmr, goal_by_uid.get(uid)))
+        rows.append(engine.user_index(uid))
+        days.append(day)
+        logged.append(values[0])
+        net.append(values[1])
+        on_target.append(values[2])
+    engine.rebuild(rows, days, logged, net, on_target)
+    return engine
+
+
+def _random_events(rng, users, days):
+    """Per-user day updates moving forward with gaps, interleaved with edits inside the window.
+
+    A third of the users log almost every day, so streaks run well past the window.
+    """
+    events = []
+    for uid in range(users):
+        diligent = rng.random() < 1 / 3
+        skip, unlogged = (0.01, 0.005) if diligent else (0.2, 0.15)
+        day = int(rng.integers(19000, 19100))
+        for _ in range(days):
+            if rng.random() < 0.15:
+                edit = day - int(rng.integers(0, WINDOW))
+            else:
+                day += int(rng.integers(2, 2 * WINDOW)) if rng.random() < skip else 1
+                edit = day
+            events.append((uid, edit, bool(rng.random() >= unlogged),
+                           float(rng.normal(300, 400)), bool(rng.random() < 0.6)))
+    return events
+
+
+def _reference(history):
+    """Brute-force metrics for one user's {day: (logged, net, on_target)}."""
+    head = max(history)
+    streak = 0
+    while history.get(head - streak, (False,))[0]:
+        streak += 1
+    result = {'streak': streak}
+    for name, width in (('7', SHORT_WINDOW), ('30', WINDOW)):
+        window = [history[d] for d in range(head - width + 1, head + 1) if d in history and history[d][0]]
+        result['loggedDays' + name] = len(window)
+        result['meanDeficit' + name] = sum(v[1] for v in window) / len(window) if window else np.nan
+        result['adherence' + name] = sum(v[2] for v in window) / len(window) if window else np.nan
+    return result
+
+
+def run_verify(users, days, seed):
+    """Property check: incremental updates, cold start and brute force all agree."""
+    rng = np.random.default_rng(seed)
+    events = _random_events(rng, users, days)
+    incremental = RollingMetrics(range(users))
+    histories = {uid: {} for uid in range(users)}
+    for uid, day, logged, net, on_target in events:
+        incremental.update(uid, day, logged, net, on_target)
+        histories[uid][day] = (logged, net, on_target)
+    cold = RollingMetrics(range(users))
+    rows, event_days, logged, net, on_target = zip(*events)
+    cold.rebuild(rows, event_days, logged, net, on_target)
+
+    failures = 0
+    fast, full = incremental.metrics(), cold.metrics()
+    for name in fast:
+        if not np.allclose(fast[name], full[name], equal_nan=True):
+            bad = np.flatnonzero(~np.isclose(fast[name], full[name], equal_nan=True))
+            print(f"❌ {name}: incremental and cold start differ for {len(bad)} users (first uid {bad[0]})")
+            failures += 1
+    for uid in range(min(users, 500)):
+        expected = _reference(histories[uid])
+        for name, value in expected.items():
+            if not np.isclose(full[name][uid], value, equal_nan=True):
+                print(f"❌ {name}: uid {uid} cold start {full[name][uid]} != brute force {value}")
+                failures += 1
+                break
+    if incremental.stale[:users].any():
+        print(f"❌ {int(incremental.stale[:users].sum())} users marked stale by in-window edits")
+        failures += 1
+    if failures:
+        return 1
+    print(f"✅ {users:,} users, {len(events):,} updates: incremental, cold start and brute force agree "
+          f"(streaks up to {int(full['streak'].max())} days)")
+    return 0
+
+
+def run_benchmark(users, days):
+    print(f"📊 Rolling metrics benchmark: {users:,} users × {days} days")
+    print("=" * 60)
+    rng = np.random.default_rng(42)
+    present = rng.random((users, days)) < 0.7
+    user_rows, day_index = np.nonzero(present)
+    day0 = to_epoch_day(datetime.date.today()) - days
+    net = rng.normal(300, 400, len(user_rows))
+    on_target = rng.random(len(user_rows)) < 0.6
+    logged = rng.random(len(user_rows)) < 0.95
+    print(f"📥 {len(user_rows):,} daily entries (~30% of days missing)")
+
+    engine = RollingMetrics(range(users))
+    start = time.perf_counter()
+    engine.rebuild(user_rows, day0 + day_index, logged, net, on_target)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Cold start: {elapsed:.2f}s ({len(user_rows) / elapsed / 1e6:.1f}M days/s)")
+
+    start = time.perf_counter()
+    metrics = engine.metrics(day0 + days)
+    print(f"✅ Metrics for all users: {(time.perf_counter() - start) * 1000:.1f}ms "
+          f"(median streak {int(np.median(metrics['streak']))} days)")
+
+    sample = rng.integers(0, users, 100_000).tolist()
+    start = time.perf_counter()
+    for uid in sample:
+        engine.update(uid, day0 + days + 1, True, 250.0, True)
+    elapsed = time.perf_counter() - start
+    print(f"⏱️  Incremental update: {elapsed / len(sample) * 1e6:.1f}µs per day")
+
+    edits = rng.integers(0, WINDOW, len(sample)).tolist()
+    start = time.perf_counter()
+    for uid, back in zip(sample, edits):
+        engine.update(uid, day0 + days + 1 - back, True, 100.0, False)
+    elapsed = time.perf_counter() - start
+    print(f"⏱️  Edit within the window: {elapsed / len(sample) * 1e6:.1f}µs per day")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    compute = sub.add_parser('compute', help='Cold-start metrics from exports and print them')
+    compute.add_argument('--entries', required=True, help='JSON/NDJSON dailyEntries export')
+    compute.add_argument('--profiles', help='JSON/NDJSON users export (for BMR)')
+    compute.add_argument('--goals', help='JSON/NDJSON weightLossGoals export')
+    compute.add_argument('--as-of', help='Evaluation date (YYYY-MM-DD), default today')
+
+    verify = sub.add_parser('verify', help='Check incremental updates against the cold start')
+    verify.add_argument('--users', type=int, default=2000)
+    verify.add_argument('--days', type=int, default=200, help='Updates per user')
+    verify.add_argument('--seed', type=int, default=1)
+
+    bench = sub.add_parser('benchmark', help='Measure the cold start and incremental updates')
+    bench.add_argument('--users', type=int, default=100_000)
+    bench.add_argument('--days', type=int, default=365)
+
+    args = parser.parse_args()
+
+    if args.command == 'compute':
+        as_of = datetime.date.fromisoformat(args.as_of) if args.as_of else datetime.date.today()
+        engine = build_metrics(_read_documents(args.entries),
+                               _read_documents(args.profiles) if args.profiles else [],
+                               _read_documents(args.goals) if args.goals else [], as_of)
+        for row in engine.report_rows(to_epoch_day(as_of)):
+            print(json.dumps(row))
+    elif args.command == 'verify':
+        return run_verify(args.users, args.days, args.seed)
+    elif args.command == 'benchmark':
+        run_benchmark(args.users, args.days)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+Entry point for the unified config tooling CLI (see samaan_tools/).
+
+  python3 scripts/samaan.py validate --env staging
+  python3 scripts/samaan.py drift
+  python3 scripts/samaan.py apk ~/Downloads/app-debug.apk
+"""
+
+import sys
+
+from samaan_tools.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
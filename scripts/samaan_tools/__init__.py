@@ -0,0 +1,6 @@
+"""
+Unified CLI for the Samaan AI config tooling.
+Run it through scripts/samaan.py (or `python3 -m samaan_tools` from scripts/).
+Subcommand modules are imported only when their subcommand is chosen, so
+--help and the JSON-only checks never load zip, subprocess or base64 code.
+"""
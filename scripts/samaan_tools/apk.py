@@ -0,0 +1,102 @@
+"""
+apk: package name, signing certificate and Google/Firebase entries of an APK,
+checked against an environment's google-services.json.
+"""
+
+import os
+import zipfile
+
+import tracing
+
+from .config_index import ENVIRONMENTS, load_index
+from .keystore import parse_sha1
+
+GOOGLE_KEYWORDS = ('google', 'firebase', 'oauth', 'client')
+
+
+def add_arguments(parser):
+    parser.add_argument('apk', help='Path to the APK')
+    parser.add_argument('--env', choices=sorted(ENVIRONMENTS), default='staging',
+                        help='Environment whose package name and certificate hash to expect')
+
+
+def _command_output(cmd):
+    try:
+        result = tracing.run(cmd, capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+def package_name(apk_path):
+    for tool in ('aapt2', 'aapt'):
+        output = _command_output([tool, 'dump', 'badging', apk_path])
+        if output:
+            for line in output.split('\n'):
+                if line.startswith('package:'):
+                    return line.split("name='", 1)[1].split("'", 1)[0]
+    return None
+
+
+def signer_sha1(apk_path):
+    """SHA-1 of the first signer, from apksigner or else keytool -printcert -jarfile."""
+    output = _command_output(['apksigner', 'verify', '--print-certs', apk_path])
+    if output:
+        for line in output.split('\n'):
+            if 'certificate SHA-1 digest:' in line:
+                return line.split(':', 1)[1].strip().lower()
+    output = _command_output(['keytool', '-printcert', '-jarfile', apk_path])
+    return parse_sha1(output) if output else None
+
+
+def google_entries(apk_path):
+    with tracing.span('scan APK entries', 'zip') as scan:
+        with zipfile.ZipFile(apk_path, 'r') as apk:
+            names = apk.namelist()
+        matches = [name for name in names if any(k in name.lower() for k in GOOGLE_KEYWORDS)]
+        scan.annotate(entries=len(names), matches=len(matches))
+    return matches
+
+
+def run(args, cache):
+    if not os.path.exists(args.apk):
+        print(f"❌ APK file not found: {args.apk}")
+        return 1
+    expected = ENVIRONMENTS[args.env]
+    config = load_index(cache, args.root, names={f"google_services:{args.env}"})[f"google_services:{args.env}"]
+    expected_sha1 = None
+    if config and config['clients'] and config['clients'][0]['android_oauth']:
+        expected_sha1 = config['clients'][0]['android_oauth'][0]['certificate_hash']
+
+    print(f"🔍 APK analysis: {args.apk}")
+    print("=" * 60)
+    errors = []
+    package = cache.cached(f"apk-package:{os.path.abspath(args.apk)}", [args.apk],
+                           lambda: package_name(args.apk))
+    if package is None:
+        print("⚠️  aapt/aapt2 not found; package name not checked")
+    elif package == expected['package_name']:
+        print(f"✅ Package: {package}")
+    else:
+        errors.append(f"Package {package} (expected {expected['package_name']})")
+
+    sha1 = cache.cached(f"apk-sha1:{os.path.abspath(args.apk)}", [args.apk],
+                        lambda: signer_sha1(args.apk))
+    if sha1 is None:
+        print("⚠️  Could not read the signing certificate (apksigner/keytool missing?)")
+    elif expected_sha1 and sha1.replace(':', '') != expected_sha1.lower():
+        errors.append(f"Signer SHA-1 {sha1} does not match {args.env} google-services.json ({expected_sha1})")
+    else:
+        print(f"✅ Signer SHA-1: {sha1}")
+
+    entries = google_entries(args.apk)
+    if entries:
+        print(f"📋 {len(entries)} Google/Firebase related entries:")
+        for name in entries[:20]:
+            print(f"   - {name}")
+    else:
+        print("⚠️  No Google/Firebase related entries found in APK")
+
+    for error in errors:
+        print(f"❌ {error}")
+    return 1 if errors else 0
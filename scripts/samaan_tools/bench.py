@@ -0,0 +1,108 @@
+"""
+benchmark: cold-start wall time of the CLI against a budget.
+Each case is run in a fresh interpreter and its median wall time, interpreter
+startup included, must stay within the budget; the bare `python -c pass`
+startup is shown alongside for reference. Before timing, every case is parsed
+by both QuickParser and argparse and the results compared, and a case that
+exits with a traceback fails the run. -X importtime confirms the fast paths
+never load the heavy modules.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ('zipfile', 'subprocess', 'base64', 'tempfile')
+LAUNCHER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'samaan.py')
+
+
+def cases(root, cache_dir):
+    """(name, argv) pairs; the global-option cases pin the command scan past option values."""
+    return (
+        ('--help', ['--help']),
+        ('validate', ['validate', '--env', 'staging']),
+        ('drift', ['drift']),
+        ('firebase-options', ['firebase-options']),
+        ('--root … drift', ['--root', root, 'drift']),
+        ('--cache-dir … validate', ['--cache-dir', cache_dir, 'validate']),
+    )
+
+
+def add_arguments(parser):
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--budget-ms', type=float, default=50.0,
+                        help='Allowed median wall time per command, interpreter startup included')
+
+
+def _time(argv, runs, env):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def parser_mismatches(argv_list):
+    """Command lines where QuickParser and argparse disagree on the parsed values."""
+    from .cli import _global_options, _load, build_parser, COMMANDS
+    from .quickparse import Fallback, parse_command
+
+    mismatches = []
+    for argv in argv_list:
+        if '--help' in argv:
+            continue
+        try:
+            quick = vars(parse_command(list(argv), _global_options(), COMMANDS, _load))
+        except Fallback:
+            mismatches.append((argv, 'QuickParser fell back to argparse'))
+            continue
+        full = vars(build_parser(list(argv)).parse_args(list(argv)))
+        if quick != full:
+            mismatches.append((argv, f"{quick} != {full}"))
+    return mismatches
+
+
+def heavy_imports(args, env):
+    """Heavy stdlib modules imported by a run, from -X importtime output."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', LAUNCHER] + args,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, env=env)
+    loaded = {line.rsplit('|', 1)[-1].strip() for line in result.stderr.splitlines() if '|' in line}
+    return sorted(name for name in HEAVY_MODULES if name in loaded)
+
+
+def run(args, cache):
+    cache_dir = os.path.dirname(cache.path)
+    env = dict(os.environ, SAMAAN_CACHE_DIR=cache_dir)
+    env.pop('SAMAAN_TRACE', None)
+    # The warm-up run also writes bytecode, as any installed copy would have
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    timed = cases(args.root, cache_dir)
+    failures = [f"{' '.join(argv)}: {problem}" for argv, problem in parser_mismatches([a for _, a in timed])]
+    baseline, _ = _time([sys.executable, '-c', 'pass'], args.runs, env)
+    print(f"📊 CLI cold start ({args.runs} runs each, interpreter baseline {baseline:.1f}ms)")
+    print("=" * 72)
+    print(f"{'command':<24} {'median':>9} {'max':>9} {'over base':>10}  heavy imports")
+    over_budget = []
+    for name, argv in timed:
+        # Warm the on-disk cache first so the timed runs see the steady state
+        warm = subprocess.run([sys.executable, LAUNCHER] + argv, stdout=subprocess.DEVNULL,
+                              stderr=subprocess.PIPE, text=True, env=env)
+        if 'Traceback (most recent call last)' in warm.stderr:
+            failures.append(f"{name}: {warm.stderr.strip().splitlines()[-1]}")
+        median, longest = _time([sys.executable, LAUNCHER] + argv, args.runs, env)
+        heavy = heavy_imports(argv, env)
+        if median > args.budget_ms:
+            over_budget.append(name)
+        print(f"{name:<24} {median:>7.1f}ms {longest:>7.1f}ms {median - baseline:>8.1f}ms  "
+              f"{', '.join(heavy) or '-'}")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if over_budget:
+        print(f"❌ Over the {args.budget_ms:.0f}ms budget: {', '.join(over_budget)}")
+    if failures or over_budget:
+        return 1
+    print(f"✅ All commands start and finish within {args.budget_ms:.0f}ms")
+    return 0
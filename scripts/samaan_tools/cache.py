@@ -0,0 +1,89 @@
+"""
+On-disk cache shared by the CLI subcommands.
+Each value is tied to the stat signature (mtime, size) of the files it was
+derived from, so editing a google-services.json or regenerating a keystore
+invalidates exactly the entries built from it.
+"""
+
+import json
+import os
+
+CACHE_DIR_ENV = 'SAMAAN_CACHE_DIR'
+CACHE_FILE = 'cache.json'
+CACHE_VERSION = 1
+
+
+def default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.environ.get(CACHE_DIR_ENV) or os.path.join(base, 'samaan-tools')
+
+
+def signature(paths):
+    """[path, mtime_ns, size] per source file; missing files sign as [path, None, None]."""
+    signed = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signed.append([os.path.abspath(path), stat.st_mtime_ns, stat.st_size])
+        except OSError:
+            signed.append([os.path.abspath(path), None, None])
+    return signed
+
+
+class DiskCache:
+    """JSON-backed key/value cache, loaded lazily and written once on save()."""
+
+    def __init__(self, directory=None, enabled=True):
+        self.path = os.path.join(directory or default_cache_dir(), CACHE_FILE)
+        self.enabled = enabled
+        self._entries = None
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        try:
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+            if state.get('version') == CACHE_VERSION:
+                self._entries = state.get('entries', {})
+        except (OSError, ValueError):
+            pass
+
+    def cached(self, key, sources, compute):
+        """Return the value stored for key if its sources are unchanged, else compute it.
+
+        None results are returned but not stored, so a failed lookup (no
+        keytool, unreadable file) is retried on the next run.
+        """
+        if not self.enabled:
+            return compute()
+        self._load()
+        signed = signature(sources)
+        entry = self._entries.get(key)
+        if entry is not None and entry['sources'] == signed:
+            self.hits += 1
+            return entry['value']
+        self.misses += 1
+        value = compute()
+        if value is not None:
+            self._entries[key] = {'sources': signed, 'value': value}
+            self._dirty = True
+        return value
+
+    def clear(self):
+        self._entries = {}
+        self._dirty = True
+
+    def save(self):
+        if not self.enabled or not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': CACHE_VERSION, 'entries': self._entries}, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
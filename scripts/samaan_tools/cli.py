@@ -0,0 +1,116 @@
+"""
+Argument parsing and lazy subcommand dispatch.
+Every subcommand module exposes add_arguments(parser) and run(args, cache).
+Only the module of the subcommand being run is imported; the others are
+listed from COMMANDS alone. Well-formed command lines are parsed by
+QuickParser, so argparse is imported only for --help and usage errors, and
+tracing and the disk cache are loaded only once a subcommand actually runs.
+"""
+
+import importlib
+import os
+import sys
+
+from .config_index import REPO_ROOT
+from .quickparse import Fallback, QuickParser, parse_command
+
+# tracing.PROFILE_FLAG / tracing.TRACE_ENV, checked here so tracing is only
+# imported when a trace was asked for
+PROFILE_FLAG = '--profile'
+TRACE_ENV = 'SAMAAN_TRACE'
+
+COMMANDS = {
+    'validate': ('samaan_tools.validate',
+                 'Check google-services.json, certificate hash and web client ID for an environment'),
+    'secrets': ('samaan_tools.github_secrets',
+                'Print base64 values for the GitHub Actions secrets'),
+    'apk': ('samaan_tools.apk',
+            'Inspect an APK: package, signing certificate and bundled Google config'),
+    'firebase-options': ('samaan_tools.firebase_options',
+                         'Compare or update the Android block of lib/firebase_options.dart'),
+    'drift': ('samaan_tools.drift',
+              'Report project IDs and keys that disagree across config files'),
+    'benchmark': ('samaan_tools.bench',
+                  'Measure CLI cold-start time against a budget'),
+}
+
+
+def add_global_options(parser):
+    parser.add_argument('--root', default=REPO_ROOT, help='Repository root (default: this checkout)')
+    parser.add_argument('--cache-dir', help='Cache directory (default: $SAMAAN_CACHE_DIR or ~/.cache/samaan-tools)')
+    parser.add_argument('--no-cache', action='store_true',
+                        default=os.environ.get('SAMAAN_NO_CACHE', '') not in ('', '0'),
+                        help='Ignore cached parses, fingerprints and verdicts (or set SAMAAN_NO_CACHE=1)')
+
+
+def _global_options():
+    parser = QuickParser()
+    add_global_options(parser)
+    return parser
+
+
+def _chosen_command(argv):
+    """The command named in argv, skipping the values of global options."""
+    takes_value = [name for name, spec in _global_options().options.items()
+                   if spec.get('action') != 'store_true']
+    args = iter(argv)
+    for arg in args:
+        if arg in ('-h', '--help'):
+            return None
+        if arg.startswith('--') and '=' not in arg and len(arg) > 2:
+            # argparse also accepts unambiguous prefixes such as --cache
+            if any(name.startswith(arg) for name in takes_value):
+                next(args, None)
+            continue
+        if arg.startswith('-'):
+            continue
+        return arg if arg in COMMANDS else None
+    return None
+
+
+def _load(name, parser):
+    module = importlib.import_module(COMMANDS[name][0])
+    module.add_arguments(parser)
+    return module.run
+
+
+def build_parser(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='samaan', description='Samaan AI config tooling (add --profile to trace any command)')
+    add_global_options(parser)
+    sub = parser.add_subparsers(dest='command', metavar='command', required=True)
+    chosen = _chosen_command(argv)
+    # Each subparser costs an ArgumentParser; --help and typos still get all of them
+    names = [chosen] if chosen else list(COMMANDS)
+    for name in names:
+        command_parser = sub.add_parser(name, help=COMMANDS[name][1], description=COMMANDS[name][1])
+        if name == chosen:
+            command_parser.set_defaults(handler=_load(name, command_parser))
+    return parser
+
+
+def parse_args(argv):
+    """Namespace for argv; argparse only sees command lines QuickParser hands back."""
+    try:
+        return parse_command(argv, _global_options(), COMMANDS, _load)
+    except Fallback:
+        return build_parser(argv).parse_args(argv)
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if PROFILE_FLAG in argv or os.environ.get(TRACE_ENV):
+        import tracing
+
+        argv = tracing.setup(argv)
+    args = parse_args(argv)
+
+    from .cache import DiskCache
+
+    cache = DiskCache(args.cache_dir, enabled=not args.no_cache)
+    try:
+        return args.handler(args, cache)
+    finally:
+        cache.save()
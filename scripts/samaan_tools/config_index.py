@@ -0,0 +1,111 @@
+"""
+Parsed view of the Firebase config files the subcommands check.
+Each source is parsed once and kept in the disk cache until the file changes.
+tracing is imported by the parsers themselves, so a fully cached run never
+loads it.
+"""
+
+import os
+import re
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ENVIRONMENTS = {
+    'staging': {
+        'project_id': 'samaan-ai-staging-2025',
+        'package_name': 'com.samaanai.productivityhealth',
+        'google_services': 'android/app/google-services.json',
+        'secret': 'GOOGLE_SERVICES_STAGING',
+    },
+    'production': {
+        'project_id': 'samaan-ai-production-2025',
+        'package_name': 'com.samaanai.productivityhealth.prod',
+        'google_services': 'android/app/google-services-production.json',
+        'secret': 'GOOGLE_SERVICES_PROD',
+    },
+}
+
+FIREBASE_OPTIONS = 'lib/firebase_options.dart'
+FIREBASERC = '.firebaserc'
+WEB_INDEX = 'web/index.html'
+
+_OPTIONS_BLOCK = re.compile(r'static const FirebaseOptions (\w+) = FirebaseOptions\((.*?)\);', re.DOTALL)
+_OPTIONS_FIELD = re.compile(r"(\w+):\s*'([^']*)'")
+_WEB_CLIENT_ID = re.compile(r'<meta name="google-signin-client_id" content="([^"]*)"')
+
+
+def parse_google_services(path):
+    """The fields of a google-services.json the checks compare, per Android client."""
+    import tracing
+
+    data = tracing.load_json(path)
+    project = data.get('project_info', {})
+    clients = []
+    for client in data.get('client', []):
+        info = client.get('client_info', {})
+        oauth = client.get('oauth_client', [])
+        clients.append({
+            'app_id': info.get('mobilesdk_app_id'),
+            'package_name': info.get('android_client_info', {}).get('package_name'),
+            'api_key': (client.get('api_key') or [{}])[0].get('current_key'),
+            'android_oauth': [{'client_id': c.get('client_id'),
+                               'package_name': c.get('android_info', {}).get('package_name'),
+                               'certificate_hash': c.get('android_info', {}).get('certificate_hash')}
+                              for c in oauth if c.get('client_type') == 1],
+            'web_client_ids': [c.get('client_id') for c in oauth if c.get('client_type') == 3],
+        })
+    return {
+        'project_id': project.get('project_id'),
+        'project_number': project.get('project_number'),
+        'storage_bucket': project.get('storage_bucket'),
+        'clients': clients,
+    }
+
+
+def parse_firebase_options(path):
+    """{platform: {field: value}} for every FirebaseOptions block in the Dart file."""
+    import tracing
+
+    content = tracing.read_text(path)
+    with tracing.span('extract FirebaseOptions blocks', 'parse'):
+        return {platform: dict(_OPTIONS_FIELD.findall(body))
+                for platform, body in _OPTIONS_BLOCK.findall(content)}
+
+
+def parse_firebaserc(path):
+    import tracing
+
+    return tracing.load_json(path).get('projects', {})
+
+
+def parse_web_client_id(path):
+    """The google-signin-client_id meta value, or '' when the tag is missing."""
+    import tracing
+
+    match = _WEB_CLIENT_ID.search(tracing.read_text(path))
+    return match.group(1) if match else ''
+
+
+def _sources(root):
+    sources = {f"google_services:{env}": (os.path.join(root, config['google_services']), parse_google_services)
+               for env, config in ENVIRONMENTS.items()}
+    sources['firebase_options'] = (os.path.join(root, FIREBASE_OPTIONS), parse_firebase_options)
+    sources['firebaserc'] = (os.path.join(root, FIREBASERC), parse_firebaserc)
+    sources['web_client_id'] = (os.path.join(root, WEB_INDEX), parse_web_client_id)
+    return sources
+
+
+def load_index(cache, root=REPO_ROOT, names=None):
+    """Parsed config sources by name; a missing or unreadable file maps to None."""
+    index = {}
+    for name, (path, parse) in _sources(root).items():
+        if names is not None and name not in names:
+            continue
+
+        def compute(path=path, parse=parse):
+            try:
+                return parse(path)
+            except (OSError, ValueError):
+                return None
+        index[name] = cache.cached(f"index:{name}:{path}", [path], compute)
+    return index
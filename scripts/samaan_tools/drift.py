@@ -0,0 +1,73 @@
+"""
+drift: cross-file consistency of project IDs, sender IDs and Android keys.
+The app is built against staging by default, so lib/firebase_options.dart is
+compared with the staging google-services.json and the .firebaserc default.
+"""
+
+from .config_index import ENVIRONMENTS, FIREBASE_OPTIONS, FIREBASERC, load_index
+from .firebase_options import expected_values
+
+PLACEHOLDER_PREFIX = 'YOUR_'
+
+
+def add_arguments(parser):
+    parser.add_argument('--strict', action='store_true',
+                        help='Treat warnings (placeholders, missing files) as failures')
+
+
+def find_drift(index):
+    """(level, source, message) findings; level is 'error' or 'warning'."""
+    findings = []
+    firebaserc = index['firebaserc'] or {}
+    if not firebaserc:
+        findings.append(('warning', FIREBASERC, 'missing or has no projects'))
+
+    for env, expected in ENVIRONMENTS.items():
+        config = index[f"google_services:{env}"]
+        source = expected['google_services']
+        if config is None:
+            findings.append(('warning', source, 'missing or not valid JSON'))
+            continue
+        if config['project_id'] != expected['project_id']:
+            findings.append(('error', source, f"project {config['project_id']}, expected {expected['project_id']}"))
+        aliased = firebaserc.get(env)
+        if aliased and aliased != config['project_id']:
+            findings.append(('error', FIREBASERC, f"{env} alias is {aliased}, google-services.json uses {config['project_id']}"))
+        for client in config['clients']:
+            if client['package_name'] != expected['package_name']:
+                findings.append(('error', source, f"package {client['package_name']}, expected {expected['package_name']}"))
+
+    staging = index['google_services:staging']
+    default_project = firebaserc.get('default') or ENVIRONMENTS['staging']['project_id']
+    for platform, fields in (index['firebase_options'] or {}).items():
+        source = f"{FIREBASE_OPTIONS} ({platform})"
+        if fields.get('projectId') != default_project:
+            findings.append(('error', source, f"projectId {fields.get('projectId')}, .firebaserc default is {default_project}"))
+        if staging and fields.get('messagingSenderId') not in (None, staging['project_number']):
+            findings.append(('error', source, f"messagingSenderId {fields['messagingSenderId']}, "
+                                              f"project number is {staging['project_number']}"))
+        for field, value in fields.items():
+            if value.startswith(PLACEHOLDER_PREFIX):
+                findings.append(('warning', source, f"{field} is still a placeholder"))
+        if platform == 'android' and staging and staging['clients']:
+            for field, value in expected_values(staging).items():
+                if fields.get(field) != value:
+                    findings.append(('error', source, f"{field} differs from google-services.json"))
+    if index['firebase_options'] is None:
+        findings.append(('warning', FIREBASE_OPTIONS, 'missing'))
+    return findings
+
+
+def run(args, cache):
+    findings = find_drift(load_index(cache, args.root))
+    print("🔍 Configuration drift report")
+    print("=" * 60)
+    if not findings:
+        print("✅ No drift: project IDs, sender IDs and Android keys agree across config files")
+        return 0
+    for level, source, message in findings:
+        print(f"{'❌' if level == 'error' else '⚠️ '} {source}: {message}")
+    errors = sum(1 for level, _, _ in findings if level == 'error')
+    warnings = len(findings) - errors
+    print(f"\n📊 {errors} errors, {warnings} warnings")
+    return 1 if errors or (args.strict and warnings) else 0
@@ -0,0 +1,82 @@
+"""
+firebase-options: compare the Android FirebaseOptions block with
+google-services.json, and optionally rewrite it to match.
+"""
+
+import os
+import re
+
+import tracing
+
+from .config_index import ENVIRONMENTS, FIREBASE_OPTIONS, load_index
+
+_ANDROID_BLOCK = re.compile(r'(static const FirebaseOptions android = FirebaseOptions\(\s*)(.*?)(\s*\);)',
+                            re.DOTALL)
+
+
+def add_arguments(parser):
+    parser.add_argument('--env', choices=sorted(ENVIRONMENTS), default='staging',
+                        help='Environment whose google-services.json is the source of truth')
+    parser.add_argument('--write', action='store_true',
+                        help='Update apiKey, appId and storageBucket in place when they differ')
+
+
+def expected_values(config):
+    client = config['clients'][0]
+    return {
+        'appId': client['app_id'],
+        'apiKey': client['api_key'],
+        'projectId': config['project_id'],
+        'storageBucket': config['storage_bucket'],
+    }
+
+
+def rewrite_android_block(content, values):
+    """content with the given fields replaced inside the Android block only."""
+    match = _ANDROID_BLOCK.search(content)
+    if not match:
+        return None
+    block = match.group(2)
+    for field, value in values.items():
+        block = re.sub(rf"{field}: '[^']*'", lambda _: f"{field}: '{value}'", block)
+    return content[:match.start(2)] + block + content[match.end(2):]
+
+
+def run(args, cache):
+    index = load_index(cache, args.root, names={f"google_services:{args.env}", 'firebase_options'})
+    config = index[f"google_services:{args.env}"]
+    options = index['firebase_options']
+    if not config or not config['clients']:
+        print(f"❌ {ENVIRONMENTS[args.env]['google_services']} is missing or has no clients")
+        return 1
+    if not options or 'android' not in options:
+        print(f"❌ Could not find the Android FirebaseOptions block in {FIREBASE_OPTIONS}")
+        return 1
+
+    expected = expected_values(config)
+    android = options['android']
+    mismatched = {}
+    print(f"🔍 {FIREBASE_OPTIONS} (android) vs {args.env} google-services.json")
+    for field, value in expected.items():
+        actual = android.get(field, '')
+        shown = (lambda v: f"{v[:10]}***") if field == 'apiKey' else (lambda v: v)
+        marker = '✅' if actual == value else '❌'
+        print(f"{marker} {field:<14} JSON={shown(value or '')} | DART={shown(actual)}")
+        if actual != value:
+            mismatched[field] = value
+
+    if not mismatched:
+        print('✅ All Firebase Android configuration values match google-services.json')
+        return 0
+    if not args.write:
+        print('❌ Firebase configuration mismatch; rerun with --write to update the Dart file')
+        return 1
+
+    path = os.path.join(args.root, FIREBASE_OPTIONS)
+    # projectId is not rewritten: a different project means the wrong file, not a stale value
+    updates = {field: value for field, value in mismatched.items() if field != 'projectId'}
+    content = rewrite_android_block(tracing.read_text(path), updates)
+    with open(path, 'w') as f:
+        f.write(content)
+    print(f"✅ Updated {', '.join(sorted(updates))} in {FIREBASE_OPTIONS}")
+    return 1 if 'projectId' in mismatched else 0
@@ -0,0 +1,53 @@
+"""
+secrets: base64 values to paste into GitHub Actions secrets.
+"""
+
+import base64
+import os
+
+import tracing
+
+from .config_index import ENVIRONMENTS
+from .keystore import DEBUG_KEYSTORE
+
+
+def add_arguments(parser):
+    parser.add_argument('--env', choices=sorted(ENVIRONMENTS), action='append',
+                        help='Environment(s) whose google-services.json to encode (default: all)')
+    parser.add_argument('--file', action='append', default=[], metavar='NAME=PATH',
+                        help='Extra secret to encode from a file')
+    parser.add_argument('--no-debug-keystore', action='store_true',
+                        help='Skip DEBUG_KEYSTORE')
+
+
+def encode_file(path):
+    data = tracing.read_bytes(path)
+    with tracing.span(f"base64 {os.path.basename(path)}", 'encode'):
+        return base64.b64encode(data).decode('ascii')
+
+
+def run(args, cache):
+    secrets = []
+    for env in args.env or sorted(ENVIRONMENTS):
+        config = ENVIRONMENTS[env]
+        secrets.append((config['secret'], os.path.join(args.root, config['google_services'])))
+    if not args.no_debug_keystore:
+        secrets.append(('DEBUG_KEYSTORE', os.path.expanduser(DEBUG_KEYSTORE)))
+    for pair in args.file:
+        name, sep, path = pair.partition('=')
+        if not sep:
+            print(f"❌ --file expects NAME=PATH, got: {pair}")
+            return 1
+        secrets.append((name, path))
+
+    missing = 0
+    for name, path in secrets:
+        if not os.path.exists(path):
+            print(f"⚠️  {name}: {path} not found")
+            missing += 1
+            continue
+        print(f"🔐 {name}:")
+        print(encode_file(path))
+        print()
+    print("📝 Add these under GitHub → Settings → Secrets and variables → Actions")
+    return 1 if missing == len(secrets) else 0
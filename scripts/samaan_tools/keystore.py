@@ -0,0 +1,41 @@
+"""
+Keystore fingerprints via keytool, cached against the keystore file.
+Passwords are passed to keytool only; they are not part of any cache key.
+"""
+
+import os
+
+DEBUG_KEYSTORE = os.path.join('~', '.android', 'debug.keystore')
+DEBUG_ALIAS = 'androiddebugkey'
+DEBUG_PASSWORD = 'android'
+
+
+def parse_sha1(keytool_output):
+    """Lower-case, colon-free SHA-1 from `keytool -list -v` output, or None."""
+    for line in keytool_output.split('\n'):
+        if 'SHA1:' in line:
+            return line.split('SHA1:')[1].strip().replace(':', '').lower()
+    return None
+
+
+def sha1_fingerprint(cache, keystore=DEBUG_KEYSTORE, alias=DEBUG_ALIAS,
+                     store_pass=DEBUG_PASSWORD, key_pass=DEBUG_PASSWORD):
+    """SHA-1 of one keystore alias; None if the keystore or keytool is unavailable."""
+    path = os.path.expanduser(keystore)
+    if not os.path.exists(path):
+        return None
+
+    def compute():
+        import tracing
+
+        try:
+            result = tracing.run(['keytool', '-list', '-v', '-keystore', path, '-alias', alias,
+                                  '-storepass', store_pass, '-keypass', key_pass],
+                                 capture_output=True, text=True)
+        except OSError:
+            return None
+        if result.returncode != 0:
+            return None
+        return parse_sha1(result.stdout)
+
+    return cache.cached(f"keystore-sha1:{os.path.abspath(path)}:{alias}", [path], compute)
@@ -0,0 +1,116 @@
+"""
+Argument parsing for the common case without importing argparse.
+QuickParser records the same add_argument calls the subcommand modules make
+on an argparse parser and parses well-formed command lines itself. Anything
+it does not handle exactly like argparse (--help, errors, abbreviations,
+unsupported keywords) raises Fallback, and the caller re-parses with
+argparse for the real help text and error messages.
+"""
+
+import types
+
+# add_argument keywords QuickParser understands; any other one forces a fallback
+_SUPPORTED = {'action', 'choices', 'default', 'type', 'help', 'metavar'}
+_ACTIONS = (None, 'store', 'store_true', 'append')
+
+
+class Fallback(Exception):
+    """The command line needs argparse (help, an error, or an unsupported option)."""
+
+
+class QuickParser:
+    def __init__(self):
+        self.options = {}
+        self.positionals = []
+        self.supported = True
+
+    def add_argument(self, name, **kwargs):
+        if set(kwargs) - _SUPPORTED or kwargs.get('action') not in _ACTIONS:
+            self.supported = False
+            return
+        if name.startswith('-'):
+            self.options[name] = dict(kwargs, dest=name.lstrip('-').replace('-', '_'))
+        else:
+            self.positionals.append(dict(kwargs, dest=name))
+
+    def defaults(self):
+        values = {}
+        for spec in self.options.values():
+            default = spec.get('default')
+            if spec.get('action') == 'store_true' and default is None:
+                default = False
+            elif isinstance(default, str) and spec.get('type') is not None:
+                # argparse converts string defaults as if they were given
+                default = spec['type'](default)
+            values[spec['dest']] = list(default) if isinstance(default, list) else default
+        return values
+
+    def _store(self, values, spec, value):
+        if spec.get('choices') is not None and value not in spec['choices']:
+            raise Fallback(value)
+        if spec.get('type') is not None:
+            try:
+                value = spec['type'](value)
+            except (TypeError, ValueError):
+                raise Fallback(value)
+        if spec.get('action') == 'append':
+            values[spec['dest']] = (values[spec['dest']] or []) + [value]
+        else:
+            values[spec['dest']] = value
+
+    def parse(self, argv, values, stop_at_positional=False):
+        """Fill values from argv; returns the index of the first positional when stop_at_positional."""
+        if not self.supported:
+            raise Fallback()
+        positionals = iter(self.positionals)
+        i = 0
+        while i < len(argv):
+            arg = argv[i]
+            if not arg.startswith('-') or arg == '-':
+                if stop_at_positional:
+                    return i
+                spec = next(positionals, None)
+                if spec is None:
+                    raise Fallback(arg)
+                self._store(values, spec, arg)
+                i += 1
+                continue
+            name, has_value, inline = arg.partition('=')
+            spec = self.options.get(name)
+            # Unknown options, prefixes, '--' and -h/--help are argparse's job
+            if spec is None:
+                raise Fallback(arg)
+            if spec.get('action') == 'store_true':
+                if has_value:
+                    raise Fallback(arg)
+                values[spec['dest']] = True
+                i += 1
+                continue
+            if has_value:
+                value, i = inline, i + 1
+            elif i + 1 < len(argv) and not argv[i + 1].startswith('-'):
+                value, i = argv[i + 1], i + 2
+            else:
+                raise Fallback(arg)
+            self._store(values, spec, value)
+        if stop_at_positional or next(positionals, None) is not None:
+            raise Fallback()
+        return len(argv)
+
+
+def parse_command(argv, global_options, commands, load):
+    """Namespace for `[global options] command [options]`, or raise Fallback.
+
+    global_options is a QuickParser; load(name, parser) adds the command's
+    arguments to a fresh QuickParser and returns the command's handler.
+    """
+    values = global_options.defaults()
+    at = global_options.parse(argv, values, stop_at_positional=True)
+    command = argv[at]
+    if command not in commands:
+        raise Fallback(command)
+    parser = QuickParser()
+    handler = load(command, parser)
+    values.update(parser.defaults())
+    parser.parse(argv[at + 1:], values)
+    return types.SimpleNamespace(command=command, handler=handler, **values)
@@ -0,0 +1,107 @@
+"""
+validate: structural checks of one environment's Android and web config.
+Only JSON/HTML parsing runs by default; --check-keystore adds the keytool
+comparison against the local debug keystore (cached between runs). The
+verdict is cached on the SHA-256 of the inputs, see validation_cache.py.
+"""
+
+import os
+
+from .config_index import ENVIRONMENTS, WEB_INDEX, load_index
+from .keystore import DEBUG_KEYSTORE
+
+# Bump when the checks below change so cached verdicts are not reused
+RULES_VERSION = 1
+
+
+def add_arguments(parser):
+    parser.add_argument('--env', choices=sorted(ENVIRONMENTS), default='staging')
+    parser.add_argument('--expected-sha1', default=os.environ.get('EXPECTED_DEBUG_SHA1'),
+                        help='Certificate hash the Android OAuth client must carry '
+                             '(default: $EXPECTED_DEBUG_SHA1)')
+    parser.add_argument('--check-keystore', action='store_true',
+                        help='Also compare against ~/.android/debug.keystore via keytool')
+
+
+def check_google_services(config, expected, expected_sha1=None):
+    """(errors, notes) for one parsed google-services.json."""
+    errors, notes = [], []
+    if config is None:
+        return [f"{expected['google_services']} is missing or not valid JSON"], notes
+    notes.append(f"Project ID: {config['project_id']}")
+    if config['project_id'] != expected['project_id']:
+        errors.append(f"Expected project {expected['project_id']}, got {config['project_id']}")
+    android = [oauth for client in config['clients'] for oauth in client['android_oauth']]
+    if not android:
+        errors.append('No Android OAuth client (client_type 1)')
+        return errors, notes
+    oauth = android[0]
+    notes.append(f"Package Name: {oauth['package_name']}")
+    notes.append(f"Certificate Hash: {oauth['certificate_hash']}")
+    if oauth['package_name'] != expected['package_name']:
+        errors.append(f"Unexpected package name: {oauth['package_name']}")
+    if expected_sha1 and (oauth['certificate_hash'] or '').lower() != expected_sha1.lower().replace(':', ''):
+        errors.append(f"Certificate hash {oauth['certificate_hash']} does not match {expected_sha1}")
+    return errors, notes
+
+
+def run(args, cache):
+    import validation_cache
+
+    verdicts = validation_cache.VerdictCache(enabled=cache.enabled)
+    inputs = [os.path.join(args.root, ENVIRONMENTS[args.env]['google_services']),
+              os.path.join(args.root, WEB_INDEX)]
+    if args.check_keystore:
+        inputs.append(os.path.expanduser(DEBUG_KEYSTORE))
+    return verdicts.run(f"samaan validate {args.env}", RULES_VERSION, inputs,
+                        lambda: check(args, cache),
+                        extra=[(args.expected_sha1 or '').lower(), args.check_keystore],
+                        # A keytool that could not run says nothing about the inputs
+                        transient_codes=(2,))
+
+
+def check(args, cache):
+    expected = ENVIRONMENTS[args.env]
+    index = load_index(cache, args.root, names={f"google_services:{args.env}", 'web_client_id'})
+    config = index[f"google_services:{args.env}"]
+    print(f"🔍 Validating {args.env} configuration ({expected['google_services']})")
+
+    errors, notes = check_google_services(config, expected, args.expected_sha1)
+    for note in notes:
+        print(f"✅ {note}")
+    if not args.expected_sha1:
+        print('⚠️  EXPECTED_DEBUG_SHA1 not set; skipping certificate hash enforcement')
+
+    incomplete = False
+    if args.check_keystore and config and not errors:
+        from .keystore import sha1_fingerprint
+
+        local_sha1 = sha1_fingerprint(cache)
+        configured = config['clients'][0]['android_oauth'][0]['certificate_hash']
+        if local_sha1 is None:
+            print('⚠️  Could not read the debug keystore SHA-1 (keytool or keystore missing)')
+            incomplete = True
+        elif local_sha1 == (configured or '').lower():
+            print(f"✅ Debug keystore SHA-1 matches: {local_sha1}")
+        else:
+            errors.append(f"Debug keystore SHA-1 {local_sha1} does not match {configured}")
+
+    web_client_id = index['web_client_id']
+    if web_client_id is None:
+        errors.append('web/index.html not found')
+    elif web_client_id == '{{GOOGLE_CLIENT_ID}}':
+        print('⚠️  web/index.html still has the {{GOOGLE_CLIENT_ID}} placeholder (replaced in CI)')
+    elif web_client_id.endswith('apps.googleusercontent.com'):
+        print(f"✅ Web client ID: {web_client_id}")
+    else:
+        errors.append('web/index.html is missing a Google client ID')
+
+    for error in errors:
+        print(f"❌ {error}")
+    if errors:
+        return 1
+    if incomplete:
+        print(f"⚠️  {args.env.capitalize()} configuration could not be fully validated")
+        return 2
+    print(f"✅ {args.env.capitalize()} configuration is valid!")
+    return 0
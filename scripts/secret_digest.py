@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Compare base64-encoded secrets with the local files they were made from.
+Each secret is read in chunks from an environment variable, a base64 text
+file or stdin, decoded incrementally and hashed as it goes; only the SHA-256
+and size of the decoded bytes are kept. The local google-services JSONs and
+keystores are hashed the same way, so a secret of hundreds of MB is checked
+in constant memory and its plaintext is never written anywhere. Several
+secrets are verified in parallel, one worker process each.
+
+  GOOGLE_SERVICES_STAGING=... python3 scripts/secret_digest.py --env GOOGLE_SERVICES_STAGING
+  python3 scripts/secret_digest.py --file staging-google-services-base64.txt=android/app/google-services.json
+  base64 -w0 my.jks | python3 scripts/secret_digest.py --stdin android/app/production-keystore.jks
+
+With no sources given, every known secret set in the environment is checked,
+plus the committed staging-google-services-base64.txt.
+"""
+
+import argparse
+import base64
+import binascii
+import hashlib
+import os
+import sys
+import time
+
+import tracing
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHUNK_SIZE = 1024 * 1024  # base64 characters read per step
+WHITESPACE = b' \t\r\n'
+
+# GitHub Actions secret -> file it is the base64 of
+KNOWN_SECRETS = {
+    'GOOGLE_SERVICES_STAGING': 'android/app/google-services.json',
+    'GOOGLE_SERVICES_PROD': 'android/app/google-services-production.json',
+    'DEBUG_KEYSTORE': '~/.android/debug.keystore',
+    'ANDROID_RELEASE_KEYSTORE': 'android/app/production-keystore.jks',
+}
+COMMITTED_ENCODINGS = {
+    'staging-google-services-base64.txt': 'android/app/google-services.json',
+}
+
+
+class Base64Decoder:
+    """Incremental base64 decoder; feed() text in any split, finish() at the end.
+
+    Whitespace and line breaks are ignored (so `base64` output wrapped at 76
+    columns works). Characters outside the alphabet, padding before the end
+    and a truncated final group raise binascii.Error.
+    """
+
+    def __init__(self):
+        self._pending = b''
+        self._ended = False
+
+    def feed(self, data):
+        data = data.translate(None, WHITESPACE)
+        if not data:
+            return b''
+        if self._ended:
+            raise binascii.Error('data after base64 padding')
+        data = self._pending + data
+        usable = len(data) - len(data) % 4
+        block, self._pending = data[:usable], data[usable:]
+        padding = block.find(b'=')
+        if padding != -1:
+            if padding < usable - 2 or block[padding:].strip(b'='):
+                raise binascii.Error('base64 padding in the middle of the data')
+            self._ended = True
+        return base64.b64decode(block, validate=True)
+
+    def finish(self):
+        if self._pending:
+            raise binascii.Error(f"truncated base64 ({len(self._pending)} trailing characters)")
+
+
+def _env_chunks(name):
+    value = os.environ.get(name)
+    if value is None:
+        return None
+
+    def chunks():
+        for start in range(0, len(value), CHUNK_SIZE):
+            yield value[start:start + CHUNK_SIZE].encode('ascii')
+    return chunks()
+
+
+def _file_chunks(f):
+    return iter(lambda: f.read(CHUNK_SIZE), b'')
+
+
+def decoded_digest(chunks):
+    """(sha256 hex, decoded size) of base64 text arriving as byte chunks."""
+    decoder = Base64Decoder()
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in chunks:
+        data = decoder.feed(chunk)
+        digest.update(data)
+        size += len(data)
+    decoder.finish()
+    return digest.hexdigest(), size
+
+
+def file_digest(path):
+    """(sha256 hex, size) of a local file, or None when it does not exist."""
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(path, 'rb') as f:
+            for chunk in _file_chunks(f):
+                digest.update(chunk)
+                size += len(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest(), size
+
+
+def _resolve(path):
+    path = os.path.expanduser(path)
+    return path if os.path.isabs(path) else os.path.join(REPO_ROOT, path)
+
+
+def verify(spec, stream=None):
+    """Compare one secret with its local file.
+
+    spec is (label, kind, where, local) with kind 'env', 'file' or 'stdin';
+    stream is the binary stream for 'stdin'. Returns a result dict whose
+    status is match, mismatch, invalid, no-secret or no-local.
+    """
+    label, kind, where, local = spec
+    result = {'label': label, 'local': local, 'status': None}
+    start = time.perf_counter()
+    with tracing.span(f"verify {label}", 'encode') as span:
+        try:
+            if kind == 'env':
+                chunks = _env_chunks(where)
+                if chunks is None:
+                    result['status'] = 'no-secret'
+                    return result
+                result['secret'] = decoded_digest(chunks)
+            elif kind == 'file':
+                with open(_resolve(where), 'rb') as f:
+                    result['secret'] = decoded_digest(_file_chunks(f))
+            else:
+                result['secret'] = decoded_digest(_file_chunks(stream))
+        except FileNotFoundError:
+            result['status'] = 'no-secret'
+            return result
+        except (binascii.Error, UnicodeEncodeError) as e:
+            result['status'] = 'invalid'
+            result['error'] = str(e)
+            return result
+        result['local_digest'] = file_digest(_resolve(local))
+        if result['local_digest'] is None:
+            result['status'] = 'no-local'
+        elif result['local_digest'] == result['secret']:
+            result['status'] = 'match'
+        else:
+            result['status'] = 'mismatch'
+        result['seconds'] = time.perf_counter() - start
+        span.annotate(bytes=result['secret'][1], status=result['status'])
+    return result
+
+
+def verify_all(specs, jobs, stdin=None):
+    """Results for every spec, in order; file and env sources run in parallel."""
+    results = [None] * len(specs)
+    parallel = [i for i, spec in enumerate(specs) if spec[1] != 'stdin']
+    if len(parallel) > 1 and jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(jobs, len(parallel))) as pool:
+            for i, result in zip(parallel, pool.map(verify, [specs[i] for i in parallel])):
+                results[i] = result
+    else:
+        for i in parallel:
+            results[i] = verify(specs[i])
+    for i, spec in enumerate(specs):
+        if spec[1] == 'stdin':
+            results[i] = verify(spec, stdin)
+    return results
+
+
+def _short(digest):
+    return f"{digest[1]} bytes, sha256 {digest[0][:12]}"
+
+
+def report(result):
+    """Print one result; True when it counts as a failure."""
+    label, local = result['label'], result['local']
+    status = result['status']
+    if status == 'match':
+        print(f"✅ {label} matches {local} ({_short(result['secret'])}, {result['seconds'] * 1000:.0f}ms)")
+    elif status == 'mismatch':
+        print(f"❌ {label} differs from {local}")
+        print(f"   Secret: {_short(result['secret'])}")
+        print(f"   Local:  {_short(result['local_digest'])}")
+    elif status == 'invalid':
+        print(f"❌ {label} is not valid base64: {result['error']}")
+    elif status == 'no-local':
+        print(f"⚠️  {label} decoded ({_short(result['secret'])}) but {local} was not found")
+        return False
+    else:
+        print(f"⚠️  {label} not set; skipped")
+        return False
+    return status != 'match'
+
+
+def _split_pair(value, option):
+    source, sep, local = value.partition('=')
+    if not sep or not source or not local:
+        raise argparse.ArgumentTypeError(f"{option} expects SOURCE=LOCAL_FILE, got: {value}")
+    return source, local
+
+
+def build_specs(args):
+    specs = []
+    for value in args.env:
+        name, sep, local = value.partition('=')
+        local = local if sep else KNOWN_SECRETS.get(name)
+        if not local:
+            raise argparse.ArgumentTypeError(
+                f"--env {name}: unknown secret, pass {name}=LOCAL_FILE")
+        specs.append((name, 'env', name, local))
+    for value in args.file:
+        path, local = _split_pair(value, '--file')
+        specs.append((path, 'file', path, local))
+    if args.stdin:
+        specs.append(('stdin', 'stdin', None, args.stdin))
+    if not specs:
+        specs = [(name, 'env', name, local) for name, local in KNOWN_SECRETS.items()
+                 if name in os.environ]
+        specs += [(path, 'file', path, local) for path, local in COMMITTED_ENCODINGS.items()]
+    return specs
+
+
+def run_benchmark(megabytes):
+    """Streaming verification against decode-everything on a synthetic secret."""
+    import tempfile
+    import tracemalloc
+
+    # A multiple of 3 bytes, so per-block encodings concatenate without padding
+    payload = os.urandom(1024 * 1024 - 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        local = os.path.join(tmp, 'secret.bin')
+        encoded = os.path.join(tmp, 'secret.b64')
+        with open(local, 'wb') as raw, open(encoded, 'wb') as text:
+            for i in range(megabytes):
+                block = bytes([i % 256]) + payload[1:]
+                raw.write(block)
+                text.write(base64.encodebytes(block))
+
+        def streaming():
+            with open(encoded, 'rb') as f:
+                return decoded_digest(_file_chunks(f))
+
+        def whole():
+            with open(encoded, 'rb') as f:
+                data = base64.b64decode(f.read())
+            return hashlib.sha256(data).hexdigest(), len(data)
+
+        print(f"📊 Verifying a {megabytes}MB secret")
+        print("=" * 60)
+        print(f"{'approach':<16} {'time':>10} {'peak memory':>14} {'MB/s':>8}")
+        expected = file_digest(local)
+        for name, verify_once in (('decode whole', whole), ('streaming', streaming)):
+            tracemalloc.start()
+            start = time.perf_counter()
+            digest = verify_once()
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            assert digest == expected, name
+            print(f"{name:<16} {elapsed * 1000:>8.0f}ms {peak / 1024 / 1024:>12.1f}MB "
+                  f"{megabytes / elapsed:>8.0f}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--env', action='append', default=[], metavar='NAME[=LOCAL]',
+                        help='Secret in an environment variable; known names map to their file')
+    parser.add_argument('--file', action='append', default=[], metavar='PATH=LOCAL',
+                        help='Base64 text file to compare with a local file')
+    parser.add_argument('--stdin', metavar='LOCAL', help='Read base64 from stdin and compare with LOCAL')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Secrets verified in parallel (default: CPU count)')
+    sub = parser.add_subparsers(dest='command')
+    bench = sub.add_parser('benchmark', help='Compare streaming and whole-secret decoding')
+    bench.add_argument('--mb', type=int, default=64, help='Size of the synthetic secret')
+    args = parser.parse_args(argv)
+
+    if args.command == 'benchmark':
+        return run_benchmark(args.mb)
+    try:
+        specs = build_specs(args)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    print("🔍 Comparing secrets with local files (SHA-256 of decoded bytes)")
+    results = verify_all(specs, args.jobs, sys.stdin.buffer)
+    failed = [result for result in results if report(result)]
+    checked = [result for result in results if result['status'] not in ('no-secret', 'no-local')]
+    if failed:
+        print(f"❌ {len(failed)} of {len(results)} secrets do not match")
+        return 1
+    if not checked:
+        print("❌ No secrets were available to check")
+        return 1
+    print(f"✅ All {len(checked)} checked secrets match their local files")
+    return 0
+
+
+if __name__ == "__main__":
+    tracing.setup()
+    sys.exit(main())
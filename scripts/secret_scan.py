@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Scan the working tree for committed secrets and credentials.
+Every tracked and untracked (not ignored) file is checked for known key
+formats (Google API keys, OAuth client IDs and secrets, keystore passwords,
+private keys, service account keys, CI tokens) by one Aho-Corasick pass over
+the rules' literal anchors, confirmed by each rule's regex, and for long
+high-entropy base64 runs, which are decoded to tell an encoded
+google-services.json or keystore from other data.
+
+Findings are cached by git blob SHA, so a re-scan only reads the files whose
+content changed since the last run; the rest of the tree, node_modules
+included, costs one `git ls-files`. Files needing a scan are spread over a
+process pool. Secrets are never printed: findings show a redacted preview
+and a fingerprint (SHA-256 prefix of the secret), and fingerprints listed in
+the baseline file are accepted.
+
+  python3 scripts/secret_scan.py scan               # exit 1 on new findings
+  python3 scripts/secret_scan.py baseline           # accept the current findings
+"""
+
+import argparse
+import base64
+import binascii
+import collections
+import concurrent.futures
+import functools
+import hashlib
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+import time
+
+from ci_log_analyzer import AhoCorasick
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR_ENV = 'SAMAAN_SECRET_SCAN_CACHE'
+BASELINE = '.secret-scan-baseline.json'
+# Bump when rules change, so cached results for unchanged blobs are discarded
+RULES_VERSION = 1
+MAX_FILE_BYTES = 32 * 1024 * 1024
+BINARY_SNIFF = 8192
+# Below this many files a process pool costs more than it saves
+PARALLEL_MIN_FILES = 64
+ENTROPY_MIN_LENGTH = 64
+# Random base64 approaches 6 bits per character; prose and identifiers stay well below
+ENTROPY_THRESHOLD = 4.5
+# Warnings (unclassified high-entropy data) in these trees are counted, not listed
+VENDORED = ('node_modules/',)
+
+JKS_MAGIC = b'\xfe\xed\xfe\xed'
+PKCS12_MAGIC = b'\x30\x82'
+KEYSTORE_EXTENSIONS = ('.jks', '.keystore', '.p12', '.pfx')
+# Well-known values that are not secrets (the Android SDK debug keystore password)
+PUBLIC_VALUES = {'android'}
+# Decoded bytes that mark a base64 blob as an encoded credential
+ENCODED_MARKERS = (b'"private_key"', b'"project_info"', b'"api_key"', b'"client_secret"',
+                   b'"service_account"', b'storePassword', b'PRIVATE KEY-----')
+
+# Anchors are matched case-sensitively; a hit only counts when the rule's
+# regex matches on that line, and its first group (or the whole match) is the secret.
+RULES = (
+    {'id': 'google-api-key', 'severity': 'error', 'anchors': ('AIza',),
+     'regex': r'AIza[0-9A-Za-z_\-]{35}',
+     'title': 'Google API key'},
+    {'id': 'oauth-client-id', 'severity': 'error', 'anchors': ('.apps.googleusercontent.com',),
+     'regex': r'\d{6,}-[0-9a-z]{32}\.apps\.googleusercontent\.com',
+     'title': 'Google OAuth client ID'},
+    {'id': 'oauth-client-secret', 'severity': 'error', 'anchors': ('GOCSPX-', 'client_secret'),
+     'regex': r'GOCSPX-[0-9A-Za-z_\-]{28}|"client_secret"\s*:\s*"([^"]{16,})"',
+     'title': 'Google OAuth client secret'},
+    {'id': 'keystore-password', 'severity': 'error',
+     'anchors': ('storePassword', 'keyPassword', '-storepass', '-keypass', 'KEYSTORE_PASSWORD', 'KEY_PASSWORD'),
+     'regex': r'(?:storePassword|keyPassword|-storepass|-keypass|KEYSTORE_PASSWORD|KEY_PASSWORD)'
+              r'["\']?\s*[=:\s]\s*["\']?([^-\s"\'$%{}()<>\[\]][^\s"\'$%{}()<>\[\]]{3,})(?![\w\[.(])',
+     'title': 'Keystore password'},
+    {'id': 'private-key', 'severity': 'error', 'anchors': ('-----BEGIN',),
+     'regex': r'-----BEGIN (?:RSA |EC |DSA |OPENSSH |ENCRYPTED )?PRIVATE KEY-----(?:\\n|\s)*([A-Za-z0-9+/]{16,})',
+     'title': 'Private key'},
+    {'id': 'service-account-key', 'severity': 'error', 'anchors': ('private_key_id',),
+     'regex': r'"private_key_id"\s*:\s*"([0-9a-f]{40})"',
+     'title': 'Service account key'},
+    {'id': 'firebase-token', 'severity': 'error', 'anchors': ('1//0',),
+     'regex': r'1//0[0-9A-Za-z_\-]{40,}',
+     'title': 'Firebase CLI refresh token'},
+    {'id': 'github-token', 'severity': 'error', 'anchors': ('ghp_', 'gho_', 'ghs_', 'github_pat_'),
+     'regex': r'gh[pos]_[0-9A-Za-z]{36}|github_pat_[0-9A-Za-z_]{60,}',
+     'title': 'GitHub token'},
+)
+ENTROPY_RULES = {
+    'encoded-credential': {'severity': 'error', 'title': 'Base64-encoded credential file'},
+    'high-entropy': {'severity': 'warning', 'title': 'High-entropy base64 data'},
+    'keystore-file': {'severity': 'error', 'title': 'Keystore file'},
+}
+BASE64_RUN = re.compile(r'[A-Za-z0-9+/_\-]{%d,}={0,2}' % ENTROPY_MIN_LENGTH)
+# Integrity hashes, inline data URIs and source maps are expected to look random
+BENIGN_PREFIX = re.compile(r'(?:base64,|sha\d{1,3}-|sha\d{1,3}:|integrity"?\s*[:=]\s*"?)$')
+
+
+def all_rules():
+    merged = {rule['id']: rule for rule in RULES}
+    merged.update((rule_id, dict(rule, id=rule_id)) for rule_id, rule in ENTROPY_RULES.items())
+    return merged
+
+
+def default_cache_path():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    directory = os.environ.get(CACHE_DIR_ENV) or os.path.join(base, 'samaan-tools', 'secret-scan')
+    return os.path.join(directory, f"blobs-v{RULES_VERSION}.json")
+
+
+class Scanner:
+    """RULES compiled into one anchor automaton plus a C-speed screen for it."""
+
+    def __init__(self, rules=RULES):
+        self.rules = rules
+        anchors = []
+        self._owners = []
+        for number, rule in enumerate(rules):
+            for anchor in rule['anchors']:
+                anchors.append(anchor)
+                self._owners.append(number)
+        self.matcher = AhoCorasick(anchors)
+        self._screen = re.compile('|'.join(map(re.escape, sorted(set(anchors), key=len, reverse=True))))
+        self._regex = [re.compile(rule['regex']) for rule in rules]
+
+    def scan_text(self, text):
+        """[(rule id, line, secret)] for one file's text."""
+        found = []
+        seen_lines = set()
+        for screened in self._screen.finditer(text):
+            start = text.rfind('\n', 0, screened.start()) + 1
+            if start in seen_lines:
+                continue
+            seen_lines.add(start)
+            end = text.find('\n', screened.end())
+            line = text[start:end if end >= 0 else len(text)]
+            number = text.count('\n', 0, start) + 1
+            hits = {self._owners[index] for _, index in self.matcher.search(line)}
+            for rule_number in sorted(hits):
+                for match in self._regex[rule_number].finditer(line):
+                    secret = match.group(match.lastindex or 0)
+                    if secret not in PUBLIC_VALUES:
+                        found.append((self.rules[rule_number]['id'], number, secret))
+        for run in BASE64_RUN.finditer(text):
+            blob = run.group()
+            if BENIGN_PREFIX.search(text, max(0, run.start() - 16), run.start()) or entropy(blob) < ENTROPY_THRESHOLD:
+                continue
+            kind = 'encoded-credential' if is_encoded_credential(blob) else 'high-entropy'
+            found.append((kind, text.count('\n', 0, run.start()) + 1, blob))
+        return found
+
+
+def entropy(text):
+    """Shannon entropy in bits per character."""
+    counts = collections.Counter(text)
+    length = len(text)
+    return -sum(count / length * math.log2(count / length) for count in counts.values())
+
+
+def is_encoded_credential(blob):
+    usable = blob.rstrip('=')
+    usable = usable[:len(usable) - len(usable) % 4]
+    try:
+        decoded = base64.b64decode(usable.replace('-', '+').replace('_', '/'), validate=True)
+    except (binascii.Error, ValueError):
+        return False
+    return decoded.startswith(JKS_MAGIC) or any(marker in decoded for marker in ENCODED_MARKERS)
+
+
+@functools.lru_cache(maxsize=None)
+def scanner():
+    return Scanner()
+
+
+def fingerprint(secret):
+    return hashlib.sha256(secret.encode('utf-8', 'surrogateescape')).hexdigest()[:16]
+
+
+def redact(secret):
+    return f"{secret[:4]}…({len(secret)} chars)"
+
+
+def scan_file(path):
+    """(path, [[rule id, line, fingerprint, preview]]) for one file on disk."""
+    try:
+        with open(os.path.join(REPO_ROOT, path), 'rb') as handle:
+            data = handle.read(MAX_FILE_BYTES + 1)
+    except OSError:
+        return path, []
+    if len(data) > MAX_FILE_BYTES:
+        return path, []
+    if b'\0' in data[:BINARY_SNIFF] or path.endswith(KEYSTORE_EXTENSIONS):
+        is_keystore = data.startswith(JKS_MAGIC) or (
+            path.endswith(KEYSTORE_EXTENSIONS) and data.startswith(PKCS12_MAGIC))
+        if is_keystore:
+            return path, [['keystore-file', 1, hashlib.sha256(data).hexdigest()[:16], f"{len(data)} bytes"]]
+        return path, []
+    # latin-1 maps every byte to one character, so any file decodes and offsets stay byte offsets
+    text = data.decode('latin-1')
+    return path, [[rule_id, line, fingerprint(secret), redact(secret)]
+                  for rule_id, line, secret in scanner().scan_text(text)]
+
+
+def git(*args):
+    return subprocess.run(('git', *args), cwd=REPO_ROOT, check=True, capture_output=True).stdout
+
+
+def tree_blobs():
+    """{path: blob sha} for tracked and untracked (not ignored) files, as in the working tree.
+
+    Unmodified tracked files take their SHA from the index; modified and
+    untracked ones are hashed by `git hash-object`, which reads only those.
+    """
+    blobs = {}
+    for entry in git('ls-files', '-s', '-z').split(b'\0'):
+        if entry:
+            meta, path = entry.split(b'\t', 1)
+            mode, sha = meta.split(b' ')[:2]
+            if mode != b'160000':  # submodules
+                blobs[path.decode('utf-8', 'surrogateescape')] = sha.decode()
+    changed = [p for p in git('ls-files', '-m', '-o', '--exclude-standard', '-z').decode(
+        'utf-8', 'surrogateescape').split('\0') if p and os.path.isfile(os.path.join(REPO_ROOT, p))]
+    for path in [p for p in blobs if p not in changed and not os.path.lexists(os.path.join(REPO_ROOT, p))]:
+        del blobs[path]
+    if changed:
+        hashed = subprocess.run(('git', 'hash-object', '--no-filters', '--stdin-paths'), cwd=REPO_ROOT, check=True,
+                                capture_output=True, input='\n'.join(changed).encode('utf-8', 'surrogateescape'))
+        blobs.update(zip(changed, hashed.stdout.decode().split()))
+    return blobs
+
+
+def load_cache(path):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(path, cache):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as handle:
+        json.dump(cache, handle, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def scan_tree(cache_path, jobs, use_cache=True):
+    """({path: findings}, stats) for the whole working tree."""
+    blobs = tree_blobs()
+    cache = load_cache(cache_path) if use_cache else {}
+    pending = {}
+    for path, sha in blobs.items():
+        # Identical content is scanned once, whichever path it is under
+        if sha not in cache:
+            cache[sha] = None
+            pending[path] = sha
+    paths = sorted(pending)
+    if jobs <= 1 or len(paths) < PARALLEL_MIN_FILES:
+        scanned = list(map(scan_file, paths))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+            scanned = list(pool.map(scan_file, paths, chunksize=32))
+    for path, findings in scanned:
+        cache[pending[path]] = findings
+    results = {}
+    for path, sha in blobs.items():
+        if cache[sha]:
+            results[path] = cache[sha]
+    live = set(blobs.values())
+    if use_cache:
+        save_cache(cache_path, {sha: findings for sha, findings in cache.items() if sha in live})
+    return results, {'files': len(blobs), 'scanned': len(pending)}
+
+
+def load_baseline(path):
+    try:
+        with open(path) as handle:
+            return set(json.load(handle).get('fingerprints', []))
+    except FileNotFoundError:
+        return set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('command', nargs='?', choices=('scan', 'baseline'), default='scan')
+    parser.add_argument('--baseline', default=os.path.join(REPO_ROOT, BASELINE),
+                        help='Accepted fingerprints (default: .secret-scan-baseline.json)')
+    parser.add_argument('--cache', default=default_cache_path(), help='Blob findings cache file')
+    parser.add_argument('--no-cache', action='store_true', help='Rescan every file')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--json', action='store_true', help='Print findings as JSON lines')
+    args = parser.parse_args()
+
+    began = time.perf_counter()
+    try:
+        results, stats = scan_tree(args.cache, args.jobs, use_cache=not args.no_cache)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"❌ Could not list the tree with git: {e}")
+        return 1
+    elapsed = time.perf_counter() - began
+    rules = all_rules()
+
+    if args.command == 'baseline':
+        fingerprints = sorted({f[2] for findings in results.values() for f in findings
+                               if rules[f[0]]['severity'] == 'error'})
+        with open(args.baseline, 'w') as handle:
+            json.dump({'fingerprints': fingerprints}, handle, indent=2)
+            handle.write('\n')
+        print(f"✅ Accepted {len(fingerprints)} finding(s) in {os.path.relpath(args.baseline)}")
+        return 0
+
+    accepted = load_baseline(args.baseline)
+    new = []
+    quiet_warnings = 0
+    for path in sorted(results):
+        for rule_id, line, print_, preview in results[path]:
+            if print_ in accepted:
+                continue
+            if rules[rule_id]['severity'] == 'warning' and path.startswith(VENDORED):
+                quiet_warnings += 1
+                continue
+            new.append({'rule': rule_id, 'path': path, 'line': line, 'fingerprint': print_, 'preview': preview})
+
+    if args.json:
+        for finding in new:
+            print(json.dumps(finding))
+    else:
+        print(f"📊 {stats['files']} files, {stats['scanned']} scanned, "
+              f"{stats['files'] - stats['scanned']} unchanged or duplicate ({elapsed:.2f}s)")
+        print("=" * 60)
+        for finding in new:
+            rule = rules[finding['rule']]
+            icon = '❌' if rule['severity'] == 'error' else '⚠️ '
+            print(f"{icon} {finding['path']}:{finding['line']} {rule['title']} "
+                  f"{finding['preview']} [{finding['fingerprint']}]")
+        if quiet_warnings:
+            print(f"ℹ️  {quiet_warnings} high-entropy string(s) in {', '.join(VENDORED)} not listed")
+        if not new:
+            print(f"✅ No new secrets ({len(accepted)} accepted in the baseline)")
+    return 1 if any(rules[f['rule']]['severity'] == 'error' for f in new) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
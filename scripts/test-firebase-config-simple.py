@@ -1,17 +1,18 @@
 #!/usr/bin/env python3
 
-import json
 import re
 import sys
 import os
 
+import tracing
+
+@tracing.traced()
 def update_firebase_config_only(android_api_key, android_app_id, storage_bucket):
     """Update firebase_options.dart with provided values (for CI use)"""
     print("🔧 Updating Firebase Android configuration...")
     
     try:
-        with open('lib/firebase_options.dart', 'r') as f:
-            content = f.read()
+        content = tracing.read_text('lib/firebase_options.dart')
         
         # Extract the Android block and replace the values
         android_pattern = r'(static const FirebaseOptions android = FirebaseOptions\(\s*)(.*?)(\s*\);)'
@@ -52,8 +53,7 @@ def main():
     print("📱 Testing Android config extraction from google-services.json...")
     
     try:
-        with open('android/app/google-services.json', 'r') as f:
-            google_services = json.load(f)
+        google_services = tracing.load_json('android/app/google-services.json')
         
         android_app_id = google_services['client'][0]['client_info']['mobilesdk_app_id']
         android_api_key = google_services['client'][0]['api_key'][0]['current_key']
@@ -72,14 +72,14 @@ def main():
     
     # Backup original file
     print("📋 Backing up firebase_options.dart...")
-    os.system('cp lib/firebase_options.dart lib/firebase_options.dart.test-backup')
+    with tracing.span('backup firebase_options.dart', 'io'):
+        os.system('cp lib/firebase_options.dart lib/firebase_options.dart.test-backup')
     
     # Test updating firebase_options.dart
     print("🔧 Testing Firebase options update...")
     
     try:
-        with open('lib/firebase_options.dart', 'r') as f:
-            content = f.read()
+        content = tracing.read_text('lib/firebase_options.dart')
         
         # Extract the Android block and replace the values
         android_pattern = r'(static const FirebaseOptions android = FirebaseOptions\(\s*)(.*?)(\s*\);)'
@@ -117,8 +117,7 @@ def main():
     
     try:
         # Re-read the updated file and extract values
-        with open('lib/firebase_options.dart', 'r') as f:
-            updated_content = f.read()
+        updated_content = tracing.read_text('lib/firebase_options.dart')
         
         # Extract Android block
         android_match = re.search(r'static const FirebaseOptions android = FirebaseOptions\((.*?)\);', updated_content, re.DOTALL)
@@ -177,12 +176,14 @@ def main():
     finally:
         # Restore original file
         print("🔄 Restoring original firebase_options.dart...")
-        os.system('mv lib/firebase_options.dart.test-backup lib/firebase_options.dart')
+        with tracing.span('restore firebase_options.dart', 'io'):
+            os.system('mv lib/firebase_options.dart.test-backup lib/firebase_options.dart')
     
     print("🎉 All tests passed! CI changes should work correctly.")
     return True
 
 if __name__ == "__main__":
+    tracing.setup()
     # Check for --update-only flag (for CI use)
     if len(sys.argv) >= 5 and sys.argv[1] == "--update-only":
         android_api_key = sys.argv[2]
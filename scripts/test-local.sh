@@ -12,6 +12,12 @@ fi
 
 echo "✅ Firebase emulators detected"
 
+# Start from a saved dataset instead of re-seeding (see scripts/emulator_snapshot.py)
+if [ -n "$EMULATOR_SNAPSHOT" ]; then
+    echo "📦 Restoring emulator data from $EMULATOR_SNAPSHOT..."
+    FIRESTORE_EMULATOR_HOST=localhost:8080 python3 "$(dirname "$0")/emulator_snapshot.py" restore "$EMULATOR_SNAPSHOT" || exit 1
+fi
+
 # Build Flutter web with emulator configuration
 echo "🔨 Building Flutter web for local testing..."
 flutter build web --dart-define=USE_FIREBASE_EMULATORS=true --dart-define=ENVIRONMENT=development
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Opt-in timing spans for the Python config and debug scripts.
+Tracing stays off unless a script runs with --profile or SAMAAN_TRACE is set
+(to 1, or to the trace file path). When on, every span is written as Chrome
+trace-event JSON (load it in chrome://tracing or https://ui.perfetto.dev) and
+the slowest spans are summarized on stderr at exit. When off, span() hands
+back one shared no-op context manager, so instrumented code pays a function
+call and nothing else.
+
+  python3 scripts/validate-local-setup.py --profile
+  SAMAAN_TRACE=ci-trace.json python3 .github/scripts/validate_staging.py
+"""
+
+import atexit
+import functools
+import os
+import sys
+import threading
+import time
+
+TRACE_ENV = 'SAMAAN_TRACE'
+PROFILE_FLAG = '--profile'
+SUMMARY_ROWS = 15
+
+# Recorded events while tracing is on; None means disabled
+_events = None
+_origin_ns = 0
+_output_path = None
+_lock = threading.Lock()
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def annotate(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('name', 'category', 'args', 'start_ns')
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        _record(self.name, self.category, self.start_ns, end_ns, self.args)
+        return False
+
+    def annotate(self, **args):
+        """Attach extra key/values (sizes, return codes) to the trace event."""
+        self.args.update(args)
+
+
+def _record(name, category, start_ns, end_ns, args):
+    event = {
+        'name': name,
+        'cat': category,
+        'ph': 'X',
+        'ts': (start_ns - _origin_ns) / 1000,
+        'dur': (end_ns - start_ns) / 1000,
+        'pid': os.getpid(),
+        'tid': threading.get_ident(),
+    }
+    if args:
+        event['args'] = args
+    with _lock:
+        _events.append(event)
+
+
+def enabled():
+    return _events is not None
+
+
+def span(name, category='step', **args):
+    """Context manager timing one block; a shared no-op while tracing is off."""
+    if _events is None:
+        return _NULL_SPAN
+    return _Span(name, category, args)
+
+
+def traced(name=None, category='step'):
+    """Decorator wrapping every call of a function in a span."""
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _events is None:
+                return fn(*args, **kwargs)
+            with _Span(label, category, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def run(cmd, **kwargs):
+    """subprocess.run inside a 'subprocess' span named after the program.
+
+    Only the program name is recorded: argument lists carry keystore
+    passwords and must not end up in trace files.
+    """
+    import subprocess
+
+    program = cmd.split()[0] if isinstance(cmd, str) else cmd[0]
+    with span(os.path.basename(program), 'subprocess') as s:
+        result = subprocess.run(cmd, **kwargs)
+        s.annotate(returncode=result.returncode)
+    return result
+
+
+def read_bytes(path):
+    with span(f"read {os.path.basename(path)}", 'io') as s:
+        with open(path, 'rb') as f:
+            data = f.read()
+        s.annotate(bytes=len(data))
+    return data
+
+
+def read_text(path):
+    with span(f"read {os.path.basename(path)}", 'io') as s:
+        with open(path, 'r') as f:
+            text = f.read()
+        s.annotate(chars=len(text))
+    return text
+
+
+def load_json(path):
+    """json.load with the file read and the parse timed as separate spans."""
+    import json
+
+    text = read_text(path)
+    with span(f"parse {os.path.basename(path)}", 'parse'):
+        return json.loads(text)
+
+
+def enable(output_path=None):
+    """Start recording spans; the trace is written and summarized at exit."""
+    global _events, _origin_ns, _output_path
+    if _events is not None:
+        return
+    script = os.path.splitext(os.path.basename(sys.argv[0] or 'python'))[0]
+    _events = []
+    _origin_ns = time.perf_counter_ns()
+    _output_path = output_path or f"{script}.trace.json"
+    atexit.register(_finish, script)
+
+
+def setup(argv=None):
+    """Enable tracing when --profile is in argv (and strip it) or SAMAAN_TRACE is set.
+
+    Scripts call this first thing so their own argument handling never sees
+    the flag. Returns argv.
+    """
+    argv = sys.argv if argv is None else argv
+    requested = os.environ.get(TRACE_ENV, '')
+    if PROFILE_FLAG in argv:
+        argv.remove(PROFILE_FLAG)
+        requested = requested or '1'
+    if requested and requested != '0':
+        enable(None if requested == '1' else requested)
+    return argv
+
+
+def summarize(events, wall_us, rows=SUMMARY_ROWS):
+    """Per-name totals, slowest first, as printable lines."""
+    totals = {}
+    for event in events:
+        key = (event['cat'], event['name'])
+        calls, total, longest = totals.get(key, (0, 0.0, 0.0))
+        totals[key] = (calls + 1, total + event['dur'], max(longest, event['dur']))
+    lines = [f"{'span':<36} {'category':<11} {'calls':>6} {'total ms':>10} {'max ms':>9} {'wall':>6}"]
+    ranked = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)
+    for (category, name), (calls, total, longest) in ranked[:rows]:
+        share = total / wall_us if wall_us else 0.0
+        lines.append(f"{name[:36]:<36} {category:<11} {calls:>6} {total / 1000:>10.1f} "
+                     f"{longest / 1000:>9.1f} {share:>6.0%}")
+    return lines
+
+
+def _finish(script):
+    import json
+
+    end_ns = time.perf_counter_ns()
+    _record(script, 'script', _origin_ns, end_ns, {})
+    wall_us = (end_ns - _origin_ns) / 1000
+    events = sorted(_events, key=lambda event: event['ts'])
+    with open(_output_path, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+    spans = [event for event in events if event['cat'] != 'script']
+    print(f"\n⏱️  {script}: {wall_us / 1000:.1f}ms wall, {len(spans)} spans → {_output_path}",
+          file=sys.stderr)
+    for line in summarize(spans, wall_us):
+        print(f"   {line}", file=sys.stderr)
+
+
+def run_benchmark(iterations):
+    """Per-span cost with tracing off and on."""
+    global _events
+
+    def loop():
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            with span('noop'):
+                pass
+        return (time.perf_counter_ns() - start) / iterations
+
+    def baseline():
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            pass
+        return (time.perf_counter_ns() - start) / iterations
+
+    empty = baseline()
+    disabled = loop()
+    _events = []
+    enabled_cost = loop()
+    _events = None
+    print(f"📊 Span overhead over {iterations:,} iterations")
+    print(f"   empty loop:       {empty:>8.0f}ns")
+    print(f"   tracing disabled: {disabled:>8.0f}ns/span")
+    print(f"   tracing enabled:  {enabled_cost:>8.0f}ns/span")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    bench = sub.add_parser('benchmark', help='Measure span overhead with tracing off and on')
+    bench.add_argument('--iterations', type=int, default=200000)
+    args = parser.parse_args()
+
+    if args.command == 'benchmark':
+        run_benchmark(args.iterations)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
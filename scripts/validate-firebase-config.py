@@ -4,17 +4,22 @@ Firebase configuration validation script for CI/CD
 Compares android/app/google-services.json with lib/firebase_options.dart
 """
 
-import json
 import re
 import sys
 
+import tracing
+import validation_cache
+
+# Bump when the checks below change so cached verdicts are not reused
+RULES_VERSION = 1
+INPUTS = ['android/app/google-services.json', 'lib/firebase_options.dart']
+
 def main():
     print('🔍 Validating Firebase Android configuration consistency...')
 
     # Extract values from google-services.json
     try:
-        with open('android/app/google-services.json', 'r') as f:
-            google_services = json.load(f)
+        google_services = tracing.load_json('android/app/google-services.json')
 
         json_app_id = google_services['client'][0]['client_info']['mobilesdk_app_id']
         json_api_key = google_services['client'][0]['api_key'][0]['current_key']
@@ -22,17 +27,17 @@ def main():
         json_storage_bucket = google_services['project_info']['storage_bucket']
     except Exception as e:
         print(f'❌ Failed to read google-services.json: {e}')
-        sys.exit(1)
+        return 1
 
     # Extract values from firebase_options.dart
     try:
-        with open('lib/firebase_options.dart', 'r') as f:
-            content = f.read()
+        content = tracing.read_text('lib/firebase_options.dart')
 
-        android_block = re.search(r'static const FirebaseOptions android = FirebaseOptions\((.*?)\);', content, re.DOTALL)
+        with tracing.span('extract android FirebaseOptions', 'parse'):
+            android_block = re.search(r'static const FirebaseOptions android = FirebaseOptions\((.*?)\);', content, re.DOTALL)
         if not android_block:
             print('❌ Could not find Android FirebaseOptions block')
-            sys.exit(1)
+            return 1
 
         block_content = android_block.group(1)
 
@@ -48,7 +53,7 @@ def main():
         dart_storage_bucket = dart_storage_bucket_match.group(1) if dart_storage_bucket_match else ''
     except Exception as e:
         print(f'❌ Failed to read firebase_options.dart: {e}')
-        sys.exit(1)
+        return 1
 
     # Display comparison results
     print(f'🔍 Comparison Results:')
@@ -79,10 +84,12 @@ def main():
     if validation_failed:
         print('❌ FATAL: Firebase configuration validation failed!')
         print('This will likely cause Android app initialization to fail.')
-        sys.exit(1)
+        return 1
 
     print('✅ All Firebase Android configuration values match google-services.json')
-    return True
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    tracing.setup()
+    cache = validation_cache.from_argv()
+    sys.exit(cache.run('validate-firebase-config', RULES_VERSION, INPUTS, main))
\ No newline at end of file
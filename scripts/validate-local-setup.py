@@ -4,12 +4,13 @@ Local validation script to check your setup before pushing to GitHub.
 This script validates your local configuration and suggests what to check in GitHub secrets.
 """
 
-import json
-import subprocess
 import os
 import sys
 import base64
 
+import tracing
+
+@tracing.traced()
 def check_file_exists(file_path, description):
     """Check if a file exists."""
     if os.path.exists(file_path):
@@ -22,18 +23,18 @@ def check_file_exists(file_path, description):
 def validate_json_file(file_path, description):
     """Validate a JSON file."""
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        data = tracing.load_json(file_path)
         print(f"✅ {description} is valid JSON")
         return data
     except Exception as e:
         print(f"❌ {description} is invalid JSON: {e}")
         return None
 
+@tracing.traced()
 def get_keystore_sha1(keystore_path, alias, store_pass, key_pass):
     """Get SHA-1 fingerprint from keystore."""
     try:
-        result = subprocess.run([
+        result = tracing.run([
             'keytool', '-list', '-v',
             '-keystore', keystore_path,
             '-alias', alias,
@@ -140,8 +141,7 @@ def main():
     
     web_index_path = "web/index.html"
     if check_file_exists(web_index_path, "Web index.html"):
-        with open(web_index_path, 'r') as f:
-            content = f.read()
+        content = tracing.read_text(web_index_path)
         
         if '{{GOOGLE_CLIENT_ID}}' in content:
             print("⚠️  Web index.html still has placeholder {{GOOGLE_CLIENT_ID}}")
@@ -164,8 +164,9 @@ def main():
     # Staging google-services.json
     if os.path.exists(staging_json_path):
         try:
-            with open(staging_json_path, 'rb') as f:
-                staging_b64 = base64.b64encode(f.read()).decode()
+            staging_bytes = tracing.read_bytes(staging_json_path)
+            with tracing.span('base64 GOOGLE_SERVICES_STAGING', 'encode'):
+                staging_b64 = base64.b64encode(staging_bytes).decode()
             print("🔐 GOOGLE_SERVICES_STAGING:")
             print(f"   {staging_b64[:50]}... (truncated)")
             print()
@@ -215,4 +216,5 @@ def main():
     return 0 if all_good else 1
 
 if __name__ == "__main__":
+    tracing.setup()
     sys.exit(main())
\ No newline at end of file
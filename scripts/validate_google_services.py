@@ -4,19 +4,25 @@ Validate google-services.json configuration against debug keystore.
 This script helps identify configuration mismatches that cause ApiException: 10.
 """
 
-import json
-import subprocess
 import sys
 import os
 
+import tracing
+import validation_cache
+
+# Bump when the checks below change so cached verdicts are not reused
+RULES_VERSION = 1
+DEBUG_KEYSTORE = os.path.expanduser('~/.android/debug.keystore')
+
+@tracing.traced()
 def get_debug_keystore_sha1():
     """Get SHA-1 fingerprint from debug keystore."""
     try:
         # Path to debug keystore
-        debug_keystore = os.path.expanduser('~/.android/debug.keystore')
+        debug_keystore = DEBUG_KEYSTORE
         
         # Run keytool to get certificate info
-        result = subprocess.run([
+        result = tracing.run([
             'keytool', '-list', '-v', 
             '-keystore', debug_keystore,
             '-alias', 'androiddebugkey',
@@ -37,11 +43,11 @@ def get_debug_keystore_sha1():
         print(f"Error getting debug keystore SHA-1: {e}")
         return None
 
+@tracing.traced()
 def validate_google_services(file_path):
     """Validate google-services.json configuration."""
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        data = tracing.load_json(file_path)
         
         project_id = data['project_info']['project_id']
         project_number = data['project_info']['project_number']
@@ -95,9 +101,7 @@ def validate_google_services(file_path):
         print(f"✗ Error validating google-services.json: {e}")
         return False
 
-if __name__ == "__main__":
-    file_path = sys.argv[1] if len(sys.argv) > 1 else "android/app/google-services.json"
-    
+def main(file_path):
     print(f"Validating {file_path}...")
     print("=" * 50)
     
@@ -105,10 +109,18 @@ if __name__ == "__main__":
     
     if result is True:
         print("\n✅ Configuration is valid!")
-        sys.exit(0)
+        return 0
     elif result is False:
         print("\n❌ Configuration has issues!")
-        sys.exit(1)
+        return 1
     else:
         print("\n⚠️  Could not fully validate configuration")
-        sys.exit(2)
\ No newline at end of file
+        return 2
+
+if __name__ == "__main__":
+    tracing.setup()
+    cache = validation_cache.from_argv()
+    file_path = sys.argv[1] if len(sys.argv) > 1 else "android/app/google-services.json"
+    # Exit code 2 means keytool could not be run; retry that next time rather than caching it
+    sys.exit(cache.run('validate_google_services', RULES_VERSION, [file_path, DEBUG_KEYSTORE],
+                       lambda: main(file_path), transient_codes=(2,)))
\ No newline at end of file
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache of validation verdicts shared across runs.
+A verdict is keyed on the SHA-256 of every input file, the check's rule-set
+name and version, and any extra inputs (such as EXPECTED_DEBUG_SHA1). When
+nothing changed, the recorded output and exit code are replayed instead of
+re-running the check. Entries live as small JSON files in one directory,
+which CI can persist with actions/cache, and the least recently used ones
+are evicted once the directory grows past its size limit.
+
+Pass --no-cache (or set SAMAAN_NO_CACHE=1) to always re-run the checks.
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+
+CACHE_DIR_ENV = 'SAMAAN_VALIDATION_CACHE'
+NO_CACHE_ENV = 'SAMAAN_NO_CACHE'
+NO_CACHE_FLAG = '--no-cache'
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+HASH_CHUNK = 1024 * 1024
+
+
+def default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.environ.get(CACHE_DIR_ENV) or os.path.join(base, 'samaan-tools', 'validation')
+
+
+def file_digest(path):
+    """SHA-256 of a file's bytes, or 'missing' when it does not exist."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return 'missing'
+    return digest.hexdigest()
+
+
+def verdict_key(rule_set, rule_version, paths, extra=()):
+    """Cache key for one check over the given input files and extra inputs."""
+    material = {
+        'rules': [rule_set, rule_version],
+        'inputs': [file_digest(path) for path in paths],
+        'extra': [str(value) for value in extra],
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class _Tee(io.TextIOBase):
+    """Writes through to a stream while keeping a copy of the text."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.captured = io.StringIO()
+
+    def write(self, text):
+        self.captured.write(text)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+class VerdictCache:
+    """Directory of verdict files with size-bounded LRU eviction (by mtime)."""
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES, enabled=True):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'r') as f:
+                verdict = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Touch on hit so eviction drops the least recently used verdicts first
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return verdict
+
+    def put(self, key, verdict):
+        if not self.enabled:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(verdict, f)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def entries(self):
+        """(mtime, size, path) for every stored verdict."""
+        found = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.json'):
+                    path = os.path.join(root, name)
+                    with contextlib.suppress(OSError):
+                        stat = os.stat(path)
+                        found.append((stat.st_mtime, stat.st_size, path))
+        return found
+
+    def evict(self):
+        """Delete least recently used verdicts until the directory fits max_bytes."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            with contextlib.suppress(OSError):
+                os.remove(path)
+                total -= size
+                removed += 1
+        return removed
+
+    def run(self, rule_set, rule_version, paths, check, extra=(), transient_codes=()):
+        """Exit code of check(), replaying a cached verdict when the inputs are unchanged.
+
+        check prints its findings and returns an exit code; both the output
+        and the code are stored, except for codes in transient_codes (results
+        that depend on something outside the inputs, like a missing tool).
+        Checks that raise are not cached.
+        """
+        if not self.enabled:
+            return check()
+        key = verdict_key(rule_set, rule_version, paths, extra)
+        verdict = self.get(key)
+        if verdict is not None:
+            sys.stdout.write(verdict['output'])
+            print(f"♻️  Cached {rule_set} verdict (inputs unchanged since "
+                  f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(verdict['checked_at']))})")
+            return verdict['exit_code']
+        tee = _Tee(sys.stdout)
+        with contextlib.redirect_stdout(tee):
+            exit_code = check()
+        if exit_code in transient_codes:
+            return exit_code
+        self.put(key, {'rule_set': rule_set, 'exit_code': exit_code,
+                       'output': tee.captured.getvalue(), 'checked_at': time.time()})
+        return exit_code
+
+
+def from_argv(argv=None, **kwargs):
+    """VerdictCache honoring --no-cache (stripped from argv) and SAMAAN_NO_CACHE."""
+    argv = sys.argv if argv is None else argv
+    enabled = os.environ.get(NO_CACHE_ENV, '') in ('', '0')
+    if NO_CACHE_FLAG in argv:
+        argv.remove(NO_CACHE_FLAG)
+        enabled = False
+    return VerdictCache(enabled=enabled, **kwargs)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dir', help='Cache directory (default: $SAMAAN_VALIDATION_CACHE or ~/.cache/samaan-tools/validation)')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('stats', help='Show entry count and size')
+    sub.add_parser('clear', help='Delete every cached verdict')
+    args = parser.parse_args()
+
+    cache = VerdictCache(args.dir)
+    entries = cache.entries()
+    if args.command == 'stats':
+        total = sum(size for _, size, _ in entries)
+        print(f"📦 {cache.directory}: {len(entries)} verdicts, {total / 1024:.1f}KB "
+              f"(limit {cache.max_bytes / 1024 / 1024:.0f}MB)")
+    elif args.command == 'clear':
+        for _, _, path in entries:
+            os.remove(path)
+        print(f"🧹 Removed {len(entries)} cached verdicts from {cache.directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
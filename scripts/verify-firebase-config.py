@@ -4,14 +4,15 @@ Verify Firebase configuration matches APK configuration.
 This script helps identify mismatches between APK and Firebase Console.
 """
 
-import json
 import sys
 
+import tracing
+
+@tracing.traced()
 def analyze_google_services_json(file_path):
     """Analyze google-services.json configuration."""
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        data = tracing.load_json(file_path)
         
         print(f"📋 Analyzing: {file_path}")
         print("=" * 60)
@@ -104,4 +105,5 @@ def verify_configuration():
     print(f"python3 scripts/debug-apk-signing.py /path/to/your/app-debug.apk")
 
 if __name__ == "__main__":
+    tracing.setup()
     verify_configuration()
\ No newline at end of file
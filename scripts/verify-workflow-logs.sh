@@ -57,4 +57,8 @@ echo ""
 echo "📱 Current local configuration:"
 echo "Package: com.fitnesstracker.fitness_tracker"
 echo "Firebase Project (staging): fitness-tracker-8d0ae"  
-echo "Expected SHA-1: 53315440bd500648d1034bdf6fa462fce03775fa"
\ No newline at end of file
+echo "Expected SHA-1: 53315440bd500648d1034bdf6fa462fce03775fa"
+echo ""
+echo "🔎 To scan a failed run's logs for known failure signatures:"
+echo "gh api repos/{owner}/{repo}/actions/runs/RUN_ID/logs > run.zip"
+echo "python3 scripts/ci_log_analyzer.py scan run.zip"
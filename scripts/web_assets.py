@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Post-build stage for the Flutter web bundle served by Firebase Hosting.
+After `flutter build web` this fingerprints the entry files (main.dart.js,
+flutter_bootstrap.js, flutter.js, manifest.json, favicon and icons) by
+content hash, rewrites their references in index.html, manifest.json,
+flutter_bootstrap.js and flutter_service_worker.js (including the service
+worker's RESOURCES hashes), and precompresses every text/wasm file to
+brotli and gzip in parallel. Fingerprinted files are safe to cache for a
+year; everything else gets `no-cache` (revalidated with ETags), see the
+header rules written to firebase.json by `headers --write`.
+
+Compressed output is cached by content hash in .web-build-cache, so a
+rebuild only compresses files whose bytes changed. The originals stay in
+place, so a stale index.html still loads.
+
+  flutter build web --release && python3 scripts/web_assets.py build
+  python3 scripts/web_assets.py headers --write
+  python3 scripts/web_assets.py serve
+"""
+
+import argparse
+import concurrent.futures
+import gzip
+import hashlib
+import http.server
+import json
+import mimetypes
+import os
+import re
+import shutil
+import sys
+import time
+import urllib.parse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BUILD_DIR = os.path.join('build', 'web')
+CACHE_DIR = os.environ.get('SAMAAN_WEB_CACHE', '.web-build-cache')
+FIREBASE_JSON = 'firebase.json'
+HASH_LENGTH = 12
+# Fingerprinted in this order: files before the files that reference them
+FINGERPRINTED = ('favicon.png', 'icons/*', 'main.dart.js', 'flutter.js', 'manifest.json',
+                 'flutter_bootstrap.js')
+# Rewritten in place, never renamed (the browser always asks for them by name)
+ENTRY_FILES = ('index.html', 'flutter_service_worker.js')
+COMPRESSIBLE = ('.js', '.mjs', '.html', '.json', '.wasm', '.css', '.svg', '.txt', '.otf',
+                '.ttf', '.frag', '.bin', '.map')
+MIN_COMPRESS_BYTES = 1024
+SIDECARS = ('.br', '.gz')
+BROTLI_QUALITY = 11
+GZIP_LEVEL = 9
+
+HASHED_PATTERN = rf"^/.+\.[0-9a-f]{{{HASH_LENGTH}}}\.[A-Za-z0-9]+$"
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+# Firebase Hosting's Cache-Control for static files without a header rule
+HOSTING_DEFAULT_MAX_AGE = 3600
+
+
+def header_rules():
+    """hosting.headers entries: revalidate everything, then a year for fingerprinted files.
+
+    Later rules win for the same header, so the regex rule overrides `**`.
+    """
+    return [
+        {'source': '**', 'headers': [{'key': 'Cache-Control', 'value': REVALIDATE}]},
+        {'regex': HASHED_PATTERN, 'headers': [{'key': 'Cache-Control', 'value': IMMUTABLE}]},
+    ]
+
+
+def cache_control(path):
+    """The Cache-Control header_rules() give a request path."""
+    return IMMUTABLE if re.match(HASHED_PATTERN, path) else REVALIDATE
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hashed_name(relpath, digest):
+    head, ext = os.path.splitext(relpath)
+    return f"{head}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def is_hashed(relpath):
+    return re.match(HASHED_PATTERN, '/' + relpath) is not None
+
+
+def walk(build_dir):
+    """Relative paths of the bundle's files, excluding sidecars and earlier fingerprinted copies."""
+    paths = []
+    for root, _, files in os.walk(build_dir):
+        for name in files:
+            relpath = os.path.relpath(os.path.join(root, name), build_dir).replace(os.sep, '/')
+            if relpath.endswith(SIDECARS) or is_hashed(relpath):
+                continue
+            paths.append(relpath)
+    return sorted(paths)
+
+
+def fingerprint_candidates(paths):
+    ordered = []
+    for pattern in FINGERPRINTED:
+        if pattern.endswith('/*'):
+            prefix = pattern[:-1]
+            ordered.extend(p for p in paths if p.startswith(prefix) and '/' not in p[len(prefix):])
+        elif pattern in paths:
+            ordered.append(pattern)
+    return ordered
+
+
+def rewrite_references(text, renamed):
+    """Replace quoted references to renamed files ("x" and 'x')."""
+    for original, hashed in renamed.items():
+        text = text.replace(f'"{original}"', f'"{hashed}"').replace(f"'{original}'", f"'{hashed}'")
+    return text
+
+
+def rewrite_service_worker(text, build_dir, renamed):
+    """Rename RESOURCES/CORE entries and refresh RESOURCES' md5 values from disk."""
+    text = rewrite_references(text, renamed)
+    match = re.search(r'const RESOURCES = (\{.*?\});', text, re.S)
+    if not match:
+        return text
+    resources = json.loads(match.group(1))
+    for key in resources:
+        path = os.path.join(build_dir, 'index.html' if key == '/' else key)
+        if os.path.isfile(path):
+            with open(path, 'rb') as handle:
+                resources[key] = hashlib.md5(handle.read()).hexdigest()
+    return text[:match.start(1)] + json.dumps(resources) + text[match.end(1):]
+
+
+def fingerprint(build_dir, paths):
+    """Write fingerprinted copies and rewrite references; returns {original: hashed}."""
+    renamed = {}
+    for relpath in fingerprint_candidates(paths):
+        path = os.path.join(build_dir, relpath)
+        if relpath.endswith(('.js', '.json')):
+            with open(path, encoding='utf-8') as handle:
+                text = handle.read()
+            rewritten = rewrite_references(text, renamed)
+            if rewritten != text:
+                with open(path, 'w', encoding='utf-8') as handle:
+                    handle.write(rewritten)
+        target = hashed_name(relpath, sha256_file(path))
+        shutil.copyfile(path, os.path.join(build_dir, target))
+        renamed[relpath] = target
+    for relpath in ENTRY_FILES:
+        path = os.path.join(build_dir, relpath)
+        if not os.path.isfile(path):
+            continue
+        with open(path, encoding='utf-8') as handle:
+            text = handle.read()
+        if relpath == 'flutter_service_worker.js':
+            text = rewrite_service_worker(text, build_dir, renamed)
+        else:
+            text = rewrite_references(text, renamed)
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(text)
+    return renamed
+
+
+def compress_object(source, digest, objects):
+    """Compress one file into the cache as <digest>.br/.gz; returns (digest, sizes)."""
+    with open(source, 'rb') as handle:
+        data = handle.read()
+    sizes = {}
+    gz = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    _write_atomic(os.path.join(objects, digest + '.gz'), gz)
+    sizes['.gz'] = len(gz)
+    if brotli is not None:
+        br = brotli.compress(data, quality=BROTLI_QUALITY)
+        _write_atomic(os.path.join(objects, digest + '.br'), br)
+        sizes['.br'] = len(br)
+    return digest, sizes
+
+
+def _write_atomic(path, data):
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as handle:
+        handle.write(data)
+    os.replace(temporary, path)
+
+
+def precompress(build_dir, files, objects, jobs):
+    """Write .br/.gz sidecars for files {relpath: sha256}, compressing only uncached content.
+
+    Returns (compressed count, reused count).
+    """
+    os.makedirs(objects, exist_ok=True)
+    sidecars = ('.gz', '.br') if brotli is not None else ('.gz',)
+    pending = {}
+    for relpath, digest in files.items():
+        if digest in pending:
+            continue
+        if not all(os.path.exists(os.path.join(objects, digest + ext)) for ext in sidecars):
+            pending[digest] = os.path.join(build_dir, relpath)
+    if pending:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(compress_object, source, digest, objects)
+                       for digest, source in pending.items()]
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+    for relpath, digest in files.items():
+        for ext in sidecars:
+            shutil.copyfile(os.path.join(objects, digest + ext), os.path.join(build_dir, relpath + ext))
+    return len(pending), len(set(files.values())) - len(pending)
+
+
+def transfer_sizes(build_dir, relpath):
+    """(raw, gzip, brotli) bytes of one file; compressed sizes fall back to raw."""
+    path = os.path.join(build_dir, relpath)
+    raw = os.path.getsize(path)
+    sizes = [raw]
+    for ext in ('.gz', '.br'):
+        sizes.append(os.path.getsize(path + ext) if os.path.exists(path + ext) else sizes[-1])
+    return tuple(sizes)
+
+
+def category(relpath):
+    if relpath.startswith('canvaskit/'):
+        return 'canvaskit'
+    if relpath.startswith('assets/'):
+        return 'assets'
+    if relpath.startswith('main.dart'):
+        return 'main.dart.js'
+    return 'other'
+
+
+def report(build_dir, state, previous):
+    files = state['files']
+    served = [p for p in files if not (p in state['renamed'])] + list(state['renamed'].values())
+    totals = {}
+    for relpath in served:
+        row = totals.setdefault(category(relpath), [0, 0, 0, 0])
+        row[0] += 1
+        for i, size in enumerate(transfer_sizes(build_dir, relpath)):
+            row[i + 1] += size
+    print(f"{'files':<14} {'count':>6} {'raw':>10} {'gzip':>10} {'brotli':>10}")
+    grand = [0, 0, 0, 0]
+    for name, row in sorted(totals.items()):
+        print(f"{name:<14} {row[0]:>6} {row[1] / 1024:>8.0f}KB {row[2] / 1024:>8.0f}KB {row[3] / 1024:>8.0f}KB")
+        grand = [a + b for a, b in zip(grand, row)]
+    print(f"{'total':<14} {grand[0]:>6} {grand[1] / 1024:>8.0f}KB {grand[2] / 1024:>8.0f}KB "
+          f"{grand[3] / 1024:>8.0f}KB")
+    print(f"📦 First visit: {grand[1] / 1024:.0f}KB uncompressed -> {grand[3] / 1024:.0f}KB "
+          f"({1 - grand[3] / max(grand[1], 1):.0%} less)")
+
+    if previous:
+        changed = [p for p, digest in files.items() if previous.get('files', {}).get(p) != digest]
+        changed_bytes = sum(transfer_sizes(build_dir, p)[2] for p in changed)
+        print(f"🔁 Repeat visit after this deploy: {len(changed)} changed file(s), "
+              f"{changed_bytes / 1024:.0f}KB to download; everything else is a cached hit or a 304")
+        print(f"   Without fingerprints every file older than {HOSTING_DEFAULT_MAX_AGE // 60} minutes "
+              f"is downloaded again: {grand[3] / 1024:.0f}KB")
+
+
+def load_state(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, 'last-build.json')) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def save_state(cache_dir, state):
+    os.makedirs(cache_dir, exist_ok=True)
+    _write_atomic(os.path.join(cache_dir, 'last-build.json'), json.dumps(state, indent=1).encode('utf-8'))
+
+
+def prune(build_dir, cache_dir, previous, state):
+    """Remove last build's fingerprinted copies and sidecars not produced again, and unused cache objects."""
+    keep = set(state['generated'])
+    for relpath in (previous or {}).get('generated', []):
+        path = os.path.join(build_dir, relpath)
+        if relpath not in keep and os.path.exists(path):
+            os.remove(path)
+    used = {digest + ext for digest in state['files'].values() for ext in SIDECARS}
+    objects = os.path.join(cache_dir, 'objects')
+    for name in os.listdir(objects) if os.path.isdir(objects) else ():
+        if name not in used:
+            os.remove(os.path.join(objects, name))
+
+
+def build(build_dir, cache_dir, jobs):
+    index = os.path.join(build_dir, 'index.html')
+    if not os.path.isfile(index):
+        print(f"❌ {index} not found; run `flutter build web` first")
+        return 1
+    previous = load_state(cache_dir)
+    if previous and previous.get('index') == sha256_file(index):
+        print("✅ Build output already fingerprinted and compressed; nothing to do")
+        report(build_dir, previous, None)
+        return 0
+    if brotli is None:
+        print("ℹ️  brotli not installed; writing gzip only (pip install brotli)")
+
+    began = time.perf_counter()
+    paths = walk(build_dir)
+    renamed = fingerprint(build_dir, paths)
+    served = paths + list(renamed.values())
+    files = {p: sha256_file(os.path.join(build_dir, p)) for p in served}
+    compressible = {p: d for p, d in files.items()
+                    if p.endswith(COMPRESSIBLE) and os.path.getsize(os.path.join(build_dir, p)) >= MIN_COMPRESS_BYTES}
+    compressed, reused = precompress(build_dir, compressible, os.path.join(cache_dir, 'objects'), jobs)
+    sidecars = SIDECARS if brotli is not None else ('.gz',)
+    state = {
+        'index': sha256_file(index),
+        'files': {p: files[p] for p in paths},
+        'renamed': renamed,
+        'generated': sorted(list(renamed.values()) + [p + ext for p in compressible for ext in sidecars]),
+    }
+    prune(build_dir, cache_dir, previous, state)
+    save_state(cache_dir, state)
+
+    print(f"📊 Web bundle post-build ({build_dir}, {time.perf_counter() - began:.1f}s, {jobs} workers)")
+    print("=" * 60)
+    print(f"🔖 Fingerprinted {len(renamed)} file(s): " + ', '.join(renamed.values()))
+    print(f"🗜️  Compressed {compressed} file(s), reused {reused} unchanged from {cache_dir}")
+    report(build_dir, state, previous)
+    if not headers_match(FIREBASE_JSON):
+        print(f"⚠️  {FIREBASE_JSON} lacks the Cache-Control rules; run `web_assets.py headers --write`")
+    return 0
+
+
+def headers_match(path):
+    try:
+        with open(path) as handle:
+            hosting = json.load(handle).get('hosting', {})
+    except (OSError, ValueError):
+        return False
+    return hosting.get('headers') == header_rules()
+
+
+def write_headers(path):
+    with open(path) as handle:
+        config = json.load(handle)
+    hosting = config.setdefault('hosting', {})
+    hosting['headers'] = header_rules()
+    ignore = hosting.setdefault('ignore', [])
+    for pattern in ('**/*.br', '**/*.gz'):
+        if pattern not in ignore:
+            ignore.append(pattern)
+    with open(path, 'w') as handle:
+        json.dump(config, handle, indent=2)
+        handle.write('\n')
+
+
+class PrecompressedHandler(http.server.SimpleHTTPRequestHandler):
+    """Serves the build like Hosting does: SPA fallback, Cache-Control rules, .br/.gz sidecars."""
+
+    def send_head(self):
+        path = urllib.parse.urlsplit(self.path).path
+        local = self.translate_path(path)
+        if os.path.isdir(local):
+            local = os.path.join(local, 'index.html')
+        if not os.path.isfile(local):
+            local = os.path.join(self.directory, 'index.html')
+        accepted = self.headers.get('Accept-Encoding', '')
+        body, encoding = local, None
+        for ext, name in (('.br', 'br'), ('.gz', 'gzip')):
+            if name in accepted and os.path.isfile(local + ext):
+                body, encoding = local + ext, name
+                break
+        handle = open(body, 'rb')
+        self.send_response(200)
+        self.send_header('Content-Type', mimetypes.guess_type(local)[0] or 'application/octet-stream')
+        self.send_header('Content-Length', str(os.fstat(handle.fileno()).st_size))
+        self.send_header('Cache-Control', cache_control(path))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Vary', 'Accept-Encoding')
+        self.end_headers()
+        return handle
+
+
+def serve(build_dir, port):
+    mimetypes.add_type('application/wasm', '.wasm')
+    handler = lambda *args, **kwargs: PrecompressedHandler(*args, directory=build_dir, **kwargs)
+    server = http.server.ThreadingHTTPServer(('localhost', port), handler)
+    print(f"🌐 Serving {build_dir} on http://localhost:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    run = sub.add_parser('build', help='Fingerprint and precompress a flutter build web output')
+    run.add_argument('--dir', default=BUILD_DIR, help='Flutter web build output')
+    run.add_argument('--cache', default=CACHE_DIR, help='Compressed output cache for incremental builds')
+    run.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='Parallel compression workers')
+    headers = sub.add_parser('headers', help='Print the firebase.json Cache-Control rules')
+    headers.add_argument('--write', action='store_true', help=f"Update {FIREBASE_JSON} in place")
+    local = sub.add_parser('serve', help='Serve the build locally with the same headers and encodings')
+    local.add_argument('--dir', default=BUILD_DIR)
+    local.add_argument('--port', type=int, default=3000)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        return build(args.dir, args.cache, args.jobs)
+    if args.command == 'serve':
+        return serve(args.dir, args.port)
+    if args.write:
+        write_headers(FIREBASE_JSON)
+        print(f"✅ Wrote Cache-Control rules and sidecar ignores to {FIREBASE_JSON}")
+    else:
+        print(json.dumps(header_rules(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Batch weight-trend and goal-projection engine.
+Smooths every user's DailyEntry.weight history with a gap-aware exponential
+moving average and derives loss rate, on-track status and projected completion
+from the trend instead of the noisy latest weigh-in.
+"""
+
+import argparse
+import datetime
+import json
+import sys
+import time
+
+import numpy as np
+
+# Smoothing factor per day for the trend weight (Hacker's Diet style)
+TREND_ALPHA = 0.1
+# Smoothing factor per day for the realized loss rate
+RATE_ALPHA = 0.05
+# Same 10% tolerance as WeightLossGoal.isOnTrack
+ON_TRACK_TOLERANCE = 0.9
+
+_EPOCH = datetime.date(1970, 1, 1)
+
+
+def to_epoch_day(value):
+    """Convert a Firestore timestamp export, ISO string or date to days since epoch."""
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        seconds = value.get('_seconds', value.get('seconds'))
+        if seconds is None:
+            return None
+        return int(seconds) // 86400
+    if isinstance(value, datetime.datetime):
+        return (value.date() - _EPOCH).days
+    if isinstance(value, datetime.date):
+        return (value - _EPOCH).days
+    if isinstance(value, (int, float)):
+        return int(value) // 86400
+    if isinstance(value, str):
+        try:
+            return (datetime.date.fromisoformat(value[:10]) - _EPOCH).days
+        except ValueError:
+            return None
+    return None
+
+
+def from_epoch_day(day):
+    return _EPOCH + datetime.timedelta(days=int(day))
+
+
+def _safe_to_double(value):
+    """Lenient float coercion matching DailyEntry._safeToDouble (None stays None)."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+class TrendEngine:
+    """Struct-of-arrays trend state for a population of users."""
+
+    def __init__(self, uids=(), trend_alpha=TREND_ALPHA, rate_alpha=RATE_ALPHA):
+        self.trend_alpha = trend_alpha
+        self.rate_alpha = rate_alpha
+        self.uids = []
+        self.index = {}
+        n = 0
+        self.trend = np.full(n, np.nan)
+        self.rate = np.zeros(n)  # trend change in lbs per day (negative = losing)
+        self.last_day = np.full(n, -1, dtype=np.int64)
+        self.count = np.zeros(n, dtype=np.int64)
+        self.goal_start_day = np.full(n, -1, dtype=np.int64)
+        self.goal_start_weight = np.full(n, np.nan)
+        self.goal_target_weight = np.full(n, np.nan)
+        self.goal_per_week = np.full(n, np.nan)
+        for uid in uids:
+            self.user_index(uid)
+
+    def __len__(self):
+        return len(self.uids)
+
+    def user_index(self, uid):
+        """Return the row for a uid, growing the arrays when a new user appears."""
+        row = self.index.get(uid)
+        if row is not None:
+            return row
+        row = len(self.uids)
+        self.uids.append(uid)
+        self.index[uid] = row
+        if row >= len(self.trend):
+            self._grow(max(16, 2 * len(self.trend)))
+        return row
+
+    def _grow(self, capacity):
+        def extend(array, fill):
+            grown = np.full(capacity, fill, dtype=array.dtype)
+            grown[:len(array)] = array
+            return grown
+
+        self.trend = extend(self.trend, np.nan)
+        self.rate = extend(self.rate, 0.0)
+        self.last_day = extend(self.last_day, -1)
+        self.count = extend(self.count, 0)
+        self.goal_start_day = extend(self.goal_start_day, -1)
+        self.goal_start_weight = extend(self.goal_start_weight, np.nan)
+        self.goal_target_weight = extend(self.goal_target_weight, np.nan)
+        self.goal_per_week = extend(self.goal_per_week, np.nan)
+
+    def set_goal(self, uid, start_day, start_weight, target_weight, per_week):
+        """Attach a WeightLossGoal (startDate, currentWeight, targetWeight, weightLossPerWeek)."""
+        row = self.user_index(uid)
+        self.goal_start_day[row] = start_day
+        self.goal_start_weight[row] = start_weight
+        self.goal_target_weight[row] = target_weight
+        self.goal_per_week[row] = per_week
+
+    def update(self, uid, day, weight):
+        """O(1) incremental update for one new weigh-in.
+
+        Weigh-ins for a day at or before the last one are folded in with a
+        one-day gap so edits never move time backwards.
+        """
+        row = self.user_index(uid)
+        if self.count[row] == 0:
+            self.trend[row] = weight
+            self.rate[row] = 0.0
+        else:
+            gap = max(1, day - self.last_day[row])
+            previous = self.trend[row]
+            alpha = 1.0 - (1.0 - self.trend_alpha) ** gap
+            self.trend[row] = previous + alpha * (weight - previous)
+            beta = 1.0 - (1.0 - self.rate_alpha) ** gap
+            daily_change = (self.trend[row] - previous) / gap
+            self.rate[row] += beta * (daily_change - self.rate[row])
+        self.last_day[row] = max(day, self.last_day[row])
+        self.count[row] += 1
+
+    def update_batch(self, user_rows, days, weights):
+        """Apply many weigh-ins in one vectorized pass.
+
+        Observations are grouped by their position within each user's history
+        and every group is applied as a single array operation, so the number
+        of Python-level steps is the longest history, not the row count.
+        """
+        user_rows = np.asarray(user_rows, dtype=np.int64)
+        days = np.asarray(days, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float64)
+        if len(user_rows) == 0:
+            return
+
+        order = np.lexsort((days, user_rows))
+        user_rows = user_rows[order]
+        days = days[order]
+        weights = weights[order]
+
+        starts = np.flatnonzero(np.r_[True, user_rows[1:] != user_rows[:-1]])
+        lengths = np.diff(np.r_[starts, len(user_rows)])
+        position = np.arange(len(user_rows)) - np.repeat(starts, lengths)
+
+        by_position = np.argsort(position, kind='stable')
+        bounds = np.searchsorted(position[by_position], np.arange(lengths.max() + 1))
+        for step in range(lengths.max()):
+            picked = by_position[bounds[step]:bounds[step + 1]]
+            rows = user_rows[picked]
+            day = days[picked]
+            weight = weights[picked]
+
+            fresh = self.count[rows] == 0
+            gap = np.maximum(1, day - self.last_day[rows])
+            previous = np.where(fresh, weight, self.trend[rows])
+            alpha = 1.0 - (1.0 - self.trend_alpha) ** gap
+            trend = previous + alpha * (weight - previous)
+            beta = 1.0 - (1.0 - self.rate_alpha) ** gap
+            rate = np.where(fresh, 0.0, self.rate[rows])
+            rate = rate + np.where(fresh, 0.0, beta * ((trend - previous) / gap - rate))
+
+            self.trend[rows] = trend
+            self.rate[rows] = rate
+            self.last_day[rows] = np.maximum(day, self.last_day[rows])
+            self.count[rows] += 1
+
+    def projections(self, as_of_day):
+        """Goal metrics for every user, computed from the trend weight.
+
+        Returns a dict of arrays: trendWeight, lossPerWeek, progressPercentage,
+        onTrack, projectedCompletionDay (-1 when not losing) and reached.
+        """
+        n = len(self.uids)
+        trend = self.trend[:n]
+        loss_per_day = -self.rate[:n]
+        start_weight = self.goal_start_weight[:n]
+        target_weight = self.goal_target_weight[:n]
+        per_week = self.goal_per_week[:n]
+        start_day = self.goal_start_day[:n]
+        has_goal = (start_day >= 0) & ~np.isnan(trend)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            total_to_lose = start_weight - target_weight
+            lost_so_far = start_weight - trend
+            progress = np.clip(lost_so_far / total_to_lose * 100, 0, 100)
+            expected_loss = np.maximum(0, as_of_day - start_day) / 7 * per_week
+            on_track = lost_so_far >= expected_loss * ON_TRACK_TOLERANCE
+            reached = trend <= target_weight
+            remaining_days = np.ceil((trend - target_weight) / loss_per_day)
+
+        losing = loss_per_day > 0
+        projected = np.where(
+            reached, as_of_day,
+            np.where(losing, as_of_day + np.nan_to_num(remaining_days), -1),
+        ).astype(np.int64)
+
+        return {
+            'trendWeight': trend,
+            'lossPerWeek': loss_per_day * 7,
+            'progressPercentage': np.where(has_goal, np.nan_to_num(progress), np.nan),
+            'onTrack': has_goal & on_track,
+            'reached': has_goal & reached,
+            'projectedCompletionDay': np.where(has_goal, projected, -1),
+        }
+
+    def report_rows(self, as_of_day):
+        """Per-user dicts suitable for NDJSON output."""
+        metrics = self.projections(as_of_day)
+        for row, uid in enumerate(self.uids):
+            if self.count[row] == 0:
+                continue
+            projected = int(metrics['projectedCompletionDay'][row])
+            progress = metrics['progressPercentage'][row]
+            yield {
+                'uid': uid,
+                'trendWeight': round(float(metrics['trendWeight'][row]), 2),
+                'lossPerWeek': round(float(metrics['lossPerWeek'][row]), 3),
+                'progressPercentage': None if np.isnan(progress) else round(float(progress), 1),
+                'onTrack': bool(metrics['onTrack'][row]),
+                'reached': bool(metrics['reached'][row]),
+                'projectedCompletionDate': from_epoch_day(projected).isoformat() if projected >= 0 else None,
+                'lastWeighIn': from_epoch_day(self.last_day[row]).isoformat(),
+            }
+
+
+def _read_documents(path):
+    with open(path, 'r') as f:
+        text = f.read()
+    stripped = text.lstrip()
+    if stripped.startswith('['):
+        return json.loads(stripped)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def build_engine(entries, goals=()):
+    """Build a TrendEngine from dailyEntries and weightLossGoals documents."""
+    engine = TrendEngine()
+    rows, days, weights = [], [], []
+    for entry in entries:
+        weight = _safe_to_double(entry.get('weight'))
+        day = to_epoch_day(entry.get('date'))
+        if weight is None or weight <= 0 or day is None:
+            continue
+        rows.append(engine.user_index(entry.get('uid') or ''))
+        days.append(day)
+        weights.append(weight)
+    engine.update_batch(rows, days, weights)
+    for goal in goals:
+        if goal.get('isActive') is False:
+            continue
+        start_day = to_epoch_day(goal.get('startDate'))
+        if start_day is None:
+            continue
+        engine.set_goal(
+            goal.get('uid') or '',
+            start_day,
+            _safe_to_double(goal.get('currentWeight')) or 170.0,
+            _safe_to_double(goal.get('targetWeight')) or 150.0,
+            _safe_to_double(goal.get('weightLossPerWeek')) or 1.0,
+        )
+    return engine
+
+
+def run_benchmark(users, days):
+    print(f"📊 Weight trend benchmark: {users:,} users × {days} days")
+    print("=" * 60)
+    rng = np.random.default_rng(42)
+    start_weight = rng.uniform(140, 260, users)
+    per_day = rng.uniform(-0.2, 2.0, users) / 7
+    present = rng.random((users, days)) < 0.6
+    user_rows, day_index = np.nonzero(present)
+    weights = (start_weight[user_rows] - per_day[user_rows] * day_index
+               + rng.normal(0, 1.5, len(user_rows)))
+    day0 = to_epoch_day(datetime.date.today()) - days
+    print(f"📥 {len(user_rows):,} weigh-ins (~40% of days missing)")
+
+    engine = TrendEngine(range(users))
+    start = time.perf_counter()
+    engine.update_batch(user_rows, day0 + day_index, weights)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Batch pass: {elapsed:.2f}s ({len(user_rows) / elapsed / 1e6:.1f}M weigh-ins/s)")
+
+    engine.goal_start_day[:users] = day0
+    engine.goal_start_weight[:users] = start_weight
+    engine.goal_target_weight[:users] = start_weight - 20
+    engine.goal_per_week[:users] = 1.0
+    start = time.perf_counter()
+    metrics = engine.projections(day0 + days)
+    print(f"✅ Projections for all users: {(time.perf_counter() - start) * 1000:.1f}ms "
+          f"({int(metrics['onTrack'].sum()):,} on track)")
+
+    sample = rng.integers(0, users, 100_000)
+    start = time.perf_counter()
+    for uid in sample.tolist():
+        engine.update(uid, day0 + days + 1, 180.0)
+    elapsed = time.perf_counter() - start
+    print(f"⏱️  Incremental update: {elapsed / len(sample) * 1e6:.1f}µs per weigh-in")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    project = sub.add_parser('project', help='Compute trend and projections from exports')
+    project.add_argument('--entries', required=True, help='JSON/NDJSON dailyEntries export')
+    project.add_argument('--goals', help='JSON/NDJSON weightLossGoals export')
+    project.add_argument('--as-of', help='Evaluation date (YYYY-MM-DD), default today')
+
+    bench = sub.add_parser('benchmark', help='Measure the batch pass on synthetic users')
+    bench.add_argument('--users', type=int, default=100_000)
+    bench.add_argument('--days', type=int, default=180)
+
+    args = parser.parse_args()
+
+    if args.command == 'project':
+        goals = _read_documents(args.goals) if args.goals else []
+        engine = build_engine(_read_documents(args.entries), goals)
+        as_of = to_epoch_day(args.as_of) if args.as_of else to_epoch_day(datetime.date.today())
+        for row in engine.report_rows(as_of):
+            print(json.dumps(row))
+    elif args.command == 'benchmark':
+        run_benchmark(args.users, args.days)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import 'package:flutter_test/flutter_test.dart';
+import 'package:samaanai_fitness_tracker/models/calorie_report.dart';
+
+void main() {
+  group('CalorieReport', () {
+    final totals = {
+      'period': 'weekly',
+      'startDate': '2025-06-01T00:00:00.000Z',
+      'endDate': '2025-06-07T00:00:00.000Z',
+      'averageBMR': 1800,
+      'totalCaloriesConsumed': 3500,
+      'totalCaloriesBurned': 400,
+      'totalNetDeficit': 500,
+      'totalGlasses': 8,
+      'averageGlasses': 4,
+      'daysWithData': 2,
+      'totalDays': 7,
+    };
+
+    test('parses row JSON payloads', () {
+      final report = CalorieReport.fromJson({
+        ...totals,
+        'data': [
+          {
+            'date': '2025-06-01T00:00:00.000Z',
+            'netCalorieDeficit': 300,
+            'bmr': 1800,
+            'caloriesConsumed': 1700,
+            'caloriesBurned': 200,
+            'weight': 180.5,
+            'glasses': null,
+          },
+        ],
+      });
+
+      expect(report.data, hasLength(1));
+      expect(report.data.first.weight, 180.5);
+      expect(report.data.first.glasses, isNull);
+    });
+
+    test('decodes the columnar format into the same rows', () {
+      final report = CalorieReport.fromJson({
+        ...totals,
+        'format': CalorieReport.columnarFormat,
+        'columns': {
+          'baseDate': '2025-06-01T00:00:00.000Z',
+          'dayOffsets': [0, 3],
+          'netCalorieDeficit': [300, 200],
+          'bmr': [1800, 1800],
+          'caloriesConsumed': [1700, 1800],
+          'caloriesBurned': [200, 200],
+          'weight': [180.5, 0],
+          'glasses': [0, 8],
+          // Bit 0 set: weight only on day 0; bit 1 set: glasses only on day 3
+          'weightPresent': 'AQ==',
+          'glassesPresent': 'Ag==',
+        },
+      });
+
+      expect(report.data, hasLength(2));
+      expect(report.data[1].date, DateTime.utc(2025, 6, 4));
+      expect(report.data[0].weight, 180.5);
+      expect(report.data[1].weight, isNull);
+      expect(report.data[0].glasses, isNull);
+      expect(report.data[1].glasses, 8.0);
+      expect(report.data[1].caloriesConsumed, 1800.0);
+      expect(report.totalNetDeficit, 500.0);
+      expect(report.daysWithData, 2);
+    });
+  });
+}
@@ -1,3 +1,4 @@
+import 'dart:convert';
 import 'package:flutter_test/flutter_test.dart';
 import 'package:mockito/annotations.dart';
 import 'package:mockito/mockito.dart';
@@ -53,5 +54,189 @@ void main() {
         );
       });
     });
+
+    group('HTTP response caching', () {
+      test('revalidates with If-None-Match and reuses body on 304', () async {
+        when(mockHttpClient.post(
+          any,
+          headers: anyNamed('headers'),
+          body: anyNamed('body'),
+        )).thenAnswer((_) async => http.Response('{"bmr": 1850.5}', 200,
+            headers: {'etag': '"abc123"'}));
+
+        expect(await firebaseService.calculateBMR('some_uid'), 1850.5);
+
+        when(mockHttpClient.post(
+          any,
+          headers: anyNamed('headers'),
+          body: anyNamed('body'),
+        )).thenAnswer((_) async => http.Response('', 304));
+
+        expect(await firebaseService.calculateBMR('some_uid'), 1850.5);
+
+        final headers = verify(mockHttpClient.post(
+          any,
+          headers: captureAnyNamed('headers'),
+          body: anyNamed('body'),
+        )).captured.last as Map<String, String>;
+        expect(headers['If-None-Match'], '"abc123"');
+      });
+
+      test('does not send If-None-Match without a prior ETag', () async {
+        when(mockHttpClient.post(
+          any,
+          headers: anyNamed('headers'),
+          body: anyNamed('body'),
+        )).thenAnswer((_) async => http.Response('{"bmr": 1500}', 200));
+
+        await firebaseService.calculateBMR('some_uid');
+        await firebaseService.calculateBMR('some_uid');
+
+        final captured = verify(mockHttpClient.post(
+          any,
+          headers: captureAnyNamed('headers'),
+          body: anyNamed('body'),
+        )).captured;
+        for (final headers in captured) {
+          expect((headers as Map<String, String>).containsKey('If-None-Match'),
+              isFalse);
+        }
+      });
+
+      test('evicts the least recently used response past the cap', () async {
+        when(mockHttpClient.post(
+          any,
+          headers: anyNamed('headers'),
+          body: anyNamed('body'),
+        )).thenAnswer((_) async => http.Response('{"bmr": 1500}', 200,
+            headers: {'etag': '"abc123"'}));
+
+        for (var i = 0; i <= FirebaseService.maxCachedHttpResponses; i++) {
+          await firebaseService.calculateBMR('uid_$i');
+        }
+        clearInteractions(mockHttpClient);
+
+        await firebaseService.calculateBMR('uid_0');
+        await firebaseService
+            .calculateBMR('uid_${FirebaseService.maxCachedHttpResponses}');
+
+        final captured = verify(mockHttpClient.post(
+          any,
+          headers: captureAnyNamed('headers'),
+          body: anyNamed('body'),
+        )).captured.cast<Map<String, String>>();
+        expect(captured[0].containsKey('If-None-Match'), isFalse);
+        expect(captured[1]['If-None-Match'], '"abc123"');
+      });
+    });
+
+    group('Deleting user data', () {
+      setUp(() {
+        mockAuth =
+            MockFirebaseAuth(signedIn: true, mockUser: MockUser(uid: 'u1'));
+        firebaseService = FirebaseService(
+          auth: mockAuth,
+          firestore: fakeFirestore,
+          httpClient: mockHttpClient,
+        );
+      });
+
+      test('advances the write watermark', () async {
+        await fakeFirestore
+            .collection(FirebaseService.usersCollection)
+            .doc('u1')
+            .set({'uid': 'u1'});
+
+        await firebaseService.deleteAllUserData();
+
+        final watermark = await fakeFirestore
+            .collection(FirebaseService.userWatermarksCollection)
+            .doc('u1')
+            .get();
+        expect(watermark.data()?['lastWriteAt'], isNotNull);
+      });
+
+      test('drops cached responses so the next request is not revalidated',
+          () async {
+        when(mockHttpClient.post(
+          any,
+          headers: anyNamed('headers'),
+          body: anyNamed('body'),
+        )).thenAnswer((_) async => http.Response('{"bmr": 1500}', 200,
+            headers: {'etag': '"abc123"'}));
+
+        await firebaseService.calculateBMR('u1');
+        await firebaseService.deleteAllUserData();
+        clearInteractions(mockHttpClient);
+        await firebaseService.calculateBMR('u1');
+
+        final headers = verify(mockHttpClient.post(
+          any,
+          headers: captureAnyNamed('headers'),
+          body: anyNamed('body'),
+        )).captured.single as Map<String, String>;
+        expect(headers.containsKey('If-None-Match'), isFalse);
+      });
+    });
+
+    group('Streaming reports', () {
+      String row(String date) => jsonEncode({
+            'date': date,
+            'netCalorieDeficit': 500,
+            'bmr': 1800,
+            'caloriesConsumed': 1500,
+            'caloriesBurned': 200,
+          });
+
+      test('yields month chunks as lines arrive, then the full report',
+          () async {
+        final body = [
+          '{"type":"month","month":"2025-01","startDate":"2025-01-01T00:00:00.000Z",'
+              '"endDate":"2025-01-31T00:00:00.000Z","data":[${row('2025-01-05T00:00:00.000Z')}]}\n',
+          '{"type":"month","month":"2025-02","startDate":"2025-02-01T00:00:00.000Z",'
+              '"endDate":"2025-02-28T00:00:00.000Z","data":[${row('2025-02-07T00:00:00.000Z')}]}\n',
+          '{"type":"totals","period":"custom","startDate":"2025-01-01T00:00:00.000Z",'
+              '"endDate":"2025-02-28T00:00:00.000Z","totalNetDeficit":1000,'
+              '"daysWithData":2,"totalDays":59}\n',
+        ].join();
+        // Split mid-record to exercise incremental line decoding
+        final bytes = utf8.encode(body);
+        final parts = [
+          bytes.sublist(0, 40),
+          bytes.sublist(40, 300),
+          bytes.sublist(300),
+        ];
+        when(mockHttpClient.send(any)).thenAnswer((_) async =>
+            http.StreamedResponse(Stream.fromIterable(parts), 200));
+
+        final chunks = await firebaseService
+            .streamCalorieReport(
+                'some_uid', DateTime(2025, 1, 1), DateTime(2025, 2, 28))
+            .toList();
+
+        expect(chunks, hasLength(3));
+        expect(chunks[0].data.single.date, DateTime.utc(2025, 1, 5));
+        expect(chunks[1].isComplete, isFalse);
+        final report = chunks.last.report!;
+        expect(report.data, hasLength(2));
+        expect(report.totalNetDeficit, 1000.0);
+        expect(report.totalDays, 59);
+      });
+
+      test('throws when the stream reports an error', () {
+        when(mockHttpClient.send(any)).thenAnswer((_) async =>
+            http.StreamedResponse(
+                Stream.value(utf8.encode('{"type":"error","error":"boom"}\n')),
+                200));
+
+        expect(
+          firebaseService
+              .streamCalorieReport(
+                  'some_uid', DateTime(2025, 1, 1), DateTime(2025, 2, 28))
+              .toList(),
+          throwsA(isA<Exception>()),
+        );
+      });
+    });
   });
 }
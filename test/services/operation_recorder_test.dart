@@ -0,0 +1,63 @@
+import 'dart:convert';
+import 'package:flutter_test/flutter_test.dart';
+import 'package:http/http.dart' as http;
+import 'package:fake_cloud_firestore/fake_cloud_firestore.dart';
+import 'package:firebase_auth_mocks/firebase_auth_mocks.dart';
+import 'package:samaanai_fitness_tracker/models/daily_entry.dart';
+import 'package:samaanai_fitness_tracker/services/firebase_service.dart';
+import 'package:samaanai_fitness_tracker/services/operation_recorder.dart';
+
+void main() {
+  group('OperationRecorder', () {
+    test('records operation, payload and outcome', () async {
+      final recorder = OperationRecorder(deviceId: 'dev1', echo: false);
+
+      await recorder.track('updateWeight', 'u1', '2025-06-01',
+          {'weight': 180.5}, () async {});
+      await expectLater(
+        recorder.track('addFoodEntry', 'u1', '2025-06-01', {}, () async {
+          throw Exception('offline');
+        }),
+        throwsA(isA<Exception>()),
+      );
+
+      final records = recorder.records;
+      expect(records.map((r) => r['op']), ['updateWeight', 'addFoodEntry']);
+      expect(records.first['device'], 'dev1');
+      expect(records.first['payload'], {'weight': 180.5});
+      expect(records.first['outcome'], 'ok');
+      expect(records.last['outcome'], 'error');
+      expect(DateTime.parse(records.first['t'] as String).isUtc, isTrue);
+
+      final lines = recorder.toNdjson().split('\n');
+      expect(lines, hasLength(2));
+      expect(jsonDecode(lines.first)['uid'], 'u1');
+    });
+
+    test('keeps only the most recent records up to capacity', () async {
+      final recorder = OperationRecorder(capacity: 2, echo: false);
+      for (final op in ['a', 'b', 'c']) {
+        await recorder.track(op, 'u1', '2025-06-01', {}, () async {});
+      }
+      expect(recorder.records.map((r) => r['op']), ['b', 'c']);
+    });
+
+    test('FirebaseService records daily entry writes', () async {
+      final recorder = OperationRecorder(echo: false);
+      final service = FirebaseService(
+        auth: MockFirebaseAuth(signedIn: true, mockUser: MockUser(uid: 'u1')),
+        firestore: FakeFirebaseFirestore(),
+        httpClient: http.Client(),
+        recorder: recorder,
+      );
+
+      await service.addFoodEntry(FoodEntry(name: 'Oats', calories: 300));
+      await service.updateWeight(180.0);
+
+      expect(recorder.records.map((r) => r['op']),
+          ['addFoodEntry', 'updateWeight']);
+      expect(recorder.records.first['payload']['name'], 'Oats');
+      expect(recorder.records.first['uid'], 'u1');
+    });
+  });
+}